@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Audtheia end-to-end benchmark
+=============================
+Drives the three Python entry points against local stand-ins for
+Roboflow, Anthropic and n8n (fake_services.py) using synthetic survey
+footage (synthetic_video.py):
+
+- proxy   proxy/main.py /detect with N concurrent clients; Roboflow is the stand-in
+- blocks  the workflow's custom blocks (roboflow-workflows/blocks) through the local
+          block runner, with ground truth standing in for the model and ByteTracker;
+          Claude analyses, n8n posts and dataset uploads go to the stand-ins
+- sink    the deploy script's sink saving an MP4 source, then finalize
+
+Blocks run flat out by default; --pace feeds them at --fps so the
+analysis interval and upload quotas see stream time and the API-call
+counts match a live camera.
+
+Each scenario records throughput, p50/p90/p99 latency, peak RSS and the
+calls each stand-in received. --json writes everything as a baseline;
+--compare prints the change against an earlier baseline and flags
+regressions beyond --tolerance.
+
+The blocks scenario needs `inference` (and supervision) installed, as the
+workflow itself does; without them it is skipped.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --profile typical --json baseline.json
+    python benchmarks/bench_end_to_end.py --profile typical --compare baseline.json --fail-on-regression
+    python benchmarks/bench_end_to_end.py --scenarios proxy --profile degraded --concurrency 16
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_services import PROFILES, FakeServices, profile_set  # noqa: E402
+from synthetic_video import SyntheticScene, write_video  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "roboflow-workflows"))
+from block_runner import normalize_record  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEPLOY_SCRIPT = REPO_ROOT / "roboflow-workflows" / "Deploy Roboflow Anthropic Pipeline.py"
+PROXY_MAIN = REPO_ROOT / "proxy" / "main.py"
+
+SCENARIOS = ("proxy", "blocks", "sink")
+STREAM_ID = "benchmark_stream"
+
+# Metrics compared against a baseline: (dotted path, higher is better)
+COMPARED_METRICS = [
+    ("throughput_per_s", True),
+    ("latency_ms.p50", False),
+    ("latency_ms.p99", False),
+    ("memory_mb.peak_rss", False),
+]
+# Latency changes smaller than this are timer noise, whatever the percentage
+NOISE_FLOOR_MS = 0.1
+
+
+def load_module(name: str, path: Path):
+    """Import a script by path (the deploy script and proxy are not packages)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+class MemorySampler:
+    """Peak resident set size while a scenario runs, sampled from /proc (getrusage elsewhere)."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.start_mb = self.peak_mb = 0.0
+
+    @staticmethod
+    def rss_mb() -> float:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self.rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = self.rss_mb()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self.rss_mb())
+
+    def summary(self) -> dict:
+        return {"start": round(self.start_mb, 1), "peak_rss": round(self.peak_mb, 1),
+                "growth": round(self.peak_mb - self.start_mb, 1)}
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    if not seconds:
+        return {"p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    ms = np.asarray(seconds) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p99": round(float(p99), 3),
+            "max": round(float(ms.max()), 3), "mean": round(float(ms.mean()), 3)}
+
+
+def api_calls(fakes: FakeServices) -> dict:
+    """Calls each stand-in received during the scenario (services that saw none are left out)."""
+    calls = {}
+    for service, stats in fakes.stats().items():
+        if stats["total"]:
+            calls[service] = {"calls": stats["calls"], "errors": stats["errors"], "cold_starts": stats["cold_starts"]}
+    return calls
+
+
+def scenario_result(count: int, busy_seconds: float, wall_seconds: float, latencies: list[float],
+                    memory: MemorySampler, fakes: FakeServices, **extra) -> dict:
+    return {
+        "count": count,
+        "throughput_per_s": round(count / busy_seconds, 2) if busy_seconds > 0 else 0.0,
+        "wall_seconds": round(wall_seconds, 3),
+        "latency_ms": latency_summary(latencies),
+        "memory_mb": memory.summary(),
+        "api_calls": api_calls(fakes),
+        **extra,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+def bench_proxy(args, fakes: FakeServices, scene: SyntheticScene, workdir: str) -> dict:
+    try:
+        import httpx
+        os.environ.setdefault("ROBOFLOW_API_KEY", "benchmark")
+        proxy = load_module("audtheia_proxy", PROXY_MAIN)
+    except ImportError as exc:
+        return {"skipped": f"proxy dependencies not installed ({exc.name})"}
+
+    proxy.ROBOFLOW_ENDPOINT = f"{fakes.url('roboflow')}/official-porifera-classifier-ju8er/12"
+    proxy.AIRTABLE_API_KEY = None  # no dashboard refresh competing for the loop
+    proxy.limiter.enabled = False  # the public demo allows 5 detections per hour per IP
+    step = max(1, args.frames // 16)
+    images = [cv2.imencode(".jpg", scene.frame(index)[0], [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+              for index in range(0, args.frames, step)]
+
+    async def run():
+        latencies, statuses = [], {}
+        requests = iter(range(args.requests))
+        async with proxy.app.router.lifespan_context(proxy.app):
+            transport = httpx.ASGITransport(app=proxy.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://proxy.bench", timeout=120) as client:
+                async def client_loop():
+                    for index in requests:
+                        started = time.perf_counter()
+                        response = await client.post(
+                            "/detect", files={"file": ("frame.jpg", images[index % len(images)], "image/jpeg")})
+                        latencies.append(time.perf_counter() - started)
+                        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+                started = time.perf_counter()
+                await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+                return time.perf_counter() - started, latencies, statuses
+
+    with MemorySampler() as memory:
+        elapsed, latencies, statuses = asyncio.run(run())
+    return scenario_result(len(latencies), elapsed, elapsed, latencies, memory, fakes,
+                           concurrency=args.concurrency, statuses=statuses,
+                           image_kb=round(sum(map(len, images)) / len(images) / 1024, 1))
+
+
+def bench_blocks(args, fakes: FakeServices, scene: SyntheticScene, workdir: str) -> dict:
+    try:
+        from block_runner import BlockChain
+        chain = BlockChain({
+            "Anthropic_Environmental_Analyzer.ANTHROPIC_API_URL": f"{fakes.url('anthropic')}/v1/messages",
+            "Anthropic_Environmental_Analyzer.ANTHROPIC_API_KEY": "benchmark",
+            "Anthropic_Environmental_Analyzer.ANALYSIS_INTERVAL_SECONDS": args.analysis_interval,
+            "Analyst_Caller.N8N_WEBHOOK_URL": f"{fakes.url('n8n')}/webhook/audtheia",
+            "Active_Learning_Upload_Policy.ROBOFLOW_API_URL": fakes.url("roboflow"),
+            "Active_Learning_Upload_Policy.ROBOFLOW_API_KEY": "benchmark",
+            "Active_Learning_Upload_Policy.SPOOL_DIR": os.path.join(workdir, "upload_spool"),
+            "Active_Learning_Upload_Policy.UPLOAD_FLUSH_SECONDS": 1.0,
+        }, stream_id=STREAM_ID)
+    except ImportError as exc:
+        return {"skipped": f"inference not installed ({exc.name})"}
+
+    with MemorySampler() as memory:
+        wall_started = time.perf_counter()
+        for index in range(args.frames):
+            if args.pace:
+                time.sleep(max(0.0, wall_started + index / args.fps - time.perf_counter()))
+            frame, boxes = scene.frame(index)
+            chain.run_frame(*chain.inputs(frame, index, normalize_record({"detections": boxes}), args.fps))
+        wall = time.perf_counter() - wall_started
+        # Claude analyses, n8n posts and dataset uploads finish on background threads
+        time.sleep(args.drain_seconds)
+
+    return scenario_result(len(chain.frame_times), sum(chain.frame_times), wall, chain.frame_times, memory, fakes,
+                           paced=args.pace,
+                           stages={name: latency_summary(times) for name, times in chain.timings.items()})
+
+
+def bench_sink(args, fakes: FakeServices, scene: SyntheticScene, workdir: str) -> dict:
+    video_path = os.path.join(workdir, "synthetic_survey.mp4")
+    write_video(video_path, args.frames, scene.width, scene.height, args.fps, args.organisms, args.seed)
+    deploy = load_module("audtheia_deploy", DEPLOY_SCRIPT)
+
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # the processor writes to ./processed_videos
+    try:
+        processor = deploy.EnhancedMP4ProcessorWithDownload(
+            download_path=os.path.join(workdir, "downloads"), writer_backend=args.writer_backend)
+        processor.detect_source_type(video_path)
+        deploy.smart_processor = processor
+        deploy.stream_processors = [processor]
+
+        latencies = []
+        with MemorySampler() as memory:
+            wall_started = time.perf_counter()
+            for index in range(args.frames):
+                frame, boxes = scene.frame(index)
+                result = {
+                    "output_image": SimpleNamespace(numpy_image=frame),
+                    "detection_converter": {"detections": {"class_names": [box["class_name"] for box in boxes]}},
+                }
+                started = time.perf_counter()
+                deploy.audtheia_optimized_sink_with_display_and_saving(result, SimpleNamespace(source_id=0, frame_id=index))
+                latencies.append(time.perf_counter() - started)
+            finalize_started = time.perf_counter()
+            output = processor.finish_saving_and_download()
+            finalize_seconds = time.perf_counter() - finalize_started
+            wall = time.perf_counter() - wall_started
+    finally:
+        os.chdir(previous_cwd)
+
+    output_mb = os.path.getsize(output) / 2**20 if output and os.path.exists(output) else None
+    return scenario_result(len(latencies), sum(latencies), wall, latencies, memory, fakes,
+                           writer=processor.codec_used, finalize_ms=round(finalize_seconds * 1000, 1),
+                           output_mb=None if output_mb is None else round(output_mb, 2))
+
+
+BENCHMARKS = {"proxy": bench_proxy, "blocks": bench_blocks, "sink": bench_sink}
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("json_path", "compare_path")},
+    }
+
+
+def metric(result: dict, path: str):
+    value = result
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def print_scenario(name: str, result: dict):
+    if "skipped" in result:
+        print(f"⚠️ {name}: skipped - {result['skipped']}")
+        return
+    latency = result["latency_ms"]
+    print(f"{name:<8} {result['throughput_per_s']:9.1f}/s  p50 {latency['p50']:9.2f} ms  p99 {latency['p99']:9.2f} ms"
+          f"  peak RSS {result['memory_mb']['peak_rss']:7.1f} MB")
+    for stage, summary in result.get("stages", {}).items():
+        print(f"   {stage:<34} p50 {summary['p50']:9.3f} ms  p99 {summary['p99']:9.3f} ms")
+    for service, calls in result["api_calls"].items():
+        routes = ", ".join(f"{route} {count}" for route, count in calls["calls"].items())
+        print(f"   📡 {service:<10} {routes} (errors {calls['errors']}, cold starts {calls['cold_starts']})")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print current vs baseline; returns the regressions beyond `tolerance` (a fraction)."""
+    print(f"\n📊 Against baseline {baseline.get('meta', {}).get('commit') or '(unknown commit)'}"
+          f" - tolerance {tolerance * 100:.0f}%")
+    if baseline.get("profiles") != results["profiles"]:
+        print("⚠️ Stand-in profiles differ from the baseline's; latency changes may not be the code's")
+    changed = sorted(key for key, value in results["meta"]["args"].items()
+                     if baseline.get("meta", {}).get("args", {}).get(key, value) != value)
+    if changed:
+        print(f"⚠️ Run options differ from the baseline's: {', '.join(changed)}")
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or "skipped" in previous or "skipped" in current:
+            print(f"{name:<8} not comparable (missing or skipped)")
+            continue
+        paths = list(COMPARED_METRICS)
+        paths += [(f"stages.{stage}.p99", False) for stage in current.get("stages", {})]
+        for path, higher_is_better in paths:
+            now, before = metric(current, path), metric(previous, path)
+            if now is None or not before:
+                continue
+            change = (now - before) / before
+            worse = -change if higher_is_better else change
+            if path.endswith(("p50", "p99")) and abs(now - before) < NOISE_FLOOR_MS:
+                worse = 0.0
+            flag = "❌" if worse > tolerance else ("✅" if worse < -tolerance else "  ")
+            print(f"{name:<8} {path:<52} {before:11.2f} -> {now:11.2f} {change * 100:+7.1f}% {flag}")
+            if worse > tolerance:
+                regressions.append(f"{name} {path} {change * 100:+.1f}%")
+        for service in sorted(set(current["api_calls"]) | set(previous.get("api_calls", {}))):
+            now = sum(current["api_calls"].get(service, {}).get("calls", {}).values())
+            before = sum(previous.get("api_calls", {}).get(service, {}).get("calls", {}).values())
+            if now != before:
+                print(f"{name:<8} {service + ' calls':<52} {before:11d} -> {now:11d}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--profile", default="typical", choices=sorted(PROFILES), help="Stand-in latency/error profile")
+    parser.add_argument("--latency-ms", type=float, help="Override median latency on every stand-in")
+    parser.add_argument("--error-rate", type=float, help="Override error rate on every stand-in")
+    parser.add_argument("--cold-start-ms", type=float, help="Override cold start on every stand-in")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--organisms", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Proxy /detect requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent proxy clients")
+    parser.add_argument("--analysis-interval", type=float, default=2.0, help="Claude analysis interval for the blocks run")
+    parser.add_argument("--pace", action="store_true",
+                        help="Feed the blocks at --fps instead of flat out, so API-call counts match a live stream")
+    parser.add_argument("--drain-seconds", type=float, default=3.0, help="Wait for background senders after the blocks run")
+    parser.add_argument("--writer-backend", default="auto", choices=["auto", "ffmpeg", "opencv"])
+    parser.add_argument("--json", dest="json_path", help="Write results (a baseline) to this JSON file")
+    parser.add_argument("--compare", dest="compare_path", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed regression in percent")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when --compare finds a regression")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    profiles = profile_set(args.profile, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                           cold_start_ms=args.cold_start_ms)
+    scene = SyntheticScene(width, height, args.organisms, args.frames, args.seed)
+    results = {
+        "meta": run_metadata(args),
+        "profiles": {service: asdict(profile) for service, profile in profiles.items()},
+        "scenarios": {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="audtheia_e2e_bench_")
+    try:
+        with FakeServices(profiles, seed=args.seed) as fakes:
+            for name in scenarios:
+                fakes.reset()  # counters start at zero and every stand-in starts cold
+                print(f"\n▶️ {name} ({args.profile} profile)")
+                results["scenarios"][name] = BENCHMARKS[name](args, fakes, scene, workdir)
+            print("\n🏁 Results")
+            for name, result in results["scenarios"].items():
+                print_scenario(name, result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline written to {args.json_path}")
+
+    if args.compare_path:
+        with open(args.compare_path) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance / 100.0)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): " + "; ".join(regressions))
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Audtheia shared-memory frame bus benchmark
+==========================================
+Publishes synthetic frames as fast as possible while 1..N consumer
+processes read them, and compares the shared-memory bus (one copy into
+shared memory, zero-copy reads) with the usual fan-out of pickled frames
+through one multiprocessing.Queue per consumer.
+
+Each consumer does a light, realistic amount of work per frame (a strided
+mean, like a motion/brightness check) so reads are not optimised away.
+
+Usage:
+    python benchmarks/bench_frame_bus.py --size 1920x1080 --seconds 5 --max-consumers 4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "roboflow-workflows"))
+from frame_bus import SharedFrameBus  # noqa: E402
+
+
+def consume_bus(bus_name: str, stop_event, ready_event, results):
+    bus = SharedFrameBus.attach(bus_name)
+    consumer = bus.register_consumer()
+    ready_event.set()
+    checksum = 0.0
+    while not stop_event.is_set():
+        ref = consumer.wait_for_frame(timeout=0.1)
+        if ref is None:
+            continue
+        checksum += float(ref.frame[::16, ::16].mean())
+        consumer.release(ref)
+    results.put({"frames": consumer.frames_read, "skipped": consumer.frames_skipped, "checksum": checksum})
+    consumer.detach()
+    bus.close()
+
+
+def consume_queue(frame_queue, stop_event, ready_event, results):
+    ready_event.set()
+    frames = 0
+    checksum = 0.0
+    while not stop_event.is_set():
+        try:
+            frame = frame_queue.get(timeout=0.1)
+        except Exception:
+            continue
+        checksum += float(frame[::16, ::16].mean())
+        frames += 1
+    results.put({"frames": frames, "skipped": 0, "checksum": checksum})
+
+
+def synthetic_frames(width: int, height: int, count: int = 8):
+    rng = np.random.default_rng(7)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def run_bus(frames, consumers: int, seconds: float) -> dict:
+    ctx = mp.get_context("spawn")
+    bus = SharedFrameBus.create(None, frames[0].shape, slots=8, max_consumers=max(8, consumers))
+    stop_event, results = ctx.Event(), ctx.Queue()
+    ready = [ctx.Event() for _ in range(consumers)]
+    workers = [ctx.Process(target=consume_bus, args=(bus.name, stop_event, ready[i], results)) for i in range(consumers)]
+    for worker in workers:
+        worker.start()
+    for event in ready:
+        event.wait(30)
+
+    published = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if bus.publish(frames[published % len(frames)]) >= 0:
+            published += 1
+    elapsed = time.perf_counter() - start
+    stop_event.set()
+    consumer_results = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(10)
+    dropped = bus.stats()["dropped"]
+    bus.close()
+    return {
+        "transport": "shared_memory_bus",
+        "consumers": consumers,
+        "publisher_fps": round(published / elapsed, 1),
+        "consumer_fps": [round(r["frames"] / elapsed, 1) for r in consumer_results],
+        "consumer_skipped": [r["skipped"] for r in consumer_results],
+        "dropped_by_publisher": dropped,
+    }
+
+
+def run_queues(frames, consumers: int, seconds: float) -> dict:
+    ctx = mp.get_context("spawn")
+    stop_event, results = ctx.Event(), ctx.Queue()
+    queues = [ctx.Queue(maxsize=4) for _ in range(consumers)]
+    ready = [ctx.Event() for _ in range(consumers)]
+    workers = [ctx.Process(target=consume_queue, args=(queues[i], stop_event, ready[i], results)) for i in range(consumers)]
+    for worker in workers:
+        worker.start()
+    for event in ready:
+        event.wait(30)
+
+    published = 0
+    dropped = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        frame = frames[(published + dropped) % len(frames)]
+        accepted = 0
+        for frame_queue in queues:
+            try:
+                frame_queue.put_nowait(frame)
+                accepted += 1
+            except Exception:
+                pass
+        if accepted:
+            published += 1
+        else:
+            dropped += 1
+    elapsed = time.perf_counter() - start
+    stop_event.set()
+    consumer_results = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(10)
+    for frame_queue in queues:
+        frame_queue.cancel_join_thread()
+    return {
+        "transport": "pickled_queues",
+        "consumers": consumers,
+        "publisher_fps": round(published / elapsed, 1),
+        "consumer_fps": [round(r["frames"] / elapsed, 1) for r in consumer_results],
+        "dropped_by_publisher": dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1920x1080", help="WIDTHxHEIGHT")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--max-consumers", type=int, default=4)
+    parser.add_argument("--skip-queue-baseline", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    frames = synthetic_frames(width, height)
+    results = []
+    print(f"{'transport':<20}{'consumers':>10}{'publish fps':>13}  consumer fps")
+    for consumers in range(1, args.max_consumers + 1):
+        runs = [run_bus(frames, consumers, args.seconds)]
+        if not args.skip_queue_baseline:
+            runs.append(run_queues(frames, consumers, args.seconds))
+        for result in runs:
+            results.append(result)
+            print(f"{result['transport']:<20}{result['consumers']:>10}{result['publisher_fps']:>13.1f}  "
+                  f"{', '.join(f'{fps:.1f}' for fps in result['consumer_fps'])}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"size": [width, height], "seconds": args.seconds, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Audtheia network I/O sidecar benchmark
+======================================
+Inference frames per second with the workflow's network I/O in process
+(threads, the default) and in the io_sidecar.py process, against the
+local Roboflow/Anthropic/n8n stand-ins (fake_services.py).
+
+Each mode runs in a fresh worker process. Per frame the worker does a
+GIL-bound stand-in for decode + model + tracking + drawing (a pure-Python
+loop calibrated to --inference-ms on an idle interpreter), then runs the
+custom blocks as the workflow does. Claude analyses run every
+--analysis-interval seconds, Analyst_Caller posts to n8n on every frame
+with a finished analysis, and dataset uploads flush every second - so
+the in-process mode has HTTP threads competing for the GIL while the
+sidecar mode hands that work to another process.
+
+Reported per mode: frames/s, frame p50/p99, how much the inference
+stand-in slowed down against its calibrated time (GIL contention), and
+the requests each stand-in received - the in-process schedulers drop
+their oldest queued webhook posts under load, so compare fps together
+with what was actually delivered. The sidecar only pays off with a spare
+core for it; on a single core it adds a process to the same CPU.
+
+Needs the workflow's packages (inference, supervision) and httpx.
+
+Usage:
+    python benchmarks/bench_io_sidecar.py --frames 600 --inference-ms 15 --json io_sidecar.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+WORKFLOWS_DIR = BENCH_DIR.parent / "roboflow-workflows"
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(WORKFLOWS_DIR))
+from fake_services import PROFILES, FakeServices, profile_set  # noqa: E402
+from synthetic_video import SyntheticScene  # noqa: E402
+
+MODES = ("off", "on")
+STREAM_ID = "benchmark_stream"
+
+
+# ---------------------------------------------------------------------------
+# Worker (one process per mode)
+# ---------------------------------------------------------------------------
+
+def calibrate(target_ms: float) -> int:
+    """Loop iterations that take `target_ms` on this interpreter with nothing else running"""
+    iterations = 10_000
+    while True:
+        started = time.perf_counter()
+        gil_work(iterations)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if elapsed_ms >= 20.0 or iterations >= 1 << 26:
+            return max(1, int(iterations * target_ms / elapsed_ms))
+        iterations *= 2
+
+
+def gil_work(iterations: int) -> int:
+    total = 0
+    for value in range(iterations):
+        total += value * value % 7
+    return total
+
+
+def percentiles(seconds: list) -> dict:
+    ms = np.asarray(seconds) * 1000.0
+    p50, p99 = np.percentile(ms, [50, 99])
+    return {"p50": round(float(p50), 3), "p99": round(float(p99), 3), "mean": round(float(ms.mean()), 3)}
+
+
+def run_worker(config: dict) -> dict:
+    from block_runner import BlockChain, normalize_record
+
+    scene = SyntheticScene(config["width"], config["height"], config["organisms"], config["frames"], config["seed"])
+    iterations = calibrate(config["inference_ms"])
+    chain = BlockChain({
+        "Anthropic_Environmental_Analyzer.ANTHROPIC_API_URL": f"{config['urls']['anthropic']}/v1/messages",
+        "Anthropic_Environmental_Analyzer.ANTHROPIC_API_KEY": "benchmark",
+        "Anthropic_Environmental_Analyzer.ANALYSIS_INTERVAL_SECONDS": config["analysis_interval"],
+        "Analyst_Caller.N8N_WEBHOOK_URL": f"{config['urls']['n8n']}/webhook/audtheia",
+        "Active_Learning_Upload_Policy.ROBOFLOW_API_URL": config["urls"]["roboflow"],
+        "Active_Learning_Upload_Policy.ROBOFLOW_API_KEY": "benchmark",
+        "Active_Learning_Upload_Policy.SPOOL_DIR": config["spool_dir"],
+        "Active_Learning_Upload_Policy.UPLOAD_FLUSH_SECONDS": 1.0,
+        "Active_Learning_Upload_Policy.MIN_SECONDS_BETWEEN_UPLOADS": 0.2,
+    }, stream_id=STREAM_ID)
+    frames = [scene.frame(index) for index in range(min(config["frames"], 120))]  # decode is not measured
+
+    inference_times, frame_times = [], []
+    wall_started = time.perf_counter()
+    for index in range(config["frames"]):
+        started = time.perf_counter()
+        frame, boxes = frames[index % len(frames)]
+        gil_work(iterations)
+        inference_done = time.perf_counter()
+        chain.run_frame(*chain.inputs(frame, index, normalize_record({"detections": boxes}), config["fps"]))
+        finished = time.perf_counter()
+        inference_times.append(inference_done - started)
+        frame_times.append(finished - started)
+    wall = time.perf_counter() - wall_started
+    time.sleep(config["drain_seconds"])
+
+    inference = percentiles(inference_times)
+    return {
+        "frames": len(frame_times),
+        "fps": round(len(frame_times) / wall, 2),
+        "frame_ms": percentiles(frame_times),
+        "inference_ms": inference,
+        "inference_slowdown_pct": round(100.0 * (inference["mean"] / config["inference_ms"] - 1.0), 1),
+        "blocks_ms": {block: percentiles(times) for block, times in chain.timings.items() if times},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def run_mode(mode: str, config: dict, workdir: str) -> dict:
+    env = dict(os.environ)
+    env.pop("AUDTHEIA_IO_SIDECAR", None)
+    sidecar = None
+    if mode == "on":
+        from io_sidecar import SOCKET_ENV, request_stats, wait_for_socket
+        socket_path = os.path.join(workdir, "io.sock")
+        sidecar = subprocess.Popen([sys.executable, str(WORKFLOWS_DIR / "io_sidecar.py"), "--socket", socket_path],
+                                   stdout=subprocess.DEVNULL)
+        if not wait_for_socket(socket_path, process=sidecar):
+            sidecar.kill()
+            raise RuntimeError("io_sidecar.py did not start")
+        env[SOCKET_ENV] = socket_path
+    config = dict(config, spool_dir=os.path.join(workdir, f"spool_{mode}"))
+    try:
+        completed = subprocess.run([sys.executable, __file__, "--worker", json.dumps(config)], env=env,
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"worker ({mode}) failed:\n{completed.stderr[-2000:]}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if sidecar is not None:
+            result["sidecar"] = request_stats(socket_path)
+        return result
+    finally:
+        if sidecar is not None:
+            sidecar.terminate()
+            sidecar.wait(timeout=5)
+
+
+def print_mode(mode: str, result: dict):
+    frame, inference = result["frame_ms"], result["inference_ms"]
+    print(f"sidecar {mode:<4} {result['fps']:8.1f} fps  frame p50 {frame['p50']:8.2f} ms  p99 {frame['p99']:8.2f} ms  "
+          f"inference stand-in p99 {inference['p99']:7.2f} ms ({result['inference_slowdown_pct']:+.1f}% vs idle)")
+    for block, summary in result["blocks_ms"].items():
+        print(f"   {block:<34} p50 {summary['p50']:8.3f} ms  p99 {summary['p99']:8.3f} ms")
+    for service, calls in result.get("api_calls", {}).items():
+        routes = ", ".join(f"{route} {count}" for route, count in calls.items())
+        print(f"   📡 {service:<10} {routes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of " + ", ".join(MODES))
+    parser.add_argument("--profile", default="typical", choices=sorted(PROFILES), help="Stand-in latency/error profile")
+    parser.add_argument("--latency-ms", type=float, help="Override median latency on every stand-in")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=float, default=30.0, help="Stream fps reported to the blocks")
+    parser.add_argument("--organisms", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--inference-ms", type=float, default=15.0,
+                        help="GIL-bound work per frame standing in for decode, model, tracking and drawing")
+    parser.add_argument("--analysis-interval", type=float, default=0.5, help="Claude analysis interval")
+    parser.add_argument("--drain-seconds", type=float, default=2.0, help="Wait for in-flight requests after the run")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return 0
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    profiles = profile_set(args.profile, latency_ms=args.latency_ms)
+    results = {"args": {key: value for key, value in vars(args).items() if key not in ("json_path", "worker")},
+               "profiles": {service: asdict(profile) for service, profile in profiles.items()}, "modes": {}}
+
+    if (os.cpu_count() or 1) < 2:
+        print("⚠️ Single CPU: the sidecar process competes with inference for the same core")
+    workdir = tempfile.mkdtemp(prefix="audtheia_io_bench_")
+    try:
+        with FakeServices(profiles, seed=args.seed) as fakes:
+            config = {"width": width, "height": height, "organisms": args.organisms, "frames": args.frames,
+                      "seed": args.seed, "fps": args.fps, "inference_ms": args.inference_ms,
+                      "analysis_interval": args.analysis_interval, "drain_seconds": args.drain_seconds,
+                      "urls": {service: fakes.url(service) for service in ("roboflow", "anthropic", "n8n")}}
+            for mode in modes:
+                fakes.reset()
+                print(f"▶️ sidecar {mode} ({args.frames} frames, {args.profile} profile)")
+                result = run_mode(mode, config, workdir)
+                result["api_calls"] = {service: stats["calls"] for service, stats in fakes.stats().items()
+                                       if stats["total"]}
+                results["modes"][mode] = result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n🏁 Results")
+    for mode, result in results["modes"].items():
+        print_mode(mode, result)
+    if "on" in results["modes"] and "off" in results["modes"]:
+        off, on = results["modes"]["off"]["fps"], results["modes"]["on"]["fps"]
+        delivered = {mode: sum(sum(calls.values()) for calls in results["modes"][mode]["api_calls"].values())
+                     for mode in ("on", "off")}
+        print(f"\n📮 Sidecar on vs off: {on:.1f} vs {off:.1f} fps ({100.0 * (on / off - 1.0):+.1f}%), "
+              f"{delivered['on']} vs {delivered['off']} requests delivered")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Audtheia startup benchmark
+==========================
+Time from launching the deploy script to the first frame reaching its
+sink - the blind spot each time a watchdog restarts a camera - broken
+down by phase.
+
+Modes (each run is a fresh interpreter):
+
+- default     the script as shipped: Rich banner, startup animations, workflow
+              compiled and model loaded by InferencePipeline on the way to frame one
+- fast-cold   --fast-start with an empty --cache-dir (first start on a new box:
+              workflow spec fetched, weights downloaded)
+- fast        --fast-start with a warm --cache-dir (a watchdog restart)
+
+Every run plays a short synthetic clip (synthetic_video.py) headless with
+--exit-after-first-frame and --startup-report. Phases come from that
+report; "interpreter" is launch to the first line of the script, taken
+against the benchmark's own clock. The fast modes also list the
+prewarm steps, which run on a background thread alongside the phases.
+
+Needs the workflow's packages (inference, supervision) and a configured
+ROBOFLOW_API_KEY / workspace / workflow in the deploy script, or
+--workflow-spec for a local workflow JSON.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --json startup.json
+    python benchmarks/bench_startup.py --modes default,fast --workflow-spec workflow.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEPLOY_SCRIPT = BENCH_DIR.parent / "roboflow-workflows" / "Deploy Roboflow Anthropic Pipeline.py"
+sys.path.insert(0, str(BENCH_DIR))
+from synthetic_video import write_video  # noqa: E402
+
+MODES = ("default", "fast-cold", "fast")
+
+
+def launch(mode: str, video: str, workdir: str, cache_dir: str, args: argparse.Namespace, index: int) -> dict:
+    """One run of the deploy script; returns its startup report plus the interpreter time"""
+    report_path = os.path.join(workdir, f"startup_{mode}_{index}.json")
+    command = [sys.executable, str(DEPLOY_SCRIPT), "--source", video, "--no-display",
+               "--exit-after-first-frame", "--startup-report", report_path]
+    if args.workflow_spec:
+        command += ["--workflow-spec", args.workflow_spec]
+    env = dict(os.environ)
+    if mode != "default":
+        command += ["--fast-start", "--cache-dir", cache_dir]
+        env.pop("MODEL_CACHE_DIR", None)  # follow --cache-dir
+
+    spawned = time.time()
+    completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, timeout=args.timeout)
+    if not os.path.exists(report_path):
+        raise RuntimeError(f"{mode} run {index} never reached the first frame (exit {completed.returncode}):\n"
+                           f"{(completed.stdout + completed.stderr)[-2000:]}")
+    with open(report_path) as f:
+        report = json.load(f)
+    interpreter_ms = round((report["script_started_unix"] - spawned) * 1000.0, 1)
+    return {
+        "total_ms": round(interpreter_ms + report["total_ms"], 1),
+        "phases_ms": {"interpreter": interpreter_ms, **report["phases_ms"]},
+        "prewarm_ms": report["prewarm_ms"],
+    }
+
+
+def medians(runs: list, key: str) -> dict:
+    names = []
+    for run in runs:
+        names += [name for name in run[key] if name not in names]
+    return {name: round(statistics.median(run[key][name] for run in runs if name in run[key]), 1) for name in names}
+
+
+def run_mode(mode: str, video: str, workdir: str, args: argparse.Namespace) -> dict:
+    shared_cache = os.path.join(workdir, "cache_warm")
+    if mode == "fast":
+        # Unmeasured first start fills the cache, as the camera's first boot would have
+        launch(mode, video, workdir, shared_cache, args, index=-1)
+    runs = []
+    for index in range(args.runs):
+        cache_dir = os.path.join(workdir, f"cache_cold_{index}") if mode == "fast-cold" else shared_cache
+        runs.append(launch(mode, video, workdir, cache_dir, args, index))
+        print(f"   run {index + 1}/{args.runs}: first frame after {runs[-1]['total_ms'] / 1000.0:.2f}s")
+    return {
+        "runs": runs,
+        "total_ms": round(statistics.median(run["total_ms"] for run in runs), 1),
+        "phases_ms": medians(runs, "phases_ms"),
+        "prewarm_ms": medians(runs, "prewarm_ms"),
+    }
+
+
+def print_results(results: dict):
+    modes = list(results["modes"])
+    phases = []
+    # Longest phase list first so phases only some modes have keep their place in the order
+    for mode in sorted(modes, key=lambda mode: -len(results["modes"][mode]["phases_ms"])):
+        phases += [phase for phase in results["modes"][mode]["phases_ms"] if phase not in phases]
+    print(f"{'phase (median ms)':<28}" + "".join(f"{mode:>12}" for mode in modes))
+    for phase in phases:
+        cells = [results["modes"][mode]["phases_ms"].get(phase) for mode in modes]
+        print(f"{phase:<28}" + "".join(f"{cell:>12.0f}" if cell is not None else f"{'-':>12}" for cell in cells))
+    print(f"{'launch to first frame':<28}" + "".join(f"{results['modes'][mode]['total_ms']:>12.0f}" for mode in modes))
+
+    for mode in modes:
+        steps = results["modes"][mode]["prewarm_ms"]
+        if steps:
+            print(f"\n🔥 {mode} prewarm (background thread)")
+            for step, ms in steps.items():
+                print(f"   {step:<60} {ms:8.0f} ms")
+
+    if "default" in results["modes"]:
+        baseline = results["modes"]["default"]["total_ms"]
+        for mode in modes:
+            if mode != "default":
+                total = results["modes"][mode]["total_ms"]
+                print(f"\n🚀 {mode} vs default: {total / 1000.0:.2f}s vs {baseline / 1000.0:.2f}s "
+                      f"({100.0 * (total / baseline - 1.0):+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of " + ", ".join(MODES))
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per mode")
+    parser.add_argument("--workflow-spec", default=None, help="Workflow JSON passed to the deploy script")
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT of the synthetic clip")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a run is abandoned")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    if args.workflow_spec:
+        args.workflow_spec = os.path.abspath(args.workflow_spec)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    results = {"args": {key: value for key, value in vars(args).items() if key != "json_path"}, "modes": {}}
+
+    workdir = tempfile.mkdtemp(prefix="audtheia_startup_bench_")
+    try:
+        video = os.path.join(workdir, "survey.mp4")
+        write_video(video, frames=30, width=width, height=height)
+        for mode in modes:
+            print(f"▶️ {mode} ({args.runs} runs)")
+            results["modes"][mode] = run_mode(mode, video, workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n🏁 Results")
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Audtheia tiled ROI inference benchmark
+======================================
+Model work and recall of the Tiled_ROI_Inference block on synthetic
+high-resolution footage (synthetic_video.py), against the whole-frame
+pass alone and against running every tile on every frame.
+
+Modes:
+
+- whole    whole-frame predictions only (the workflow without the block)
+- dense    every tile on every frame (plain SAHI-style slicing)
+- active   the block's defaults: tiles with motion or last frame's
+           detections, plus one idle tile in rotation
+
+By default the model is a stand-in. The whole-frame pass "sees" the
+ground-truth organisms whose smaller side is still --min-object-px after
+the frame is shrunk to 640 px. A tile sees the part of each organism
+inside it, as a box clipped to the tile, so an organism cut by a tile
+edge comes back as fragments for the block to resolve. The stand-in
+sleeps --call-ms per batched call plus --tile-ms per tile, so model time
+follows tile count as a CPU model's would. With
+--model-id the block calls the real model through inference.get_model:
+the timings are then real, but recall against the synthetic ellipses
+means nothing.
+
+Run it across several --organisms counts to see compute follow activity
+rather than resolution.
+
+Usage:
+    python benchmarks/bench_tiled_inference.py --size 3840x2160 --organisms 0,4,16 --frames 150 --json tiled.json
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent / "roboflow-workflows"))
+from synthetic_video import SPECIES, SyntheticScene  # noqa: E402
+from block_runner import BlockChain, normalize_record, summarize  # noqa: E402
+
+MODES = ("whole", "dense", "active")
+BLOCK_TYPE = "Tiled_ROI_Inference"
+MODEL_INPUT = 640
+
+
+class StandInTileModel:
+    """Returns the ground truth clipped to each crop, at a fixed cost per call and per tile"""
+
+    def __init__(self, call_ms: float, tile_ms: float, min_object_px: float):
+        self.call_ms = call_ms
+        self.tile_ms = tile_ms
+        self.min_object_px = min_object_px
+        self.frame = None
+        self.truth = []
+        self.calls = 0
+        self.tiles = 0
+
+    def infer(self, crops, confidence: float = 0.0):
+        self.calls += 1
+        self.tiles += len(crops)
+        time.sleep((self.call_ms + self.tile_ms * len(crops)) / 1000.0)
+        return [SimpleNamespace(predictions=self._predictions(crop)) for crop in crops]
+
+    def _predictions(self, crop):
+        # Crops are views into the frame: their origin follows from the buffer offset
+        offset = crop.ctypes.data - self.frame.ctypes.data
+        y0, x0 = offset // self.frame.strides[0], (offset % self.frame.strides[0]) // self.frame.strides[1]
+        height, width = crop.shape[:2]
+        predictions = []
+        for box in self.truth:
+            x1, y1, x2, y2 = box["xyxy"]
+            x1, y1, x2, y2 = max(x1, x0), max(y1, y0), min(x2, x0 + width), min(y2, y0 + height)
+            if min(x2 - x1, y2 - y1) < self.min_object_px:
+                continue
+            predictions.append(SimpleNamespace(
+                x=(x1 + x2) / 2 - x0, y=(y1 + y2) / 2 - y0, width=x2 - x1, height=y2 - y1,
+                confidence=box["confidence"], class_id=SPECIES.index(box["class_name"]), class_name=box["class_name"]))
+        return predictions
+
+
+def whole_frame_record(truth: list, width: int, height: int, min_object_px: float) -> dict:
+    """Ground truth the whole-frame pass would still find after the frame is shrunk to the model input"""
+    scale = MODEL_INPUT / float(max(width, height))
+    visible = [box for box in truth
+               if min(box["xyxy"][2] - box["xyxy"][0], box["xyxy"][3] - box["xyxy"][1]) * scale >= min_object_px]
+    return normalize_record({"detections": visible})
+
+
+def recall(truth: list, predictions) -> tuple:
+    """(matched, total) ground-truth boxes at IoU >= 0.5 with the same class"""
+    if not truth:
+        return 0, 0
+    if predictions is None or len(predictions) == 0:
+        return 0, len(truth)
+    reference = np.asarray([box["xyxy"] for box in truth], dtype=np.float32)
+    candidate = np.asarray(predictions.xyxy, dtype=np.float32)
+    top_left = np.maximum(reference[:, None, :2], candidate[None, :, :2])
+    bottom_right = np.minimum(reference[:, None, 2:], candidate[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    areas = (np.prod(reference[:, 2:] - reference[:, :2], axis=1)[:, None]
+             + np.prod(candidate[:, 2:] - candidate[:, :2], axis=1)[None, :])
+    iou = intersection / np.maximum(areas - intersection, 1e-6)
+    same_class = (np.asarray([box["class_name"] for box in truth], dtype=object)[:, None]
+                  == np.asarray(predictions.data["class_name"], dtype=object)[None, :])
+    return int(((iou >= 0.5) & same_class).any(axis=1).sum()), len(truth)
+
+
+def run_mode(mode: str, organisms: int, args: argparse.Namespace, width: int, height: int) -> dict:
+    chain = BlockChain(blocks=[BLOCK_TYPE], stream_id=f"bench_{mode}_{organisms}")
+    block = importlib.reload(chain.blocks[BLOCK_TYPE])  # fresh stream state and model per run
+    model = None
+    if args.model_id:
+        block.MODEL_ID = args.model_id
+        block.ROBOFLOW_API_KEY = args.api_key
+    else:
+        model = block._model = StandInTileModel(args.call_ms, args.tile_ms, args.min_object_px)
+    if mode == "whole":
+        block.MIN_TILED_SIDE = 1 << 30
+    elif mode == "dense":
+        block.MOTION_MIN_FRACTION = -1.0  # every tile counts as moving
+        block.MAX_TILES_PER_FRAME = 1 << 30
+
+    scene = SyntheticScene(width, height, organisms, args.frames, args.seed)
+    block_seconds, tiles_run, model_ms = [], [], []
+    matched = total = small_matched = small_total = 0
+    small_px = args.min_object_px * max(width, height) / MODEL_INPUT
+    for index in range(args.frames):
+        frame, truth = scene.frame(index)
+        if model is not None:
+            model.frame, model.truth = frame, truth
+        image, predictions, _, _ = chain.inputs(frame, index, whole_frame_record(truth, width, height, args.min_object_px),
+                                                args.fps)
+        started = time.perf_counter()
+        output = block.run(chain.owner, image=image, predictions=predictions)
+        block_seconds.append(time.perf_counter() - started)
+        stats = output["tile_stats"]
+        if "error" in stats:
+            raise RuntimeError(f"{mode}: {stats['error']}")
+        tiles_run.append(stats["tiles_run"])
+        model_ms.append(stats["model_ms"])
+        hit, count = recall(truth, output["predictions"])
+        matched, total = matched + hit, total + count
+        small = [box for box in truth if min(box["xyxy"][2] - box["xyxy"][0], box["xyxy"][3] - box["xyxy"][1]) < small_px]
+        hit, count = recall(small, output["predictions"])
+        small_matched, small_total = small_matched + hit, small_total + count
+
+    block_summary = summarize(block_seconds)
+    return {
+        "tiles_total": stats["tiles_total"],
+        "tiles_per_frame": round(float(np.mean(tiles_run)), 2),
+        "model_ms_per_frame": round(float(np.mean(model_ms)), 2),
+        "block_ms": block_summary,
+        "fps": round(1000.0 / block_summary["mean_ms"], 2) if block_summary["mean_ms"] else 0.0,
+        "recall": round(matched / total, 4) if total else None,
+        "small_recall": round(small_matched / small_total, 4) if small_total else None,
+        "objects": total,
+        "small_objects": small_total,
+    }
+
+
+def print_row(organisms: int, mode: str, result: dict):
+    def pct(value):
+        return f"{100.0 * value:6.1f}%" if value is not None else f"{'-':>7}"
+    print(f"{organisms:>9} {mode:<7} {result['tiles_per_frame']:6.2f}/{result['tiles_total']:<3} "
+          f"{result['model_ms_per_frame']:9.1f} {result['block_ms']['p50_ms']:9.1f} {result['block_ms']['p99_ms']:9.1f} "
+          f"{result['fps']:7.1f} {pct(result['recall'])} {pct(result['small_recall'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of " + ", ".join(MODES))
+    parser.add_argument("--size", default="3840x2160", help="WIDTHxHEIGHT")
+    parser.add_argument("--organisms", default="0,4,16", help="Comma-separated activity levels (organisms in view)")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-object-px", type=float, default=32.0,
+                        help="Stand-in: smallest organism side, in model input pixels, the model detects")
+    parser.add_argument("--call-ms", type=float, default=5.0, help="Stand-in: cost of one batched model call")
+    parser.add_argument("--tile-ms", type=float, default=40.0, help="Stand-in: cost per 640 px tile")
+    parser.add_argument("--model-id", help="Use this Roboflow model instead of the stand-in (needs inference)")
+    parser.add_argument("--api-key", default="", help="Roboflow API key for --model-id")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    levels = [int(v) for v in args.organisms.split(",") if v.strip()]
+    results = {"args": {key: value for key, value in vars(args).items() if key not in ("json_path", "api_key")},
+               "runs": {}}
+
+    print(f"{'organisms':>9} {'mode':<7} {'tiles':>10} {'model ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'fps':>7} "
+          f"{'recall':>7} {'small':>7}")
+    for organisms in levels:
+        for mode in modes:
+            result = run_mode(mode, organisms, args, width, height)
+            results["runs"][f"{organisms}/{mode}"] = result
+            print_row(organisms, mode, result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
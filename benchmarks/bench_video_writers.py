@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Audtheia video writer benchmark
+===============================
+Compares encode throughput and output size of the ffmpeg pipe writer
+against the OpenCV fourcc fallbacks used by the deploy script.
+
+Frames are synthetic (moving shapes over a textured background) so the
+numbers are reproducible without survey footage.
+
+Usage:
+    python benchmarks/bench_video_writers.py --frames 300 --size 1920x1080
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+DEPLOY_SCRIPT = Path(__file__).resolve().parent.parent / "roboflow-workflows" / "Deploy Roboflow Anthropic Pipeline.py"
+
+OPENCV_CODECS = ["mp4v", "XVID", "MJPG", "X264", "avc1"]
+FFMPEG_PRESETS = [("libx264", "ultrafast", 23), ("libx264", "veryfast", 23)]
+
+
+def load_deploy_module():
+    """Import the deploy script despite the spaces in its filename."""
+    spec = importlib.util.spec_from_file_location("audtheia_deploy", DEPLOY_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_frames(count: int, width: int, height: int):
+    """Yield BGR frames with a static textured background and moving blobs."""
+    rng = np.random.default_rng(42)
+    background = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    background = cv2.resize(background, (width, height), interpolation=cv2.INTER_LINEAR)
+    for i in range(count):
+        frame = background.copy()
+        for k in range(6):
+            cx = int((width / 2) + (width / 3) * np.sin((i + 17 * k) / 40.0))
+            cy = int((height / 2) + (height / 3) * np.cos((i + 11 * k) / 55.0))
+            cv2.circle(frame, (cx, cy), max(8, width // 40), (40 * k, 255 - 30 * k, 120), -1)
+        yield frame
+
+
+def bench_writer(make_writer, frames):
+    writer = make_writer()
+    if writer is None or not writer.isOpened():
+        return None
+    start = time.perf_counter()
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    deploy = load_deploy_module()
+    frames = list(synthetic_frames(args.frames, width, height))
+    workdir = tempfile.mkdtemp(prefix="audtheia_writer_bench_")
+    results = []
+
+    candidates = []
+    ffmpeg_binary = shutil.which("ffmpeg")
+    if ffmpeg_binary:
+        for codec, preset, crf in FFMPEG_PRESETS:
+            candidates.append((
+                f"ffmpeg {codec} {preset} crf{crf}",
+                lambda path, c=codec, p=preset, q=crf: deploy.FFmpegPipeWriter(
+                    path, args.fps, (width, height), codec=c, preset=p, crf=q, ffmpeg_binary=ffmpeg_binary),
+            ))
+    else:
+        print("⚠️ ffmpeg not found on PATH - skipping ffmpeg backends")
+    for fourcc in OPENCV_CODECS:
+        candidates.append((
+            f"opencv {fourcc}",
+            lambda path, f=fourcc: cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*f), args.fps, (width, height), True),
+        ))
+
+    try:
+        for name, factory in candidates:
+            path = os.path.join(workdir, name.replace(" ", "_") + (".avi" if "XVID" in name else ".mp4"))
+            elapsed = bench_writer(lambda: factory(path), frames)
+            if elapsed is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+                print(f"{name:<34} unavailable")
+                continue
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            fps = len(frames) / elapsed if elapsed > 0 else 0.0
+            results.append({"writer": name, "encode_fps": round(fps, 1), "size_mb": round(size_mb, 2)})
+            print(f"{name:<34} {fps:8.1f} fps {size_mb:9.2f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"frames": len(frames), "size": [width, height], "results": results}, f, indent=2)
+
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Audtheia local service stand-ins
+================================
+Small HTTP servers that answer like the three external services the
+pipeline talks to, so the proxy, the dynamic blocks and the deploy sink
+can be benchmarked offline:
+
+- roboflow   POST /<model>/<version>                 hosted detection JSON
+             POST /dataset/<project>/upload           {"success": true, "id": ...}
+             POST /dataset/<project>/annotate/<id>    {"success": true}
+- anthropic  POST /v1/messages                        Messages API reply, one
+                                                      "Tile N:" line per tile in the prompt
+- n8n        POST /webhook/<path>                     {"received": true}
+
+Every server also answers GET /_stats (request counts per route, injected
+errors, cold starts) and POST /_reset.
+
+Each service has a ServiceProfile: latency (median and jitter), an error
+rate with the status code to answer, and a cold start. A cold service
+holds every request that arrives while it warms up, the way a hosted model
+or a sleeping free-tier worker does; it goes cold again after
+`idle_timeout_s` without traffic.
+
+Usage:
+    python benchmarks/fake_services.py --profile typical
+    # then e.g. ROBOFLOW_ENDPOINT / ANTHROPIC_API_URL / N8N_WEBHOOK_URL -> the printed URLs
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICES = ("roboflow", "anthropic", "n8n")
+
+DETECT_CLASSES = ["Porifera", "Scarus taeniopterus", "Acropora cervicornis", "Diadema antillarum"]
+TILE_PROMPT_PATTERN = re.compile(r"Tile (\d+): track (\d+) \(detector label: ([^,]+),")
+
+
+@dataclass
+class ServiceProfile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    cold_start_ms: float = 0.0
+    idle_timeout_s: float | None = None  # None: cold only before the first request
+
+
+# Named profiles: per-service behaviour for one benchmark run
+PROFILES = {
+    "instant": {service: ServiceProfile() for service in SERVICES},
+    "typical": {
+        "roboflow": ServiceProfile(latency_ms=90, jitter_ms=25),
+        "anthropic": ServiceProfile(latency_ms=1800, jitter_ms=500),
+        "n8n": ServiceProfile(latency_ms=40, jitter_ms=15),
+    },
+    "degraded": {
+        "roboflow": ServiceProfile(latency_ms=250, jitter_ms=120, error_rate=0.05, error_status=503,
+                                   cold_start_ms=4000, idle_timeout_s=30),
+        "anthropic": ServiceProfile(latency_ms=4000, jitter_ms=1500, error_rate=0.1, error_status=529),
+        "n8n": ServiceProfile(latency_ms=150, jitter_ms=80, error_rate=0.05, error_status=502,
+                              cold_start_ms=2000, idle_timeout_s=60),
+    },
+}
+
+
+def profile_set(name: str, **overrides) -> dict[str, ServiceProfile]:
+    """A copy of a named profile with the given fields overridden on every service."""
+    if name not in PROFILES:
+        raise ValueError(f"profile must be one of {sorted(PROFILES)}, got {name!r}")
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    return {service: replace(profile, **overrides) for service, profile in PROFILES[name].items()}
+
+
+class ServiceState:
+    """Counters and the warm/cold clock of one fake service; shared by its handler threads."""
+
+    def __init__(self, name: str, profile: ServiceProfile, seed: int = 0):
+        self.name = name
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls: dict[str, int] = {}
+            self.errors = 0
+            self.cold_starts = 0
+            self.bytes_in = 0
+            self.warm_at = None
+            self.last_request = None
+
+    def admit(self, route: str, size: int) -> tuple[float, bool]:
+        """Count a request; returns (seconds to hold it, whether to answer with an error)."""
+        profile = self.profile
+        with self.lock:
+            now = time.monotonic()
+            self.calls[route] = self.calls.get(route, 0) + 1
+            self.bytes_in += size
+            idle = (self.last_request is not None and profile.idle_timeout_s is not None
+                    and now - self.last_request > profile.idle_timeout_s)
+            if profile.cold_start_ms > 0 and (self.warm_at is None or (idle and self.warm_at <= now)):
+                self.warm_at = now + profile.cold_start_ms / 1000.0
+                self.cold_starts += 1
+            self.last_request = now
+            hold = max(0.0, (self.warm_at or now) - now)
+            hold += max(0.0, self.rng.gauss(profile.latency_ms, profile.jitter_ms)) / 1000.0
+            failed = self.rng.random() < profile.error_rate
+            if failed:
+                self.errors += 1
+        return hold, failed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "calls": dict(self.calls),
+                "total": sum(self.calls.values()),
+                "errors": self.errors,
+                "cold_starts": self.cold_starts,
+                "bytes_in": self.bytes_in,
+                "profile": asdict(self.profile),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Responses
+# ---------------------------------------------------------------------------
+
+def roboflow_response(path: str, rng: random.Random) -> tuple[str, dict]:
+    parts = [part for part in path.split("/") if part]
+    if len(parts) >= 3 and parts[0] == "dataset" and parts[2] == "upload":
+        return "upload", {"success": True, "id": uuid.uuid4().hex[:20]}
+    if len(parts) >= 3 and parts[0] == "dataset" and parts[2] == "annotate":
+        return "annotate", {"success": True}
+    width, height = 640, 480
+    predictions = []
+    for index in range(rng.randint(0, 6)):
+        w, h = rng.uniform(30, 160), rng.uniform(30, 160)
+        class_id = rng.randrange(len(DETECT_CLASSES))
+        predictions.append({
+            "x": round(rng.uniform(w / 2, width - w / 2), 1),
+            "y": round(rng.uniform(h / 2, height - h / 2), 1),
+            "width": round(w, 1),
+            "height": round(h, 1),
+            "confidence": round(rng.uniform(0.3, 0.97), 3),
+            "class": DETECT_CLASSES[class_id],
+            "class_id": class_id,
+            "detection_id": str(uuid.uuid4()),
+        })
+    return "detect", {
+        "inference_id": str(uuid.uuid4()),
+        "time": 0.02,
+        "image": {"width": width, "height": height},
+        "predictions": predictions,
+    }
+
+
+def anthropic_response(body: bytes) -> tuple[str, dict]:
+    try:
+        request = json.loads(body or b"{}")
+        prompt = " ".join(part.get("text", "") for message in request.get("messages", [])
+                          for part in message.get("content", []) if isinstance(part, dict))
+    except (ValueError, AttributeError):
+        request, prompt = {}, ""
+    tiles = "\n".join(f"Tile {tile}: {label.strip()} (confirmed, track {track})"
+                      for tile, track, label in TILE_PROMPT_PATTERN.findall(prompt))
+    text = (
+        "claude_environmentalanalysis, scientifically_validated\n"
+        "**Species Identification:** Stand-in analysis for benchmarking.\n"
+        "**Environmental Conditions:** Clear water, moderate light.\n"
+        "**Habitat Assessment:** Patch reef.\n"
+        "**Conservation Implications:** None noted.\n"
+    )
+    if tiles:
+        text += "**Per-Tile Identification:**\n" + tiles + "\n"
+    return "messages", {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "stand-in"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+    }
+
+
+def make_handler(state: ServiceState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.split("?")[0] == "/_stats":
+                self._reply(200, state.stats())
+            else:
+                self._reply(404, {"error": "not_found"})
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if path == "/_reset":
+                state.reset()
+                self._reply(200, {"reset": True})
+                return
+            if state.name == "roboflow":
+                route, payload = roboflow_response(path, state.rng)
+            elif state.name == "anthropic":
+                route, payload = anthropic_response(body)
+            else:
+                route, payload = "webhook", {"received": True}
+            hold, failed = state.admit(route, len(body))
+            if hold:
+                time.sleep(hold)
+            if failed:
+                self._reply(state.profile.error_status, {"error": "injected", "status": state.profile.error_status})
+            else:
+                self._reply(200, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FakeServices:
+    """The three stand-ins on loopback ports; use as a context manager."""
+
+    def __init__(self, profiles: dict[str, ServiceProfile], host: str = "127.0.0.1", ports: dict | None = None,
+                 seed: int = 0):
+        self.host = host
+        self.states = {name: ServiceState(name, profiles[name], seed + index) for index, name in enumerate(SERVICES)}
+        self.ports = ports or {}
+        self.servers: dict[str, ThreadingHTTPServer] = {}
+
+    def start(self) -> "FakeServices":
+        for name, state in self.states.items():
+            server = ThreadingHTTPServer((self.host, self.ports.get(name, 0)), make_handler(state))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name=f"fake-{name}", daemon=True).start()
+            self.servers[name] = server
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+        self.servers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def url(self, name: str) -> str:
+        return f"http://{self.host}:{self.servers[name].server_address[1]}"
+
+    def reset(self):
+        for state in self.states.values():
+            state.reset()
+
+    def stats(self) -> dict:
+        return {name: state.stats() for name, state in self.states.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="typical", choices=sorted(PROFILES))
+    parser.add_argument("--latency-ms", type=float, help="Override median latency on every service")
+    parser.add_argument("--error-rate", type=float, help="Override error rate on every service")
+    parser.add_argument("--cold-start-ms", type=float, help="Override cold start on every service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=8181, help="roboflow, anthropic and n8n use this port and the next two")
+    args = parser.parse_args()
+
+    profiles = profile_set(args.profile, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                           cold_start_ms=args.cold_start_ms)
+    ports = {name: args.base_port + index for index, name in enumerate(SERVICES)}
+    services = FakeServices(profiles, host=args.host, ports=ports).start()
+    print(f"🧪 Fake services running ({args.profile} profile) - Ctrl+C to stop")
+    print(f"   Roboflow detect:   {services.url('roboflow')}/official-porifera-classifier-ju8er/12")
+    print(f"   Roboflow dataset:  {services.url('roboflow')}  (ROBOFLOW_API_URL)")
+    print(f"   Anthropic:         {services.url('anthropic')}/v1/messages")
+    print(f"   n8n webhook:       {services.url('n8n')}/webhook/audtheia")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(services.stats(), indent=2))
+        services.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
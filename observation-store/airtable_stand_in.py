@@ -0,0 +1,138 @@
+"""
+Audtheia Airtable Stand-in
+==========================
+A small in-memory imitation of the Airtable record API, for exercising
+`airtable_sync.py` locally without a real base or API quota.
+
+It enforces the limits the sync has to respect:
+
+- at most 10 records per request (422 otherwise),
+- 5 requests per second per base (429 otherwise, sliding one-second window),
+- `performUpsert.fieldsToMergeOn` must name fields present in every record.
+
+Usage
+-----
+    uvicorn airtable_stand_in:app --host 127.0.0.1 --port 8091
+    AIRTABLE_API_URL=http://127.0.0.1:8091/v0 AIRTABLE_BASE_ID=appLocal AIRTABLE_API_KEY=x \\
+        uvicorn service:app --port 8092
+
+GET /_stats reports requests, 429s and the largest batch seen.
+"""
+
+import itertools
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+MAX_RECORDS_PER_REQUEST = 10
+REQUESTS_PER_SECOND = 5
+
+app = FastAPI(title="Airtable stand-in", docs_url=None, redoc_url=None)
+
+_tables: dict[tuple[str, str], dict[str, dict]] = {}
+_recent: dict[str, deque] = {}
+_ids = itertools.count(1)
+_stats = {"requests": 0, "rate_limited": 0, "rejected": 0, "records_written": 0, "max_batch": 0}
+
+
+def reset():
+    _tables.clear()
+    _recent.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+def error(status: int, kind: str, message: str) -> JSONResponse:
+    return JSONResponse(status_code=status, content={"error": {"type": kind, "message": message}})
+
+
+def rate_limited(base_id: str) -> bool:
+    now = time.monotonic()
+    window = _recent.setdefault(base_id, deque())
+    while window and now - window[0] >= 1.0:
+        window.popleft()
+    if len(window) >= REQUESTS_PER_SECOND:
+        return True
+    window.append(now)
+    return False
+
+
+def new_record(fields: dict) -> dict:
+    return {
+        "id": f"rec{next(_ids):014d}",
+        "createdTime": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "fields": dict(fields),
+    }
+
+
+async def checked_body(base_id: str, request: Request):
+    _stats["requests"] += 1
+    if rate_limited(base_id):
+        _stats["rate_limited"] += 1
+        return None, error(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+    body = await request.json()
+    records = body.get("records") or []
+    if not records or len(records) > MAX_RECORDS_PER_REQUEST:
+        _stats["rejected"] += 1
+        return None, error(422, "INVALID_RECORDS", f"Send between 1 and {MAX_RECORDS_PER_REQUEST} records")
+    _stats["max_batch"] = max(_stats["max_batch"], len(records))
+    return body, None
+
+
+@app.get("/_stats")
+async def stats():
+    return {**_stats, "tables": {f"{base}/{table}": len(rows) for (base, table), rows in _tables.items()}}
+
+
+@app.get("/v0/{base_id}/{table}")
+async def list_records(base_id: str, table: str):
+    return {"records": list(_tables.get((base_id, table), {}).values())}
+
+
+@app.post("/v0/{base_id}/{table}")
+async def create_records(base_id: str, table: str, request: Request):
+    body, failure = await checked_body(base_id, request)
+    if failure:
+        return failure
+    rows = _tables.setdefault((base_id, table), {})
+    created = []
+    for record in body["records"]:
+        row = new_record(record.get("fields", {}))
+        rows[row["id"]] = row
+        created.append(row)
+    _stats["records_written"] += len(created)
+    return {"records": created}
+
+
+@app.patch("/v0/{base_id}/{table}")
+async def update_records(base_id: str, table: str, request: Request):
+    body, failure = await checked_body(base_id, request)
+    if failure:
+        return failure
+    rows = _tables.setdefault((base_id, table), {})
+    merge_on = (body.get("performUpsert") or {}).get("fieldsToMergeOn")
+    written = []
+    for record in body["records"]:
+        fields = record.get("fields", {})
+        if merge_on:
+            if any(name not in fields for name in merge_on):
+                _stats["rejected"] += 1
+                return error(422, "INVALID_MERGE_FIELD", "Every record must contain the fieldsToMergeOn fields")
+            match = next((row for row in rows.values()
+                          if all(row["fields"].get(name) == fields[name] for name in merge_on)), None)
+        else:
+            match = rows.get(record.get("id"))
+            if match is None:
+                _stats["rejected"] += 1
+                return error(404, "NOT_FOUND", f"Record {record.get('id')} not found")
+        if match is None:
+            match = new_record(fields)
+            rows[match["id"]] = match
+        else:
+            match["fields"].update(fields)
+        written.append(match)
+    _stats["records_written"] += len(written)
+    return {"records": written}
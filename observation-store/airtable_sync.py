@@ -0,0 +1,230 @@
+"""
+Audtheia Airtable Sync
+======================
+Pushes dirty rows from the local ObservationStore to Airtable in batches
+of 10 records (the API maximum) through one rate-aware scheduler per base.
+
+Airtable allows 5 requests per second per base and answers 429 when that
+is exceeded, after which the base is blocked for 30 seconds. The
+scheduler spaces requests evenly below the limit, round-robins between
+tables so one busy table cannot starve the other, and backs off the whole
+base on a 429.
+
+Tables whose primary key is a text field are written with
+`performUpsert` (merge on the primary key). The Environmental Mapping
+table's key is a linked record, which Airtable cannot merge on, so its
+rows are created once and then updated by the record id Airtable returned.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from urllib.parse import quote
+
+import httpx
+
+from observation_store import ObservationStore
+
+logger = logging.getLogger("audtheia-airtable-sync")
+
+AIRTABLE_API_URL = os.environ.get("AIRTABLE_API_URL", "https://api.airtable.com/v0")
+AIRTABLE_API_KEY = os.environ.get("AIRTABLE_API_KEY")
+AIRTABLE_BASE_ID = os.environ.get("AIRTABLE_BASE_ID")
+
+AIRTABLE_BATCH_SIZE = 10
+AIRTABLE_REQUESTS_PER_SECOND = 5.0
+# Stay a little under the documented limit; clocks and proxies are not exact
+SAFETY_FACTOR = 0.9
+RATE_LIMIT_BACKOFF_SECONDS = 30.0
+MAX_RETRY_BACKOFF_SECONDS = 60.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+
+class RequestPacer:
+    """Evenly spaced request slots for one base, with a shared pause after a 429."""
+
+    def __init__(self, requests_per_second: float = AIRTABLE_REQUESTS_PER_SECOND * SAFETY_FACTOR,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        self.interval = 1.0 / requests_per_second
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await self.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+
+@dataclass
+class SyncStats:
+    requests: int = 0
+    records_synced: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    rejected: int = 0
+    last_error: str | None = None
+    last_sync_at: float | None = None
+    per_table: dict = field(default_factory=dict)
+
+    def summary(self, pending: dict) -> dict:
+        return {
+            "requests": self.requests,
+            "records_synced": self.records_synced,
+            "records_per_request": round(self.records_synced / self.requests, 2) if self.requests else 0.0,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+            "last_sync_at": self.last_sync_at,
+            "per_table": dict(self.per_table),
+            "pending": pending,
+        }
+
+
+class AirtableSync:
+    """Background task draining the store's dirty rows into Airtable."""
+
+    def __init__(self, store: ObservationStore, client: httpx.AsyncClient, base_id: str,
+                 api_url: str = AIRTABLE_API_URL, pacer: RequestPacer | None = None, idle_seconds: float = 1.0):
+        self.store = store
+        self.client = client
+        self.base_id = base_id
+        self.api_url = api_url.rstrip("/")
+        self.pacer = pacer or RequestPacer()
+        self.idle_seconds = idle_seconds
+        self.stats = SyncStats()
+        self._wake = asyncio.Event()
+        self._retry_backoff = 1.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def notify(self, *_):
+        """Store listener: new data, skip the idle wait. Safe to call from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def table_url(self, table: str) -> str:
+        return f"{self.api_url}/{self.base_id}/{quote(table, safe='')}"
+
+    async def run(self):
+        """Sync forever; cancel the task to stop."""
+        self._loop = asyncio.get_running_loop()
+        while True:
+            try:
+                pushed = await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.stats.errors += 1
+                self.stats.last_error = type(exc).__name__
+                logger.warning("Airtable sync round failed (%s).", type(exc).__name__)
+                pushed = 0
+            if pushed == 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.idle_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def sync_once(self) -> int:
+        """One batch per table, round-robin; returns the number of records pushed."""
+        pushed = 0
+        for table in self.store.schemas:
+            records = await asyncio.to_thread(self.store.dirty_records, table, AIRTABLE_BATCH_SIZE)
+            if records:
+                pushed += await self.push_batch(table, records)
+        return pushed
+
+    async def push_batch(self, table: str, records: list[dict]) -> int:
+        schema = self.store.schema(table)
+        if schema.primary_key_is_link:
+            creates = [record for record in records if not record["airtable_id"]]
+            updates = [record for record in records if record["airtable_id"]]
+            synced = 0
+            if creates:
+                synced += await self._send(table, "POST", creates,
+                                           {"records": [{"fields": r["fields"]} for r in creates], "typecast": True})
+            if updates:
+                synced += await self._send(table, "PATCH", updates,
+                                           {"records": [{"id": r["airtable_id"], "fields": r["fields"]} for r in updates],
+                                            "typecast": True})
+            return synced
+
+        body = {
+            "performUpsert": {"fieldsToMergeOn": [schema.primary_key]},
+            "records": [{"fields": record["fields"]} for record in records],
+            "typecast": True,
+        }
+        return await self._send(table, "PATCH", records, body)
+
+    async def _send(self, table: str, method: str, records: list[dict], body: dict) -> int:
+        await self.pacer.wait()
+        self.stats.requests += 1
+        response = await self.client.request(method, self.table_url(table), json=body)
+
+        if response.status_code == 429:
+            self.stats.rate_limited += 1
+            self.pacer.pause(RATE_LIMIT_BACKOFF_SECONDS)
+            logger.warning("Airtable rate limit hit; pausing base for %.0fs.", RATE_LIMIT_BACKOFF_SECONDS)
+            return 0
+        if response.status_code >= 500:
+            self.stats.errors += 1
+            self.stats.last_error = f"HTTP {response.status_code}"
+            self.pacer.pause(self._retry_backoff)
+            self._retry_backoff = min(self._retry_backoff * 2, MAX_RETRY_BACKOFF_SECONDS)
+            return 0
+        if response.status_code != 200:
+            # Other 4xx will not fix itself on retry. Resend a failed batch one record at a
+            # time so one bad record cannot hold back nine good ones; a record rejected on
+            # its own is set aside until it is updated again.
+            self.stats.errors += 1
+            self.stats.last_error = f"HTTP {response.status_code}"
+            if len(records) > 1:
+                synced = 0
+                for record, payload in zip(records, body["records"]):
+                    synced += await self._send(table, method, [record], {**body, "records": [payload]})
+                return synced
+            if response.status_code == 404 and records[0]["airtable_id"]:
+                # Deleted in Airtable: drop the stale id so the next round creates it again
+                await asyncio.to_thread(self.store.forget_airtable_id, table, records[0]["key"])
+                return 0
+            logger.error("Airtable rejected %s record %s with HTTP %d.", table, records[0]["key"], response.status_code)
+            self.stats.rejected += 1
+            await asyncio.to_thread(self.store.mark_synced, table,
+                                    [(records[0]["key"], records[0]["updated_at"], records[0]["airtable_id"])])
+            return 0
+
+        self._retry_backoff = 1.0
+        returned = response.json().get("records", [])
+        schema = self.store.schema(table)
+        synced = []
+        for index, record in enumerate(records):
+            airtable_id = record["airtable_id"]
+            if index < len(returned):
+                airtable_id = returned[index].get("id", airtable_id)
+            synced.append((record["key"], record["updated_at"], airtable_id))
+        marked = await asyncio.to_thread(self.store.mark_synced, table, synced)
+        self.stats.records_synced += len(records)
+        self.stats.per_table[schema.name] = self.stats.per_table.get(schema.name, 0) + len(records)
+        self.stats.last_sync_at = time.time()
+        return marked or len(records)
+
+    def summary(self) -> dict:
+        return self.stats.summary(self.store.pending_count())
+
+
+def airtable_client(api_key: str | None = AIRTABLE_API_KEY) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=REQUEST_TIMEOUT_SECONDS,
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+    )
@@ -0,0 +1,410 @@
+"""
+Audtheia Local Observation Store
+================================
+SQLite tables generated from the Airtable schema documents in
+`airtable-schemas/`, so every observation is written locally and
+immediately. The Airtable copy is kept up to date asynchronously by
+`airtable_sync.py` instead of by one API call per field group.
+
+Schema mapping
+--------------
+- One SQLite table per schema file (`tableName` -> snake_case table name),
+  one column per schema column, keeping the Airtable column name.
+- number -> REAL, checkbox -> INTEGER (0/1), everything else -> TEXT.
+- Fields the n8n workflow writes that are not in the schema document
+  (the live base has grown past it) are kept in `_extra_fields` and are
+  still synced.
+- Pipeline-only details (tracker ids, dwell time, paths) go to `_meta`,
+  which never leaves the machine.
+
+Each row carries `_updated_at` / `_synced_at`; a row is dirty while
+`_synced_at` is older than `_updated_at`.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger("audtheia-observation-store")
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / "airtable-schemas"
+DEFAULT_SCHEMA_FILES = ("species-observations-schema.json", "environmental-mapping-schema.json")
+
+SPECIES_TABLE = "Species Observations"
+MAPPING_TABLE = "Environmental Mapping"
+
+SQL_TYPES = {"number": "REAL", "checkbox": "INTEGER"}
+
+# Track lifecycle events that describe a finished (or still running) visit
+OBSERVATION_EVENTS = ("track_ended", "track_evicted", "track_heartbeat")
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    airtable_type: str
+    required: bool = False
+
+    @property
+    def sql_type(self) -> str:
+        return SQL_TYPES.get(self.airtable_type, "TEXT")
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    name: str
+    primary_key: str
+    columns: tuple
+
+    @property
+    def sql_name(self) -> str:
+        return re.sub(r"[^a-z0-9]+", "_", self.name.lower()).strip("_")
+
+    @property
+    def column_names(self) -> frozenset:
+        return frozenset(column.name for column in self.columns)
+
+    def column(self, name: str) -> ColumnSpec | None:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        return None
+
+    @property
+    def primary_key_is_link(self) -> bool:
+        column = self.column(self.primary_key)
+        return column is not None and column.airtable_type == "linkedRecord"
+
+
+def load_table_schema(path: str | Path) -> TableSchema:
+    """Read one `airtable-schemas/*-schema.json` document."""
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    columns = tuple(
+        ColumnSpec(column["name"], column["type"], bool(column.get("required")))
+        for column in document["columns"]
+    )
+    return TableSchema(document["tableName"], document["primaryKey"], columns)
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def create_table_sql(schema: TableSchema) -> str:
+    columns = [f"{quote(column.name)} {column.sql_type}" for column in schema.columns]
+    columns += [
+        "_extra_fields TEXT NOT NULL DEFAULT '{}'",
+        "_meta TEXT NOT NULL DEFAULT '{}'",
+        "_airtable_id TEXT",
+        "_updated_at REAL NOT NULL",
+        "_synced_at REAL",
+        f"PRIMARY KEY ({quote(schema.primary_key)})",
+    ]
+    return f"CREATE TABLE IF NOT EXISTS {quote(schema.sql_name)} (\n  " + ",\n  ".join(columns) + "\n)"
+
+# ---------------------------------------------------------------------------
+# Value coercion
+# ---------------------------------------------------------------------------
+
+def iso_timestamp(value: Any) -> Any:
+    """Epoch seconds -> ISO 8601 UTC, which is what Airtable dateTime fields accept."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, tz=timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return value
+
+
+def coerce(column: ColumnSpec, value: Any) -> Any:
+    """Best-effort conversion to the column's storage type; unparseable values are kept as given."""
+    if value is None:
+        return None
+    kind = column.airtable_type
+    try:
+        if kind == "number":
+            return float(value)
+        if kind == "checkbox":
+            if isinstance(value, str):
+                return int(value.strip().lower() in ("true", "1", "yes", "checked"))
+            return int(bool(value))
+        if kind == "dateTime":
+            return iso_timestamp(value)
+    except (TypeError, ValueError):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def airtable_value(column: ColumnSpec, value: Any) -> Any:
+    """Stored value -> Airtable API value."""
+    if column.airtable_type == "checkbox":
+        return bool(value)
+    if column.airtable_type == "linkedRecord":
+        # With typecast, Airtable links by the linked table's primary field text
+        return value if isinstance(value, list) else [value]
+    return value
+
+# ---------------------------------------------------------------------------
+# Payload mapping
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SiteConfig:
+    """Static camera location ("Set Static Location" in the RTSP Analyst)."""
+    latitude: float | None = None
+    longitude: float | None = None
+    location: str | None = None
+    data_source: str = "RTSP Stream"
+
+
+def observation_id_for(event: dict) -> str:
+    """Stable per visit, so heartbeats and the final track_ended update one row."""
+    started = datetime.fromtimestamp(float(event.get("first_seen", 0.0)), tz=timezone.utc)
+    return f"obs-{started:%Y-%m-%d-%H-%M-%S}-{event.get('stream_id', 'default_source')}-{event.get('tracker_id')}"
+
+
+def track_event_to_record(event: dict, site: SiteConfig) -> tuple[dict, dict]:
+    """One Track_Lifecycle_Aggregator event -> (Species Observations fields, local-only meta)."""
+    fields = {
+        "Observation ID": observation_id_for(event),
+        "Species Name": event.get("class_name"),
+        "Common Name": event.get("class_name"),
+        "Observation Time": event.get("first_seen"),
+        "Detection Confidence": event.get("max_confidence"),
+        "Data Source": site.data_source,
+        "Latitude": site.latitude,
+        "Longitude": site.longitude,
+        "Location": site.location,
+    }
+    meta = {key: event.get(key) for key in (
+        "event", "stream_id", "tracker_id", "first_seen", "last_seen", "dwell_seconds", "frames",
+        "mean_confidence", "max_confidence", "best_frame_number", "best_bbox",
+    )}
+    return {name: value for name, value in fields.items() if value is not None}, meta
+
+
+def records_from_payload(payload: dict, site: SiteConfig) -> list[tuple[str, dict, dict]]:
+    """
+    Accepted payloads -> [(table name, fields, meta)]:
+
+    - Analyst_Caller track observations: {"source": "audtheia_track_observations", "observations": [...]}
+    - Airtable-style n8n writes: {"table": ..., "fields": {...}} or {"table": ..., "records": [{"fields": {...}}]}
+    """
+    if payload.get("source") == "audtheia_track_observations":
+        records = []
+        for event in payload.get("observations") or []:
+            if event.get("event") in OBSERVATION_EVENTS and event.get("class_name"):
+                fields, meta = track_event_to_record(event, site)
+                records.append((SPECIES_TABLE, fields, meta))
+        return records
+
+    table = payload.get("table", SPECIES_TABLE)
+    if "fields" in payload:
+        return [(table, payload["fields"], {})]
+    return [(table, record.get("fields", {}), {}) for record in payload.get("records") or []]
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class ObservationStore:
+    """Local, immediately consistent copy of the Audtheia Airtable tables."""
+
+    def __init__(self, db_path: str, schema_paths: list | None = None):
+        schema_paths = schema_paths or [SCHEMA_DIR / name for name in DEFAULT_SCHEMA_FILES]
+        self.schemas = {schema.name: schema for schema in map(load_table_schema, schema_paths)}
+        self.listeners: list[Callable[[str, dict, dict], None]] = []
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for schema in self.schemas.values():
+            self._db.execute(create_table_sql(schema))
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {quote(schema.sql_name + '_dirty')} "
+                f"ON {quote(schema.sql_name)} (_synced_at, _updated_at)"
+            )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (stream_id TEXT, timestamp REAL, analysis TEXT)"
+        )
+        self._db.commit()
+
+    def add_listener(self, listener: Callable[[str, dict, dict], None]):
+        """Called as listener(table, fields, meta) after every committed upsert."""
+        self.listeners.append(listener)
+
+    def schema(self, table: str) -> TableSchema:
+        try:
+            return self.schemas[table]
+        except KeyError:
+            raise ValueError(f"Unknown table {table!r}; expected one of {sorted(self.schemas)}") from None
+
+    # -- writes --------------------------------------------------------------
+
+    def upsert(self, table: str, fields: dict, meta: dict | None = None, now: float | None = None) -> str:
+        """Merge `fields` into the row with the same primary key (Airtable upsert semantics)."""
+        schema = self.schema(table)
+        key = fields.get(schema.primary_key)
+        if key in (None, ""):
+            raise ValueError(f"{table} record is missing its primary key {schema.primary_key!r}")
+        if isinstance(key, list):
+            key = key[0]
+        now = time.time() if now is None else now
+
+        known, extra = {}, {}
+        for name, value in fields.items():
+            column = schema.column(name)
+            if column is None:
+                extra[name] = value
+            elif name != schema.primary_key:
+                known[name] = coerce(column, value)
+
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT _extra_fields, _meta FROM {quote(schema.sql_name)} WHERE {quote(schema.primary_key)} = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                names = [schema.primary_key, *known, "_extra_fields", "_meta", "_updated_at"]
+                values = [key, *known.values(), json.dumps(extra, ensure_ascii=False),
+                          json.dumps(meta or {}, ensure_ascii=False), now]
+                self._db.execute(
+                    f"INSERT INTO {quote(schema.sql_name)} ({', '.join(map(quote, names))}) "
+                    f"VALUES ({', '.join('?' * len(values))})",
+                    values,
+                )
+            else:
+                merged_extra = {**json.loads(row[0]), **extra}
+                merged_meta = {**json.loads(row[1]), **(meta or {})}
+                assignments = [f"{quote(name)} = ?" for name in known]
+                assignments += ["_extra_fields = ?", "_meta = ?", "_updated_at = ?"]
+                self._db.execute(
+                    f"UPDATE {quote(schema.sql_name)} SET {', '.join(assignments)} "
+                    f"WHERE {quote(schema.primary_key)} = ?",
+                    [*known.values(), json.dumps(merged_extra, ensure_ascii=False),
+                     json.dumps(merged_meta, ensure_ascii=False), now, key],
+                )
+            self._db.commit()
+
+        for listener in self.listeners:
+            try:
+                listener(table, fields, meta or {})
+            except Exception:
+                logger.exception("Observation listener failed.")
+        return key
+
+    def ingest(self, payload: dict, site: SiteConfig | None = None) -> list[str]:
+        """Store everything in one Analyst_Caller / n8n payload; returns the keys written."""
+        if payload.get("source") == "audtheia_environmental_analysis":
+            with self._lock:
+                self._db.execute(
+                    "INSERT INTO analyses VALUES (?, ?, ?)",
+                    (payload.get("stream_id"), payload.get("timestamp"), payload.get("analysis")),
+                )
+                self._db.commit()
+            return []
+        return [self.upsert(table, fields, meta) for table, fields, meta in records_from_payload(payload, site or SiteConfig())]
+
+    # -- sync bookkeeping ----------------------------------------------------
+
+    def dirty_records(self, table: str, limit: int = 10) -> list[dict]:
+        """Oldest unsynced rows as {"key", "airtable_id", "updated_at", "fields"} with Airtable-ready fields."""
+        schema = self.schema(table)
+        column_list = ", ".join(quote(column.name) for column in schema.columns)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {column_list}, _extra_fields, _airtable_id, _updated_at FROM {quote(schema.sql_name)} "
+                f"WHERE _synced_at IS NULL OR _synced_at < _updated_at ORDER BY _updated_at LIMIT ?",
+                (limit,),
+            ).fetchall()
+        records = []
+        for row in rows:
+            values, extra_json, airtable_id, updated_at = row[:-3], row[-3], row[-2], row[-1]
+            fields = {
+                column.name: airtable_value(column, value)
+                for column, value in zip(schema.columns, values) if value is not None
+            }
+            fields.update(json.loads(extra_json))
+            records.append({
+                "key": values[[c.name for c in schema.columns].index(schema.primary_key)],
+                "airtable_id": airtable_id,
+                "updated_at": updated_at,
+                "fields": fields,
+            })
+        return records
+
+    def mark_synced(self, table: str, synced: list[tuple[str, float, str | None]], now: float | None = None) -> int:
+        """
+        Mark (key, updated_at, airtable_id) rows synced unless they changed again meanwhile.
+
+        The Airtable record id is stored either way: a row edited while its create was in
+        flight must be updated by that id on the next push, not created a second time.
+        """
+        schema = self.schema(table)
+        now = time.time() if now is None else now
+        with self._lock:
+            count = 0
+            for key, updated_at, airtable_id in synced:
+                if airtable_id is not None:
+                    self._db.execute(
+                        f"UPDATE {quote(schema.sql_name)} SET _airtable_id = ? WHERE {quote(schema.primary_key)} = ?",
+                        (airtable_id, key),
+                    )
+                count += self._db.execute(
+                    f"UPDATE {quote(schema.sql_name)} SET _synced_at = ? "
+                    f"WHERE {quote(schema.primary_key)} = ? AND _updated_at = ?",
+                    (max(now, updated_at), key, updated_at),
+                ).rowcount
+            self._db.commit()
+        return count
+
+    def forget_airtable_id(self, table: str, key: str):
+        schema = self.schema(table)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE {quote(schema.sql_name)} SET _airtable_id = NULL WHERE {quote(schema.primary_key)} = ?", (key,)
+            )
+            self._db.commit()
+
+    def pending_count(self) -> dict:
+        with self._lock:
+            return {
+                name: self._db.execute(
+                    f"SELECT COUNT(*) FROM {quote(schema.sql_name)} WHERE _synced_at IS NULL OR _synced_at < _updated_at"
+                ).fetchone()[0]
+                for name, schema in self.schemas.items()
+            }
+
+    def rows(self, table: str, columns: tuple) -> list[tuple[dict, dict]]:
+        """(fields, meta) for every row, limited to `columns` (schema columns only)."""
+        schema = self.schema(table)
+        names = [name for name in columns if schema.column(name)]
+        with self._lock:
+            result = self._db.execute(
+                f"SELECT {', '.join(map(quote, names))}, _meta FROM {quote(schema.sql_name)}"
+            ).fetchall()
+        return [({name: value for name, value in zip(names, row) if value is not None}, json.loads(row[-1]))
+                for row in result]
+
+    def get(self, table: str, key: str) -> dict | None:
+        schema = self.schema(table)
+        with self._lock:
+            cursor = self._db.execute(
+                f"SELECT * FROM {quote(schema.sql_name)} WHERE {quote(schema.primary_key)} = ?", (key,)
+            )
+            row = cursor.fetchone()
+            names = [description[0] for description in cursor.description]
+        return dict(zip(names, row)) if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,372 @@
+"""
+Audtheia Biodiversity Rollups
+=============================
+Hourly per-site, per-species aggregates kept up to date as observations
+arrive, so the Daily Reporter's statistics no longer need a 24-hour
+Airtable scan and a pass over every record.
+
+Each Species Observations row contributes to exactly one
+(hour, site, species) cell. The row's current contribution is remembered
+in `rollup_contributions`. When the same observation is written again
+(heartbeat, then track_ended, then n8n enrichment), the old contribution
+is subtracted and the new one added, so counts stay per observation
+rather than per write.
+
+Per cell: observation count, dwell seconds (sum, sum of squares, max),
+detection confidence (sum, sum of squares, min, max, 10-bin histogram).
+Shannon and Simpson diversity are computed at query time from the cell
+counts, vectorized over sites with NumPy.
+
+Sums and sums of squares are subtracted exactly. Minima and maxima
+cannot be subtracted, so a cell that loses a contribution re-reads them
+from its (indexed) contributions.
+"""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from observation_store import SPECIES_TABLE, ObservationStore
+
+logger = logging.getLogger("audtheia-rollups")
+
+HOUR_SECONDS = 3600
+CONFIDENCE_BINS = 10
+DEFAULT_SITE = "default_source"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+  hour INTEGER NOT NULL,
+  site TEXT NOT NULL,
+  species TEXT NOT NULL,
+  observations INTEGER NOT NULL DEFAULT 0,
+  dwell_sum REAL NOT NULL DEFAULT 0,
+  dwell_sq_sum REAL NOT NULL DEFAULT 0,
+  dwell_max REAL NOT NULL DEFAULT 0,
+  confidence_count INTEGER NOT NULL DEFAULT 0,
+  confidence_sum REAL NOT NULL DEFAULT 0,
+  confidence_sq_sum REAL NOT NULL DEFAULT 0,
+  confidence_min REAL,
+  confidence_max REAL,
+  confidence_histogram TEXT NOT NULL DEFAULT '0,0,0,0,0,0,0,0,0,0',
+  PRIMARY KEY (hour, site, species)
+);
+CREATE TABLE IF NOT EXISTS rollup_contributions (
+  observation_id TEXT PRIMARY KEY,
+  hour INTEGER NOT NULL,
+  site TEXT NOT NULL,
+  species TEXT NOT NULL,
+  dwell REAL,
+  confidence REAL
+);
+CREATE INDEX IF NOT EXISTS rollup_contributions_cell ON rollup_contributions (hour, site, species);
+"""
+
+# ---------------------------------------------------------------------------
+# Observation -> contribution
+# ---------------------------------------------------------------------------
+
+def epoch_seconds(value) -> float | None:
+    """Observation Time as stored (ISO 8601) or as sent (epoch seconds)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def number(value) -> float | None:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return result if math.isfinite(result) else None
+
+
+def confidence_bin(confidence: float) -> int:
+    return min(CONFIDENCE_BINS - 1, max(0, int(confidence * CONFIDENCE_BINS)))
+
+
+def descriptive(count: float, total: float, sq_total: float) -> tuple[float | None, float | None]:
+    """Mean and population standard deviation from running sums."""
+    if not count:
+        return None, None
+    mean = total / count
+    return mean, math.sqrt(max(0.0, sq_total / count - mean * mean))
+
+
+def diversity_indices(counts: np.ndarray) -> dict:
+    """
+    Shannon H (natural log), Gini-Simpson 1 - sum(p^2) and Pielou evenness for
+    every row of a sites x species count matrix in one pass.
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+    totals = counts.sum(axis=1, keepdims=True)
+    proportions = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    logs = np.log(proportions, out=np.zeros_like(proportions), where=proportions > 0)
+    shannon = -(proportions * logs).sum(axis=1)
+    simpson = np.where(totals[:, 0] > 0, 1.0 - (proportions ** 2).sum(axis=1), 0.0)
+    richness = (counts > 0).sum(axis=1)
+    log_richness = np.log(np.maximum(richness, 1))
+    evenness = np.divide(shannon, log_richness, out=np.zeros_like(shannon), where=richness > 1)
+    return {"shannon": shannon, "simpson": simpson, "evenness": evenness, "richness": richness}
+
+# ---------------------------------------------------------------------------
+# Rollup engine
+# ---------------------------------------------------------------------------
+
+class BiodiversityRollups:
+    """Incremental hourly aggregates; register `on_observation` as an ObservationStore listener."""
+
+    def __init__(self, db_path: str, tz: timezone = timezone.utc):
+        self.tz = tz
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self.updates = 0
+
+    # -- feeding -------------------------------------------------------------
+
+    def on_observation(self, table: str, fields: dict, meta: dict):
+        """ObservationStore listener. Fields may be partial (n8n enrichment writes)."""
+        if table != SPECIES_TABLE:
+            return
+        observation_id = fields.get("Observation ID")
+        if isinstance(observation_id, list):
+            observation_id = observation_id[0] if observation_id else None
+        if not observation_id:
+            return
+        with self._lock:
+            self._apply(observation_id, fields, meta)
+            self._db.commit()
+
+    def _apply(self, observation_id: str, fields: dict, meta: dict):
+        previous = self._db.execute(
+            "SELECT hour, site, species, dwell, confidence FROM rollup_contributions WHERE observation_id = ?",
+            (observation_id,),
+        ).fetchone()
+
+        observed_at = epoch_seconds(fields.get("Observation Time"))
+        species = fields.get("Species Name")
+        site = fields.get("Location") or meta.get("stream_id")
+        dwell = number(meta.get("dwell_seconds"))
+        confidence = number(fields.get("Detection Confidence"))
+        if previous is not None:
+            hour, old_site, old_species, old_dwell, old_confidence = previous
+            observed_at = observed_at if observed_at is not None else hour * HOUR_SECONDS
+            species = species or old_species
+            site = site or old_site
+            dwell = dwell if dwell is not None else old_dwell
+            confidence = confidence if confidence is not None else old_confidence
+        if not species or observed_at is None:
+            return
+
+        contribution = (int(observed_at // HOUR_SECONDS), str(site or DEFAULT_SITE), str(species), dwell, confidence)
+        if previous is not None and tuple(previous) == contribution:
+            return
+        # Contributions first, so a cell re-reading its extremes sees the new state
+        self._db.execute(
+            "INSERT OR REPLACE INTO rollup_contributions VALUES (?, ?, ?, ?, ?, ?)",
+            (observation_id, *contribution),
+        )
+        if previous is not None:
+            self._add(*previous, sign=-1)
+        self._add(*contribution, sign=1)
+        self.updates += 1
+
+    def _add(self, hour: int, site: str, species: str, dwell: float | None, confidence: float | None, sign: int):
+        row = self._db.execute(
+            "SELECT confidence_min, confidence_max, confidence_histogram FROM rollup_hourly "
+            "WHERE hour = ? AND site = ? AND species = ?",
+            (hour, site, species),
+        ).fetchone()
+        if row is None:
+            self._db.execute("INSERT INTO rollup_hourly (hour, site, species) VALUES (?, ?, ?)", (hour, site, species))
+            confidence_min = confidence_max = None
+            histogram = [0] * CONFIDENCE_BINS
+        else:
+            confidence_min, confidence_max = row[0], row[1]
+            histogram = [int(value) for value in row[2].split(",")]
+
+        dwell_value = dwell or 0.0
+        confidence_count = 0
+        confidence_value = 0.0
+        if confidence is not None:
+            confidence_count = sign
+            confidence_value = confidence
+            histogram[confidence_bin(confidence)] += sign
+            if sign > 0:
+                confidence_min = confidence if confidence_min is None else min(confidence_min, confidence)
+                confidence_max = confidence if confidence_max is None else max(confidence_max, confidence)
+        dwell_max = None
+        if sign < 0:
+            dwell_max, confidence_min, confidence_max = self._db.execute(
+                "SELECT COALESCE(MAX(dwell), 0), MIN(confidence), MAX(confidence) FROM rollup_contributions "
+                "WHERE hour = ? AND site = ? AND species = ?",
+                (hour, site, species),
+            ).fetchone()
+
+        self._db.execute(
+            "UPDATE rollup_hourly SET observations = observations + ?, "
+            "dwell_sum = dwell_sum + ?, dwell_sq_sum = dwell_sq_sum + ?, dwell_max = COALESCE(?, MAX(dwell_max, ?)), "
+            "confidence_count = confidence_count + ?, confidence_sum = confidence_sum + ?, "
+            "confidence_sq_sum = confidence_sq_sum + ?, confidence_min = ?, confidence_max = ?, "
+            "confidence_histogram = ? WHERE hour = ? AND site = ? AND species = ?",
+            (sign, sign * dwell_value, sign * dwell_value * dwell_value, dwell_max, dwell_value,
+             confidence_count, sign * confidence_value, sign * confidence_value * confidence_value,
+             confidence_min, confidence_max, ",".join(map(str, histogram)), hour, site, species),
+        )
+        if sign < 0:
+            self._db.execute(
+                "DELETE FROM rollup_hourly WHERE hour = ? AND site = ? AND species = ? AND observations <= 0",
+                (hour, site, species),
+            )
+
+    def rebuild(self, store: ObservationStore) -> int:
+        """Recompute everything from the store (first start on an existing database)."""
+        rows = store.rows(SPECIES_TABLE, ("Observation ID", "Species Name", "Observation Time",
+                                          "Location", "Detection Confidence"))
+        with self._lock:
+            self._db.execute("DELETE FROM rollup_hourly")
+            self._db.execute("DELETE FROM rollup_contributions")
+            count = 0
+            for fields, meta in rows:
+                self._apply(fields["Observation ID"], fields, meta)
+                count += 1
+            self._db.commit()
+        return count
+
+    # -- queries -------------------------------------------------------------
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM rollup_contributions LIMIT 1").fetchone() is None
+
+    def day_bounds(self, day: date) -> tuple[int, int]:
+        """First and last+1 hour bucket of a calendar day in the reporting time zone."""
+        start = datetime(day.year, day.month, day.day, tzinfo=self.tz)
+        end = start + timedelta(days=1)
+        return int(start.timestamp() // HOUR_SECONDS), int(end.timestamp() // HOUR_SECONDS)
+
+    def cells(self, first_hour: int, end_hour: int, site: str | None = None) -> list[tuple]:
+        query = ("SELECT hour, site, species, observations, dwell_sum, dwell_sq_sum, dwell_max, confidence_count, "
+                 "confidence_sum, confidence_sq_sum, confidence_min, confidence_max, confidence_histogram "
+                 "FROM rollup_hourly WHERE hour >= ? AND hour < ?")
+        params: list = [first_hour, end_hour]
+        if site:
+            query += " AND site = ?"
+            params.append(site)
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def day_statistics(self, day: date, site: str | None = None) -> dict:
+        first_hour, end_hour = self.day_bounds(day)
+        return self.window_statistics(first_hour, end_hour, site, label=day.isoformat())
+
+    def window_statistics(self, first_hour: int, end_hour: int, site: str | None = None, label: str | None = None) -> dict:
+        started = time.perf_counter()
+        rows = self.cells(first_hour, end_hour, site)
+
+        sites = sorted({row[1] for row in rows})
+        species = sorted({row[2] for row in rows})
+        site_index = {name: i for i, name in enumerate(sites)}
+        species_index = {name: i for i, name in enumerate(species)}
+
+        # columns: observations, dwell_sum, dwell_sq_sum, confidence_count, confidence_sum, confidence_sq_sum
+        sums = np.zeros((len(sites), len(species), 6))
+        dwell_max = np.zeros(len(species))
+        confidence_min = np.full(len(species), np.inf)
+        confidence_max = np.full(len(species), -np.inf)
+        histograms = np.zeros((len(species), CONFIDENCE_BINS), dtype=np.int64)
+        by_hour = np.zeros(end_hour - first_hour, dtype=np.int64)
+        for (hour, row_site, name, observations, dwell_sum, dwell_sq_sum, row_dwell_max, confidence_count,
+             confidence_sum, confidence_sq_sum, row_min, row_max, histogram) in rows:
+            s, k = site_index[row_site], species_index[name]
+            sums[s, k] += (observations, dwell_sum, dwell_sq_sum, confidence_count, confidence_sum, confidence_sq_sum)
+            dwell_max[k] = max(dwell_max[k], row_dwell_max)
+            if row_min is not None:
+                confidence_min[k] = min(confidence_min[k], row_min)
+                confidence_max[k] = max(confidence_max[k], row_max)
+            histograms[k] += np.array(histogram.split(","), dtype=np.int64)
+            by_hour[hour - first_hour] += observations
+
+        site_counts = sums[:, :, 0]
+        per_site = diversity_indices(site_counts) if len(sites) else None
+        species_totals = sums.sum(axis=0)
+        overall = diversity_indices(species_totals[:, 0]) if len(species) else None
+
+        species_stats = {}
+        for k, name in enumerate(species):
+            observations, dwell_sum, dwell_sq_sum, confidence_count, confidence_sum, confidence_sq_sum = species_totals[k]
+            dwell_mean, dwell_std = descriptive(observations, dwell_sum, dwell_sq_sum)
+            confidence_mean, confidence_std = descriptive(confidence_count, confidence_sum, confidence_sq_sum)
+            species_stats[name] = {
+                "observations": int(observations),
+                "sites": [sites[s] for s in np.flatnonzero(site_counts[:, k])],
+                "dwell_seconds": {"total": round(float(dwell_sum), 3), "mean": rounded(dwell_mean),
+                                  "std": rounded(dwell_std), "max": round(float(dwell_max[k]), 3)},
+                "confidence": {"count": int(confidence_count), "mean": rounded(confidence_mean, 4),
+                               "std": rounded(confidence_std, 4),
+                               "min": rounded(confidence_min[k] if np.isfinite(confidence_min[k]) else None, 4),
+                               "max": rounded(confidence_max[k] if np.isfinite(confidence_max[k]) else None, 4),
+                               "histogram": histograms[k].tolist()},
+            }
+
+        total = int(site_counts.sum())
+        return {
+            "day": label,
+            "site": site,
+            "totalObservations": total,
+            "uniqueSpeciesCount": len(species),
+            "uniqueSpeciesList": species,
+            "observationsByHour": by_hour.tolist(),
+            "diversity": diversity_summary(overall, 0) if overall else None,
+            "sites": {
+                name: {"observations": int(site_counts[s].sum()), **diversity_summary(per_site, s)}
+                for s, name in enumerate(sites)
+            },
+            "species": species_stats,
+            "query_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def rounded(value, digits: int = 3):
+    return None if value is None else round(float(value), digits)
+
+
+def diversity_summary(indices: dict, row: int) -> dict:
+    return {
+        "richness": int(indices["richness"][row]),
+        "shannon": round(float(indices["shannon"][row]), 4) + 0.0,  # no -0.0 for single-species rows
+        "simpson": round(float(indices["simpson"][row]), 4),
+        "evenness": round(float(indices["evenness"][row]), 4),
+    }
+
+
+def attach(store: ObservationStore, db_path: str, tz: timezone = timezone.utc, rebuild: bool = True) -> BiodiversityRollups:
+    """Rollups fed by `store`; rebuilt from existing rows when the rollup tables are empty."""
+    rollups = BiodiversityRollups(db_path, tz)
+    if rebuild and rollups.is_empty():
+        rebuilt = rollups.rebuild(store)
+        if rebuilt:
+            logger.info("Rebuilt biodiversity rollups from %d stored observations.", rebuilt)
+    store.add_listener(rollups.on_observation)
+    return rollups
@@ -0,0 +1,246 @@
+"""
+Audtheia Observation Service
+============================
+Local ingestion endpoint for the Analyst_Caller webhook payloads and the
+n8n workflows. Every observation is committed to the local SQLite store
+before the response is returned; Airtable is brought up to date in the
+background by AirtableSync (10-record batch upserts, paced under the
+5 requests/second per-base limit).
+
+Usage
+-----
+    cd observation-store
+    AIRTABLE_API_KEY=... AIRTABLE_BASE_ID=app... uvicorn service:app --host 127.0.0.1 --port 8092
+
+Without AIRTABLE_API_KEY / AIRTABLE_BASE_ID the service only stores
+locally; rows stay dirty and are pushed once sync is configured.
+
+Configuration
+-------------
+- OBSERVATION_DB_PATH               SQLite file (default observations.sqlite3)
+- OBS_SITE_LATITUDE / _LONGITUDE    Static camera location, as in "Set Static Location"
+- OBS_SITE_LOCATION                 Location name written to Species Observations
+- OBS_DATA_SOURCE                   Data Source value (default "RTSP Stream")
+- AIRTABLE_API_URL                  Override for the stand-in (airtable_stand_in.py)
+- ROLLUP_TIMEZONE                   IANA zone that defines a reporting day (default UTC)
+- OBS_INDEX_CELL_METERS             Duplicate index grid cell (default 100)
+- OBS_INDEX_BUCKET_MINUTES          Duplicate index time bucket (default 10)
+- OBS_INDEX_RETENTION_DAYS          Duplicate index retention window (default 7)
+
+Routes
+------
+- POST /observations   Analyst_Caller payload or {"table", "fields"|"records"}
+- GET  /sync/stats     Batches sent, records per request, 429s, pending rows
+- GET  /rollups/day    Daily statistics from the hourly rollups (?day=YYYY-MM-DD&site=...)
+- GET  /index/nearby   Same species within radius_m and window_minutes? (replaces Airtable searches)
+- GET  /index/latest   Most recent observation of a species, excluding the current one
+- GET  /index/stats
+- GET  /health
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from fastapi import FastAPI, HTTPException, Request
+
+import rollups
+import spatial_index
+from airtable_sync import AIRTABLE_API_KEY, AIRTABLE_API_URL, AIRTABLE_BASE_ID, AirtableSync, airtable_client
+from observation_store import ObservationStore, SiteConfig
+from rollups import epoch_seconds, number
+
+# ---------------------------------------------------------------------------
+# Logging
+# ---------------------------------------------------------------------------
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("audtheia-observation-service")
+
+# httpx logs every request at INFO; keep the sync loop quiet
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+DB_PATH = os.environ.get("OBSERVATION_DB_PATH", "observations.sqlite3")
+ROLLUP_TIMEZONE = ZoneInfo(os.environ["ROLLUP_TIMEZONE"]) if os.environ.get("ROLLUP_TIMEZONE") else timezone.utc
+INDEX_CELL_METERS = float(os.environ.get("OBS_INDEX_CELL_METERS", "100"))
+INDEX_BUCKET_SECONDS = float(os.environ.get("OBS_INDEX_BUCKET_MINUTES", "10")) * 60
+INDEX_RETENTION_SECONDS = float(os.environ.get("OBS_INDEX_RETENTION_DAYS", "7")) * 86400
+INDEX_MAX_RADIUS_METERS = 50_000.0  # /index/nearby clamps radius_m to this
+
+
+def env_float(name: str) -> float | None:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+SITE = SiteConfig(
+    latitude=env_float("OBS_SITE_LATITUDE"),
+    longitude=env_float("OBS_SITE_LONGITUDE"),
+    location=os.environ.get("OBS_SITE_LOCATION"),
+    data_source=os.environ.get("OBS_DATA_SOURCE", "RTSP Stream"),
+)
+
+# ---------------------------------------------------------------------------
+# Lifespan
+# ---------------------------------------------------------------------------
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store = ObservationStore(DB_PATH)
+    app.state.store = store
+    app.state.rollups = rollups.attach(store, DB_PATH, ROLLUP_TIMEZONE)
+    app.state.index = spatial_index.attach(
+        store, cell_meters=INDEX_CELL_METERS, bucket_seconds=INDEX_BUCKET_SECONDS,
+        retention_seconds=INDEX_RETENTION_SECONDS,
+    )
+    app.state.sync = None
+    client = task = None
+    if AIRTABLE_API_KEY and AIRTABLE_BASE_ID:
+        client = airtable_client(AIRTABLE_API_KEY)
+        sync = AirtableSync(store, client, AIRTABLE_BASE_ID, api_url=AIRTABLE_API_URL)
+        store.add_listener(sync.notify)
+        app.state.sync = sync
+        task = asyncio.create_task(sync.run())
+        logger.info("Observation service started (store %s, Airtable sync on).", DB_PATH)
+    else:
+        logger.info("Observation service started (store %s, Airtable sync off: "
+                    "AIRTABLE_API_KEY / AIRTABLE_BASE_ID not set).", DB_PATH)
+    yield
+    if task:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if client:
+        await client.aclose()
+    app.state.rollups.close()
+    store.close()
+    logger.info("Observation service stopped.")
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+app = FastAPI(
+    title="Audtheia Observation Service",
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan,
+)
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "service": "audtheia-observation-service"}
+
+
+@app.post("/observations")
+async def observations(request: Request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON.")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object.")
+    try:
+        keys = await asyncio.to_thread(request.app.state.store.ingest, payload, SITE)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"stored": len(keys), "keys": keys}
+
+
+@app.get("/sync/stats")
+async def sync_stats(request: Request):
+    store = request.app.state.store
+    sync = request.app.state.sync
+    if sync is None:
+        return {"enabled": False, "pending": store.pending_count()}
+    return {"enabled": True, **sync.summary()}
+
+
+@app.get("/rollups/day")
+async def rollups_day(request: Request, day: str | None = None, site: str | None = None):
+    """Statistics for one reporting day; defaults to yesterday, which is what the midnight report covers."""
+    if day is None:
+        target = datetime.now(ROLLUP_TIMEZONE).date() - timedelta(days=1)
+    else:
+        try:
+            target = date.fromisoformat(day)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="day must be YYYY-MM-DD.")
+    return request.app.state.rollups.day_statistics(target, site)
+
+
+@app.get("/index/nearby")
+async def index_nearby(
+    request: Request,
+    species: str,
+    lat: float | None = None,
+    lon: float | None = None,
+    at: str | None = None,
+    radius_m: float = 50.0,
+    window_minutes: float = 15.0,
+    exclude: str | None = None,
+    limit: int = 10,
+):
+    """
+    Has `species` been seen within radius_m and window_minutes of this point?
+    lat/lon default to the site location and `at` (ISO 8601 or epoch seconds) to now.
+    radius_m is clamped to INDEX_MAX_RADIUS_METERS and window_minutes to the retention window.
+    """
+    observed_at = time.time()
+    if at:
+        # Query strings are always text, so epoch seconds arrive as "1700000000"
+        observed_at = number(at)
+        if observed_at is None:
+            observed_at = epoch_seconds(at)
+    if observed_at is None:
+        raise HTTPException(status_code=400, detail="at must be ISO 8601 or epoch seconds.")
+    if not math.isfinite(radius_m) or not math.isfinite(window_minutes):
+        raise HTTPException(status_code=400, detail="radius_m and window_minutes must be finite numbers.")
+    if lat is None or lon is None:
+        lat, lon = SITE.latitude, SITE.longitude
+    radius_m = max(0.0, min(radius_m, INDEX_MAX_RADIUS_METERS))
+    window_seconds = max(0.0, min(window_minutes * 60, INDEX_RETENTION_SECONDS))
+    started = time.perf_counter()
+    matches = request.app.state.index.nearby(species, observed_at, lat, lon, radius_m, window_seconds,
+                                             exclude, max(1, min(limit, 100)))
+    elapsed_us = (time.perf_counter() - started) * 1e6
+    return {
+        "seen": bool(matches),
+        "count": len(matches),
+        "records": [
+            {**observation.to_record(),
+             "distance_m": None if distance is None else round(distance, 1),
+             "minutes_apart": round(seconds / 60, 2)}
+            for observation, distance, seconds in matches
+        ],
+        "query_us": round(elapsed_us, 1),
+    }
+
+
+@app.get("/index/latest")
+async def index_latest(request: Request, species: str, exclude: str | None = None):
+    observation = request.app.state.index.latest(species, exclude)
+    return {"records": [observation.to_record()] if observation else []}
+
+
+@app.get("/index/stats")
+async def index_stats(request: Request):
+    return request.app.state.index.stats()
@@ -0,0 +1,291 @@
+"""
+Audtheia Spatio-Temporal Observation Index
+==========================================
+Answers "has this species been seen within X metres and Y minutes?" from
+memory, in place of the Airtable search calls the RTSP Analyst agents
+run for every observation ("Verify Last Obs", "Check Same Species",
+"Search Same Species Occurrence").
+
+Layout
+------
+Observations are bucketed by (species, time bucket) and then by grid
+cell. Cells are CELL_METERS squares: rows are latitude bands, and the
+width of a band in degrees of longitude follows the band's own latitude,
+so cells stay roughly square away from the equator. Each cell holds its
+observations sorted by time.
+
+A query visits only the time buckets that overlap the window. Within each
+bucket it visits the cells that overlap the radius, or the occupied cells
+when those are fewer. Candidates are then checked by time (bisect) and
+great-circle distance. Buckets older than the retention window are dropped
+whole.
+
+Observations without coordinates are indexed in a single "no location"
+cell and match on species and time only.
+"""
+
+import bisect
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from observation_store import SPECIES_TABLE, ObservationStore
+from rollups import epoch_seconds, number
+
+EARTH_RADIUS_METERS = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180.0
+
+CELL_METERS = 100.0
+BUCKET_SECONDS = 600.0
+RETENTION_SECONDS = 7 * 86400.0
+
+NO_LOCATION = None
+
+
+@dataclass(frozen=True)
+class IndexedObservation:
+    observation_id: str
+    species: str
+    observed_at: float
+    latitude: float | None
+    longitude: float | None
+
+    def to_record(self) -> dict:
+        """Shaped like an Airtable search result so n8n tool nodes can read it the same way."""
+        fields = {
+            "Observation ID": self.observation_id,
+            "Species Name": self.species,
+            "Observation Time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.observed_at)),
+        }
+        if self.latitude is not None:
+            fields["Latitude"] = self.latitude
+            fields["Longitude"] = self.longitude
+        return {"id": self.observation_id, "fields": fields}
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatioTemporalIndex:
+    """In-memory (species, time bucket, grid cell) index with a retention window."""
+
+    def __init__(self, cell_meters: float = CELL_METERS, bucket_seconds: float = BUCKET_SECONDS,
+                 retention_seconds: float = RETENTION_SECONDS, clock=time.time):
+        self.cell_meters = cell_meters
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (species, bucket) -> cell -> [(observed_at, observation_id)] sorted by time
+        self._grid: dict[tuple, dict] = {}
+        self._species_by_bucket: dict[int, set] = {}
+        self._bucket_heap: list[int] = []
+        self._entries: dict[str, IndexedObservation] = {}
+        self.evicted = 0
+
+    # -- geometry ------------------------------------------------------------
+
+    def _band(self, latitude: float) -> int:
+        return math.floor(latitude * METERS_PER_DEGREE / self.cell_meters)
+
+    def _band_width_degrees(self, band: int) -> float:
+        center = (band + 0.5) * self.cell_meters / METERS_PER_DEGREE
+        return self.cell_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(center)), 1e-6))
+
+    def cell(self, latitude: float | None, longitude: float | None):
+        if latitude is None or longitude is None:
+            return NO_LOCATION
+        band = self._band(latitude)
+        return band, math.floor(longitude / self._band_width_degrees(band))
+
+    def _column_ranges(self, latitude: float, longitude: float, radius_meters: float):
+        """(band, range of columns) covering the radius, one per latitude band"""
+        bands = range(self._band(latitude - radius_meters / METERS_PER_DEGREE),
+                      self._band(latitude + radius_meters / METERS_PER_DEGREE) + 1)
+        for band in bands:
+            width = self._band_width_degrees(band)
+            # Degrees of longitude covering the radius, widest at the band edge nearest the pole
+            edge = max(abs(band), abs(band + 1)) * self.cell_meters / METERS_PER_DEGREE
+            span = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(min(edge, 89.9))), 1e-6))
+            yield band, range(math.floor((longitude - span) / width), math.floor((longitude + span) / width) + 1)
+
+    def count_cells_within(self, latitude: float, longitude: float, radius_meters: float) -> int:
+        """len(cells_within(...)) without building the list"""
+        return sum(len(columns) for _, columns in self._column_ranges(latitude, longitude, radius_meters))
+
+    def cells_within(self, latitude: float, longitude: float, radius_meters: float) -> list:
+        return [(band, column) for band, columns in self._column_ranges(latitude, longitude, radius_meters)
+                for column in columns]
+
+    def bucket(self, observed_at: float) -> int:
+        return math.floor(observed_at / self.bucket_seconds)
+
+    # -- writes --------------------------------------------------------------
+
+    def add(self, observation: IndexedObservation):
+        """Insert or move an observation (a later write may change its species, time or position)."""
+        with self._lock:
+            previous = self._entries.get(observation.observation_id)
+            if previous == observation:
+                return
+            if previous is not None:
+                self._remove(previous)
+            if observation.observed_at < self.clock() - self.retention_seconds:
+                self._entries.pop(observation.observation_id, None)
+                return
+            bucket = self.bucket(observation.observed_at)
+            key = (observation.species, bucket)
+            cells = self._grid.get(key)
+            if cells is None:
+                cells = self._grid[key] = {}
+                species = self._species_by_bucket.get(bucket)
+                if species is None:
+                    species = self._species_by_bucket[bucket] = set()
+                    heapq.heappush(self._bucket_heap, bucket)
+                species.add(observation.species)
+            bisect.insort(cells.setdefault(self.cell(observation.latitude, observation.longitude), []),
+                          (observation.observed_at, observation.observation_id))
+            self._entries[observation.observation_id] = observation
+            self._evict_locked()
+
+    def _remove(self, observation: IndexedObservation):
+        key = (observation.species, self.bucket(observation.observed_at))
+        cells = self._grid.get(key, {})
+        items = cells.get(self.cell(observation.latitude, observation.longitude))
+        if items:
+            position = bisect.bisect_left(items, (observation.observed_at, observation.observation_id))
+            if position < len(items) and items[position][1] == observation.observation_id:
+                del items[position]
+        del self._entries[observation.observation_id]
+
+    def _evict_locked(self):
+        cutoff = self.bucket(self.clock() - self.retention_seconds)
+        while self._bucket_heap and self._bucket_heap[0] < cutoff:
+            bucket = heapq.heappop(self._bucket_heap)
+            for species in self._species_by_bucket.pop(bucket, ()):
+                for items in self._grid.pop((species, bucket), {}).values():
+                    for _, observation_id in items:
+                        if self._entries.pop(observation_id, None) is not None:
+                            self.evicted += 1
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked()
+
+    def on_observation(self, table: str, fields: dict, meta: dict):
+        """ObservationStore listener; partial writes are merged with what is already indexed."""
+        if table != SPECIES_TABLE:
+            return
+        observation_id = fields.get("Observation ID")
+        if isinstance(observation_id, list):
+            observation_id = observation_id[0] if observation_id else None
+        if not observation_id:
+            return
+        previous = self._entries.get(observation_id)
+        species = fields.get("Species Name") or (previous.species if previous else None)
+        observed_at = epoch_seconds(fields.get("Observation Time"))
+        if observed_at is None and previous is not None:
+            observed_at = previous.observed_at
+        latitude, longitude = number(fields.get("Latitude")), number(fields.get("Longitude"))
+        if (latitude is None or longitude is None) and previous is not None:
+            latitude, longitude = previous.latitude, previous.longitude
+        if species and observed_at is not None:
+            self.add(IndexedObservation(str(observation_id), str(species), observed_at, latitude, longitude))
+
+    def rebuild(self, store: ObservationStore) -> int:
+        rows = store.rows(SPECIES_TABLE, ("Observation ID", "Species Name", "Observation Time", "Latitude", "Longitude"))
+        for fields, meta in rows:
+            self.on_observation(SPECIES_TABLE, fields, meta)
+        return len(self._entries)
+
+    # -- queries -------------------------------------------------------------
+
+    def nearby(self, species: str, observed_at: float, latitude: float | None = None, longitude: float | None = None,
+               radius_meters: float = 50.0, window_seconds: float = 900.0, exclude: str | None = None,
+               limit: int = 10) -> list[tuple[IndexedObservation, float | None, float]]:
+        """
+        Observations of `species` within `radius_meters` and `window_seconds`
+        (either side) of the given point, as (observation, distance_m, seconds_apart),
+        closest in time first. Without coordinates, only species and time are compared.
+        """
+        located = latitude is not None and longitude is not None
+        start, end = observed_at - window_seconds, observed_at + window_seconds
+        matches = []
+        with self._lock:
+            # Counted first: a wide radius covers millions of cells, and then the occupied ones are scanned
+            query_count = self.count_cells_within(latitude, longitude, radius_meters) if located else 1
+            query_cells = None
+            for bucket in range(self.bucket(start), self.bucket(end) + 1):
+                cells = self._grid.get((species, bucket))
+                if not cells:
+                    continue
+                if located and query_count > len(cells):
+                    candidates = [items for cell, items in cells.items() if cell is not NO_LOCATION]
+                elif located:
+                    if query_cells is None:
+                        query_cells = self.cells_within(latitude, longitude, radius_meters)
+                    candidates = [cells[cell] for cell in query_cells if cell in cells]
+                else:
+                    candidates = list(cells.values())
+                for items in candidates:
+                    low = bisect.bisect_left(items, (start, ""))
+                    high = bisect.bisect_right(items, (end, "\uffff"))
+                    for _, observation_id in items[low:high]:
+                        if observation_id == exclude:
+                            continue
+                        observation = self._entries[observation_id]
+                        distance = None
+                        if located and observation.latitude is not None:
+                            distance = haversine_meters(latitude, longitude, observation.latitude, observation.longitude)
+                            if distance > radius_meters:
+                                continue
+                        matches.append((observation, distance, abs(observation.observed_at - observed_at)))
+        matches.sort(key=lambda match: match[2])
+        return matches[:limit]
+
+    def latest(self, species: str, exclude: str | None = None, before: float | None = None) -> IndexedObservation | None:
+        """Most recent retained observation of `species` (what "Verify Last Obs" asks Airtable for)."""
+        with self._lock:
+            buckets = sorted((bucket for bucket, names in self._species_by_bucket.items() if species in names),
+                             reverse=True)
+            for bucket in buckets:
+                if before is not None and bucket > self.bucket(before):
+                    continue
+                best = None
+                for items in self._grid[(species, bucket)].values():
+                    for observed_at, observation_id in reversed(items):
+                        if observation_id == exclude or (before is not None and observed_at > before):
+                            continue
+                        if best is None or observed_at > best[0]:
+                            best = (observed_at, observation_id)
+                        break
+                if best is not None:
+                    return self._entries[best[1]]
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "observations": len(self._entries),
+                "buckets": len(self._species_by_bucket),
+                "species_buckets": len(self._grid),
+                "evicted": self.evicted,
+                "cell_meters": self.cell_meters,
+                "bucket_seconds": self.bucket_seconds,
+                "retention_seconds": self.retention_seconds,
+            }
+
+
+def attach(store: ObservationStore, **options) -> SpatioTemporalIndex:
+    """Index fed by `store`, pre-loaded with the stored observations still inside the retention window."""
+    index = SpatioTemporalIndex(**options)
+    index.rebuild(store)
+    store.add_listener(index.on_observation)
+    return index
@@ -0,0 +1,431 @@
+"""
+Audtheia Environmental API Caching Gateway
+==========================================
+A local HTTP gateway for the environmental APIs called by the RTSP Analyst
+n8n workflow (Open-Meteo, NOAA CO-OPS, OpenTopoData, Open Elevation, GBIF,
+iNaturalist, SoilGrids, Nominatim, API Ninjas, Mapbox static maps).
+
+With "Set Static Location" every observation asks the same questions about
+the same coordinates every ~15 seconds. The gateway answers repeats from a
+persistent cache so an observation costs almost no external latency or quota.
+
+Usage
+-----
+    uvicorn env_gateway:app --host 127.0.0.1 --port 8090
+
+Point an n8n HTTP tool node at the gateway by prefixing the upstream URL:
+
+    https://marine-api.open-meteo.com/v1/marine?latitude=...
+    -> http://127.0.0.1:8090/marine-api.open-meteo.com/v1/marine?latitude=...
+
+Cache keys
+----------
+- Only the hosts in UPSTREAM_POLICIES are forwarded (no open proxy).
+- Coordinates (latitude/longitude, lat/lon, locations=lat,lon) are snapped to
+  a GATEWAY_GRID_DEGREES grid, and the snapped values are what is sent
+  upstream, so every request in a grid cell shares one answer.
+- Time-varying APIs add a time bucket (e.g. the current hour for Open-Meteo,
+  which publishes hourly), so entries roll over when the data does.
+- Credentials (api_key, access_token, ...) are forwarded but never part of a
+  key and never logged.
+
+Concurrent identical requests share one upstream call (in-flight
+coalescing). If an upstream fails, an expired entry up to MAX_STALE_SECONDS
+old is served instead. GET /gateway/stats reports per-upstream hit rates.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# ---------------------------------------------------------------------------
+# Logging
+# ---------------------------------------------------------------------------
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("audtheia-env-gateway")
+
+# httpx logs every request URL at INFO, and upstream URLs may carry API keys.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+CACHE_PATH = os.environ.get("GATEWAY_CACHE_PATH", "env_gateway_cache.sqlite3")
+
+# 0.01 degrees is ~1.1 km: finer than any of the gridded weather/marine
+# models behind these APIs, coarse enough that GPS jitter hits one cell.
+GRID_DEGREES = float(os.environ.get("GATEWAY_GRID_DEGREES", "0.01"))
+
+UPSTREAM_TIMEOUT_SECONDS = 20.0
+
+# How long past expiry an entry may still be served when the upstream is down.
+MAX_STALE_SECONDS = 24 * 3600
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Query parameters that carry credentials: forwarded, never keyed or logged.
+SECRET_PARAMS = frozenset({"api_key", "apikey", "access_token", "key", "token"})
+
+# Request headers passed on to the upstream (API Ninjas authenticates by header).
+FORWARDED_HEADERS = ("accept", "accept-language", "x-api-key")
+
+# Response headers worth keeping with a cached body.
+CACHED_HEADERS = ("content-type",)
+
+
+@dataclass(frozen=True)
+class UpstreamPolicy:
+    """Caching rules for one upstream API (host + optional path prefix)."""
+    name: str
+    host: str
+    ttl_seconds: int
+    bucket_seconds: int = 0   # 0 = not time-bucketed
+    path_prefix: str = "/"
+
+
+UPSTREAM_POLICIES = [
+    # Hourly model output
+    UpstreamPolicy("open-meteo-forecast", "api.open-meteo.com", HOUR, HOUR),
+    UpstreamPolicy("open-meteo-marine", "marine-api.open-meteo.com", HOUR, HOUR),
+    UpstreamPolicy("open-meteo-air-quality", "air-quality-api.open-meteo.com", HOUR, HOUR),
+    # CO-OPS water levels are 6-minute data; station metadata barely changes
+    UpstreamPolicy("noaa-coops-data", "api.tidesandcurrents.noaa.gov", 360, 360, "/api/"),
+    UpstreamPolicy("noaa-coops-metadata", "api.tidesandcurrents.noaa.gov", DAY, 0, "/mdapi/"),
+    # Static terrain / soil / places
+    UpstreamPolicy("opentopodata", "api.opentopodata.org", 30 * DAY),
+    UpstreamPolicy("open-elevation", "api.open-elevation.com", 30 * DAY),
+    UpstreamPolicy("soilgrids", "rest.isric.org", 30 * DAY),
+    UpstreamPolicy("nominatim", "nominatim.openstreetmap.org", 30 * DAY),
+    UpstreamPolicy("mapbox-static", "api.mapbox.com", 30 * DAY),
+    # Taxonomy and occurrence lookups
+    UpstreamPolicy("gbif", "api.gbif.org", 7 * DAY),
+    UpstreamPolicy("inaturalist", "api.inaturalist.org", 7 * DAY),
+    UpstreamPolicy("api-ninjas", "api.api-ninjas.com", 30 * DAY),
+]
+
+
+def find_policy(host: str, path: str) -> UpstreamPolicy | None:
+    """Most specific policy (longest path prefix) for a host and path."""
+    matches = [p for p in UPSTREAM_POLICIES if p.host == host and path.startswith(p.path_prefix)]
+    return max(matches, key=lambda p: len(p.path_prefix)) if matches else None
+
+# ---------------------------------------------------------------------------
+# Request normalisation
+# ---------------------------------------------------------------------------
+
+def snap(value: str, grid: float = GRID_DEGREES) -> str:
+    """Snap one coordinate to the grid; non-numeric and non-finite values pass through."""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if not math.isfinite(number):
+        # nan / inf cannot be snapped; the upstream rejects them as it does any bad coordinate
+        return value
+    decimals = max(0, -math.floor(math.log10(grid))) if grid < 1 else 0
+    return f"{round(number / grid) * grid:.{decimals}f}"
+
+
+def snap_locations(value: str, grid: float = GRID_DEGREES) -> str:
+    """`lat,lon|lat,lon` location lists used by OpenTopoData / Open Elevation."""
+    points = []
+    for point in value.split("|"):
+        parts = point.split(",")
+        points.append(",".join(snap(part.strip(), grid) for part in parts) if len(parts) == 2 else point)
+    return "|".join(points)
+
+
+COORDINATE_PARAMS = frozenset({"latitude", "longitude", "lat", "lon", "lng"})
+
+
+def normalize_query(items: list[tuple[str, str]], grid: float = GRID_DEGREES) -> list[tuple[str, str]]:
+    """Snap coordinates, tidy whitespace and sort, keeping repeated parameters."""
+    normalized = []
+    for name, value in items:
+        value = " ".join(value.split())
+        if name.lower() in COORDINATE_PARAMS:
+            value = snap(value, grid)
+        elif name.lower() == "locations":
+            value = snap_locations(value, grid)
+        normalized.append((name, value))
+    return sorted(normalized)
+
+
+def cache_key(policy: UpstreamPolicy, path: str, query: list[tuple[str, str]], now: float) -> str:
+    keyed = [(name, value) for name, value in query if name.lower() not in SECRET_PARAMS]
+    bucket = int(now // policy.bucket_seconds) if policy.bucket_seconds else 0
+    return f"{policy.host}{path}?{urlencode(keyed)}#{bucket}"
+
+# ---------------------------------------------------------------------------
+# Persistent store
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: dict
+    body: bytes
+    stored_at: float
+    expires_at: float
+
+
+class ResponseStore:
+    """SQLite-backed response cache; survives gateway and n8n restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, upstream TEXT NOT NULL, status INTEGER NOT NULL,"
+            " content_type TEXT, body BLOB NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_expiry ON responses (expires_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, content_type, body, stored_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, content_type, body, stored_at, expires_at = row
+        headers = {"content-type": content_type} if content_type else {}
+        return CachedResponse(status, headers, body, stored_at, expires_at)
+
+    def put(self, key: str, upstream: str, response: CachedResponse):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, upstream, response.status_code, response.headers.get("content-type"),
+                 response.body, response.stored_at, response.expires_at),
+            )
+            self._db.commit()
+
+    def purge(self, older_than: float) -> int:
+        """Delete entries that expired before `older_than` (beyond the stale window)."""
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM responses WHERE expires_at < ?", (older_than,)).rowcount
+            self._db.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+# ---------------------------------------------------------------------------
+# Gateway
+# ---------------------------------------------------------------------------
+
+@dataclass
+class UpstreamStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    stale: int = 0
+    errors: int = 0
+    upstream_seconds: float = field(default=0.0, repr=False)
+
+    def summary(self) -> dict:
+        requests = self.hits + self.misses + self.coalesced + self.stale
+        served_locally = self.hits + self.coalesced + self.stale
+        return {
+            "requests": requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale,
+            "errors": self.errors,
+            "hit_rate": round(served_locally / requests, 4) if requests else 0.0,
+            "avg_upstream_ms": round(self.upstream_seconds / self.misses * 1000, 1) if self.misses else 0.0,
+        }
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream could not be reached and nothing usable was cached."""
+
+
+class CachingGateway:
+    """Cache lookup, in-flight coalescing and upstream fetches for one process."""
+
+    def __init__(self, store: ResponseStore, client: httpx.AsyncClient, clock=time.time):
+        self.store = store
+        self.client = client
+        self.clock = clock
+        self.stats: dict[str, UpstreamStats] = {p.name: UpstreamStats() for p in UPSTREAM_POLICIES}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def get(self, policy: UpstreamPolicy, path: str, query: list[tuple[str, str]],
+                  headers: dict) -> tuple[CachedResponse, str]:
+        """Return (response, cache status) where status is HIT, MISS, COALESCED or STALE."""
+        stats = self.stats[policy.name]
+        now = self.clock()
+        key = cache_key(policy, path, query, now)
+
+        cached = self.store.get(key)
+        if cached is not None and cached.expires_at > now:
+            stats.hits += 1
+            return cached, "HIT"
+
+        task = self._inflight.get(key)
+        status = "COALESCED"
+        if task is None:
+            status = "MISS"
+            task = asyncio.ensure_future(self._fetch(policy, key, path, query, headers))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            response = await asyncio.shield(task)
+        except UpstreamUnavailable:
+            stats.errors += 1
+            # Serve the last good answer rather than nothing: this bucket's expired
+            # entry, or the previous bucket's for time-bucketed APIs
+            stale = cached
+            if stale is None and policy.bucket_seconds:
+                stale = self.store.get(cache_key(policy, path, query, now - policy.bucket_seconds))
+            if stale is not None and now - stale.expires_at < MAX_STALE_SECONDS:
+                stats.stale += 1
+                return stale, "STALE"
+            raise
+        if status == "MISS":
+            stats.misses += 1
+        else:
+            stats.coalesced += 1
+        return response, status
+
+    async def _fetch(self, policy: UpstreamPolicy, key: str, path: str, query: list[tuple[str, str]],
+                     headers: dict) -> CachedResponse:
+        started = time.perf_counter()
+        try:
+            upstream = await self.client.get(f"https://{policy.host}{path}", params=query, headers=headers)
+        except httpx.RequestError as exc:
+            # Exception type only: URLs may carry credentials
+            logger.warning("Upstream %s unreachable (%s).", policy.name, type(exc).__name__)
+            raise UpstreamUnavailable(policy.name) from None
+        finally:
+            self.stats[policy.name].upstream_seconds += time.perf_counter() - started
+
+        if upstream.status_code >= 500 or upstream.status_code == 429:
+            logger.warning("Upstream %s returned HTTP %d.", policy.name, upstream.status_code)
+            raise UpstreamUnavailable(policy.name)
+
+        now = self.clock()
+        response = CachedResponse(
+            status_code=upstream.status_code,
+            headers={name: upstream.headers[name] for name in CACHED_HEADERS if name in upstream.headers},
+            body=upstream.content,
+            stored_at=now,
+            expires_at=now + policy.ttl_seconds,
+        )
+        # Only successful answers are worth remembering; 4xx is passed through once
+        if upstream.status_code == 200:
+            await asyncio.to_thread(self.store.put, key, policy.name, response)
+        return response
+
+    def summary(self) -> dict:
+        upstreams = {name: stats.summary() for name, stats in self.stats.items()}
+        totals = UpstreamStats(
+            hits=sum(s.hits for s in self.stats.values()),
+            misses=sum(s.misses for s in self.stats.values()),
+            coalesced=sum(s.coalesced for s in self.stats.values()),
+            stale=sum(s.stale for s in self.stats.values()),
+            errors=sum(s.errors for s in self.stats.values()),
+            upstream_seconds=sum(s.upstream_seconds for s in self.stats.values()),
+        )
+        return {"total": totals.summary(), "upstreams": upstreams}
+
+# ---------------------------------------------------------------------------
+# App lifecycle
+# ---------------------------------------------------------------------------
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store = ResponseStore(CACHE_PATH)
+    purged = store.purge(time.time() - MAX_STALE_SECONDS)
+    client = httpx.AsyncClient(
+        timeout=UPSTREAM_TIMEOUT_SECONDS,
+        headers={"User-Agent": "Audtheia-Environmental-Gateway/1.0"},
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+    app.state.gateway = CachingGateway(store, client)
+    logger.info("Audtheia environmental gateway started (cache %s, %d expired entries purged).", CACHE_PATH, purged)
+    yield
+    await client.aclose()
+    store.close()
+    logger.info("Audtheia environmental gateway stopped.")
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+app = FastAPI(
+    title="Audtheia Environmental API Gateway",
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan,
+)
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "service": "audtheia-env-gateway"}
+
+
+@app.get("/gateway/stats")
+async def gateway_stats(request: Request):
+    """Per-upstream hit rates, coalesced requests and upstream latency."""
+    return request.app.state.gateway.summary()
+
+
+@app.get("/{host}/{path:path}")
+async def forward(host: str, path: str, request: Request):
+    """Answer a prefixed upstream URL from the cache, fetching it once on a miss."""
+    path = "/" + path
+    policy = find_policy(host, path)
+    if policy is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "unknown_upstream", "detail": f"{host} is not a configured upstream."},
+        )
+
+    query = normalize_query(list(request.query_params.multi_items()))
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    try:
+        response, status = await request.app.state.gateway.get(policy, path, query, headers)
+    except UpstreamUnavailable:
+        return JSONResponse(
+            status_code=502,
+            content={"error": "upstream_unavailable", "detail": f"{policy.name} is unreachable and not cached."},
+        )
+
+    age = max(0, int(time.time() - response.stored_at))
+    return Response(
+        content=response.body,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        headers={"X-Cache": status, "Age": str(age)},
+    )
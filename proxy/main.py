@@ -17,17 +17,38 @@ Security model
 - File uploads are validated for MIME type and size before any forwarding occurs.
 - Errors returned to the browser contain no internal detail, key fragments,
   or Roboflow response bodies.
+
+Dashboard cache
+---------------
+- When AIRTABLE_API_KEY and AIRTABLE_BASE_ID are set, the proxy reads the
+  Species Observations, Environmental Mapping and Daily Reports tables every
+  DASHBOARD_REFRESH_SECONDS and serves them from memory through
+  /dashboard/summary and the paged /dashboard/{species,mapping,reports}.
+  Use a read-only token scoped to that one base: anything in those tables
+  becomes readable by any visitor of the dashboard.
+- Every response body is serialized and gzip-compressed once per refresh and
+  carries a content-hash ETag, so a repeat page load is one conditional GET
+  answered with 304 Not Modified.
 """
 
+import asyncio
 import base64
+import gzip
+import hashlib
+import json
 import logging
 import os
+import time
+from collections import Counter
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 
 import httpx
 from fastapi import FastAPI, File, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 
@@ -83,6 +104,32 @@ MAX_FILE_BYTES = 10 * 1024 * 1024
 # 30 seconds accommodates cold starts on their end.
 ROBOFLOW_TIMEOUT_SECONDS = 30.0
 
+# Dashboard cache. Optional: without a token and base the /dashboard routes
+# answer 503 and the rest of the proxy is unaffected.
+AIRTABLE_API_KEY: str | None = os.environ.get("AIRTABLE_API_KEY")
+AIRTABLE_BASE_ID: str | None = os.environ.get("AIRTABLE_BASE_ID")
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
+
+# Table names or IDs (tbl...), matching the dashboard's Settings fields.
+DASHBOARD_TABLES = {
+    "species": os.environ.get("AIRTABLE_TABLE_SPECIES", "Species Observations"),
+    "mapping": os.environ.get("AIRTABLE_TABLE_MAPPING", "Environmental Mapping"),
+    "reports": os.environ.get("AIRTABLE_TABLE_REPORTS", "Daily Reports"),
+}
+
+DASHBOARD_REFRESH_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SECONDS", "300"))
+
+# Airtable returns at most 100 records per page. 50 pages per table keeps a
+# refresh bounded; the browser used to stop at 10.
+DASHBOARD_MAX_PAGES = 50
+
+# Airtable allows 5 requests per second per base; pages are fetched serially
+# with this gap so a refresh never competes with the n8n workflows for quota.
+DASHBOARD_PAGE_INTERVAL_SECONDS = 0.25
+
+DASHBOARD_PAGE_SIZE = 25
+DASHBOARD_MAX_PAGE_SIZE = 100
+
 # ---------------------------------------------------------------------------
 # Rate limiter
 # ---------------------------------------------------------------------------
@@ -105,6 +152,212 @@ def _real_ip(request: Request) -> str:
 
 limiter = Limiter(key_func=_real_ip)
 
+# ---------------------------------------------------------------------------
+# Dashboard cache
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A JSON body serialized and compressed once, with its content-hash ETag."""
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def encode_cached(payload: dict) -> CachedBody:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # mtime=0 keeps the compressed bytes identical for identical content.
+    gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+    return CachedBody(body, gzipped, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+def _observation_time(record: dict) -> str:
+    return str((record.get("fields") or {}).get("Observation Time") or record.get("createdTime") or "")
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(timespec="seconds")
+
+
+def build_summary(tables: dict[str, list[dict]], generated_at: float) -> dict:
+    """
+    The aggregates the dashboard header needs, computed once per refresh
+    instead of by every browser from every record.
+    """
+    species = tables.get("species", [])
+    names = Counter(
+        (record.get("fields") or {}).get("Species Name")
+        for record in species
+        if (record.get("fields") or {}).get("Species Name")
+    )
+    conservation = Counter(
+        (record.get("fields") or {}).get("IUCN Conservation Status") or "Not Evaluated"
+        for record in species
+    )
+
+    today = datetime.fromtimestamp(generated_at, tz=timezone.utc).date()
+    days = [(today - timedelta(days=offset)).isoformat() for offset in range(13, -1, -1)]
+    per_day = Counter(_observation_time(record)[:10] for record in species)
+
+    latest = max((_observation_time(record) for record in species), default=None)
+    return {
+        "generated_at": _iso(generated_at),
+        "refresh_seconds": DASHBOARD_REFRESH_SECONDS,
+        "record_counts": {name: len(records) for name, records in tables.items()},
+        "unique_species": len(names),
+        "top_species": [{"species": name, "observations": count} for name, count in names.most_common(10)],
+        "conservation_status": dict(conservation.most_common()),
+        "observations_last_14_days": [{"date": day, "observations": per_day.get(day, 0)} for day in days],
+        "latest_observation_time": latest or None,
+    }
+
+
+@dataclass
+class DashboardSnapshot:
+    tables: dict[str, list[dict]]
+    summary: CachedBody
+    generated_at: float
+    pages: dict = field(default_factory=dict)
+
+
+class DashboardCache:
+    """
+    Periodically refreshed, in-memory copy of the dashboard tables.
+
+    A failed refresh keeps serving the previous snapshot; the error is
+    logged without URLs, so the token never reaches the logs.
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.snapshot: DashboardSnapshot | None = None
+        self.last_error: str | None = None
+
+    async def fetch_table(self, table: str) -> list[dict]:
+        url = f"{AIRTABLE_API_URL}/{AIRTABLE_BASE_ID}/{quote(table, safe='')}"
+        records: list[dict] = []
+        offset = None
+        for _ in range(DASHBOARD_MAX_PAGES):
+            params = {"pageSize": 100}
+            if offset:
+                params["offset"] = offset
+            response = await self.client.get(url, params=params)
+            if response.status_code == 429:
+                # Airtable blocks the base for 30 seconds after a 429.
+                await asyncio.sleep(30)
+                continue
+            response.raise_for_status()
+            data = response.json()
+            records.extend(data.get("records", []))
+            offset = data.get("offset")
+            if not offset:
+                break
+            await asyncio.sleep(DASHBOARD_PAGE_INTERVAL_SECONDS)
+        return records
+
+    async def refresh(self):
+        tables = {}
+        for name, table in DASHBOARD_TABLES.items():
+            try:
+                tables[name] = await self.fetch_table(table)
+            except httpx.HTTPStatusError as exc:
+                # A missing optional table (e.g. no Daily Reports yet) should
+                # not take the whole dashboard down.
+                if exc.response.status_code == 404:
+                    tables[name] = []
+                    continue
+                raise
+        tables["species"].sort(key=_observation_time, reverse=True)
+        tables["reports"].sort(key=lambda record: record.get("createdTime", ""), reverse=True)
+        generated_at = time.time()
+        self.snapshot = DashboardSnapshot(tables, encode_cached(build_summary(tables, generated_at)), generated_at)
+        self.last_error = None
+        logger.info(
+            "Dashboard cache refreshed — %s.",
+            ", ".join(f"{len(records)} {name}" for name, records in tables.items()),
+        )
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Exception type only — httpx messages include the request URL.
+                self.last_error = type(exc).__name__
+                logger.error("Dashboard cache refresh failed (%s); serving previous data.", type(exc).__name__)
+            await asyncio.sleep(DASHBOARD_REFRESH_SECONDS)
+
+    def page(self, table: str, page: int, page_size: int) -> CachedBody:
+        snapshot = self.snapshot
+        key = (table, page, page_size)
+        cached = snapshot.pages.get(key)
+        if cached is None:
+            records = snapshot.tables[table]
+            pages = max(1, -(-len(records) // page_size))
+            start = (page - 1) * page_size
+            cached = encode_cached({
+                "records": records[start:start + page_size],
+                "page": page,
+                "page_size": page_size,
+                "pages": pages,
+                "total": len(records),
+                "next_page": page + 1 if page < pages else None,
+                "generated_at": _iso(snapshot.generated_at),
+            })
+            # Bounded: page/size combinations are client-controlled.
+            if len(snapshot.pages) < 512:
+                snapshot.pages[key] = cached
+        return cached
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110): proxies and CDNs may add a W/ prefix.
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """304 when the browser already holds this version, gzip when it accepts it."""
+    headers = {
+        "ETag": cached.etag,
+        # Browsers keep the body but revalidate on every load (a 304 is tiny).
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("If-None-Match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzipped, media_type="application/json", headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _dashboard_cache(request: Request) -> DashboardCache:
+    cache: DashboardCache | None = request.app.state.dashboard
+    if cache is None:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "dashboard_not_configured",
+                "detail": "The public dashboard is not enabled on this proxy.",
+            },
+        )
+    if cache.snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "dashboard_warming_up",
+                "detail": "Dashboard data is loading. Please try again in a few seconds.",
+            },
+            headers={"Retry-After": "5"},
+        )
+    return cache
+
 # ---------------------------------------------------------------------------
 # App lifecycle
 # ---------------------------------------------------------------------------
@@ -117,7 +370,31 @@ async def lifespan(app: FastAPI):
             "Add it under Environment in your Render.com Web Service settings."
         )
     logger.info("Audtheia proxy started. Roboflow endpoint is configured.")
+
+    app.state.dashboard = None
+    dashboard_task = None
+    dashboard_client = None
+    if AIRTABLE_API_KEY and AIRTABLE_BASE_ID:
+        dashboard_client = httpx.AsyncClient(
+            timeout=ROBOFLOW_TIMEOUT_SECONDS,
+            headers={"Authorization": f"Bearer {AIRTABLE_API_KEY}"},
+        )
+        app.state.dashboard = DashboardCache(dashboard_client)
+        # Refresh in the background so startup (and Render's health check)
+        # never waits on Airtable.
+        dashboard_task = asyncio.create_task(app.state.dashboard.run())
+        logger.info("Dashboard cache enabled (refresh every %.0fs).", DASHBOARD_REFRESH_SECONDS)
+
     yield
+
+    if dashboard_task:
+        dashboard_task.cancel()
+        try:
+            await dashboard_task
+        except asyncio.CancelledError:
+            pass
+    if dashboard_client:
+        await dashboard_client.aclose()
     logger.info("Audtheia proxy stopped.")
 
 # ---------------------------------------------------------------------------
@@ -142,7 +419,7 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
     allow_methods=["GET", "POST"],
-    allow_headers=["Content-Type"],
+    allow_headers=["Content-Type", "If-None-Match"],
 )
 
 # ---------------------------------------------------------------------------
@@ -152,6 +429,14 @@ app.add_middleware(
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     """Return a clear, user-facing message when the rate limit is reached."""
+    if request.url.path.startswith("/dashboard"):
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "rate_limit_exceeded",
+                "detail": "Too many dashboard requests. Please wait a minute and reload.",
+            },
+        )
     return JSONResponse(
         status_code=429,
         content={
@@ -284,3 +569,36 @@ async def detect(request: Request, file: UploadFile = File(...)):
     logger.info("Inference complete — %d prediction(s) returned.", prediction_count)
 
     return JSONResponse(content=result)
+
+
+@app.get("/dashboard/summary")
+@limiter.limit("120/minute")
+async def dashboard_summary(request: Request):
+    """
+    Precomputed dashboard aggregates: record counts, species richness, top
+    species, IUCN status mix and observations per day for the last 14 days.
+    """
+    return cached_response(request, _dashboard_cache(request).snapshot.summary)
+
+
+@app.get("/dashboard/{table}")
+@limiter.limit("120/minute")
+async def dashboard_records(request: Request, table: str, page: int = 1, page_size: int = DASHBOARD_PAGE_SIZE):
+    """
+    One page of cached records in Airtable's {id, createdTime, fields} shape,
+    newest first. `table` is species, mapping or reports.
+    """
+    if table not in DASHBOARD_TABLES:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "unknown_table", "detail": "Use species, mapping or reports."},
+        )
+    if page < 1 or not 1 <= page_size <= DASHBOARD_MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "invalid_page",
+                "detail": f"page must be >= 1 and page_size between 1 and {DASHBOARD_MAX_PAGE_SIZE}.",
+            },
+        )
+    return cached_response(request, _dashboard_cache(request).page(table, page, page_size))
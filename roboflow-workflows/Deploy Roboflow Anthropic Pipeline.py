@@ -25,43 +25,197 @@ Status: Production-Ready with Enhanced Performance & Visual Interface
 - 🚀 COMPREHENSIVE DEBUG OUTPUT for troubleshooting
 """
 
-import cv2
 import time
+# Startup profile origin (see StartupProfile); taken before the heavy imports below
+SCRIPT_STARTED = time.perf_counter()
+SCRIPT_STARTED_UNIX = time.time()
+
+import cv2
+import numpy as np
 import sys
 import os
 import shutil
+import subprocess
+import tempfile
+import argparse
+import glob
+import json
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import threading
 from dataclasses import dataclass, field
 from pathlib import Path
+IMPORTS_FINISHED = time.perf_counter()
+
+# Rich terminal interface, imported by load_rich_ui() from main(); --fast-start never imports it
+RICH_AVAILABLE = False
+console = None
 
-# Rich library imports for beautiful terminal interface
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.text import Text
-    from rich.table import Table
-    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
-    from rich.status import Status
-    from rich.columns import Columns
-    from rich.align import Align
-    from rich.rule import Rule
+def load_rich_ui() -> bool:
+    """Import Rich and create the console; False (plain prints) if Rich is not installed"""
+    global RICH_AVAILABLE, console, Console, Panel, Text, Table, Progress, SpinnerColumn, TextColumn
+    global BarColumn, TimeRemainingColumn, Status, Columns, Align, Rule
+    if RICH_AVAILABLE:
+        return True
+    try:
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.text import Text
+        from rich.table import Table
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
+        from rich.status import Status
+        from rich.columns import Columns
+        from rich.align import Align
+        from rich.rule import Rule
+    except ImportError:
+        print("⚠️ Rich library not available. Install with: pip install rich")
+        return False
     RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
-    print("⚠️ Rich library not available. Install with: pip install rich")
+    console = Console()
+    return True
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🔑 ROBOFLOW DEPLOYMENT CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+ROBOFLOW_API_KEY = "[YOUR_ROBOFLOW_API_KEY_HERE]"
+ROBOFLOW_WORKSPACE = "[YOUR_ROBOFLOW_WORKSPACE_HERE]"
+ROBOFLOW_WORKFLOW_ID = "[ROBOFLOW_WORKFLOW_ID_HERE]"
+DEFAULT_VIDEO_SOURCE = r"[INSERT_VIDEO_PATH_HERE]"
+DEFAULT_DOWNLOAD_PATH = "[INSERT_YOUR_PATH_HERE]"
+ARCHIVE_VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv")
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🎥 ENHANCED MP4 VIDEO PROCESSOR WITH AUTO DOWNLOAD
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Finalize strategies for moving the processed MP4 into the download folder:
+#   "auto"   - rename/hard link on the same filesystem, reflink if supported,
+#              chunked sendfile copy across filesystems
+#   "move"   - like "auto" but never keeps the ./processed_videos copy
+#   "copy"   - always byte-copy (chunked sendfile with progress)
+#   "direct" - the writer streams straight to the download path, nothing to finalize
+FINALIZE_STRATEGIES = ("auto", "move", "copy", "direct")
+FINALIZE_COPY_CHUNK_BYTES = 64 * 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write reflinks (btrfs, XFS)
+
+# Writer backends: "ffmpeg" pipes raw BGR frames into an ffmpeg subprocess
+# (H.264, small files, no OpenCV codec build required), "opencv" uses the
+# cv2.VideoWriter fourcc fallback list, "auto" prefers ffmpeg when installed.
+WRITER_BACKENDS = ("auto", "ffmpeg", "opencv")
+DEFAULT_OUTPUT_FPS = 30.0
+FFMPEG_STARTUP_SECONDS = 0.5  # ffmpeg must still be running this long after the first frame
+
+class FFmpegPipeWriter:
+    """cv2.VideoWriter-compatible writer that streams raw frames into an ffmpeg subprocess.
+    ffmpeg's stderr goes to a temp file, so a failed encode can say why."""
+    
+    def __init__(self, filename: str, fps: float, frame_size: tuple,
+                 codec: str = "libx264", preset: str = "veryfast", crf: int = 23,
+                 ffmpeg_binary: str = "ffmpeg"):
+        width, height = frame_size
+        self.frame_bytes = width * height * 3
+        self.frame_size = (width, height)
+        self.process = None
+        
+        command = [
+            ffmpeg_binary, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-r", f"{fps:.3f}",
+            "-i", "-",
+            "-an",
+            "-c:v", codec,
+            # yuv420p needs even dimensions for H.264 players
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+        ]
+        if codec in ("libx264", "libx265"):
+            command += ["-preset", preset, "-crf", str(crf)]
+        command.append(filename)
+        
+        self.stderr = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=self.stderr,
+                bufsize=0,
+            )
+        except OSError:
+            self.process = None
+    
+    def isOpened(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def start(self, frame, timeout: float = FFMPEG_STARTUP_SECONDS) -> bool:
+        """Write the first frame and confirm ffmpeg is still encoding `timeout` seconds later.
+        Right after Popen isOpened() passes even for a codec ffmpeg cannot open."""
+        if not self.isOpened():
+            return False
+        try:
+            self.write(frame)
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return True
+        except (OSError, ValueError):
+            pass
+        return False
+    
+    def error_output(self, limit: int = 2000) -> str:
+        """Tail of what ffmpeg wrote to stderr"""
+        try:
+            self.stderr.seek(0)
+            return self.stderr.read().decode("utf-8", "replace").strip()[-limit:]
+        except (OSError, ValueError):
+            return ""
+    
+    def write(self, frame):
+        """Write one BGR frame; the numpy buffer is handed to the pipe without copying"""
+        if frame.shape[1] != self.frame_size[0] or frame.shape[0] != self.frame_size[1]:
+            raise ValueError(f"Frame size {frame.shape[1]}x{frame.shape[0]} does not match writer {self.frame_size[0]}x{self.frame_size[1]}")
+        if not frame.flags['C_CONTIGUOUS']:
+            frame = np.ascontiguousarray(frame)
+        self.process.stdin.write(memoryview(frame).cast('B'))
+    
+    def release(self):
+        """Close the pipe and wait for ffmpeg; raises RuntimeError when it did not exit cleanly"""
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass  # ffmpeg already gone; its exit code says why
+        try:
+            returncode = process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            returncode = process.wait()
+        error = self.error_output()
+        self.stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {returncode}" + (f": {error}" if error else ""))
+
 class EnhancedMP4ProcessorWithDownload:
     """Enhanced video processor with visual display, auto download, and comprehensive debugging"""
     
-    def __init__(self, download_path="[INSERT_YOUR_PATH_HERE]"):
+    def __init__(self, download_path=DEFAULT_DOWNLOAD_PATH, finalize_strategy="auto",
+                 writer_backend="auto", ffmpeg_codec="libx264", ffmpeg_preset="veryfast", ffmpeg_crf=23):
+        if finalize_strategy not in FINALIZE_STRATEGIES:
+            raise ValueError(f"finalize_strategy must be one of {FINALIZE_STRATEGIES}, got {finalize_strategy!r}")
+        if writer_backend not in WRITER_BACKENDS:
+            raise ValueError(f"writer_backend must be one of {WRITER_BACKENDS}, got {writer_backend!r}")
         self.output_path = "./processed_videos"
         self.download_path = download_path
+        self.finalize_strategy = finalize_strategy
+        self.finalize_method = None
+        self.writer_backend = writer_backend
+        self.ffmpeg_codec = ffmpeg_codec
+        self.ffmpeg_preset = ffmpeg_preset
+        self.ffmpeg_crf = ffmpeg_crf
+        self.source_fps = DEFAULT_OUTPUT_FPS
         self.is_processing_mp4 = False
         self.input_filename = None
         self.output_filename = None
@@ -101,15 +255,18 @@ class EnhancedMP4ProcessorWithDownload:
                 path = Path(video_reference)
                 self.log_debug(f"📁 Path exists: {path.exists()}, Suffix: {path.suffix.lower()}")
                 
-                if path.exists() and path.suffix.lower() == '.mp4':
+                if path.exists() and path.suffix.lower() in ARCHIVE_VIDEO_EXTENSIONS:
                     self.is_processing_mp4 = True
                     self.input_filename = path.name
                     
-                    # Count total frames for progress tracking
+                    # Count total frames for progress tracking and keep the source frame rate
                     cap = cv2.VideoCapture(str(path))
                     self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                    source_fps = cap.get(cv2.CAP_PROP_FPS)
                     cap.release()
-                    self.log_debug(f"📊 Total frames in video: {self.total_frames}")
+                    if source_fps and 0 < source_fps <= 240:
+                        self.source_fps = float(source_fps)
+                    self.log_debug(f"📊 Total frames in video: {self.total_frames} @ {self.source_fps:.2f}fps")
                     
                     # Generate output filename with timestamp
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -124,7 +281,11 @@ class EnhancedMP4ProcessorWithDownload:
                         self.download_path,
                         f"{stem}_AUDTHEIA_PROCESSED_{timestamp}.mp4"
                     )
-                    
+
+                    # Direct mode: stream the writer straight into the download folder
+                    if self.finalize_strategy == "direct":
+                        self.output_filename = self.final_download_path
+
                     self.log_debug(f"✅ MP4 file detected: {self.input_filename}")
                     self.log_debug(f"💾 Will save to: {self.output_filename}")
                     self.log_debug(f"📥 Will download to: {self.final_download_path}")
@@ -151,8 +312,9 @@ class EnhancedMP4ProcessorWithDownload:
                 console.print(f"[red]⚠️ Source detection error: {e}[/red]")
             return False
     
-    def try_initialize_writer(self, width: int, height: int, fps: float = 30.0) -> bool:
-        """Try to initialize video writer with multiple codec fallbacks"""
+    def try_initialize_writer(self, width: int, height: int, fps: float = DEFAULT_OUTPUT_FPS, first_frame=None) -> bool:
+        """Try to initialize video writer: ffmpeg pipe first (if enabled), then OpenCV codec fallbacks.
+        With `first_frame`, ffmpeg is started on it (and has written it) when it is chosen."""
         if not self.is_processing_mp4 or self.writer_initialized:
             return self.writer_initialized
             
@@ -162,6 +324,12 @@ class EnhancedMP4ProcessorWithDownload:
         self.initialization_attempted = True
         self.frame_dimensions = (width, height)
         
+        if (self.writer_backend in ("auto", "ffmpeg") and first_frame is not None
+                and self.try_initialize_ffmpeg_writer(width, height, fps, first_frame)):
+            return True
+        if self.writer_backend == "ffmpeg":
+            self.log_debug("⚠️ ffmpeg writer unavailable - falling back to OpenCV codecs")
+        
         # Multiple codec options for maximum compatibility
         codec_options = [
             ('mp4v', 'MP4V - MPEG-4 Part 2'),
@@ -211,6 +379,41 @@ class EnhancedMP4ProcessorWithDownload:
         
         return False
     
+    def try_initialize_ffmpeg_writer(self, width: int, height: int, fps: float, first_frame) -> bool:
+        """Start an ffmpeg subprocess writer if the binary is installed and it encodes `first_frame`"""
+        ffmpeg_binary = shutil.which("ffmpeg")
+        if not ffmpeg_binary:
+            self.log_debug("ℹ️ ffmpeg not found on PATH")
+            return False
+        
+        codec_name = f"FFMPEG - {self.ffmpeg_codec} ({self.ffmpeg_preset}, CRF {self.ffmpeg_crf})"
+        self.log_debug(f"🔄 Trying codec: {codec_name}")
+        writer = FFmpegPipeWriter(
+            self.output_filename, fps, (width, height),
+            codec=self.ffmpeg_codec, preset=self.ffmpeg_preset, crf=self.ffmpeg_crf,
+            ffmpeg_binary=ffmpeg_binary,
+        )
+        if not writer.start(first_frame):
+            self.log_debug(f"❌ Failed to initialize with {codec_name}")
+            try:
+                writer.release()
+            except RuntimeError as e:
+                self.log_debug(f"❌ {e}")
+            if os.path.exists(self.output_filename):
+                os.remove(self.output_filename)
+            return False
+        
+        self.video_writer = writer
+        self.writer_initialized = True
+        self.codec_used = codec_name
+        self.log_debug(f"✅ SUCCESS! Video writer initialized with {codec_name}")
+        self.log_debug(f"📊 Dimensions: {width}x{height}, FPS: {fps}")
+        
+        if console and RICH_AVAILABLE:
+            console.print(f"[green]🔴 STARTED saving processed MP4 - {width}x{height} @ {fps}fps with {codec_name}[/green]")
+        
+        return True
+    
     def save_frame(self, frame):
         """Save a processed frame with automatic initialization and progress tracking"""
         if not self.is_processing_mp4:
@@ -219,7 +422,11 @@ class EnhancedMP4ProcessorWithDownload:
         # Auto-initialize writer on first frame
         if not self.writer_initialized and not self.initialization_attempted:
             height, width = frame.shape[:2]
-            self.try_initialize_writer(width, height, 30.0)
+            self.try_initialize_writer(width, height, self.source_fps, first_frame=frame)
+            if isinstance(self.video_writer, FFmpegPipeWriter):
+                # ffmpeg was confirmed on this frame, so it is already written
+                self.processed_frames += 1
+                return True
         
         # Save frame if writer is ready
         if self.writer_initialized and self.video_writer:
@@ -252,12 +459,15 @@ class EnhancedMP4ProcessorWithDownload:
             
         self.log_debug("🏁 Finishing video processing...")
         
+        writer_failed = False
         if self.video_writer:
             try:
                 self.video_writer.release()
                 self.log_debug("✅ Video writer released successfully")
             except Exception as e:
-                self.log_debug(f"⚠️ Error releasing video writer: {e}")
+                # ffmpeg exiting non-zero leaves an unfinished MP4: keep it locally, don't report it saved
+                writer_failed = True
+                self.log_debug(f"❌ Video writer failed: {e}")
         
         # Calculate file statistics
         file_size_mb = 0
@@ -272,16 +482,16 @@ class EnhancedMP4ProcessorWithDownload:
         
         # AUTO DOWNLOAD TO DOWNLOADS FOLDER
         download_success = False
-        if file_exists:
+        if file_exists and not writer_failed:
             try:
                 self.log_debug(f"📥 Starting auto-download to: {self.final_download_path}")
-                shutil.copy2(self.output_filename, self.final_download_path)
+                self.finalize_method = self.finalize_output(self.output_filename, self.final_download_path)
                 
                 if os.path.exists(self.final_download_path):
                     download_size_mb = os.path.getsize(self.final_download_path) / (1024 * 1024)
                     download_success = True
-                    self.log_debug(f"✅ AUTO DOWNLOAD SUCCESSFUL: {download_size_mb:.1f} MB")
-                    
+                    self.log_debug(f"✅ AUTO DOWNLOAD SUCCESSFUL ({self.finalize_method}): {download_size_mb:.1f} MB")
+
                     if console and RICH_AVAILABLE:
                         console.print(f"[bright_green]🎉 AUTO DOWNLOAD COMPLETE![/bright_green]")
                         console.print(f"[bright_cyan]📥 Downloaded to: {self.final_download_path}[/bright_cyan]")
@@ -296,7 +506,7 @@ class EnhancedMP4ProcessorWithDownload:
         
         # Final report
         if console and RICH_AVAILABLE:
-            if file_exists and self.processed_frames > 0:
+            if file_exists and self.processed_frames > 0 and not writer_failed:
                 console.print(f"[green]✅ PROCESSED MP4 SAVED SUCCESSFULLY[/green]")
                 console.print(f"[cyan]📊 Frames processed: {self.processed_frames:,}/{self.total_frames:,}[/cyan]")
                 console.print(f"[cyan]📁 File size: {file_size_mb:.1f} MB[/cyan]")
@@ -304,7 +514,7 @@ class EnhancedMP4ProcessorWithDownload:
                 console.print(f"[cyan]💾 Processed file: {self.output_filename}[/cyan]")
                 
                 if download_success:
-                    console.print(f"[bright_green]🎉 AUTO DOWNLOAD: SUCCESS[/bright_green]")
+                    console.print(f"[bright_green]🎉 AUTO DOWNLOAD: SUCCESS ({self.finalize_method})[/bright_green]")
                     console.print(f"[bright_cyan]📥 Your file: {self.final_download_path}[/bright_cyan]")
                 else:
                     console.print(f"[yellow]⚠️ Auto download failed - file saved locally only[/yellow]")
@@ -319,7 +529,94 @@ class EnhancedMP4ProcessorWithDownload:
         self.print_debug_summary()
         
         return self.final_download_path if download_success else (self.output_filename if file_exists else None)
-    
+
+    def finalize_output(self, source: str, destination: str) -> str:
+        """Place the processed MP4 at the download path with the cheapest available method"""
+        if os.path.abspath(source) == os.path.abspath(destination):
+            return "direct"
+
+        if self.finalize_strategy != "copy" and self._same_filesystem(source, destination):
+            if self.finalize_strategy == "move":
+                os.replace(source, destination)
+                return "rename"
+            try:
+                os.link(source, destination)
+                return "hardlink"
+            except OSError as e:
+                self.log_debug(f"⚠️ Hard link unavailable ({e}), trying reflink")
+            if self._reflink(source, destination):
+                return "reflink"
+
+        try:
+            self._sendfile_copy(source, destination)
+        except OSError:
+            # A short copy must not sit in the download folder looking complete
+            if os.path.exists(destination):
+                os.remove(destination)
+            raise
+        if self.finalize_strategy == "move":
+            os.remove(source)
+        return "copy"
+
+    @staticmethod
+    def _same_filesystem(source: str, destination: str) -> bool:
+        """Check whether both paths live on the same device"""
+        try:
+            dest_dir = os.path.dirname(os.path.abspath(destination))
+            return os.stat(source).st_dev == os.stat(dest_dir).st_dev
+        except OSError:
+            return False
+
+    def _reflink(self, source: str, destination: str) -> bool:
+        """Copy-on-write clone via FICLONE (Linux only); leaves no partial file on failure"""
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return True
+        except OSError as e:
+            self.log_debug(f"⚠️ Reflink unavailable ({e}), falling back to copy")
+            if os.path.exists(destination):
+                os.remove(destination)
+            return False
+
+    def _sendfile_copy(self, source: str, destination: str):
+        """Chunked in-kernel copy with progress logging; plain buffered copy where sendfile is missing.
+        Raises OSError when the source ends before its size at the start (a short copy)."""
+        total_bytes = os.path.getsize(source)
+        copied = 0
+        next_report = 0.1
+
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            sendfile = getattr(os, "sendfile", None)
+            while copied < total_bytes:
+                chunk = min(FINALIZE_COPY_CHUNK_BYTES, total_bytes - copied)
+                if sendfile is not None:
+                    try:
+                        sent = sendfile(dst.fileno(), src.fileno(), copied, chunk)
+                    except OSError:
+                        # Some platforms only allow sockets as sendfile targets
+                        sendfile = None
+                        continue
+                else:
+                    src.seek(copied)
+                    dst.seek(copied)
+                    sent = dst.write(src.read(chunk))
+                if sent == 0:
+                    raise OSError(f"Copy of {source} ended at {copied:,} of {total_bytes:,} bytes")
+                copied += sent
+
+                if total_bytes and copied / total_bytes >= next_report:
+                    self.log_debug(f"📥 Copy progress: {copied / (1024 * 1024):.1f}/{total_bytes / (1024 * 1024):.1f} MB ({copied / total_bytes * 100:.0f}%)")
+                    next_report += 0.1
+
+        shutil.copystat(source, destination)
+
     def print_debug_summary(self):
         """Print comprehensive debug summary"""
         if console and RICH_AVAILABLE:
@@ -347,7 +644,38 @@ class EnhancedMP4ProcessorWithDownload:
 # 🎨 PERFORMANCE OPTIMIZATIONS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-console = Console() if RICH_AVAILABLE else None
+# Pipeline stages timed per frame. "inference" is the whole workflow run (model +
+# workflow blocks) as seen by InferencePipeline; the execution engine does not expose
+# individual block timings to the caller.
+METRIC_STAGES = ("decode", "inference", "sink", "encode", "display")
+METRIC_WINDOW = 1024
+
+class StageLatencyRing:
+    """Preallocated ring buffer of stage durations (seconds); O(1) per sample"""
+    
+    def __init__(self, capacity: int = METRIC_WINDOW):
+        self.samples = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+    
+    def add(self, seconds: float):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+    
+    def recent(self, count: int) -> np.ndarray:
+        """The newest `count` samples (fewer while the ring is filling)"""
+        count = min(count, self.count)
+        return self.samples[(self.index - count + np.arange(count)) % self.capacity]
+    
+    def percentiles_ms(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "samples": 0}
+        p50, p95, p99 = np.percentile(self.samples[:self.count], (50, 95, 99)) * 1000
+        return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+                "samples": self.count}
 
 @dataclass
 class OptimizedMetrics:
@@ -355,82 +683,258 @@ class OptimizedMetrics:
     total_frames: int = 0
     species_detected: set = field(default_factory=set)
     start_time: float = field(default_factory=time.time)
-    processing_times: list = field(default_factory=list)
-    last_fps_update: float = field(default_factory=time.time)
-    current_fps: float = 0.0
+    stages: Dict[str, StageLatencyRing] = field(default_factory=lambda: {stage: StageLatencyRing() for stage in METRIC_STAGES})
+    last_frame_time: float = 0.0
+    ewma_frame_interval: float = 0.0
+    ewma_alpha: float = 0.05
+    target_fps: float = DEFAULT_OUTPUT_FPS
+    sources: Dict[str, Any] = field(default_factory=dict)
+    controller: Any = None
     
     def add_detection(self, species_name: str):
         """Record a new species detection (optimized)"""
         self.species_detected.add(species_name)
     
+    def add_stage_time(self, stage: str, seconds: float):
+        """Record one stage duration; unknown stages get their own ring on first use"""
+        ring = self.stages.get(stage)
+        if ring is None:
+            ring = self.stages[stage] = StageLatencyRing()
+        ring.add(seconds)
+    
+    def register_source(self, name: str, source):
+        """Include a live source's counters (anything with .stats()) in every summary"""
+        self.sources[name] = source
+    
     def add_processing_time(self, processing_time: float):
-        """Record processing time with minimal overhead"""
+        """Record sink time for one frame and update the EWMA frame rate"""
         self.total_frames += 1
+        self.stages["sink"].add(processing_time)
         
-        # Update FPS every 30 frames to reduce overhead
-        if self.total_frames % 60 == 0:
-            current_time = time.time()
-            time_diff = current_time - self.last_fps_update
-            if time_diff > 0:
-                self.current_fps = 60.0 / time_diff
-                self.last_fps_update = current_time
-        
-        # Keep only recent processing times
-        self.processing_times.append(processing_time)
-        if len(self.processing_times) > 30:
-            self.processing_times.pop(0)
+        now = time.perf_counter()
+        if self.last_frame_time:
+            interval = now - self.last_frame_time
+            if self.ewma_frame_interval == 0.0:
+                self.ewma_frame_interval = interval
+            else:
+                self.ewma_frame_interval += self.ewma_alpha * (interval - self.ewma_frame_interval)
+        self.last_frame_time = now
+    
+    @property
+    def current_fps(self) -> float:
+        return 1.0 / self.ewma_frame_interval if self.ewma_frame_interval > 0 else 0.0
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Generate lightweight performance summary"""
         runtime = time.time() - self.start_time
-        avg_processing = sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0
         overall_fps = self.total_frames / runtime if runtime > 0 else 0
+        current_fps = self.current_fps if self.current_fps > 0 else overall_fps
+        stage_summary = {stage: ring.percentiles_ms() for stage, ring in list(self.stages.items())}
         
         return {
+            'timestamp': time.time(),
             'runtime_minutes': runtime / 60,
             'total_frames': self.total_frames,
             'species_count': len(self.species_detected),
-            'current_fps': self.current_fps if self.current_fps > 0 else overall_fps,
-            'avg_processing_ms': avg_processing * 1000,
-            'efficiency': min(100, (self.current_fps / 30) * 100) if self.current_fps > 0 else 0
+            'current_fps': current_fps,
+            'ewma_fps': self.current_fps,
+            'avg_processing_ms': stage_summary['sink']['p50_ms'],
+            'stages': stage_summary,
+            'sources': {name: source.stats() for name, source in list(self.sources.items())},
+            'throughput': self.controller.stats() if self.controller else None,
+            'efficiency': min(100, (current_fps / self.target_fps) * 100) if current_fps > 0 and self.target_fps > 0 else 0
         }
 
 # Global performance monitor
 perf_monitor = OptimizedMetrics()
 
+class TimedFrameProducer:
+    """Wraps a VideoFrameProducer and records grab + retrieve time as the "decode" stage"""
+    
+    def __init__(self, producer, metrics: OptimizedMetrics):
+        self.producer = producer
+        self.metrics = metrics
+        self._grab_seconds = 0.0
+    
+    def grab(self) -> bool:
+        started = time.perf_counter()
+        success = self.producer.grab()
+        self._grab_seconds = time.perf_counter() - started
+        return success
+    
+    def retrieve(self):
+        started = time.perf_counter()
+        result = self.producer.retrieve()
+        self.metrics.add_stage_time("decode", self._grab_seconds + time.perf_counter() - started)
+        return result
+    
+    def __getattr__(self, name):
+        return getattr(self.producer, name)
+
+def timed_video_reference(video_reference, metrics: OptimizedMetrics):
+    """Turn a path/URL/index or producer factory into a factory of decode-timed producers"""
+    if callable(video_reference):
+        return lambda: TimedFrameProducer(video_reference(), metrics)
+    
+    def factory():
+        from inference.core.interfaces.camera.video_source import CV2VideoFrameProducer
+        return TimedFrameProducer(CV2VideoFrameProducer(video_reference), metrics)
+    return factory
+
+def create_stage_timing_watchdog(metrics: OptimizedMetrics):
+    """InferencePipeline watchdog that feeds per-frame workflow latency into the metrics rings"""
+    from inference.core.interfaces.stream.watchdog import BasePipelineWatchDog
+    
+    class StageTimingWatchDog(BasePipelineWatchDog):
+        def __init__(self):
+            super().__init__()
+            self._started = {}
+        
+        def on_model_inference_started(self, frames):
+            super().on_model_inference_started(frames)
+            now = time.perf_counter()
+            for frame in frames:
+                self._started[(frame.source_id, frame.frame_id)] = now
+        
+        def on_model_prediction_ready(self, frames):
+            super().on_model_prediction_ready(frames)
+            now = time.perf_counter()
+            for frame in frames:
+                started = self._started.pop((frame.source_id, frame.frame_id), None)
+                if started is not None:
+                    metrics.add_stage_time("inference", now - started)
+    
+    return StageTimingWatchDog()
+
+class MetricsExporter:
+    """
+    Periodic, non-blocking metrics export for unattended deployments.
+    
+    A daemon thread appends a summary line to a JSONL file every interval and/or
+    serves the latest summary as JSON on http://127.0.0.1:<port>/metrics. The
+    frame path never waits on disk or network I/O.
+    """
+    
+    def __init__(self, metrics: OptimizedMetrics, jsonl_path: Optional[str] = None,
+                 http_port: Optional[int] = None, interval_seconds: float = 10.0):
+        self.metrics = metrics
+        self.jsonl_path = jsonl_path
+        self.http_port = http_port
+        self.interval_seconds = interval_seconds
+        self.latest = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+    
+    def start(self):
+        if self.jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+        if self.http_port:
+            self._start_http_server()
+        self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.export_once()
+    
+    def export_once(self):
+        try:
+            self.latest = self.metrics.get_metrics_summary()
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.latest, separators=(",", ":")) + "\n")
+        except Exception:
+            pass
+    
+    def _start_http_server(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        exporter = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(exporter.latest or exporter.metrics.get_metrics_summary()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.http_port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="MetricsHTTP", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+        self.export_once()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🛠️ BYTETRACKER FPS OPTIMIZATION - ENHANCED VERSION
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class ByteTrackerOptimizer:
-    """Professional ByteTracker optimization system"""
+    """
+    Feeds ByteTrack the frame rate the pipeline really runs at. ByteTrack sizes its
+    lost-track buffer from the fps it is created with, so a live box that only
+    manages 8 fps but reports 60 keeps dead tracks alive 7x too long.
+    """
+    
+    # Frame rate used when the source reports none; batch mode sets it per file
+    fallback_fps = DEFAULT_OUTPUT_FPS
+    # Live sources: callable(source_id) -> measured fps (0 if unknown), set by the throughput controller
+    live_fps_provider = None
+    
+    @classmethod
+    def tracker_fps(cls, metadata) -> float:
+        """Measured processing rate for live streams, the file's own frame rate otherwise"""
+        if cls.live_fps_provider and not getattr(metadata, 'comes_from_video_file', False):
+            identifier = getattr(metadata, 'video_identifier', None)
+            source_id = int(identifier) if str(identifier).isdigit() else 0
+            measured = cls.live_fps_provider(source_id)
+            if measured > 0:
+                return measured
+        fps = getattr(metadata, 'fps', None)
+        return fps if fps and fps > 0 else cls.fallback_fps
     
     @staticmethod
     def apply_comprehensive_patch() -> bool:
-        """Apply enhanced ByteTracker FPS fix with comprehensive error handling"""
+        """Wrap ByteTrackerBlockV3.run so trackers are created and kept at the measured fps"""
         try:
-            from inference.core.workflows.execution_engine.v1.blocks.byte_tracker.v3 import ByteTrackerBlockV3
+            from inference.core.workflows.core_steps.transformations.byte_tracker.v3 import ByteTrackerBlockV3
             
             if not hasattr(ByteTrackerBlockV3, '_audtheia_original_run'):
                 ByteTrackerBlockV3._audtheia_original_run = ByteTrackerBlockV3.run
             
-            def audtheia_optimized_run(self, image, detections, **kwargs):
+            def audtheia_optimized_run(self, image, detections, *args, **kwargs):
                 """Audtheia-optimized ByteTracker run method"""
+                md = None
                 try:
-                    # Enhanced FPS stabilization
-                    if hasattr(image, 'video_metadata') and image.video_metadata:
-                        md = image.video_metadata
-                        if not getattr(md, 'fps', None) or md.fps <= 0:
-                            md.fps = 60.0
-                        if not hasattr(md, 'measured_fps') or md.measured_fps is None:
-                            md.measured_fps = 60.0
-                        if not hasattr(md, 'frame_count'):
-                            md.frame_count = 0
-                        md.frame_count += 1
+                    md = image.video_metadata
+                    if md is not None:
+                        md.fps = ByteTrackerOptimizer.tracker_fps(md)
                 except Exception:
                     pass
                 
-                return ByteTrackerBlockV3._audtheia_original_run(self, image, detections, **kwargs)
+                result = ByteTrackerBlockV3._audtheia_original_run(self, image, detections, *args, **kwargs)
+                
+                # Existing trackers keep their creation fps; rescale the lost-track buffer as the rate moves
+                try:
+                    tracker = self._trackers.get(md.video_identifier) if md is not None else None
+                    if tracker is not None and hasattr(tracker, 'max_time_lost'):
+                        lost_track_buffer = kwargs.get('lost_track_buffer', 30)
+                        tracker.max_time_lost = max(1, int(md.fps / 30.0 * lost_track_buffer))
+                except Exception:
+                    pass
+                return result
             
             ByteTrackerBlockV3.run = audtheia_optimized_run
             return True
@@ -444,75 +948,592 @@ class ByteTrackerOptimizer:
 
 bytetracker_optimizer = ByteTrackerOptimizer()
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🎛️ ADAPTIVE THROUGHPUT CONTROL - HOLD A LATENCY / CPU BUDGET ON SLOW HOSTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Degradation order: overlay detail first (cosmetic), then frame rate, then input
+# resolution (costs detection of small organisms). Recovery runs in reverse.
+OVERLAY_DETAIL_LEVELS = ("full", "compact", "off")
+INPUT_SCALE_LEVELS = (1.0, 0.75, 0.5)
+
+class AdaptiveThroughputController:
+    """
+    Feedback loop over the measured stage latencies in OptimizedMetrics. Every
+    `interval_seconds` it compares p95 latency (capture→sink for live sources,
+    inference + sink otherwise) and process CPU share against the budget and
+    moves one step along the overlay → fps → resolution ladder.
+    
+    Frame rate and resolution are applied to live sources by ThrottledFrameProducer;
+    overlay detail reaches the workflow through the shared `workflow_parameters`
+    dict, which InferencePipeline re-reads on every frame.
+    """
+    
+    def __init__(self, metrics: OptimizedMetrics, max_fps: float = 60.0, min_fps: float = 2.0,
+                 target_latency_ms: Optional[float] = 200.0, cpu_budget: Optional[float] = None,
+                 interval_seconds: float = 2.0, resolution_dwell_seconds: float = 30.0):
+        self.metrics = metrics
+        self.max_fps = max_fps
+        self.min_fps = min(min_fps, max_fps)
+        self.target_latency_ms = target_latency_ms
+        self.cpu_budget = cpu_budget
+        self.interval_seconds = interval_seconds
+        # Resolution changes shift box coordinates under ByteTrack, so they are rare
+        self.resolution_dwell_seconds = resolution_dwell_seconds
+        
+        self.fps = max_fps
+        self.overlay_index = 0
+        self.scale_index = 0
+        self.workflow_parameters = {"overlay_detail": OVERLAY_DETAIL_LEVELS[0]}
+        self.adjustments = 0
+        self.last_latency_ms = 0.0
+        self.last_cpu_share = 0.0
+        self.measured_fps = {}
+        
+        self._frames = {}
+        self._lock = threading.Lock()
+        self._window_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._last_resolution_change = 0.0
+    
+    @property
+    def overlay_detail(self) -> str:
+        return OVERLAY_DETAIL_LEVELS[self.overlay_index]
+    
+    @property
+    def input_scale(self) -> float:
+        return INPUT_SCALE_LEVELS[self.scale_index]
+    
+    def source_fps(self, source_id: int) -> float:
+        return self.measured_fps.get(source_id, 0.0)
+    
+    def on_frame(self, source_id: int = 0):
+        """Called by the sink once per frame; re-evaluates the budget every interval"""
+        now = time.perf_counter()
+        with self._lock:
+            self._frames[source_id] = self._frames.get(source_id, 0) + 1
+            elapsed = now - self._window_started
+            if elapsed < self.interval_seconds:
+                return
+            frames = self._frames
+            self._frames = {}
+            self._window_started = now
+            cpu_now = time.process_time()
+            self.last_cpu_share = (cpu_now - self._cpu_started) / elapsed / (os.cpu_count() or 1)
+            self._cpu_started = cpu_now
+        
+        self.measured_fps = {source: count / elapsed for source, count in frames.items()}
+        self.update(sum(frames.values()), now)
+    
+    def window_latency_ms(self, samples: int) -> float:
+        """p95 latency of the frames seen in the last window"""
+        stages = self.metrics.stages
+        if "capture_to_sink" in stages and stages["capture_to_sink"].count:
+            window = stages["capture_to_sink"].recent(samples)
+        else:
+            inference = stages["inference"].recent(samples)
+            sink = stages["sink"].recent(samples)
+            if len(inference) != len(sink):
+                count = min(len(inference), len(sink))
+                inference, sink = inference[len(inference) - count:], sink[len(sink) - count:]
+            window = inference + sink
+        return float(np.percentile(window, 95) * 1000) if len(window) else 0.0
+    
+    def work_ms(self, samples: int) -> float:
+        """Median busy time per frame; 1000 / work_ms is the rate the host can sustain"""
+        inference = self.metrics.stages["inference"].recent(samples)
+        sink = self.metrics.stages["sink"].recent(samples)
+        work = (float(np.median(inference)) if len(inference) else 0.0) + (float(np.median(sink)) if len(sink) else 0.0)
+        return work * 1000
+    
+    def update(self, frames: int, now: Optional[float] = None):
+        now = time.perf_counter() if now is None else now
+        samples = max(1, frames)
+        self.last_latency_ms = self.window_latency_ms(samples)
+        over_latency = bool(self.target_latency_ms) and self.last_latency_ms > self.target_latency_ms
+        over_cpu = bool(self.cpu_budget) and self.last_cpu_share > self.cpu_budget
+        
+        # Never ask for more frames than the host finished per second: the excess only queues
+        work_ms = self.work_ms(samples)
+        if work_ms > 0:
+            sustainable_fps = 1000.0 / work_ms
+            if self.fps > sustainable_fps:
+                self.fps = max(self.min_fps, min(self.max_fps, 0.9 * sustainable_fps))
+        
+        if over_latency or over_cpu:
+            self.step_down(now)
+        elif ((not self.target_latency_ms or self.last_latency_ms < 0.7 * self.target_latency_ms)
+              and (not self.cpu_budget or self.last_cpu_share < 0.8 * self.cpu_budget)):
+            self.step_up(now)
+        self.workflow_parameters["overlay_detail"] = self.overlay_detail
+    
+    def _resolution_may_change(self, now: float) -> bool:
+        return now - self._last_resolution_change >= self.resolution_dwell_seconds
+    
+    def step_down(self, now: float):
+        if self.overlay_index < len(OVERLAY_DETAIL_LEVELS) - 1:
+            self.overlay_index += 1
+        elif self.fps > self.min_fps:
+            self.fps = max(self.min_fps, self.fps * 0.75)
+        elif self.scale_index < len(INPUT_SCALE_LEVELS) - 1 and self._resolution_may_change(now):
+            self.scale_index += 1
+            self._last_resolution_change = now
+        else:
+            return
+        self.adjustments += 1
+    
+    def step_up(self, now: float):
+        if self.scale_index > 0 and self._resolution_may_change(now):
+            self.scale_index -= 1
+            self._last_resolution_change = now
+        elif self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps + max(1.0, 0.25 * self.fps))
+        elif self.overlay_index > 0:
+            self.overlay_index -= 1
+        else:
+            return
+        self.adjustments += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "target_fps": round(self.fps, 2),
+            "measured_fps": {str(source): round(fps, 2) for source, fps in self.measured_fps.items()},
+            "input_scale": self.input_scale,
+            "overlay_detail": self.overlay_detail,
+            "latency_p95_ms": round(self.last_latency_ms, 2),
+            "cpu_share": round(self.last_cpu_share, 3),
+            "adjustments": self.adjustments,
+        }
+
+class ThrottledFrameProducer:
+    """Paces a live producer to the controller's fps and downscales frames to its input scale"""
+    
+    def __init__(self, producer, controller: AdaptiveThroughputController):
+        self.producer = producer
+        self.controller = controller
+        self._next_grab = 0.0
+    
+    def grab(self) -> bool:
+        # Sleeping before the grab (not after) means a latest-frame reader hands over the newest frame
+        delay = self._next_grab - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_grab = max(self._next_grab, time.perf_counter()) + 1.0 / max(self.controller.fps, 0.1)
+        return self.producer.grab()
+    
+    def retrieve(self):
+        success, frame = self.producer.retrieve()
+        scale = self.controller.input_scale
+        if success and frame is not None and scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return success, frame
+    
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def __getattr__(self, name):
+        return getattr(self.producer, name)
+
+def throttled_video_reference(video_reference, controller: AdaptiveThroughputController):
+    """Wrap a live source (index/URL or producer factory) in a ThrottledFrameProducer factory"""
+    if callable(video_reference):
+        return lambda: ThrottledFrameProducer(video_reference(), controller)
+    
+    def factory():
+        from inference.core.interfaces.camera.video_source import CV2VideoFrameProducer
+        return ThrottledFrameProducer(CV2VideoFrameProducer(video_reference), controller)
+    return factory
+
+# Optional --adaptive controller; None keeps the fixed-rate pipeline
+throughput_controller = None
+
 # Global smart processor instance
 smart_processor = None
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 🎯 OPTIMIZED SINK FUNCTION WITH VISUAL DISPLAY + ENHANCED SMART SAVING
+# 📺 DECOUPLED DISPLAY - LATEST-FRAME MAILBOX + PREALLOCATED LETTERBOX
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def audtheia_optimized_sink_with_display_and_saving(result, video_frame):
+DISPLAY_WINDOW_NAME = "🌊 Audtheia Environmental Detection Platform - ENHANCED PROCESSING"
+DISPLAY_SIZE = (960, 540)
+
+class FrameMailbox:
+    """Single-slot mailbox: the sink overwrites, the display reads only the newest frame"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._captured_at = None
+        self._sequence = 0
+        self._taken = 0
+        self.dropped = 0
+        self.last_captured_at = None
+    
+    def put(self, frame: np.ndarray, captured_at: Optional[float] = None):
+        with self._lock:
+            if self._sequence != self._taken:
+                self.dropped += 1
+            self._frame = frame
+            self._captured_at = captured_at
+            self._sequence += 1
+    
+    def take(self) -> Optional[np.ndarray]:
+        """Newest frame since the last take, or None if nothing new arrived"""
+        with self._lock:
+            if self._sequence == self._taken:
+                return None
+            self._taken = self._sequence
+            self.last_captured_at = self._captured_at
+            return self._frame
+
+class LetterboxRenderer:
     """
-    ENHANCED sink function with visual display, proper aspect ratio and FIXED smart MP4 saving + download
-    *** VISUAL DISPLAY + AUTOMATIC VIDEO WRITER INITIALIZATION + AUTO DOWNLOAD ***
+    Fits frames into a fixed display size with proper aspect ratio.
+    
+    Geometry and buffers are computed once per source resolution; each frame
+    is resized straight into a preallocated buffer and copied into the center
+    of a canvas whose black borders are never redrawn.
     """
-    global smart_processor
-    start_time = time.time()
     
-    # Display the beautiful Roboflow interface with FIXED ASPECT RATIO
-    if result.get("output_image"):
-        image = result["output_image"].numpy_image
-        height, width = image.shape[:2]
-        
-        # Fixed display size with proper aspect ratio preservation
-        display_width = 960
-        display_height = 540
-        
-        # ASPECT RATIO FIX - Calculate proper dimensions
+    def __init__(self, display_size=DISPLAY_SIZE):
+        self.display_width, self.display_height = display_size
+        self.canvas = np.zeros((self.display_height, self.display_width, 3), dtype=np.uint8)
+        self._source_shape = None
+        self._resized = None
+        self._region = None
+    
+    def _configure(self, shape):
+        height, width = shape[:2]
         aspect_ratio = width / height
-        target_ratio = display_width / display_height
+        target_ratio = self.display_width / self.display_height
         
         if aspect_ratio > target_ratio:
             # Width is limiting factor
-            new_width = display_width
-            new_height = int(display_width / aspect_ratio)
+            new_width = self.display_width
+            new_height = int(self.display_width / aspect_ratio)
         else:
             # Height is limiting factor
-            new_height = display_height
-            new_width = int(display_height * aspect_ratio)
-        
-        # Resize with proper aspect ratio
-        display_image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+            new_height = self.display_height
+            new_width = int(self.display_height * aspect_ratio)
         
-        # Add letterboxing/pillarboxing if needed
-        if new_width != display_width or new_height != display_height:
-            # Create black background
-            import numpy as np
-            final_image = np.zeros((display_height, display_width, 3), dtype=np.uint8)
-            
-            # Calculate centering offsets
-            x_offset = (display_width - new_width) // 2
-            y_offset = (display_height - new_height) // 2
+        x_offset = (self.display_width - new_width) // 2
+        y_offset = (self.display_height - new_height) // 2
+        self.canvas.fill(0)
+        self._resized = np.empty((new_height, new_width, 3), dtype=np.uint8)
+        self._region = self.canvas[y_offset:y_offset + new_height, x_offset:x_offset + new_width]
+        self._source_shape = shape
+    
+    def render(self, image: np.ndarray) -> np.ndarray:
+        if image.shape != self._source_shape:
+            self._configure(image.shape)
+        new_height, new_width = self._resized.shape[:2]
+        cv2.resize(image, (new_width, new_height), dst=self._resized, interpolation=cv2.INTER_AREA)
+        self._region[...] = self._resized
+        return self.canvas
+
+class DisplayWorker:
+    """
+    Shows the latest annotated frame of each stream at a fixed refresh rate,
+    independent of the prediction thread. Runs on the main thread (HighGUI is
+    not thread-safe on every platform) while the pipeline's own threads do
+    decoding and inference. One window per stream.
+    """
+    
+    def __init__(self, mailboxes: List[FrameMailbox], refresh_fps: float = 30.0, display_size=DISPLAY_SIZE,
+                 window_name: str = DISPLAY_WINDOW_NAME):
+        self.mailboxes = mailboxes
+        self.renderers = [LetterboxRenderer(display_size) for _ in mailboxes]
+        self.refresh_interval = 1.0 / max(1.0, refresh_fps)
+        if len(mailboxes) == 1:
+            self.window_names = [window_name]
+        else:
+            self.window_names = [f"{window_name} [{index}]" for index in range(len(mailboxes))]
+        self.frames_shown = 0
+    
+    def run(self, stop_event: threading.Event, on_quit=None):
+        """Refresh until stop_event is set or the user presses 'q'/ESC"""
+        while not stop_event.is_set():
+            tick = time.perf_counter()
+            for mailbox, renderer, window_name in zip(self.mailboxes, self.renderers, self.window_names):
+                frame = mailbox.take()
+                if frame is not None:
+                    render_start = time.perf_counter()
+                    cv2.imshow(window_name, renderer.render(frame))
+                    self.frames_shown += 1
+                    shown_at = time.perf_counter()
+                    perf_monitor.add_stage_time("display", shown_at - render_start)
+                    if mailbox.last_captured_at is not None:
+                        perf_monitor.add_stage_time("capture_to_display", shown_at - mailbox.last_captured_at)
             
-            # Place resized image in center
-            final_image[y_offset:y_offset+new_height, x_offset:x_offset+new_width] = display_image
-            display_image = final_image
-        
-        cv2.imshow("🌊 Audtheia Environmental Detection Platform - ENHANCED PROCESSING", display_image)
+            remaining_ms = int((self.refresh_interval - (time.perf_counter() - tick)) * 1000)
+            key = cv2.waitKey(max(1, remaining_ms)) & 0xFF
+            if key == ord('q') or key == 27:  # 'q' or ESC to quit
+                if on_quit:
+                    on_quit()
+                break
+
+# Latest-frame mailbox per stream fed by the sink; None in --no-display mode
+display_mailboxes = None
+
+# One MP4 processor per video_reference, indexed by the frame's source_id
+stream_processors = []
+
+# Latest-frame readers of live sources, keyed by source_id
+live_producers = {}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🚌 SHARED-MEMORY FRAME BUS - ANNOTATED FRAMES FOR OUT-OF-PROCESS CONSUMERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FrameBusPublisher:
+    """
+    Publishes each stream's annotated frames to a shared-memory frame bus
+    (roboflow-workflows/frame_bus.py) so recorders, viewers and analyzers can
+    run as separate processes and read them zero-copy. One bus per stream,
+    created on the first frame because only then is the frame size known.
+    """
+    
+    def __init__(self, name: str, stream_count: int, slots: int = 8):
+        self.name = name
+        self.stream_count = stream_count
+        self.slots = slots
+        self.buses = {}
+        self.failed = False
+    
+    def bus_name(self, source_id: int) -> str:
+        return self.name if self.stream_count == 1 else f"{self.name}_{source_id}"
+    
+    def publish(self, source_id: int, frame: np.ndarray, captured_wall: Optional[float] = None):
+        """captured_wall: wall-clock capture time (time.time()); the bus stamps publish time when None"""
+        if self.failed:
+            return
+        bus = self.buses.get(source_id)
+        if bus is None:
+            try:
+                script_dir = str(Path(__file__).resolve().parent)
+                if script_dir not in sys.path:
+                    sys.path.insert(0, script_dir)
+                from frame_bus import SharedFrameBus
+                bus = SharedFrameBus.create(self.bus_name(source_id), frame.shape, slots=self.slots)
+            except Exception as e:
+                # Never let an optional output stop inference
+                self.failed = True
+                print(f"⚠️ Frame bus '{self.bus_name(source_id)}' unavailable: {e}")
+                return
+            self.buses[source_id] = bus
+            print(f"🚌 Frame bus '{bus.name}' ready ({frame.shape[1]}x{frame.shape[0]}, {self.slots} slots)")
+        if frame.nbytes <= bus.slot_bytes and frame.dtype == np.uint8:
+            bus.publish(np.ascontiguousarray(frame), captured_wall)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {bus.name: bus.stats() for bus in self.buses.values()}
+    
+    def close(self):
+        for bus in self.buses.values():
+            try:
+                bus.close()
+            except Exception:
+                pass
+        self.buses = {}
+
+# Optional --frame-bus publisher; None unless requested
+frame_bus_publisher = None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📼 WORKFLOW OUTPUT RECORDER - BINARY LOG FOR DOWNSTREAM REPLAY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class WorkflowOutputRecorder:
+    """
+    Appends every frame's workflow outputs (tracked detections, analysis text,
+    track events, optional thumbnails) to a binary log, see
+    roboflow-workflows/workflow_log.py. `workflow_log.py replay` re-drives the
+    downstream blocks and webhooks from it at 1x, Nx or max speed.
+    """
+    
+    def __init__(self, path: str, thumbnail_width: int = 0, thumbnail_every: int = 5):
+        self.writer = None
+        try:
+            script_dir = str(Path(__file__).resolve().parent)
+            if script_dir not in sys.path:
+                sys.path.insert(0, script_dir)
+            from workflow_log import WorkflowLogWriter
+            self.writer = WorkflowLogWriter(path, thumbnail_width=thumbnail_width, thumbnail_every=thumbnail_every)
+            print(f"📼 Recording workflow outputs to {path}")
+        except Exception as e:
+            # Never let an optional output stop inference
+            print(f"⚠️ Workflow output log '{path}' unavailable: {e}")
+    
+    def record(self, source_id: int, frame_id: int, result, image: Optional[np.ndarray]):
+        """Records are stamped with wall-clock time at the sink, the same clock for every source type"""
+        if self.writer is None:
+            return
+        try:
+            self.writer.record(source_id, frame_id, result, image)
+        except Exception as e:
+            print(f"⚠️ Workflow output log stopped: {e}")
+            self.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return self.writer.stats() if self.writer else {}
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+# Optional --record-log recorder; None unless requested
+workflow_recorder = None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📮 NETWORK I/O SIDECAR - CLAUDE / N8N / UPLOADS OUTSIDE THE INFERENCE PROCESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class IOSidecarProcess:
+    """
+    Runs roboflow-workflows/io_sidecar.py as a child process and points the
+    blocks at it (AUDTHEIA_IO_SIDECAR). The analyzer, webhook and upload
+    blocks then hand their HTTP work to its asyncio loop instead of running
+    it on threads that share the GIL with inference; if it is not running
+    they fall back to those threads.
+    """
+    
+    def __init__(self, socket_path: str, limits: Optional[List[str]] = None):
+        self.socket_path = socket_path
+        self.process = None
+        script_dir = Path(__file__).resolve().parent
+        try:
+            command = [sys.executable, str(script_dir / "io_sidecar.py"), "--socket", socket_path]
+            for limit in limits or []:
+                command += ["--limit", limit]
+            self.process = subprocess.Popen(command)
+            if str(script_dir) not in sys.path:
+                sys.path.insert(0, str(script_dir))
+            from io_sidecar import SOCKET_ENV, wait_for_socket
+            if not wait_for_socket(socket_path, process=self.process):
+                raise RuntimeError("did not start listening")
+            os.environ[SOCKET_ENV] = socket_path
+        except Exception as e:
+            # Never let an optional output stop inference
+            print(f"⚠️ I/O sidecar unavailable, network calls stay in-process: {e}")
+            self.stop()
+    
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def stats(self) -> Dict[str, Any]:
+        if not self.running:
+            return {}
+        try:
+            from io_sidecar import request_stats
+            return request_stats(self.socket_path) or {}
+        except Exception:
+            return {}
+    
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🪝 STREAM HOOKS - MEDIA CLOCKS AND END-OF-STREAM FLUSH FOR THE BLOCKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def load_stream_hooks():
+    """
+    roboflow-workflows/stream_hooks.py, put on sys.path before the workflow is
+    compiled so the blocks can register with it. Through it the lifecycle
+    aggregator reads media time from thinned file producers, and its last open
+    visits are delivered when the pipeline ends.
+    """
+    try:
+        script_dir = str(Path(__file__).resolve().parent)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        import stream_hooks
+        return stream_hooks
+    except Exception as e:
+        print(f"⚠️ Stream hooks unavailable, open track visits are not flushed at the end: {e}")
+        return None
+
+def register_producer_clock(hooks, source_id: int, producer: "SelectiveFrameProducer"):
+    """Media time of produced frame k is its source frame index over the source rate, whatever was skipped"""
+    if hooks is not None and producer.source_fps:
+        hooks.register_media_clock(str(source_id), lambda frame_number: producer.source_index_for(frame_number) / producer.source_fps)
+
+def flush_stream_hooks(hooks):
+    """End of stream: close the blocks' open state (track visits) and deliver it"""
+    if hooks is None:
+        return
+    try:
+        flushed = hooks.end_of_stream()
+    except Exception as e:
+        print(f"⚠️ End-of-stream flush failed: {e}")
+        return
+    if flushed:
+        print(f"🏁 Closed {flushed} open track visit(s) at end of stream")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🎯 OPTIMIZED SINK FUNCTION WITH VISUAL DISPLAY + ENHANCED SMART SAVING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def audtheia_optimized_sink_with_display_and_saving(result, video_frame):
+    """
+    ENHANCED sink function with visual display, proper aspect ratio and FIXED smart MP4 saving + download
+    *** VISUAL DISPLAY + AUTOMATIC VIDEO WRITER INITIALIZATION + AUTO DOWNLOAD ***
+    """
+    start_time = time.perf_counter()
+    if not startup_profile.first_frame_seen:
+        startup_profile.first_frame()
+    source_id = getattr(video_frame, "source_id", None) or 0
+    processor = stream_processors[source_id] if source_id < len(stream_processors) else smart_processor
+    
+    # Live sources: how far behind the camera this frame is by the time it reaches the sink
+    captured_at = captured_wall = None
+    live_producer = live_producers.get(source_id)
+    if live_producer is not None:
+        captured_at = live_producer.capture_time_for(getattr(video_frame, "frame_id", 0))
+        if captured_at is not None:
+            perf_monitor.add_stage_time("capture_to_sink", start_time - captured_at)
+            # Same instant on the wall clock, for consumers in other processes
+            captured_wall = live_producer.capture_wall_time_for(getattr(video_frame, "frame_id", 0))
+    
+    # Hand the annotated frame to the display thread (latest frame wins)
+    image = None
+    if result.get("output_image"):
+        image = result["output_image"].numpy_image
+        if display_mailboxes is not None and source_id < len(display_mailboxes):
+            display_mailboxes[source_id].put(image, captured_at)
+        if frame_bus_publisher is not None:
+            frame_bus_publisher.publish(source_id, image, captured_wall)
         
         # 🎥 ENHANCED SMART SAVING - Automatic initialization and saving
-        if smart_processor and smart_processor.is_processing_mp4:
-            success = smart_processor.save_frame(image)
-            if not success and smart_processor.processed_frames == 0:
-                smart_processor.log_debug("❌ First frame save failed - check video writer initialization")
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q') or key == 27:  # 'q' or ESC to quit
-            return False
+        if processor and processor.is_processing_mp4:
+            encode_start = time.perf_counter()
+            success = processor.save_frame(image)
+            perf_monitor.add_stage_time("encode", time.perf_counter() - encode_start)
+            if not success and processor.processed_frames == 0:
+                processor.log_debug("❌ First frame save failed - check video writer initialization")
+    
+    if workflow_recorder is not None:
+        record_start = time.perf_counter()
+        workflow_recorder.record(source_id, getattr(video_frame, "frame_id", 0), result, image)
+        perf_monitor.add_stage_time("record", time.perf_counter() - record_start)
     
     # Update performance metrics (optimized)
-    processing_time = time.time() - start_time
+    processing_time = time.perf_counter() - start_time
     perf_monitor.add_processing_time(processing_time)
+    if throughput_controller is not None:
+        throughput_controller.on_frame(source_id)
     
     # Process detected species (lightweight)
     try:
@@ -528,6 +1549,971 @@ def audtheia_optimized_sink_with_display_and_saving(result, video_frame):
     
     return True
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# ⏭️ FRAME SELECTION FOR FILE SOURCES - STRIDE / KEYFRAMES / ADAPTIVE SKIP
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SKIP_MODES = ("none", "stride", "keyframes", "adaptive")
+
+@dataclass
+class FrameSkipOptions:
+    """How a file source is thinned out before inference"""
+    mode: str = "none"
+    stride: int = 1                  # "stride": run detection on every Nth frame
+    diff_threshold: float = 2.0      # "adaptive": mean abs difference (0-255) below which a frame is skipped
+    max_skip: int = 30               # "adaptive": never skip more than this many frames in a row
+    diff_size: tuple = (64, 36)      # "adaptive": downsampled size used for the difference
+    interpolate: bool = True         # fill skipped frames in the output video with interpolated boxes
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "none" and not (self.mode == "stride" and self.stride <= 1)
+
+class SelectiveFrameProducer:
+    """
+    Frame producer implementing inference's VideoFrameProducer interface
+    (grab / retrieve / isOpened / release / discover_source_properties).
+    
+    InferencePipeline accepts a callable returning a producer as video_reference,
+    so frames rejected here never reach decoding-to-buffer, the model or the
+    workflow blocks. source_indices[k] is the source frame index of produced
+    frame k + 1 (inference frame ids start at 1).
+    """
+    
+    def __init__(self, video_path: str, options: FrameSkipOptions):
+        self.video_path = video_path
+        self.options = options
+        self.source_indices = []
+        self.frames_examined = 0
+        self._position = -1
+        self._pending = None
+        self._reference_signature = None
+        self._av_container = None
+        self._av_frames = None
+        
+        self.stream = cv2.VideoCapture(video_path)
+        self.source_fps = self.stream.get(cv2.CAP_PROP_FPS) or DEFAULT_OUTPUT_FPS
+        self.total_frames = int(self.stream.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.mode = options.mode
+        
+        if self.mode == "keyframes":
+            try:
+                import av
+                self._av_container = av.open(video_path)
+                video_stream = self._av_container.streams.video[0]
+                video_stream.codec_context.skip_frame = "NONKEY"
+                self._av_time_base = float(video_stream.time_base)
+                self._av_frames = self._av_container.decode(video_stream)
+                self.stream.release()
+            except Exception:
+                # Without PyAV fall back to one frame per second of footage
+                self.mode = "stride"
+                self.options = FrameSkipOptions(**{**options.__dict__, "mode": "stride",
+                                                    "stride": max(1, int(round(self.source_fps)))})
+    
+    @property
+    def effective_fps(self) -> float:
+        """Frame rate of the thinned stream as seen by ByteTracker"""
+        if self.mode == "stride":
+            return self.source_fps / max(1, self.options.stride)
+        if self.mode == "keyframes":
+            return self.source_fps / self._estimated_gop()
+        return self.source_fps
+    
+    def _estimated_gop(self) -> float:
+        if not hasattr(self, "_gop"):
+            self._gop = float(max(1, int(round(self.source_fps))))
+            try:
+                import av
+                with av.open(self.video_path) as probe:
+                    packets = keyframes = 0
+                    for packet in probe.demux(probe.streams.video[0]):
+                        if packet.size:
+                            packets += 1
+                            keyframes += int(packet.is_keyframe)
+                    if keyframes:
+                        self._gop = packets / keyframes
+            except Exception:
+                pass
+        return self._gop
+    
+    def isOpened(self) -> bool:
+        return self._av_frames is not None or self.stream.isOpened()
+    
+    def grab(self) -> bool:
+        if self.mode == "keyframes":
+            return self._grab_keyframe()
+        if self.mode == "adaptive":
+            return self._grab_adaptive()
+        return self._grab_stride()
+    
+    def _grab_stride(self) -> bool:
+        steps = 1 if self._position < 0 else max(1, self.options.stride)
+        for _ in range(steps):
+            if not self.stream.grab():
+                return False
+            self._position += 1
+            self.frames_examined += 1
+        self._pending = None
+        self.source_indices.append(self._position)
+        return True
+    
+    def _grab_keyframe(self) -> bool:
+        try:
+            frame = next(self._av_frames)
+        except Exception:
+            return False
+        self._position = int(round((frame.pts or 0) * self._av_time_base * self.source_fps))
+        self.frames_examined += 1
+        self._pending = frame.to_ndarray(format="bgr24")
+        self.source_indices.append(self._position)
+        return True
+    
+    def _grab_adaptive(self) -> bool:
+        skipped = 0
+        while True:
+            ok, frame = self.stream.read()
+            if not ok:
+                return False
+            self._position += 1
+            self.frames_examined += 1
+            
+            small = cv2.resize(frame, self.options.diff_size, interpolation=cv2.INTER_AREA)
+            signature = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+            if self._reference_signature is not None and skipped < self.options.max_skip:
+                difference = float(np.abs(signature - self._reference_signature).mean())
+                if difference < self.options.diff_threshold:
+                    skipped += 1
+                    continue
+            
+            self._reference_signature = signature
+            self._pending = frame
+            self.source_indices.append(self._position)
+            return True
+    
+    def retrieve(self):
+        if self._pending is not None:
+            frame, self._pending = self._pending, None
+            return True, frame
+        return self.stream.retrieve()
+    
+    def initialize_source_properties(self, properties: Dict[str, float]):
+        pass
+    
+    def discover_source_properties(self):
+        from inference.core.interfaces.camera.entities import SourceProperties
+        
+        width = int(self.stream.get(cv2.CAP_PROP_FRAME_WIDTH)) if self.stream.isOpened() else 0
+        height = int(self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT)) if self.stream.isOpened() else 0
+        if self._av_container is not None:
+            codec_context = self._av_container.streams.video[0].codec_context
+            width, height = codec_context.width, codec_context.height
+        ratio = self.effective_fps / self.source_fps if self.source_fps else 1.0
+        return SourceProperties(
+            width=width,
+            height=height,
+            total_frames=max(1, int(self.total_frames * ratio)),
+            is_file=True,
+            fps=self.effective_fps,
+        )
+    
+    def source_index_for(self, frame_id: int) -> int:
+        """Map an inference frame id (1-based) back to the source frame index"""
+        if 0 < frame_id <= len(self.source_indices):
+            return self.source_indices[frame_id - 1]
+        return frame_id - 1
+    
+    def release(self):
+        self.stream.release()
+        if self._av_container is not None:
+            self._av_container.close()
+            self._av_container = None
+            self._av_frames = None
+
+def interpolate_detection_records(previous: Dict[str, Any], current: Dict[str, Any], alpha: float) -> Dict[str, Any]:
+    """Linearly interpolate boxes of tracks present in both records (alpha in 0..1)"""
+    prev_ids = previous.get("tracker_id") or []
+    curr_ids = current.get("tracker_id") or []
+    if not prev_ids or not curr_ids:
+        return {"xyxy": [], "confidence": [], "class_name": [], "tracker_id": []}
+    
+    prev_index = {tracker_id: i for i, tracker_id in enumerate(prev_ids)}
+    pairs = [(prev_index[tracker_id], j) for j, tracker_id in enumerate(curr_ids) if tracker_id in prev_index]
+    if not pairs:
+        return {"xyxy": [], "confidence": [], "class_name": [], "tracker_id": []}
+    
+    prev_rows, curr_rows = (list(rows) for rows in zip(*pairs))
+    prev_boxes = np.asarray(previous["xyxy"], dtype=np.float32)[prev_rows]
+    curr_boxes = np.asarray(current["xyxy"], dtype=np.float32)[curr_rows]
+    boxes = prev_boxes + (curr_boxes - prev_boxes) * alpha
+    confidences = current.get("confidence") or [0.0] * len(curr_ids)
+    class_names = current.get("class_name") or [""] * len(curr_ids)
+    return {
+        "xyxy": boxes.round(1).tolist(),
+        "confidence": [confidences[j] for j in curr_rows],
+        "class_name": [class_names[j] for j in curr_rows],
+        "tracker_id": [curr_ids[j] for j in curr_rows],
+    }
+
+def draw_interpolated_overlay(frame, record: Dict[str, Any]):
+    """Lightweight boxes + labels for frames that skipped the workflow"""
+    for (x1, y1, x2, y2), class_name, tracker_id in zip(record["xyxy"], record["class_name"], record["tracker_id"]):
+        color = ((37 * tracker_id) % 255, (17 * tracker_id + 96) % 255, (91 * tracker_id + 160) % 255)
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
+        cv2.putText(frame, f"{class_name} #{tracker_id}", (int(x1), max(12, int(y1) - 6)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+    return frame
+
+def box_recall(reference: Dict[str, Any], candidate: Dict[str, Any], iou_threshold: float = 0.5) -> tuple:
+    """(matched, total) reference boxes found in candidate with same class and IoU >= threshold"""
+    total = len(reference.get("xyxy") or [])
+    if total == 0 or not candidate.get("xyxy"):
+        return 0, total
+    
+    ref_boxes = np.asarray(reference["xyxy"], dtype=np.float32)
+    cand_boxes = np.asarray(candidate["xyxy"], dtype=np.float32)
+    top_left = np.maximum(ref_boxes[:, None, :2], cand_boxes[None, :, :2])
+    bottom_right = np.minimum(ref_boxes[:, None, 2:], cand_boxes[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    ref_area = np.prod(ref_boxes[:, 2:] - ref_boxes[:, :2], axis=1)
+    cand_area = np.prod(cand_boxes[:, 2:] - cand_boxes[:, :2], axis=1)
+    iou = intersection / np.maximum(ref_area[:, None] + cand_area[None, :] - intersection, 1e-6)
+    
+    same_class = np.asarray(reference["class_name"])[:, None] == np.asarray(candidate["class_name"])[None, :]
+    iou = np.where(same_class, iou, 0.0)
+    
+    matched = 0
+    for _ in range(min(iou.shape)):
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        matched += 1
+        iou[i, :] = 0.0
+        iou[:, j] = 0.0
+    return matched, total
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📡 LIVE SOURCES - LATEST-FRAME READER WITH RECONNECTION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+LIVE_READER_MODES = ("latest", "buffered")
+RECONNECT_BACKOFF_INITIAL = 0.5
+RECONNECT_BACKOFF_MAX = 30.0
+
+class LatestFrameProducer:
+    """
+    VideoFrameProducer for live RTSP/webcam sources.
+    
+    A dedicated thread decodes continuously into a single slot; grab() hands
+    out only the newest frame, so a slow consumer skips frames instead of
+    falling behind real time. Stream drops are retried with exponential
+    backoff while the pipeline keeps waiting; the backoff resets only once
+    frames decode again. Capture times are kept per
+    handed-out frame so the sink and display can report true latency.
+    """
+    
+    def __init__(self, source, open_timeout: float = 10.0):
+        self.source = source
+        self.open_timeout = open_timeout
+        self._condition = threading.Condition()
+        self._capture = None
+        self._frame = None
+        self._captured_at = 0.0
+        self._sequence = 0
+        self._delivered_sequence = 0
+        self._current = None
+        self._released = False
+        self._requested_properties = {}
+        self._capture_times = {}
+        self.frames_decoded = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.connected = False
+        self.width = 0
+        self.height = 0
+        self.fps = DEFAULT_OUTPUT_FPS
+        self._thread = threading.Thread(target=self._read_loop, name=f"LiveReader-{source}", daemon=True)
+        self._thread.start()
+    
+    def _open(self) -> bool:
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            capture.release()
+            return False
+        for property_id, value in self._requested_properties.items():
+            capture.set(property_id, value)
+        # Keep the driver-side queue as short as the backend allows
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if fps and 0 < fps <= 240:
+            self.fps = float(fps)
+        self._capture = capture
+        return True
+    
+    def _read_loop(self):
+        backoff = RECONNECT_BACKOFF_INITIAL
+        decoded_since_open = 0
+        while not self._released:
+            if self._capture is None:
+                if not self._open():
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+                    continue
+                with self._condition:
+                    if self.connected is False and self.frames_decoded:
+                        self.reconnects += 1
+                    self.connected = True
+                    self._condition.notify_all()
+                decoded_since_open = 0
+            
+            success, frame = self._capture.read()
+            if not success:
+                self._capture.release()
+                self._capture = None
+                self.connected = False
+                # A source that opens but never delivers (RTSP session without a stream,
+                # busy webcam) backs off like one that will not open at all
+                time.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+                continue
+            
+            if decoded_since_open == 0:
+                backoff = RECONNECT_BACKOFF_INITIAL  # the stream really is back
+            decoded_since_open += 1
+            
+            with self._condition:
+                if self._sequence != self._delivered_sequence:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._captured_at = time.perf_counter()
+                self._sequence += 1
+                self.frames_decoded += 1
+                self._condition.notify_all()
+        
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+    
+    def isOpened(self) -> bool:
+        return not self._released
+    
+    def grab(self) -> bool:
+        """Block until a frame newer than the last one is available; False only after release()"""
+        with self._condition:
+            while not self._released and self._sequence == self._delivered_sequence:
+                self._condition.wait(timeout=0.5)
+            if self._released:
+                return False
+            self._delivered_sequence = self._sequence
+            self._current = self._frame
+            self.frames_delivered += 1
+            self._capture_times[self.frames_delivered] = self._captured_at
+            self._capture_times.pop(self.frames_delivered - 256, None)
+            return True
+    
+    def retrieve(self):
+        return self._current is not None, self._current
+    
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def capture_time_for(self, frame_id: int) -> Optional[float]:
+        """perf_counter() timestamp at which the frame with this pipeline frame_id was decoded"""
+        return self._capture_times.get(frame_id)
+    
+    def capture_wall_time_for(self, frame_id: int) -> Optional[float]:
+        """capture_time_for() on the wall clock (time.time()), for readers outside this process"""
+        captured_at = self.capture_time_for(frame_id)
+        return None if captured_at is None else time.time() - (time.perf_counter() - captured_at)
+    
+    def release(self):
+        with self._condition:
+            self._released = True
+            self._condition.notify_all()
+    
+    def initialize_source_properties(self, properties: Dict[str, float]):
+        for name, value in properties.items():
+            property_id = getattr(cv2, f"CAP_PROP_{name.upper()}", None)
+            if property_id is not None:
+                self._requested_properties[property_id] = value
+                if self._capture is not None:
+                    self._capture.set(property_id, value)
+    
+    def discover_source_properties(self):
+        from inference.core.interfaces.camera.entities import SourceProperties
+        
+        with self._condition:
+            self._condition.wait_for(lambda: self.connected or self._released, timeout=self.open_timeout)
+        return SourceProperties(
+            width=self.width,
+            height=self.height,
+            total_frames=-1,
+            is_file=False,
+            fps=self.fps,
+            is_reconnectable=True,
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "frames_decoded": self.frames_decoded,
+            "frames_delivered": self.frames_delivered,
+            "frames_dropped": self.frames_dropped,
+            "reconnects": self.reconnects,
+        }
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🗂️ OFFLINE BATCH MODE - HEADLESS ARCHIVE PROCESSING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SIDECAR_FORMATS = ("jsonl", "parquet")
+
+def detections_to_record(detections) -> Dict[str, Any]:
+    """Flatten a supervision Detections object into plain lists for the sidecar"""
+    if detections is None or len(detections) == 0:
+        return {"xyxy": [], "confidence": [], "class_name": [], "tracker_id": []}
+    
+    class_names = detections.data.get("class_name") if hasattr(detections, "data") else None
+    return {
+        "xyxy": detections.xyxy.round(1).tolist(),
+        "confidence": detections.confidence.round(4).tolist() if detections.confidence is not None else [],
+        "class_name": class_names.tolist() if class_names is not None else [],
+        "tracker_id": detections.tracker_id.tolist() if detections.tracker_id is not None else [],
+    }
+
+class DetectionSidecarWriter:
+    """Per-file detections sidecar: streamed JSONL, or Parquet written on close"""
+    
+    def __init__(self, path: str, fmt: str = "jsonl"):
+        if fmt not in SIDECAR_FORMATS:
+            raise ValueError(f"sidecar format must be one of {SIDECAR_FORMATS}, got {fmt!r}")
+        self.fmt = fmt
+        self.records = []
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                self.fmt = "jsonl"
+                path = os.path.splitext(path)[0] + ".jsonl"
+        self.path = path
+        self.handle = open(path, "w", encoding="utf-8") if self.fmt == "jsonl" else None
+    
+    def write(self, record: Dict[str, Any]):
+        if self.handle:
+            self.handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        else:
+            self.records.append(record)
+    
+    def close(self):
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+        elif self.records:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pylist(self.records), self.path)
+            self.records = []
+
+class OfflineArchiveJob:
+    """Headless sink for one archive file: no imshow, no waitKey, video + sidecar out"""
+    
+    def __init__(self, video_path: str, output_dir: str, sidecar_format: str = "jsonl",
+                 writer_backend: str = "auto", skip_options: Optional[FrameSkipOptions] = None):
+        self.video_path = video_path
+        self.skip_options = skip_options or FrameSkipOptions()
+        self.processor = EnhancedMP4ProcessorWithDownload(
+            download_path=output_dir,
+            finalize_strategy="direct",
+            writer_backend=writer_backend,
+        )
+        self.processor.detect_source_type(video_path)
+        stem = Path(video_path).stem
+        extension = ".parquet" if sidecar_format == "parquet" else ".jsonl"
+        self.sidecar = DetectionSidecarWriter(os.path.join(output_dir, f"{stem}_detections{extension}"), sidecar_format)
+        self.frames = 0
+        
+        # Frame selection: the producer decides which frames reach the workflow,
+        # the backfill reader re-reads skipped frames for the output video
+        self.producer = None
+        self.backfill = None
+        self.source_fps = self.processor.source_fps
+        self.next_source_index = 0
+        self.previous_record = None
+        if self.skip_options.enabled:
+            self.producer = SelectiveFrameProducer(video_path, self.skip_options)
+            self.source_fps = self.producer.source_fps
+            if self.skip_options.interpolate:
+                self.backfill = cv2.VideoCapture(video_path)
+            else:
+                self.processor.source_fps = self.producer.effective_fps
+    
+    @property
+    def video_reference(self):
+        """What InferencePipeline should decode: the path, or a selective producer factory"""
+        if self.producer is None:
+            return self.video_path
+        return lambda: self.producer
+    
+    @property
+    def tracker_fps(self) -> float:
+        return self.producer.effective_fps if self.producer else self.source_fps
+    
+    def on_prediction(self, result, video_frame):
+        self.frames += 1
+        frame_id = getattr(video_frame, "frame_id", self.frames)
+        source_index = self.producer.source_index_for(frame_id) if self.producer else frame_id - 1
+        record = detections_to_record(result.get("tracked_detections"))
+        
+        if self.backfill is not None:
+            self.fill_skipped_frames(source_index, record)
+        
+        output_image = result.get("output_image")
+        if output_image is not None:
+            self.processor.save_frame(output_image.numpy_image)
+        self.write_record(source_index, record, interpolated=False)
+        self.previous_record = (source_index, record)
+    
+    def fill_skipped_frames(self, source_index: int, record: Dict[str, Any]):
+        """Write source frames between the last processed frame and this one with interpolated boxes"""
+        while self.next_source_index < source_index:
+            ok, frame = self.backfill.read()
+            if not ok:
+                break
+            if self.previous_record is not None:
+                previous_index, previous = self.previous_record
+                alpha = (self.next_source_index - previous_index) / max(1, source_index - previous_index)
+                interpolated = interpolate_detection_records(previous, record, alpha)
+                draw_interpolated_overlay(frame, interpolated)
+                self.write_record(self.next_source_index, interpolated, interpolated=True)
+            self.processor.save_frame(frame)
+            self.next_source_index += 1
+        # The processed frame itself comes from the workflow output
+        if self.next_source_index == source_index and self.backfill.grab():
+            self.next_source_index += 1
+    
+    def write_record(self, source_index: int, record: Dict[str, Any], interpolated: bool):
+        self.sidecar.write({
+            "source_frame": source_index,
+            "media_time_s": round(source_index / self.source_fps, 4) if self.source_fps else 0.0,
+            "interpolated": interpolated,
+            **record,
+        })
+    
+    def close(self) -> Optional[str]:
+        if self.backfill is not None:
+            # Trailing frames after the last processed one keep its boxes
+            last = self.previous_record[1] if self.previous_record else None
+            while True:
+                ok, frame = self.backfill.read()
+                if not ok:
+                    break
+                if last:
+                    draw_interpolated_overlay(frame, last)
+                    self.write_record(self.next_source_index, last, interpolated=True)
+                self.processor.save_frame(frame)
+                self.next_source_index += 1
+            self.backfill.release()
+        if self.producer is not None:
+            self.producer.release()
+        self.sidecar.close()
+        return self.processor.finish_saving_and_download()
+
+def process_archive_file(video_path: str, output_dir: str, sidecar_format: str = "jsonl",
+                         writer_backend: str = "auto", workflow_spec_path: Optional[str] = None,
+                         skip_options: Optional[FrameSkipOptions] = None) -> Dict[str, Any]:
+    """Run the workflow over one archive file as fast as the CPU/GPU allows (process-pool worker)"""
+    from inference.core.interfaces.stream.inference_pipeline import InferencePipeline
+    
+    started = time.perf_counter()
+    job = OfflineArchiveJob(video_path, output_dir, sidecar_format, writer_backend, skip_options)
+    hooks = load_stream_hooks()
+    if job.producer is not None:
+        register_producer_clock(hooks, 0, job.producer)
+    
+    # ByteTracker must see the rate frames actually arrive at, not the 60fps live default
+    ByteTrackerOptimizer.fallback_fps = job.tracker_fps
+    bytetracker_optimizer.apply_comprehensive_patch()
+    
+    if workflow_spec_path:
+        with open(workflow_spec_path, "r", encoding="utf-8") as f:
+            workflow_source = {"workflow_specification": json.load(f)}
+    else:
+        workflow_source = {"workspace_name": ROBOFLOW_WORKSPACE, "workflow_id": ROBOFLOW_WORKFLOW_ID}
+    
+    pipeline = InferencePipeline.init_with_workflow(
+        api_key=ROBOFLOW_API_KEY,
+        video_reference=job.video_reference,
+        max_fps=None,  # files are decoded as fast as inference keeps up
+        on_prediction=job.on_prediction,
+        **workflow_source,
+    )
+    try:
+        pipeline.start()
+        pipeline.join()
+        # Pool workers run file after file as stream 0; nothing may stay open into the next one
+        flush_stream_hooks(hooks)
+    finally:
+        saved_file = job.close()
+    
+    elapsed = time.perf_counter() - started
+    source_frames = job.producer.frames_examined if job.producer else job.frames
+    return {
+        "video": video_path,
+        "frames": job.frames,
+        "source_frames": source_frames,
+        "seconds": round(elapsed, 2),
+        "fps": round(source_frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "source_fps": job.source_fps,
+        "output_video": saved_file,
+        "sidecar": job.sidecar.path,
+    }
+
+def load_sidecar_by_source_frame(path: str) -> Dict[int, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        records = (json.loads(line) for line in f if line.strip())
+        return {record["source_frame"]: record for record in records}
+
+def evaluate_frame_skipping(video_path: str, output_dir: str, skip_options: FrameSkipOptions,
+                            writer_backend: str = "auto", workflow_spec_path: Optional[str] = None) -> Dict[str, Any]:
+    """Run a reference clip fully and with frame skipping; report speedup and detection recall"""
+    reference_dir = os.path.join(output_dir, "reference_full")
+    skipped_dir = os.path.join(output_dir, f"reference_{skip_options.mode}")
+    for directory in (reference_dir, skipped_dir):
+        os.makedirs(directory, exist_ok=True)
+    
+    full = process_archive_file(video_path, reference_dir, "jsonl", writer_backend, workflow_spec_path)
+    skipped = process_archive_file(video_path, skipped_dir, "jsonl", writer_backend, workflow_spec_path,
+                                   FrameSkipOptions(**{**skip_options.__dict__, "interpolate": True}))
+    
+    reference_records = load_sidecar_by_source_frame(full["sidecar"])
+    skipped_records = load_sidecar_by_source_frame(skipped["sidecar"])
+    matched = total = 0
+    for source_frame, reference in reference_records.items():
+        frame_matched, frame_total = box_recall(reference, skipped_records.get(source_frame, {}))
+        matched += frame_matched
+        total += frame_total
+    
+    report = {
+        "video": video_path,
+        "mode": skip_options.mode,
+        "frames_full": full["frames"],
+        "frames_processed": skipped["frames"],
+        "speedup": round(full["seconds"] / skipped["seconds"], 2) if skipped["seconds"] > 0 else 0.0,
+        "detection_recall": round(matched / total, 4) if total else 1.0,
+        "reference_boxes": total,
+    }
+    print(f"⏭️ {Path(video_path).name} [{skip_options.mode}]: {report['frames_processed']:,}/{report['frames_full']:,} frames run, "
+          f"speedup {report['speedup']:.2f}x, recall {report['detection_recall'] * 100:.1f}% of {total:,} reference boxes")
+    return report
+
+def expand_archive_inputs(inputs: List[str]) -> List[str]:
+    """Resolve directories and glob patterns to a sorted list of video files"""
+    videos = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item, recursive=True)
+        videos.extend(
+            path for path in candidates
+            if os.path.isfile(path) and path.lower().endswith(ARCHIVE_VIDEO_EXTENSIONS)
+        )
+    return sorted(set(videos))
+
+def run_offline_batch(inputs: List[str], output_dir: str, workers: int = 1, sidecar_format: str = "jsonl",
+                      writer_backend: str = "auto", workflow_spec_path: Optional[str] = None,
+                      skip_options: Optional[FrameSkipOptions] = None,
+                      evaluate_skipping: bool = False) -> List[Dict[str, Any]]:
+    """Process a set of archive videos across a process pool and print an aggregate summary"""
+    videos = expand_archive_inputs(inputs)
+    if not videos:
+        print(f"❌ No video files found in: {', '.join(inputs)}")
+        return []
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    if evaluate_skipping:
+        # Sequential on purpose: parallel runs would distort the speedup measurement
+        return [
+            evaluate_frame_skipping(video, output_dir, skip_options or FrameSkipOptions(mode="stride", stride=2),
+                                    writer_backend, workflow_spec_path)
+            for video in videos
+        ]
+    
+    workers = max(1, min(workers, len(videos)))
+    print(f"🗂️ Offline batch: {len(videos)} file(s), {workers} worker process(es) → {output_dir}")
+    
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    summaries = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_archive_file, video, output_dir, sidecar_format,
+                            writer_backend, workflow_spec_path, skip_options): video
+            for video in videos
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                summary = future.result()
+                summaries.append(summary)
+                print(f"✅ {Path(video).name}: {summary['source_frames']:,} frames ({summary['frames']:,} inferred) in {summary['seconds']:.1f}s ({summary['fps']:.1f} fps)")
+            except Exception as e:
+                print(f"❌ {Path(video).name}: {e}")
+    
+    wall_seconds = time.perf_counter() - started
+    total_frames = sum(summary["source_frames"] for summary in summaries)
+    aggregate_fps = total_frames / wall_seconds if wall_seconds > 0 else 0.0
+    
+    if console and RICH_AVAILABLE:
+        summary_table = Table(title="🗂️ Offline Batch Summary", show_header=True)
+        summary_table.add_column("Video", style="cyan")
+        summary_table.add_column("Frames", style="bright_green", justify="right")
+        summary_table.add_column("FPS", style="bright_green", justify="right")
+        summary_table.add_column("× Real Time", style="yellow", justify="right")
+        for summary in sorted(summaries, key=lambda item: item["video"]):
+            realtime = summary["fps"] / summary["source_fps"] if summary["source_fps"] else 0.0
+            summary_table.add_row(Path(summary["video"]).name, f"{summary['source_frames']:,}", f"{summary['fps']:.1f}", f"{realtime:.2f}x")
+        summary_table.add_row("TOTAL", f"{total_frames:,}", f"{aggregate_fps:.1f}", "")
+        console.print(summary_table)
+    else:
+        print("═" * 60)
+        print(f"📊 {len(summaries)}/{len(videos)} file(s), {total_frames:,} frames in {wall_seconds:.1f}s")
+        print(f"📈 Aggregate throughput: {aggregate_fps:.1f} fps")
+        print("═" * 60)
+    
+    return summaries
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🚀 FAST START - STARTUP PROFILE, WORKFLOW / MODEL CACHE, PREWARM
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# --fast-start cache: workflows/<workspace>_<workflow>.json, models/ (inference's MODEL_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "audtheia")
+PREWARM_FRAME_SIZE = 640
+
+class StartupProfile:
+    """
+    Wall-clock phases from the top of this script to the first frame reaching
+    the sink. A camera restarted by a watchdog is blind for all of it.
+    """
+    
+    def __init__(self, started: float, started_unix: float):
+        self.started_unix = started_unix
+        self.marks = [("script_start", started)]
+        self.prewarm_ms: Dict[str, float] = {}  # background steps, overlapping the phases
+        self.first_frame_seen = False
+        self.report_path = None
+        self.on_first_frame = None
+    
+    def mark(self, phase: str, at: Optional[float] = None):
+        """End `phase` now (or at `at`); it covers the time since the previous mark"""
+        self.marks.append((phase, time.perf_counter() if at is None else at))
+    
+    def phases(self) -> Dict[str, float]:
+        return {phase: round((at - previous) * 1000.0, 1)
+                for (_, previous), (phase, at) in zip(self.marks, self.marks[1:])}
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            "script_started_unix": self.started_unix,
+            "total_ms": round((self.marks[-1][1] - self.marks[0][1]) * 1000.0, 1),
+            "phases_ms": self.phases(),
+            "prewarm_ms": dict(self.prewarm_ms),
+        }
+    
+    def first_frame(self):
+        """Called from the sink: print the breakdown, write --startup-report, run --exit-after-first-frame"""
+        if self.first_frame_seen:
+            return
+        self.first_frame_seen = True
+        self.mark("first_frame")
+        report = self.report()
+        print(f"⏱️ First frame {report['total_ms'] / 1000.0:.2f}s after start: "
+              + " · ".join(f"{phase} {ms:.0f} ms" for phase, ms in report["phases_ms"].items()))
+        if self.report_path:
+            try:
+                with open(self.report_path, "w") as f:
+                    json.dump(report, f, indent=2)
+            except OSError as e:
+                print(f"⚠️ Startup report '{self.report_path}' not written: {e}")
+        if self.on_first_frame:
+            self.on_first_frame()
+
+startup_profile = StartupProfile(SCRIPT_STARTED, SCRIPT_STARTED_UNIX)
+startup_profile.mark("imports", IMPORTS_FINISHED)
+
+def workflow_cache_path(cache_dir: str) -> str:
+    name = "".join(c if c.isalnum() or c in "-_." else "_" for c in f"{ROBOFLOW_WORKSPACE}_{ROBOFLOW_WORKFLOW_ID}")
+    return os.path.join(cache_dir, "workflows", f"{name}.json")
+
+def fetch_workflow_specification() -> Dict[str, Any]:
+    from inference.core.roboflow_api import get_workflow_specification
+    return get_workflow_specification(api_key=ROBOFLOW_API_KEY, workspace_id=ROBOFLOW_WORKSPACE,
+                                      workflow_id=ROBOFLOW_WORKFLOW_ID)
+
+def write_workflow_cache(cache_dir: str, specification: Dict[str, Any]):
+    path = workflow_cache_path(cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(specification, f)
+    os.replace(path + ".tmp", path)
+
+def load_workflow_specification(spec_path: Optional[str], cache_dir: str, refresh: bool = False) -> tuple:
+    """(specification, origin): --workflow-spec file, else the disk cache, else the Roboflow API (then cached)"""
+    if spec_path:
+        with open(spec_path, "r", encoding="utf-8") as f:
+            return json.load(f), "file"
+    cache_path = workflow_cache_path(cache_dir)
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f), "cache"
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Workflow cache '{cache_path}' unreadable, fetching again: {e}")
+    specification = fetch_workflow_specification()
+    write_workflow_cache(cache_dir, specification)
+    return specification, "api"
+
+def refresh_workflow_cache(cache_dir: str, cached: Dict[str, Any]):
+    """Re-fetch after the stream is up, so an edit made in Roboflow reaches the next start"""
+    try:
+        specification = fetch_workflow_specification()
+    except Exception as e:
+        print(f"⚠️ Workflow cache refresh failed (the cached copy stays): {e}")
+        return
+    if specification != cached:
+        write_workflow_cache(cache_dir, specification)
+        print("🔄 Workflow changed in Roboflow - cached copy updated, the next start uses it")
+
+def workflow_model_ids(specification: Dict[str, Any]) -> List[str]:
+    """Model ids fixed in the spec (steps taking theirs from a workflow input are skipped)"""
+    model_ids = []
+    for step in specification.get("steps", []):
+        model_id = step.get("model_id")
+        if isinstance(model_id, str) and not model_id.startswith("$") and model_id not in model_ids:
+            model_ids.append(model_id)
+    return model_ids
+
+class PipelinePrewarm:
+    """
+    --fast-start: what the first frames would otherwise pay for, on a thread
+    that runs while the banner-free startup opens the sources. Imports the
+    inference stack, patches ByteTracker, loads the workflow spec (file, disk
+    cache or API), builds the model manager and compiles the spec with the
+    execution engine, then loads each model the spec names into that manager
+    - weights land in the MODEL_CACHE_DIR disk cache on the first run - and
+    runs one inference on a blank frame.
+    
+    The pipeline is then built on this engine (pipeline_on_video_frame), so
+    the model the first frame uses is the one warmed here. Only the model
+    runs on the dummy frame: executing the whole workflow would send it to
+    Claude, n8n and the dataset. Failures are reported and skipped; the
+    pipeline then pays that cost itself, as without --fast-start.
+    """
+    
+    def __init__(self, spec_path: Optional[str], cache_dir: str, refresh_cache: bool = False):
+        self.spec_path = spec_path
+        self.cache_dir = cache_dir
+        self.refresh_cache = refresh_cache
+        self.specification = None
+        self.spec_origin = None
+        self.model_manager = None
+        self.execution_engine = None
+        self.timings: Dict[str, float] = {}
+        self.failures: List[str] = []
+        self.thread = threading.Thread(target=self._run, name="Prewarm", daemon=True)
+    
+    def start(self) -> "PipelinePrewarm":
+        self.thread.start()
+        return self
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+    
+    def _step(self, name: str, work):
+        started = time.perf_counter()
+        try:
+            return work()
+        except Exception as e:
+            self.failures.append(name)
+            print(f"⚠️ Prewarm {name} failed: {e}")
+            return None
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000.0, 1)
+    
+    def _run(self):
+        self._step("import_inference", self._import_inference)
+        self._step("bytetracker_patch", bytetracker_optimizer.apply_comprehensive_patch)
+        loaded = self._step("workflow_spec", lambda: load_workflow_specification(self.spec_path, self.cache_dir,
+                                                                                 self.refresh_cache))
+        if not loaded:
+            return
+        self.specification, self.spec_origin = loaded
+        if not self._step("compile_workflow", self._compile):
+            return
+        blank = np.zeros((PREWARM_FRAME_SIZE, PREWARM_FRAME_SIZE, 3), dtype=np.uint8)
+        for model_id in workflow_model_ids(self.specification):
+            if self._step(f"load_model {model_id}", lambda: self._load_model(model_id)):
+                self._step(f"dummy_inference {model_id}", lambda: self.model_manager[model_id].infer(blank))
+    
+    @staticmethod
+    def _import_inference():
+        from inference.core.interfaces.stream.inference_pipeline import InferencePipeline  # noqa: F401
+    
+    def _compile(self) -> bool:
+        """The same manager and engine InferencePipeline.init_with_workflow would build"""
+        from concurrent.futures import ThreadPoolExecutor
+        from inference.core.env import MAX_ACTIVE_MODELS
+        from inference.core.managers.base import ModelManager
+        from inference.core.managers.decorators.fixed_size_cache import WithFixedSizeCache
+        from inference.core.registries.roboflow import RoboflowModelRegistry
+        from inference.core.workflows.core_steps.common.entities import StepExecutionMode
+        from inference.core.workflows.execution_engine.core import ExecutionEngine
+        from inference.models.utils import ROBOFLOW_MODEL_TYPES
+        
+        model_manager = WithFixedSizeCache(ModelManager(model_registry=RoboflowModelRegistry(ROBOFLOW_MODEL_TYPES)),
+                                           max_size=MAX_ACTIVE_MODELS)
+        self.execution_engine = ExecutionEngine.init(
+            workflow_definition=self.specification,
+            init_parameters={
+                "workflows_core.model_manager": model_manager,
+                "workflows_core.api_key": ROBOFLOW_API_KEY,
+                "workflows_core.step_execution_mode": StepExecutionMode.LOCAL,
+                "workflows_core.thread_pool_executor": ThreadPoolExecutor(max_workers=4),
+            },
+        )
+        self.model_manager = model_manager
+        return True
+    
+    def _load_model(self, model_id: str) -> bool:
+        """Into the engine's manager, so the model step finds it loaded (add_model skips known ids)"""
+        self.model_manager.add_model(model_id, api_key=ROBOFLOW_API_KEY)
+        return True
+    
+    def pipeline_on_video_frame(self, workflows_parameters: Optional[Dict[str, Any]]):
+        """on_video_frame for InferencePipeline.init_with_custom_logic running the warmed engine,
+        as init_with_workflow wires its own; None when the engine did not compile"""
+        if self.execution_engine is None:
+            return None
+        from functools import partial
+        from inference.core.interfaces.stream.model_handlers.workflows import WorkflowRunner
+        
+        return partial(
+            WorkflowRunner().run_workflow,
+            workflows_parameters=workflows_parameters,
+            execution_engine=self.execution_engine,
+            image_input_name="image",
+            video_metadata_input_name="video_metadata",
+        )
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🎨 ENHANCED STARTUP SEQUENCE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -573,6 +2559,7 @@ def initialize_enhanced_systems():
     if not console or not RICH_AVAILABLE:
         print("🔧 Initializing Audtheia enhanced systems with display + download...")
         time.sleep(1)
+        bytetracker_optimizer.apply_comprehensive_patch()
         return True
     
     with Progress(
@@ -625,88 +2612,282 @@ def initialize_enhanced_systems():
 # 🌊 MAIN EXECUTION FUNCTION - ENHANCED PROCESSING VERSION WITH DISPLAY + DOWNLOAD
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def main():
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Command-line options; without --batch the interactive display mode runs"""
+    parser = argparse.ArgumentParser(description="Audtheia Environmental Monitoring pipeline")
+    parser.add_argument("--source", nargs="+", default=[DEFAULT_VIDEO_SOURCE],
+                        help="One or more video files, RTSP URLs or webcam indices served by one pipeline")
+    parser.add_argument("--batch", nargs="+", metavar="PATH_OR_GLOB",
+                        help="Headless offline mode: directories or glob patterns of archive videos")
+    parser.add_argument("--output-dir", default="./processed_videos",
+                        help="Where batch mode writes annotated videos and detection sidecars")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Parallel worker processes for batch mode")
+    parser.add_argument("--sidecar-format", choices=SIDECAR_FORMATS, default="jsonl")
+    parser.add_argument("--writer-backend", choices=WRITER_BACKENDS, default="auto")
+    parser.add_argument("--workflow-spec", default=None,
+                        help="Local workflow JSON to run instead of the hosted workflow ID")
+    parser.add_argument("--skip-mode", choices=SKIP_MODES, default="none",
+                        help="File sources only: run detection on every Nth frame, keyframes, or changed frames")
+    parser.add_argument("--stride", type=int, default=2, help="Frame stride for --skip-mode stride")
+    parser.add_argument("--diff-threshold", type=float, default=2.0,
+                        help="Mean absolute pixel difference below which --skip-mode adaptive skips a frame")
+    parser.add_argument("--max-skip", type=int, default=30, help="Longest run of adaptively skipped frames")
+    parser.add_argument("--no-interpolate", action="store_true",
+                        help="Write only processed frames instead of interpolating skipped ones")
+    parser.add_argument("--evaluate-skipping", action="store_true",
+                        help="With --batch: run each clip fully and skipped, report speedup and detection recall")
+    parser.add_argument("--live-reader", choices=LIVE_READER_MODES, default="latest",
+                        help="Live sources: 'latest' decodes in its own thread and always serves the newest frame "
+                             "(reconnects with backoff); 'buffered' uses the stock inference reader")
+    parser.add_argument("--no-display", action="store_true",
+                        help="Interactive mode without the preview window (no resize/imshow cost at all)")
+    parser.add_argument("--display-fps", type=float, default=30.0,
+                        help="Preview window refresh rate; independent of inference throughput")
+    parser.add_argument("--metrics-jsonl", default=None,
+                        help="Append a stage-latency/FPS summary to this JSONL file every --metrics-interval seconds")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve the latest metrics summary as JSON on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between metrics exports")
+    parser.add_argument("--frame-bus", default=None, metavar="NAME",
+                        help="Publish annotated frames to shared memory NAME (NAME_<i> per stream) for consumer "
+                             "processes, see roboflow-workflows/frame_bus.py")
+    parser.add_argument("--frame-bus-slots", type=int, default=8, help="Ring slots per frame bus")
+    parser.add_argument("--record-log", default=None, metavar="PATH",
+                        help="Append each frame's workflow outputs to a binary log for replay, "
+                             "see roboflow-workflows/workflow_log.py")
+    parser.add_argument("--record-thumbnail-width", type=int, default=0,
+                        help="--record-log: also store JPEG thumbnails this wide (0 = none)")
+    parser.add_argument("--record-thumbnail-every", type=int, default=5,
+                        help="--record-log: store a thumbnail every Nth frame per stream")
+    parser.add_argument("--io-sidecar", nargs="?", const="/tmp/audtheia-io.sock", default=None, metavar="SOCKET",
+                        help="Run Claude, n8n and dataset-upload requests in a separate asyncio process "
+                             "(roboflow-workflows/io_sidecar.py) listening on SOCKET")
+    parser.add_argument("--io-limit", action="append", default=[], metavar="SERVICE=N",
+                        help="--io-sidecar: concurrent requests per service, e.g. anthropic=2 (repeatable)")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="No banner or startup animations, no Rich; prewarm the workflow and model in the background "
+                             "and cache the workflow spec and model weights under --cache-dir")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="--fast-start: workflow spec and model weight cache")
+    parser.add_argument("--refresh-workflow-cache", action="store_true",
+                        help="--fast-start: fetch the workflow from Roboflow instead of the cached copy")
+    parser.add_argument("--startup-report", default=None, metavar="PATH",
+                        help="Write the startup time breakdown (up to the first frame) as JSON")
+    parser.add_argument("--exit-after-first-frame", action="store_true",
+                        help="Stop once the first frame reaches the sink (startup benchmarking)")
+    parser.add_argument("--max-fps", type=float, default=60.0, help="Upper bound on frames fed to inference")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adjust overlay detail, live frame rate and live input resolution to hold "
+                             "--target-latency-ms / --cpu-budget (for CPU-only field boxes)")
+    parser.add_argument("--target-latency-ms", type=float, default=200.0,
+                        help="--adaptive: p95 capture-to-sink latency to hold (inference + sink for files)")
+    parser.add_argument("--cpu-budget", type=float, default=None,
+                        help="--adaptive: share of all CPU cores this process may use, e.g. 0.5")
+    parser.add_argument("--min-fps", type=float, default=2.0, help="--adaptive: lowest live frame rate")
+    return parser.parse_args(argv)
+
+def skip_options_from_arguments(args: argparse.Namespace) -> FrameSkipOptions:
+    return FrameSkipOptions(
+        mode=args.skip_mode,
+        stride=args.stride,
+        diff_threshold=args.diff_threshold,
+        max_skip=args.max_skip,
+        interpolate=not args.no_interpolate,
+    )
+
+def main(argv=None):
     """
     🏆 Enhanced main execution for Audtheia Environmental Monitoring
     FIXED MP4 processing with visual display + automatic download
     """
-    global smart_processor
-    
-    # Import numpy here since we use it in the sink function
-    import numpy as np
-    globals()['np'] = np
-    
-    # Enhanced startup
-    display_enhanced_banner()
+    global smart_processor, display_mailboxes, stream_processors, live_producers, frame_bus_publisher, throughput_controller, workflow_recorder
     
-    if console and RICH_AVAILABLE:
-        console.print(Rule("[bold blue]Enhanced Environmental Analysis Platform with Display + Download[/bold blue]"))
-        console.print()
-    
-    # System initialization
-    initialization_success = initialize_enhanced_systems()
-    
-    if not initialization_success:
-        if console:
-            console.print("[red]❌ System initialization failed[/red]")
+    startup_profile.mark("module_setup")
+    args = parse_arguments(argv)
+    skip_options = skip_options_from_arguments(args)
+    startup_profile.report_path = args.startup_report
+    startup_profile.mark("arguments")
+    if not args.fast_start:
+        load_rich_ui()
+    if args.batch:
+        run_offline_batch(
+            args.batch, args.output_dir, workers=args.workers, sidecar_format=args.sidecar_format,
+            writer_backend=args.writer_backend, workflow_spec_path=args.workflow_spec,
+            skip_options=skip_options, evaluate_skipping=args.evaluate_skipping,
+        )
         return
     
-    # Configuration
-    if console and RICH_AVAILABLE:
-        config_table = Table(title="🔧 Enhanced Configuration", show_header=True)
-        config_table.add_column("Parameter", style="cyan")
-        config_table.add_column("Value", style="bright_green")
-        config_table.add_column("Description", style="white")
-        
-        config_table.add_row("Target FPS", "60", "Enhanced for file processing")
-        config_table.add_row("Video Source", "marine_test_video.mp4", "Marine sponge test video")
-        config_table.add_row("Display Mode", "960x540", "Fixed size with proper aspect ratio")
-        config_table.add_row("Processing Mode", "Enhanced Streaming", "Fast detection with auto-init saving")
-        config_table.add_row("AI Analysis", "Anthropic Claude", "Environmental context")
-        config_table.add_row("Smart Saving", "Auto-Init + Fallbacks", "Automatic video writer with multiple codecs")
-        config_table.add_row("Auto Download", "Downloads Folder", "Automatic download to user's Downloads")
-        config_table.add_row("Debug Output", "Comprehensive", "Full troubleshooting information")
-        
-        console.print(config_table)
-        console.print()
-    
-    # Initialize enhanced smart processor
-    smart_processor = EnhancedMP4ProcessorWithDownload()
+    # Before anything compiles the workflow (the fast-start prewarm included)
+    stream_hooks = load_stream_hooks()
+    prewarm = None
+    if args.fast_start:
+        # Model weights go to the persistent cache; set before anything imports inference
+        os.environ.setdefault("MODEL_CACHE_DIR", os.path.join(args.cache_dir, "models"))
+        prewarm = PipelinePrewarm(args.workflow_spec, args.cache_dir, args.refresh_workflow_cache).start()
+        print(f"🚀 Audtheia fast start - prewarming workflow + model (cache: {args.cache_dir})")
+    else:
+        # Enhanced startup
+        display_enhanced_banner()
+        
+        if console and RICH_AVAILABLE:
+            console.print(Rule("[bold blue]Enhanced Environmental Analysis Platform with Display + Download[/bold blue]"))
+            console.print()
+        
+        # System initialization
+        initialization_success = initialize_enhanced_systems()
+        
+        if not initialization_success:
+            if console:
+                console.print("[red]❌ System initialization failed[/red]")
+            return
+        
+        # Configuration
+        if console and RICH_AVAILABLE:
+            config_table = Table(title="🔧 Enhanced Configuration", show_header=True)
+            config_table.add_column("Parameter", style="cyan")
+            config_table.add_column("Value", style="bright_green")
+            config_table.add_column("Description", style="white")
+        
+            if args.adaptive:
+                budget = f"p95 ≤ {args.target_latency_ms:g} ms" + (f", CPU ≤ {args.cpu_budget:.0%}" if args.cpu_budget else "")
+                config_table.add_row("Target FPS", f"{args.min_fps:g}-{args.max_fps:g} adaptive", budget)
+            else:
+                config_table.add_row("Target FPS", f"{args.max_fps:g}", "Enhanced for file processing")
+            config_table.add_row("Video Source", ", ".join(str(source) for source in args.source), "Files, RTSP URLs or webcam indices")
+            if args.no_display:
+                config_table.add_row("Display Mode", "Disabled", "Headless (--no-display)")
+            else:
+                config_table.add_row("Display Mode", f"960x540 @ {args.display_fps:g}Hz", "Separate display thread, latest frame only")
+            config_table.add_row("Processing Mode", "Enhanced Streaming", "Fast detection with auto-init saving")
+            config_table.add_row("AI Analysis", "Anthropic Claude", "Environmental context")
+            config_table.add_row("Smart Saving", "Auto-Init + Fallbacks", "Automatic video writer with multiple codecs")
+            config_table.add_row("Auto Download", "Downloads Folder", "Automatic download to user's Downloads")
+            config_table.add_row("Debug Output", "Comprehensive", "Full troubleshooting information")
+        
+            console.print(config_table)
+            console.print()
+        
+    startup_profile.mark("interface")
+    
+    # Initialize one enhanced smart processor per stream
+    stream_processors = [EnhancedMP4ProcessorWithDownload(writer_backend=args.writer_backend) for _ in args.source]
+    smart_processor = stream_processors[0]
     
     pipeline = None
+    metrics_exporter = None
+    display_mailboxes = None if args.no_display else [FrameMailbox() for _ in args.source]
+    frame_bus_publisher = FrameBusPublisher(args.frame_bus, len(args.source), args.frame_bus_slots) if args.frame_bus else None
+    workflow_recorder = WorkflowOutputRecorder(args.record_log, args.record_thumbnail_width,
+                                               args.record_thumbnail_every) if args.record_log else None
+    # Before the pipeline compiles the workflow, so the blocks see AUDTHEIA_IO_SIDECAR from their first frame
+    io_sidecar = IOSidecarProcess(args.io_sidecar, args.io_limit) if args.io_sidecar else None
+    throughput_controller = None
+    if args.adaptive:
+        throughput_controller = AdaptiveThroughputController(
+            perf_monitor, max_fps=args.max_fps, min_fps=args.min_fps,
+            target_latency_ms=args.target_latency_ms, cpu_budget=args.cpu_budget)
+        perf_monitor.controller = throughput_controller
+        ByteTrackerOptimizer.live_fps_provider = throughput_controller.source_fps
     
     try:
-        # FIXED VIDEO SOURCE 
-        video_source = r"[INSERT_VIDEO_PATH_HERE]"
+        video_references = []
+        for processor, source in zip(stream_processors, args.source):
+            # Webcam indices arrive as strings on the command line
+            video_source = int(source) if str(source).isdigit() else source
+            
+            # Detect source type and setup saving
+            processor.detect_source_type(video_source)
+            
+            # File sources can be thinned out before inference (stride / keyframes / adaptive);
+            # live sources get a latest-frame reader so stalls never queue stale frames
+            video_reference = video_source
+            if not processor.is_processing_mp4 and args.live_reader == "latest":
+                source_id = len(video_references)
+                live_producer = LatestFrameProducer(video_source)
+                live_producers[source_id] = live_producer
+                perf_monitor.register_source(f"source_{source_id}", live_producer)
+                video_reference = lambda producer=live_producer: producer
+            if not processor.is_processing_mp4 and throughput_controller:
+                video_reference = throttled_video_reference(video_reference, throughput_controller)
+            elif skip_options.enabled and processor.is_processing_mp4:
+                frame_producer = SelectiveFrameProducer(video_source, skip_options)
+                register_producer_clock(stream_hooks, len(video_references), frame_producer)
+                video_reference = lambda producer=frame_producer: producer
+                processor.source_fps = frame_producer.effective_fps
+                if processor is smart_processor:
+                    ByteTrackerOptimizer.fallback_fps = frame_producer.effective_fps
+            
+            # Stage timing: decode inside each producer
+            video_references.append(timed_video_reference(video_reference, perf_monitor))
+        
+        perf_monitor.target_fps = smart_processor.source_fps if smart_processor.is_processing_mp4 else DEFAULT_OUTPUT_FPS
+        video_reference = video_references[0] if len(video_references) == 1 else video_references
         
-        # Detect source type and setup saving
-        smart_processor.detect_source_type(video_source)
+        # Workflow latency via the watchdog
+        stage_watchdog = create_stage_timing_watchdog(perf_monitor)
+        if args.metrics_jsonl or args.metrics_port:
+            metrics_exporter = MetricsExporter(perf_monitor, args.metrics_jsonl, args.metrics_port,
+                                               args.metrics_interval).start()
+        
+        startup_profile.mark("sources")
+        
+        # Fast start: the prewarm thread has the spec, the compiled engine and a warm model by now or shortly
+        workflow_specification = None
+        warmed_on_video_frame = None
+        workflows_parameters = throughput_controller.workflow_parameters if throughput_controller else None
+        if prewarm is not None:
+            prewarm.wait()
+            startup_profile.mark("prewarm_wait")
+            startup_profile.prewarm_ms.update(prewarm.timings)
+            workflow_specification = prewarm.specification
+            try:
+                warmed_on_video_frame = prewarm.pipeline_on_video_frame(workflows_parameters)
+            except Exception as e:
+                print(f"⚠️ Prewarmed engine not usable, the pipeline builds its own: {e}")
+        if workflow_specification is None and args.workflow_spec:
+            with open(args.workflow_spec, "r", encoding="utf-8") as f:
+                workflow_specification = json.load(f)
+        if workflow_specification is not None:
+            workflow_source = {"workflow_specification": workflow_specification}
+        else:
+            workflow_source = {"workspace_name": ROBOFLOW_WORKSPACE, "workflow_id": ROBOFLOW_WORKFLOW_ID}
+        
+        def init_pipeline():
+            from inference.core.interfaces.stream.inference_pipeline import InferencePipeline, SinkMode
+            
+            if warmed_on_video_frame is not None:
+                # Same wiring as init_with_workflow, on the engine and model manager the prewarm loaded
+                return InferencePipeline.init_with_custom_logic(
+                    video_reference=video_reference,
+                    on_video_frame=warmed_on_video_frame,
+                    max_fps=args.max_fps,
+                    watchdog=stage_watchdog,
+                    sink_mode=SinkMode.SEQUENTIAL,
+                    on_prediction=audtheia_optimized_sink_with_display_and_saving,
+                )
+            return InferencePipeline.init_with_workflow(
+                api_key=ROBOFLOW_API_KEY,
+                video_reference=video_reference,
+                max_fps=args.max_fps,
+                watchdog=stage_watchdog,
+                workflows_parameters=workflows_parameters,
+                sink_mode=SinkMode.SEQUENTIAL,
+                on_prediction=audtheia_optimized_sink_with_display_and_saving,
+                **workflow_source,
+            )
         
         if console and RICH_AVAILABLE:
             with console.status("[bold green]🚀 Launching Enhanced Audtheia Pipeline with Display + Download...[/bold green]", spinner="dots"):
                 time.sleep(1)
-                from inference.core.interfaces.stream.inference_pipeline import InferencePipeline
-                
-                pipeline = InferencePipeline.init_with_workflow(
-                    api_key="[YOUR_ROBOFLOW_API_KEY_HERE]",
-                    workspace_name="[YOUR_ROBOFLOW_WORKSPACE_HERE]",
-                    workflow_id="[ROBOFLOW_WORKFLOW_ID_HERE]",
-                    video_reference=video_source,
-                    max_fps=60,
-                    on_prediction=audtheia_optimized_sink_with_display_and_saving
-                )
+                pipeline = init_pipeline()
         else:
             print("🚀 Launching enhanced Audtheia pipeline with display + download...")
-            from inference.core.interfaces.stream.inference_pipeline import InferencePipeline
-            
-            pipeline = InferencePipeline.init_with_workflow(
-                api_key="[YOUR_ROBOFLOW_API_KEY_HERE]",
-                workspace_name="[YOUR_ROBOFLOW_WORKSPACE_HERE]",
-                workflow_id="[ROBOFLOW_WORKFLOW_ID_HERE]",
-                video_reference=video_source,
-                max_fps=60,
-                on_prediction=audtheia_optimized_sink_with_display_and_saving
-            )
+            pipeline = init_pipeline()
+        startup_profile.mark("pipeline_init")
+        if args.exit_after_first_frame:
+            # terminate() joins the pipeline threads, so not from the sink's own thread
+            startup_profile.on_first_frame = lambda: threading.Thread(
+                target=pipeline.terminate, name="FirstFrameExit", daemon=True).start()
 
         # System active notification
         if console and RICH_AVAILABLE:
@@ -718,12 +2899,12 @@ def main():
                          "⚡ Fast species detection: ONLINE\n"
                          "🧠 Anthropic Claude analysis: ACTIVE\n"
                          "📡 N8N workflow integration: CONNECTED\n"
-                         "📺 Visual display window: ENABLED\n"
+                         f"📺 Visual display window: {'DISABLED' if args.no_display else 'ENABLED'}\n"
                          "🎥 Enhanced MP4 saving: AUTO-INIT + FALLBACKS\n"
                          "📥 Auto download: TO DOWNLOADS FOLDER\n"
                          "🔧 Comprehensive debugging: ENABLED\n\n"
                          "🎯 Press 'Q' or 'ESC' in video window to stop\n"
-                         "📺 Display: 960x540 with proper aspect ratio\n"
+                         f"📺 Display: {'off (--no-display)' if args.no_display else '960x540 with proper aspect ratio'}\n"
                          f"🎬 Source: {source_type}", 
                          style="bright_green")
                 ),
@@ -738,15 +2919,29 @@ def main():
             print("═" * 80)
             print("⏰ Session started:", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
             print("🎯 Press 'Q' or 'ESC' in video window to stop")
-            print("📺 Display: 960x540 with fixed aspect ratio")
+            print(f"📺 Display: {'off (--no-display)' if args.no_display else '960x540 with fixed aspect ratio'}")
             print(f"🎬 Source: {'Marine Test Video (display + auto-download)' if smart_processor.is_processing_mp4 else 'Live source (display only)'}")
             print("📥 Auto download: TO DOWNLOADS FOLDER")
             print("🔧 Enhanced debugging: ENABLED")
             print("-" * 80)
 
-        # Start the pipeline
+        # Start the pipeline; the main thread only runs the preview window
         pipeline.start()
-        pipeline.join()
+        if prewarm is not None and prewarm.spec_origin == "cache":
+            threading.Thread(target=refresh_workflow_cache, args=(args.cache_dir, prewarm.specification),
+                             name="WorkflowCacheRefresh", daemon=True).start()
+        if display_mailboxes is None:
+            pipeline.join()
+        else:
+            pipeline_finished = threading.Event()
+            
+            def wait_for_pipeline():
+                pipeline.join()
+                pipeline_finished.set()
+            
+            threading.Thread(target=wait_for_pipeline, name="PipelineJoin", daemon=True).start()
+            DisplayWorker(display_mailboxes, refresh_fps=args.display_fps).run(pipeline_finished, on_quit=pipeline.terminate)
+            pipeline_finished.wait()
 
     except KeyboardInterrupt:
         if console and RICH_AVAILABLE:
@@ -762,13 +2957,23 @@ def main():
             print(f"❌ Error: {e}")
         
     finally:
-        # Save processed MP4 and auto-download if applicable
-        if smart_processor and smart_processor.is_processing_mp4:
-            saved_file = smart_processor.finish_saving_and_download()
-            if saved_file and console:
-                console.print(f"[bright_green]🎉 FINAL SUCCESS: {saved_file}[/bright_green]")
-            elif smart_processor.is_processing_mp4:
-                console.print(f"[red]❌ Enhanced MP4 processing failed - check debug output above[/red]")
+        # Save processed MP4s and auto-download if applicable
+        saved_file = None
+        for processor in stream_processors:
+            if not processor.is_processing_mp4:
+                continue
+            processor_saved_file = processor.finish_saving_and_download()
+            if processor is smart_processor:
+                saved_file = processor_saved_file
+            if console and RICH_AVAILABLE:
+                if processor_saved_file:
+                    console.print(f"[bright_green]🎉 FINAL SUCCESS: {processor_saved_file}[/bright_green]")
+                else:
+                    console.print(f"[red]❌ Enhanced MP4 processing failed for {processor.input_filename} - check debug output above[/red]")
+            elif processor_saved_file:
+                print(f"🎉 FINAL SUCCESS: {processor_saved_file}")
+            else:
+                print(f"❌ Enhanced MP4 processing failed for {processor.input_filename} - check debug output above")
         
         # Cleanup
         if console and RICH_AVAILABLE:
@@ -781,7 +2986,8 @@ def main():
                     except Exception:
                         pass
                 
-                cv2.destroyAllWindows()
+                if display_mailboxes is not None:
+                    cv2.destroyAllWindows()
         else:
             print("🧹 Cleaning up enhanced systems...")
             if pipeline:
@@ -789,11 +2995,28 @@ def main():
                     pipeline.terminate()
                 except Exception:
                     pass
-            cv2.destroyAllWindows()
+            # Headless OpenCV builds have no HighGUI to clean up
+            if display_mailboxes is not None:
+                cv2.destroyAllWindows()
+        
+        # The pipeline has stopped: visits still open would otherwise never be sent
+        flush_stream_hooks(stream_hooks)
+        if metrics_exporter:
+            metrics_exporter.stop()
+        bus_stats = frame_bus_publisher.stats() if frame_bus_publisher else {}
+        if frame_bus_publisher:
+            frame_bus_publisher.close()
+        record_stats = workflow_recorder.stats() if workflow_recorder else {}
+        if workflow_recorder:
+            workflow_recorder.close()
+        sidecar_stats = io_sidecar.stats() if io_sidecar else {}
+        if io_sidecar:
+            io_sidecar.stop()
         
         # Final performance report
         if perf_monitor.total_frames > 0:
             metrics = perf_monitor.get_metrics_summary()
+            efficiency = metrics['efficiency']
             
             if console and RICH_AVAILABLE:
                 report_table = Table(title="📊 Final Enhanced Performance Report", show_header=True)
@@ -801,7 +3024,6 @@ def main():
                 report_table.add_column("Value", style="bright_green")
                 report_table.add_column("Assessment", style="yellow")
                 
-                efficiency = metrics['efficiency']
                 if efficiency > 90:
                     grade = "🏆 EXCELLENT"
                 elif efficiency > 75:
@@ -816,6 +3038,27 @@ def main():
                 report_table.add_row("📈 Average FPS", f"{metrics['current_fps']:.2f}", "Processing Speed")
                 report_table.add_row("⚡ System Efficiency", f"{efficiency:.1f}%", grade)
                 report_table.add_row("🐟 Species Detected", f"{metrics['species_count']}", "Unique Classifications")
+                for name, source_stats in metrics['sources'].items():
+                    report_table.add_row(f"📡 {name}", f"{source_stats['frames_delivered']:,} delivered / {source_stats['frames_dropped']:,} dropped",
+                                         f"{source_stats['reconnects']} reconnects")
+                if metrics['throughput']:
+                    control = metrics['throughput']
+                    report_table.add_row("🎛️ Throughput Control", f"{control['target_fps']:.1f} fps @ {control['input_scale']:.2f}x, overlay {control['overlay_detail']}",
+                                         f"{control['adjustments']} adjustments")
+                for name, stats in bus_stats.items():
+                    report_table.add_row(f"🚌 {name}", f"{stats['published']:,} published / {stats['dropped']:,} dropped",
+                                         f"{stats['consumers']} consumers")
+                for service, stats in sidecar_stats.get('services', {}).items():
+                    report_table.add_row(f"📮 Sidecar {service}", f"{stats['jobs']:,} requests, mean {stats['mean_ms']:.0f} ms",
+                                         f"{stats['failed']:,} failed")
+                if record_stats:
+                    report_table.add_row("📼 Workflow Log", f"{record_stats['frames']:,} frames, {record_stats['bytes'] / 1e6:.1f} MB",
+                                         f"{record_stats['thumbnails']:,} thumbnails")
+                for stage, latency in metrics['stages'].items():
+                    if latency['samples']:
+                        report_table.add_row(f"⏱️ {stage.title()} Latency",
+                                             f"p50 {latency['p50_ms']:.1f} / p95 {latency['p95_ms']:.1f} / p99 {latency['p99_ms']:.1f} ms",
+                                             f"{latency['samples']} samples")
                 
                 if smart_processor and smart_processor.is_processing_mp4:
                     codec_info = smart_processor.codec_used if smart_processor.codec_used else "Failed"
@@ -850,6 +3093,20 @@ def main():
                 print(f"📈 FPS: {metrics['current_fps']:.2f}")
                 print(f"⚡ Efficiency: {efficiency:.1f}%")
                 print(f"🐟 Species: {metrics['species_count']}")
+                for name, source_stats in metrics['sources'].items():
+                    print(f"📡 {name}: {source_stats['frames_delivered']:,} delivered, {source_stats['frames_dropped']:,} dropped, {source_stats['reconnects']} reconnects")
+                if metrics['throughput']:
+                    control = metrics['throughput']
+                    print(f"🎛️ Throughput Control: {control['target_fps']:.1f} fps @ {control['input_scale']:.2f}x, overlay {control['overlay_detail']}, {control['adjustments']} adjustments")
+                for name, stats in bus_stats.items():
+                    print(f"🚌 {name}: {stats['published']:,} published, {stats['dropped']:,} dropped, {stats['consumers']} consumers")
+                for service, stats in sidecar_stats.get('services', {}).items():
+                    print(f"📮 Sidecar {service}: {stats['jobs']:,} requests, mean {stats['mean_ms']:.0f} ms, {stats['failed']:,} failed")
+                if record_stats:
+                    print(f"📼 Workflow Log: {record_stats['frames']:,} frames, {record_stats['bytes'] / 1e6:.1f} MB, {record_stats['thumbnails']:,} thumbnails -> {record_stats['path']}")
+                for stage, latency in metrics['stages'].items():
+                    if latency['samples']:
+                        print(f"⏱️ {stage.title()}: p50 {latency['p50_ms']:.1f} / p95 {latency['p95_ms']:.1f} / p99 {latency['p99_ms']:.1f} ms")
                 if smart_processor and smart_processor.is_processing_mp4:
                     completion_pct = (smart_processor.processed_frames / smart_processor.total_frames) * 100 if smart_processor.total_frames > 0 else 0
                     print(f"🎥 Enhanced MP4: {smart_processor.processed_frames:,}/{smart_processor.total_frames:,} frames ({completion_pct:.1f}%)")
@@ -4,6 +4,11 @@
     {
       "type": "InferenceImage",
       "name": "image"
+    },
+    {
+      "type": "WorkflowParameter",
+      "name": "overlay_detail",
+      "default_value": "full"
     }
   ],
   "steps": [
@@ -13,32 +18,43 @@
       "images": "$inputs.image",
       "model_id": "official-porifera-classifier-ju8er/12"
     },
+    {
+      "name": "tiled_inference",
+      "type": "Tiled_ROI_Inference",
+      "image": "$inputs.image",
+      "predictions": "$steps.model.predictions"
+    },
     {
       "type": "roboflow_core/bounding_box_visualization@v1",
       "name": "bounding_box_visualization",
       "image": "$inputs.image",
-      "predictions": "$steps.model.predictions"
+      "predictions": "$steps.tiled_inference.predictions"
     },
     {
       "type": "roboflow_core/byte_tracker@v3",
       "name": "byte_tracker",
       "image": "$inputs.image",
-      "detections": "$steps.model.predictions",
-      "fps": 60,
+      "detections": "$steps.tiled_inference.predictions",
       "track_buffer": 60,
       "track_thresh": 0.5,
       "match_thresh": 0.8
     },
+    {
+      "name": "track_lifecycle",
+      "type": "Track_Lifecycle_Aggregator",
+      "tracked_detections": "$steps.byte_tracker.tracked_detections",
+      "image": "$inputs.image"
+    },
     {
       "type": "roboflow_core/label_visualization@v1",
       "name": "label_visualization",
       "image": "$steps.bounding_box_visualization.image",
-      "predictions": "$steps.model.predictions"
+      "predictions": "$steps.tiled_inference.predictions"
     },
     {
       "name": "detection_converter",
       "type": "Detection_Converter",
-      "detection_results": "$steps.model.predictions",
+      "detection_results": "$steps.tiled_inference.predictions",
       "raw_predictions": "$steps.byte_tracker.new_instances"
     },
     {
@@ -46,26 +62,29 @@
       "type": "Add_Webcam_Interface",
       "image": "$steps.label_visualization.image",
       "detections": "$steps.detection_converter.detections",
-      "new_instances": "$steps.byte_tracker.new_instances"
+      "new_instances": "$steps.byte_tracker.new_instances",
+      "overlay_detail": "$inputs.overlay_detail"
     },
     {
-      "name": "roboflow_dataset_upload",
-      "type": "roboflow_core/roboflow_dataset_upload@v2",
-      "images": "$steps.draw_custom_label.output_image",
-      "target_project": "audtheia-official-database",
-      "usage_quota_name": "upload_quota_RDjlO",
-      "predictions": "$steps.model.predictions"
+      "name": "dataset_upload_policy",
+      "type": "Active_Learning_Upload_Policy",
+      "image": "$inputs.image",
+      "predictions": "$steps.tiled_inference.predictions",
+      "new_instances": "$steps.byte_tracker.new_instances"
     },
     {
       "name": "anthropic_environmental_analyzer",
       "type": "Anthropic_Environmental_Analyzer",
       "detections": "$steps.detection_converter.detections",
-      "image": "$steps.draw_custom_label.output_image"
+      "image": "$inputs.image",
+      "tracked_detections": "$steps.byte_tracker.tracked_detections"
     },
     {
       "name": "analyst_caller",
       "type": "Analyst_Caller",
-      "anthropic_analysis": "$steps.anthropic_environmental_analyzer.anthropic_analysis"
+      "anthropic_analysis": "$steps.anthropic_environmental_analyzer.anthropic_analysis",
+      "image": "$inputs.image",
+      "observations": "$steps.track_lifecycle.observations"
     }
   ],
   "outputs": [
@@ -74,9 +93,103 @@
       "name": "output_image",
       "coordinates_system": "own",
       "selector": "$steps.draw_custom_label.output_image"
+    },
+    {
+      "type": "JsonField",
+      "name": "tracked_detections",
+      "coordinates_system": "own",
+      "selector": "$steps.byte_tracker.tracked_detections"
+    },
+    {
+      "type": "JsonField",
+      "name": "detection_converter",
+      "selector": "$steps.detection_converter.*"
+    },
+    {
+      "type": "JsonField",
+      "name": "track_observations",
+      "selector": "$steps.track_lifecycle.observations"
+    },
+    {
+      "type": "JsonField",
+      "name": "track_identifications",
+      "selector": "$steps.anthropic_environmental_analyzer.track_identifications"
+    },
+    {
+      "type": "JsonField",
+      "name": "snapshot_stats",
+      "selector": "$steps.anthropic_environmental_analyzer.snapshot_stats"
+    },
+    {
+      "type": "JsonField",
+      "name": "anthropic_analysis",
+      "selector": "$steps.anthropic_environmental_analyzer.anthropic_analysis"
+    },
+    {
+      "type": "JsonField",
+      "name": "tile_stats",
+      "selector": "$steps.tiled_inference.tile_stats"
     }
   ],
   "dynamic_blocks_definitions": [
+    {
+      "type": "DynamicBlockDefinition",
+      "manifest": {
+        "type": "ManifestDescription",
+        "description": "Tiled ROI inference for high-resolution frames: re-runs the model at full resolution on overlapping tiles that are active (motion, last frame's detections, one idle tile in rotation), batched in one call, and merges the result with the whole-frame predictions by class-wise NMS.",
+        "block_type": "Tiled_ROI_Inference",
+        "inputs": {
+          "image": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_image",
+              "step_output_image"
+            ],
+            "selector_data_kind": {
+              "input_image": [
+                "image"
+              ],
+              "step_output_image": [
+                "image"
+              ]
+            }
+          },
+          "predictions": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "object_detection_prediction"
+              ],
+              "step_output": [
+                "object_detection_prediction"
+              ]
+            }
+          }
+        },
+        "outputs": {
+          "predictions": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "object_detection_prediction"
+            ]
+          },
+          "tile_stats": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "dictionary"
+            ]
+          }
+        }
+      },
+      "code": {
+        "type": "PythonCode",
+        "run_function_code": "import time\nimport uuid\nimport threading\nimport cv2\nimport numpy as np\nimport supervision as sv\nfrom typing import Any, Dict, List, Optional, Tuple\n\n# === TILE MODEL CONFIGURATION ===\nROBOFLOW_API_KEY = \"[YOUR-API-KEY-HERE]\"\nMODEL_ID = \"official-porifera-classifier-ju8er/12\"  # Same model as the workflow's `model` step\nCONFIDENCE_THRESHOLD = 0.4\nMODEL_RETRY_SECONDS = 60.0\n\n# === TILING CONFIGURATION ===\nTILE_SIZE = 640  # Model input size, so tiles are seen at full resolution\nTILE_OVERLAP = 128  # At least; grids widen it so every organism left to the tiles fits whole in one\nMIN_TILED_SIDE = 1280  # Frames no larger than this only get the whole-frame pass\nMAX_TILES_PER_FRAME = 8  # Hard cap on model work per frame, highest priority first\nSWEEP_TILES_PER_FRAME = 1  # Idle tiles visited in rotation, so still organisms are found\nNMS_IOU = 0.5\nEDGE_MARGIN = 2  # Boxes this close to a tile edge shared with a tile that also ran are cut fragments\nFRAGMENT_COVERED = 0.6  # Fragments this much inside a same-class box are part of it; the rest are joined\n\n# === ACTIVITY CONFIGURATION ===\nMOTION_WIDTH = 480  # Motion is measured on a grayscale copy this wide\nMOTION_PIXEL_DELTA = 15\nMOTION_MIN_FRACTION = 0.002  # Share of a tile's pixels that must change\nPRIOR_MARGIN = 32  # Detections keep the tiles within this many pixels active on the next frame\nWHOLE_FRAME_MIN_SIDE = 32  # Organisms this many model-input pixels across are left to the whole-frame pass\nDEFAULT_STREAM_ID = \"default_source\"\n\n# Priorities: prior detections first (they are why the tile is worth a look), then motion, then sweep\nPRIORITY_PRIOR, PRIORITY_MOTION, PRIORITY_SWEEP = 3.0, 2.0, 1.0\n\ndef small_side(width: int, height: int) -> float:\n    \"\"\"Frame-space size below which the whole-frame pass, seeing the frame shrunk to TILE_SIZE, misses an organism\"\"\"\n    return WHOLE_FRAME_MIN_SIDE * max(width, height) / float(TILE_SIZE)\n\nclass TileGrid:\n    \"\"\"Overlapping TILE_SIZE tiles covering a frame, spread evenly so the last tile ends at the border.\n    Neighbours overlap by at least the small-organism size, so such an organism cut by one tile is whole in the next.\"\"\"\n\n    def __init__(self, width: int, height: int):\n        self.size = (width, height)\n        self.overlap = min(max(TILE_OVERLAP, int(np.ceil(small_side(width, height))) + 2 * EDGE_MARGIN), TILE_SIZE // 2)\n        self.xs = self._starts(width, self.overlap)\n        self.ys = self._starts(height, self.overlap)\n        self.boxes = np.array([[x, y, min(x + TILE_SIZE, width), min(y + TILE_SIZE, height)]\n                               for y in self.ys for x in self.xs], dtype=np.int32)\n        self.columns = len(self.xs)\n\n    @staticmethod\n    def _starts(length: int, overlap: int) -> List[int]:\n        if length <= TILE_SIZE:\n            return [0]\n        count = int(np.ceil((length - overlap) / (TILE_SIZE - overlap)))\n        return [int(round(v)) for v in np.linspace(0, length - TILE_SIZE, count)]\n\n    def neighbour(self, index: int, d_column: int, d_row: int) -> Optional[int]:\n        row, column = divmod(index, self.columns)\n        row, column = row + d_row, column + d_column\n        if 0 <= column < self.columns and 0 <= row < len(self.ys):\n            return row * self.columns + column\n        return None\n\nclass StreamTileState:\n    \"\"\"Previous motion frame, last merged detections and sweep position of one stream\"\"\"\n\n    def __init__(self):\n        self.lock = threading.Lock()\n        self.grid: Optional[TileGrid] = None\n        self.previous_small: Optional[np.ndarray] = None\n        self.previous_boxes = np.zeros((0, 4), dtype=np.float32)\n        self.sweep_cursor = 0\n        self.waiting: Optional[np.ndarray] = None  # frames each wanted tile has been passed over by the cap\n        self.frames = 0\n        self.tiles_run = 0\n\n_streams: Dict[str, StreamTileState] = {}\n_streams_lock = threading.Lock()\n_model = None\n_model_lock = threading.Lock()\n_model_retry_at = 0.0\n\ndef get_stream_state(stream_id: str) -> StreamTileState:\n    with _streams_lock:\n        state = _streams.get(stream_id)\n        if state is None:\n            state = _streams[stream_id] = StreamTileState()\n        return state\n\ndef get_tile_model():\n    \"\"\"The tile model, loaded on first use; None (whole-frame pass only) until it loads\"\"\"\n    global _model, _model_retry_at\n    if _model is not None:\n        return _model\n    with _model_lock:\n        if _model is None and time.time() >= _model_retry_at:\n            try:\n                from inference import get_model\n                _model = get_model(MODEL_ID, api_key=ROBOFLOW_API_KEY)\n            except Exception as e:\n                _model_retry_at = time.time() + MODEL_RETRY_SECONDS\n                print(f\"⚠️ Tiled inference: model {MODEL_ID} unavailable, whole-frame pass only: {e}\")\n        return _model\n\ndef is_small(boxes: np.ndarray, width: int, height: int) -> np.ndarray:\n    \"\"\"Per box: too small for the whole-frame pass, which sees the frame shrunk to TILE_SIZE\"\"\"\n    return np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]) < small_side(width, height)\n\ndef motion_fractions(state: StreamTileState, frame: np.ndarray, grid: TileGrid, ignore: np.ndarray) -> np.ndarray:\n    \"\"\"Changed-pixel share per tile against the previous frame (zeros on the first frame);\n    motion inside the `ignore` boxes (organisms the whole-frame pass already has) does not count\"\"\"\n    height, width = frame.shape[:2]\n    scale = MOTION_WIDTH / float(width)\n    small = cv2.resize(frame, (MOTION_WIDTH, max(1, int(round(height * scale)))), interpolation=cv2.INTER_AREA)\n    if small.ndim == 3:\n        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)\n    small = cv2.GaussianBlur(small, (5, 5), 0)\n    previous, state.previous_small = state.previous_small, small\n    if previous is None or previous.shape != small.shape:\n        return np.zeros(len(grid.boxes), dtype=np.float32)\n    moving = (cv2.absdiff(small, previous) > MOTION_PIXEL_DELTA).astype(np.uint8)\n    for x1, y1, x2, y2 in np.round(ignore * scale).astype(np.int32):\n        moving[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 0\n    integral = cv2.integral(moving)\n    tiles = np.clip(np.round(grid.boxes * scale).astype(np.int32), 0,\n                    [small.shape[1], small.shape[0], small.shape[1], small.shape[0]])\n    x1, y1, x2, y2 = tiles.T\n    changed = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]\n    area = np.maximum((x2 - x1) * (y2 - y1), 1)\n    return changed / area\n\ndef tiles_touching(grid: TileGrid, boxes: np.ndarray) -> np.ndarray:\n    \"\"\"Per tile: does any box (grown by PRIOR_MARGIN) overlap it\"\"\"\n    if len(boxes) == 0:\n        return np.zeros(len(grid.boxes), dtype=bool)\n    grown = boxes + np.array([-PRIOR_MARGIN, -PRIOR_MARGIN, PRIOR_MARGIN, PRIOR_MARGIN], dtype=np.float32)\n    tiles = grid.boxes.astype(np.float32)\n    overlap_x = (grown[None, :, 0] < tiles[:, None, 2]) & (grown[None, :, 2] > tiles[:, None, 0])\n    overlap_y = (grown[None, :, 1] < tiles[:, None, 3]) & (grown[None, :, 3] > tiles[:, None, 1])\n    return (overlap_x & overlap_y).any(axis=1)\n\ndef select_tiles(state: StreamTileState, grid: TileGrid, motion: np.ndarray, prior: np.ndarray) -> Dict[str, List[int]]:\n    \"\"\"Active tiles by reason, at most MAX_TILES_PER_FRAME in total\"\"\"\n    if state.waiting is None or len(state.waiting) != len(grid.boxes):\n        state.waiting = np.zeros(len(grid.boxes), dtype=np.float32)\n    # Tiles the cap has passed over gain half a reason per frame, so motion in a new\n    # place still gets a look when known organisms fill the budget\n    bonus = state.waiting * 0.5\n    priority = np.zeros(len(grid.boxes), dtype=np.float32)\n    moving = motion >= MOTION_MIN_FRACTION\n    priority[moving] = PRIORITY_MOTION + bonus[moving]\n    priority[prior] = PRIORITY_PRIOR + bonus[prior]\n    idle = np.flatnonzero(priority == 0)\n    for _ in range(min(SWEEP_TILES_PER_FRAME, len(idle))):\n        # Next idle tile at or after the cursor, wrapping around\n        after = idle[idle >= state.sweep_cursor]\n        tile = int(after[0]) if len(after) else int(idle[0])\n        priority[tile] = PRIORITY_SWEEP\n        idle = idle[idle != tile]\n        state.sweep_cursor = (tile + 1) % len(grid.boxes)\n    wanted = [int(i) for i in np.argsort(-priority, kind=\"stable\") if priority[i] > 0]\n    order = wanted[:MAX_TILES_PER_FRAME]\n    state.waiting[wanted[MAX_TILES_PER_FRAME:]] += 1.0\n    state.waiting[order] = 0.0\n    state.waiting[priority == 0] = 0.0\n    reasons = {\"prior\": [], \"motion\": [], \"sweep\": []}\n    for tile in order:\n        reason = \"prior\" if priority[tile] >= PRIORITY_PRIOR else \"motion\" if priority[tile] >= PRIORITY_MOTION else \"sweep\"\n        reasons[reason].append(tile)\n    return reasons\n\ndef tile_detections(responses: List[Any], grid: TileGrid, tiles: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:\n    \"\"\"Model responses for the tile crops -> frame-space xyxy, confidence, class_id, class_name, cut;\n    `cut` marks boxes on an edge shared with another tile that ran, likely fragments of a larger organism\"\"\"\n    ran = set(tiles)\n    xyxy, confidence, class_id, class_name, cut = [], [], [], [], []\n    for tile, response in zip(tiles, responses):\n        x0, y0, x1, y1 = (int(v) for v in grid.boxes[tile])\n        # Interior edges where a neighbouring tile also ran and sees past them\n        shared = {side: grid.neighbour(tile, dx, dy) in ran\n                  for side, dx, dy in ((\"left\", -1, 0), (\"right\", 1, 0), (\"top\", 0, -1), (\"bottom\", 0, 1))}\n        for prediction in getattr(response, \"predictions\", None) or []:\n            half_w, half_h = prediction.width / 2.0, prediction.height / 2.0\n            box = [x0 + prediction.x - half_w, y0 + prediction.y - half_h, x0 + prediction.x + half_w, y0 + prediction.y + half_h]\n            cut.append((shared[\"left\"] and box[0] <= x0 + EDGE_MARGIN) or (shared[\"right\"] and box[2] >= x1 - EDGE_MARGIN)\n                       or (shared[\"top\"] and box[1] <= y0 + EDGE_MARGIN) or (shared[\"bottom\"] and box[3] >= y1 - EDGE_MARGIN))\n            xyxy.append(box)\n            confidence.append(float(prediction.confidence))\n            class_id.append(int(prediction.class_id))\n            class_name.append(str(getattr(prediction, \"class_name\", None) or getattr(prediction, \"class\", \"\")))\n    return (np.asarray(xyxy, dtype=np.float32).reshape(-1, 4), np.asarray(confidence, dtype=np.float32),\n            np.asarray(class_id, dtype=int), np.asarray(class_name, dtype=object), np.asarray(cut, dtype=bool))\n\ndef merge_fragments(xyxy: np.ndarray, confidence: np.ndarray, class_id: np.ndarray, cut: np.ndarray,\n                    whole_xyxy: np.ndarray, whole_class_id: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:\n    \"\"\"Tile detections with cut fragments resolved -> (kept indices, xyxy, confidence).\n    A fragment mostly inside a same-class uncut or whole-frame box is dropped; the others are\n    joined with the same-class fragments they overlap into one union box at their best confidence.\"\"\"\n    xyxy = xyxy.copy()\n    confidence = confidence.copy()\n    fragments = np.flatnonzero(cut)\n    if len(fragments) == 0:\n        return np.arange(len(xyxy)), xyxy, confidence\n    cover_xyxy = np.concatenate([whole_xyxy.reshape(-1, 4), xyxy[~cut]])\n    cover_class = np.concatenate([whole_class_id.astype(int), class_id[~cut]])\n    area = np.prod(np.clip(xyxy[:, 2:] - xyxy[:, :2], 1e-6, None), axis=1)\n\n    def inside(index: int, others: np.ndarray) -> np.ndarray:\n        top_left = np.maximum(xyxy[index, :2], others[:, :2])\n        bottom_right = np.minimum(xyxy[index, 2:], others[:, 2:])\n        return np.prod(np.clip(bottom_right - top_left, 0, None), axis=1) / area[index]\n\n    dropped = np.zeros(len(xyxy), dtype=bool)\n    for index in fragments:\n        same = cover_class == class_id[index]\n        dropped[index] = bool(same.any()) and inside(index, cover_xyxy[same]).max() >= FRAGMENT_COVERED\n    fragments = fragments[~dropped[fragments]]\n    # Join overlapping same-class fragments, repeating until no union grows into another\n    changed = True\n    while changed:\n        changed = False\n        for position, index in enumerate(fragments):\n            if dropped[index]:\n                continue\n            for other in fragments[position + 1:]:\n                if dropped[other] or class_id[other] != class_id[index] or inside(index, xyxy[other:other + 1])[0] <= 0:\n                    continue\n                xyxy[index, :2] = np.minimum(xyxy[index, :2], xyxy[other, :2])\n                xyxy[index, 2:] = np.maximum(xyxy[index, 2:], xyxy[other, 2:])\n                area[index] = np.prod(xyxy[index, 2:] - xyxy[index, :2])\n                confidence[index] = max(confidence[index], confidence[other])\n                dropped[other] = changed = True\n    return np.flatnonzero(~dropped), xyxy, confidence\n\ndef classwise_nms(xyxy: np.ndarray, confidence: np.ndarray, class_id: np.ndarray, iou_threshold: float) -> np.ndarray:\n    \"\"\"Indices kept by greedy NMS run separately per class, highest confidence first\"\"\"\n    keep = []\n    for cls in np.unique(class_id):\n        candidates = np.flatnonzero(class_id == cls)\n        candidates = candidates[np.argsort(-confidence[candidates], kind=\"stable\")]\n        while len(candidates):\n            best, rest = candidates[0], candidates[1:]\n            keep.append(best)\n            top_left = np.maximum(xyxy[best, :2], xyxy[rest, :2])\n            bottom_right = np.minimum(xyxy[best, 2:], xyxy[rest, 2:])\n            intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)\n            area_best = np.prod(xyxy[best, 2:] - xyxy[best, :2])\n            area_rest = np.prod(xyxy[rest, 2:] - xyxy[rest, :2], axis=1)\n            iou = intersection / np.maximum(area_best + area_rest - intersection, 1e-6)\n            candidates = rest[iou < iou_threshold]\n    return np.sort(np.asarray(keep, dtype=int))\n\ndef frame_data(image: Any, class_name: np.ndarray, reference: Any) -> Dict[str, np.ndarray]:\n    \"\"\"Detection data for tile results, with the same keys the `model` step attaches.\n    Per-frame values are copied from the whole-frame predictions when it has any.\"\"\"\n    count = len(class_name)\n    detection_ids = np.array([str(uuid.uuid4()) for _ in range(count)], dtype=object)\n    if reference is not None and len(reference) > 0:\n        data = {key: np.repeat(np.asarray(values)[:1], count, axis=0) for key, values in reference.data.items()}\n        data[\"class_name\"] = class_name\n        data[\"detection_id\"] = detection_ids\n        return data\n    height, width = image.numpy_image.shape[:2]\n    parent_id = image.parent_metadata.parent_id\n    root = getattr(image, \"workflow_root_ancestor_metadata\", None)\n    return {\n        \"class_name\": class_name,\n        \"detection_id\": detection_ids,\n        \"parent_id\": np.array([parent_id] * count, dtype=object),\n        \"root_parent_id\": np.array([getattr(root, \"parent_id\", parent_id)] * count, dtype=object),\n        \"prediction_type\": np.array([\"object-detection\"] * count, dtype=object),\n        \"image_dimensions\": np.tile([height, width], (count, 1)),\n        \"parent_dimensions\": np.tile([height, width], (count, 1)),\n        \"root_parent_dimensions\": np.tile([height, width], (count, 1)),\n        \"parent_coordinates\": np.zeros((count, 2), dtype=int),\n        \"root_parent_coordinates\": np.zeros((count, 2), dtype=int),\n    }\n\ndef merge_predictions(image: Any, predictions: Any, xyxy, confidence, class_id, class_name) -> Any:\n    \"\"\"Whole-frame predictions plus tile detections, overlaps removed by class-wise NMS\"\"\"\n    tiles = sv.Detections(xyxy=xyxy, confidence=confidence, class_id=class_id,\n                          data=frame_data(image, class_name, predictions))\n    if predictions is None or len(predictions) == 0:\n        merged = tiles\n    else:\n        merged = sv.Detections(\n            xyxy=np.concatenate([np.asarray(predictions.xyxy, dtype=np.float32), xyxy]),\n            confidence=np.concatenate([np.asarray(predictions.confidence, dtype=np.float32), confidence]),\n            class_id=np.concatenate([np.asarray(predictions.class_id, dtype=int), class_id]),\n            data={key: np.concatenate([np.asarray(values), tiles.data[key]]) for key, values in predictions.data.items()},\n        )\n    return merged[classwise_nms(merged.xyxy, merged.confidence, merged.class_id, NMS_IOU)]\n\ndef run(self, image: Any, predictions: Any) -> Dict[str, Any]:\n    \"\"\"\n    TILED ROI INFERENCE\n    Re-runs the model at full resolution on the active tiles of large frames\n    (motion, last frame's detections, one idle tile in rotation) in one batched\n    call, and merges the result with the whole-frame predictions\n    \"\"\"\n    try:\n        stream_id = str(image.video_metadata.video_identifier)\n    except Exception:\n        stream_id = DEFAULT_STREAM_ID\n    stats = {\"stream_id\": stream_id, \"tiled\": False, \"tiles_total\": 0, \"tiles_run\": 0,\n             \"prior\": 0, \"motion\": 0, \"sweep\": 0, \"detections_added\": 0, \"model_ms\": 0.0}\n\n    try:\n        frame = image.numpy_image\n        height, width = frame.shape[:2]\n        if max(width, height) <= MIN_TILED_SIDE:\n            return {\"predictions\": predictions, \"tile_stats\": stats}\n        state = get_stream_state(stream_id)\n        with state.lock:\n            if state.grid is None or state.grid.size != (width, height):\n                state.grid = TileGrid(width, height)\n                state.previous_small = None\n                state.sweep_cursor = 0\n            grid = state.grid\n            whole_frame = np.zeros((0, 4), dtype=np.float32)\n            if predictions is not None and len(predictions) > 0:\n                whole_frame = np.asarray(predictions.xyxy, dtype=np.float32).reshape(-1, 4)\n            # Large organisms need no tiles: their boxes neither activate tiles nor count as motion\n            motion = motion_fractions(state, frame, grid, whole_frame[~is_small(whole_frame, width, height)])\n            prior_boxes = np.concatenate([state.previous_boxes, whole_frame])\n            prior_boxes = prior_boxes[is_small(prior_boxes, width, height)]\n            reasons = select_tiles(state, grid, motion, tiles_touching(grid, prior_boxes))\n\n        tiles = reasons[\"prior\"] + reasons[\"motion\"] + reasons[\"sweep\"]\n        stats.update(tiled=True, tiles_total=len(grid.boxes), **{reason: len(found) for reason, found in reasons.items()})\n        model = get_tile_model() if tiles else None\n        merged = predictions\n        if model is not None:\n            crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in grid.boxes[tiles]]\n            started = time.perf_counter()\n            responses = model.infer(crops, confidence=CONFIDENCE_THRESHOLD)\n            stats[\"model_ms\"] = round((time.perf_counter() - started) * 1000.0, 2)\n            stats[\"tiles_run\"] = len(tiles)\n            if not isinstance(responses, list):\n                responses = [responses]\n            xyxy, confidence, class_id, class_name, cut = tile_detections(responses, grid, tiles)\n            whole_class_id = np.asarray(predictions.class_id, dtype=int) if len(whole_frame) else np.zeros(0, dtype=int)\n            keep, xyxy, confidence = merge_fragments(xyxy, confidence, class_id, cut, whole_frame, whole_class_id)\n            xyxy, confidence, class_id, class_name = xyxy[keep], confidence[keep], class_id[keep], class_name[keep]\n            merged = merge_predictions(image, predictions, xyxy, confidence, class_id, class_name)\n            stats[\"detections_added\"] = len(merged) - (len(predictions) if predictions is not None else 0)\n\n        with state.lock:\n            state.previous_boxes = np.asarray(merged.xyxy, dtype=np.float32).reshape(-1, 4) if merged is not None else np.zeros((0, 4), dtype=np.float32)\n            state.frames += 1\n            state.tiles_run += stats[\"tiles_run\"]\n            stats[\"mean_tiles_run\"] = round(state.tiles_run / state.frames, 2)\n        return {\"predictions\": merged, \"tile_stats\": stats}\n    except Exception as e:\n        stats[\"error\"] = str(e)\n        return {\"predictions\": predictions, \"tile_stats\": stats}\n"
+      }
+    },
     {
       "type": "DynamicBlockDefinition",
       "manifest": {
@@ -98,20 +211,50 @@
                 "dictionary"
               ]
             }
+          },
+          "image": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_image",
+              "step_output_image"
+            ],
+            "selector_data_kind": {
+              "input_image": [
+                "image"
+              ],
+              "step_output_image": [
+                "image"
+              ]
+            }
+          },
+          "observations": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "dictionary"
+              ],
+              "step_output": [
+                "dictionary"
+              ]
+            }
           }
         },
         "outputs": {}
       },
       "code": {
         "type": "PythonCode",
-        "run_function_code": "import requests\nimport time\nimport threading\nfrom typing import Any, Dict\nfrom concurrent.futures import ThreadPoolExecutor\n\n# === N8N CONFIGURATION ===\nN8N_WEBHOOK_URL = \"[YOUR-WEBHOOK-URL-HERE]\"\nHTTP_TIMEOUT = 5\nMAX_HTTP_THREADS = 2\n\nclass SilentN8NCommunicator:\n    \"\"\"Silent N8N communicator with aggressive transmission logic\"\"\"\n    \n    def __init__(self):\n        self.frame_counter: int = 0\n        self.total_transmissions: int = 0\n        self.http_executor = ThreadPoolExecutor(max_workers=MAX_HTTP_THREADS, thread_name_prefix=\"N8N\")\n    \n    def should_transmit(self, analysis_text: str) -> bool:\n        \"\"\"Detect any meaningful analysis for transmission\"\"\"\n        \n        if not analysis_text or len(analysis_text) < 50:\n            return False\n        \n        # Accept comprehensive analysis (real Claude OR quality fallback)\n        quality_indicators = [\n            \"claude_environmental_analysis\",\n            \"scientifically_validated\", \n            \"audtheia_environmental_monitoring\",\n            \"Species Identification\",\n            \"Environmental Conditions\",\n            \"Habitat Assessment\",\n            \"Conservation Implications\",\n            \"background_processing_complete\"\n        ]\n        \n        # Reject only basic interim responses\n        reject_patterns = [\n            \"awaiting_claude_analysis\",\n            \"environmental_monitoring_active\"\n        ]\n        \n        has_quality = any(indicator in analysis_text for indicator in quality_indicators)\n        has_reject = any(pattern in analysis_text for pattern in reject_patterns)\n        \n        # Accept if has quality indicators and no reject patterns\n        return has_quality and not has_reject\n    \n    def transmit_to_n8n(self, analysis_text: str, current_time: float):\n        \"\"\"Fire-and-forget transmission to N8N\"\"\"\n        \n        payload = {\n            \"timestamp\": current_time,\n            \"analysis\": analysis_text,\n            \"source\": \"audtheia_environmental_analysis\", \n            \"frame_number\": self.frame_counter,\n            \"system\": \"audtheia_airw\",\n            \"scientific_grade\": True,\n            \"description\": f\"Audtheia environmental analysis - Frame {self.frame_counter}\",\n            \"metadata\": {\n                \"analysis_timestamp\": time.strftime(\"%Y-%m-%dT%H:%M:%SZ\", time.gmtime(current_time)),\n                \"total_transmissions\": self.total_transmissions,\n                \"analysis_length\": len(analysis_text),\n                \"processing_method\": \"claude_environmental_analysis\"\n            }\n        }\n        \n        # Submit to thread pool for immediate return\n        self.http_executor.submit(self._execute_transmission, payload)\n        self.total_transmissions += 1\n\n    def _execute_transmission(self, payload: Dict):\n        \"\"\"Execute HTTP transmission silently\"\"\"\n        try:\n            response = requests.post(\n                N8N_WEBHOOK_URL,\n                json=payload,\n                timeout=HTTP_TIMEOUT,\n                headers={\n                    \"Content-Type\": \"application/json\",\n                    \"User-Agent\": \"Audtheia-AIRW/3.0\"\n                }\n            )\n            # Silent operation - no console output\n        except:\n            # Silent error handling\n            pass\n\n# Global communicator\n_communicator = SilentN8NCommunicator()\n\ndef run(self, anthropic_analysis: Any) -> Dict:\n    \"\"\"\n    SILENT ANALYST CALLER\n    Transmits comprehensive analysis to N8N with minimal console output\n    \"\"\"\n    global _communicator\n    \n    _communicator.frame_counter += 1\n    current_time = time.time()\n    \n    try:\n        # Extract analysis text\n        if isinstance(anthropic_analysis, dict):\n            analysis_text = anthropic_analysis.get(\"anthropic_analysis\", \"\")\n        else:\n            analysis_text = str(anthropic_analysis) if anthropic_analysis else \"\"\n        \n        # Transmit if meaningful analysis detected\n        if _communicator.should_transmit(analysis_text):\n            _communicator.transmit_to_n8n(analysis_text, current_time)\n        \n        return {}\n        \n    except:\n        return {}"
+        "run_function_code": "import requests\nimport time\nimport threading\nfrom collections import deque\nfrom typing import Any, Dict, List\n\ntry:\n    # Out-of-process network I/O (roboflow-workflows/io_sidecar.py), used when AUDTHEIA_IO_SIDECAR is set\n    from io_sidecar import client as io_sidecar_client\nexcept ImportError:\n    io_sidecar_client = None\n\ntry:\n    # End-of-stream delivery of the aggregator's last open visits (roboflow-workflows/stream_hooks.py)\n    from stream_hooks import register_sink\nexcept ImportError:\n    register_sink = None\n\n# === N8N CONFIGURATION ===\nN8N_WEBHOOK_URL = \"[YOUR-WEBHOOK-URL-HERE]\"\nHTTP_TIMEOUT = 5\nMAX_HTTP_THREADS = 2\nMAX_PENDING_PER_STREAM = 8  # Oldest queued transmission is dropped beyond this\nDEFAULT_STREAM_ID = \"default_source\"\n\n# === OBSERVATION STORE CONFIGURATION ===\n# Track visits go to the observation store (observation-store/, POST /observations), not to the\n# RTSP Analyst webhook, which expects one analysis per call; nothing is sent while this is unset\nOBSERVATIONS_URL = \"[YOUR-OBSERVATIONS-URL-HERE]\"\n\nclass FairStreamScheduler:\n    \"\"\"Round-robin work queue shared by all streams - every stream with pending work\n    gets a turn before any stream gets a second one, within a fixed worker budget\"\"\"\n    \n    def __init__(self, max_workers: int, max_pending_per_stream: int, name: str):\n        self.max_workers = max_workers\n        self.max_pending_per_stream = max_pending_per_stream\n        self.name = name\n        self.condition = threading.Condition()\n        self.pending: Dict[str, deque] = {}\n        self.rotation: deque = deque()\n        self.dropped: int = 0\n        self.workers: List[threading.Thread] = []\n    \n    def submit(self, stream_id: str, task) -> None:\n        with self.condition:\n            queue = self.pending.setdefault(stream_id, deque())\n            if not queue:\n                self.rotation.append(stream_id)\n            elif len(queue) >= self.max_pending_per_stream:\n                queue.popleft()\n                self.dropped += 1\n            queue.append(task)\n            if len(self.workers) < self.max_workers:\n                worker = threading.Thread(target=self._work, name=f\"{self.name}-{len(self.workers)}\", daemon=True)\n                self.workers.append(worker)\n                worker.start()\n            self.condition.notify()\n    \n    def _work(self):\n        while True:\n            with self.condition:\n                while not self.rotation:\n                    self.condition.wait()\n                stream_id = self.rotation.popleft()\n                queue = self.pending[stream_id]\n                task = queue.popleft()\n                if queue:\n                    self.rotation.append(stream_id)\n            try:\n                task()\n            except Exception:\n                pass\n\nclass SilentN8NCommunicator:\n    \"\"\"Silent N8N communicator with aggressive transmission logic - one per video stream\"\"\"\n    \n    def __init__(self, stream_id: str = DEFAULT_STREAM_ID):\n        self.stream_id = stream_id\n        self.frame_counter: int = 0\n        self.total_transmissions: int = 0\n    \n    def should_transmit(self, analysis_text: str) -> bool:\n        \"\"\"Detect any meaningful analysis for transmission\"\"\"\n        \n        if not analysis_text or len(analysis_text) < 50:\n            return False\n        \n        # Accept comprehensive analysis (real Claude OR quality fallback)\n        quality_indicators = [\n            \"claude_environmental_analysis\",\n            \"scientifically_validated\", \n            \"audtheia_environmental_monitoring\",\n            \"Species Identification\",\n            \"Environmental Conditions\",\n            \"Habitat Assessment\",\n            \"Conservation Implications\",\n            \"background_processing_complete\"\n        ]\n        \n        # Reject only basic interim responses\n        reject_patterns = [\n            \"awaiting_claude_analysis\",\n            \"environmental_monitoring_active\"\n        ]\n        \n        has_quality = any(indicator in analysis_text for indicator in quality_indicators)\n        has_reject = any(pattern in analysis_text for pattern in reject_patterns)\n        \n        # Accept if has quality indicators and no reject patterns\n        return has_quality and not has_reject\n    \n    def transmit_to_n8n(self, analysis_text: str, current_time: float):\n        \"\"\"Fire-and-forget transmission to N8N\"\"\"\n        \n        payload = {\n            \"timestamp\": current_time,\n            \"analysis\": analysis_text,\n            \"source\": \"audtheia_environmental_analysis\", \n            \"stream_id\": self.stream_id,\n            \"frame_number\": self.frame_counter,\n            \"system\": \"audtheia_airw\",\n            \"scientific_grade\": True,\n            \"description\": f\"Audtheia environmental analysis - Frame {self.frame_counter}\",\n            \"metadata\": {\n                \"analysis_timestamp\": time.strftime(\"%Y-%m-%dT%H:%M:%SZ\", time.gmtime(current_time)),\n                \"total_transmissions\": self.total_transmissions,\n                \"analysis_length\": len(analysis_text),\n                \"processing_method\": \"claude_environmental_analysis\"\n            }\n        }\n        \n        self._send(payload)\n\n    def transmit_observations(self, events: List[Dict], current_time: float):\n        \"\"\"Fire-and-forget transmission of completed track visits (one record per animal visit)\"\"\"\n        \n        if not observations_enabled():\n            return\n        self._send(observations_payload(events, self.stream_id, current_time), OBSERVATIONS_URL, \"observations\")\n\n    def _send(self, payload: Dict, url: str = None, service: str = \"n8n\"):\n        \"\"\"Hand the payload to the I/O sidecar if one is running, else queue it on the shared fair scheduler\"\"\"\n        url = url or N8N_WEBHOOK_URL\n        sidecar = io_sidecar_client() if io_sidecar_client else None\n        if sidecar is None or not sidecar.submit({\n            \"kind\": \"http\", \"service\": service, \"url\": url, \"json\": payload, \"timeout\": HTTP_TIMEOUT,\n            \"headers\": {\"Content-Type\": \"application/json\", \"User-Agent\": \"Audtheia-AIRW/3.0\"},\n        }):\n            _http_scheduler.submit(self.stream_id, lambda: self._execute_transmission(payload, url))\n        self.total_transmissions += 1\n\n    def _execute_transmission(self, payload: Dict, url: str = None):\n        \"\"\"Execute HTTP transmission silently\"\"\"\n        try:\n            response = requests.post(\n                url or N8N_WEBHOOK_URL,\n                json=payload,\n                timeout=HTTP_TIMEOUT,\n                headers={\n                    \"Content-Type\": \"application/json\",\n                    \"User-Agent\": \"Audtheia-AIRW/3.0\"\n                }\n            )\n            # Silent operation - no console output\n        except:\n            # Silent error handling\n            pass\n\ndef observations_enabled() -> bool:\n    return bool(OBSERVATIONS_URL) and not OBSERVATIONS_URL.startswith(\"[\")\n\ndef observations_payload(events: List[Dict], stream_id: str, current_time: float) -> Dict:\n    \"\"\"Track visits for the observation store's POST /observations\"\"\"\n    return {\n        \"timestamp\": current_time,\n        \"source\": \"audtheia_track_observations\",\n        \"stream_id\": stream_id,\n        \"system\": \"audtheia_airw\",\n        \"observations\": events,\n        \"metadata\": {\n            \"analysis_timestamp\": time.strftime(\"%Y-%m-%dT%H:%M:%SZ\", time.gmtime(current_time)),\n            \"observation_count\": len(events)\n        }\n    }\n\ndef deliver_final_observations(events: List[Dict]):\n    \"\"\"End of stream: post the last visits synchronously, one payload per stream, before the process exits\"\"\"\n    if not observations_enabled():\n        return\n    by_stream: Dict[str, List[Dict]] = {}\n    for event in events:\n        by_stream.setdefault(str(event.get(\"stream_id\", DEFAULT_STREAM_ID)), []).append(event)\n    for stream_id, stream_events in by_stream.items():\n        get_stream_communicator(stream_id)._execute_transmission(\n            observations_payload(stream_events, stream_id, time.time()), OBSERVATIONS_URL)\n\n# Per-stream communicators; webhook concurrency is shared fairly across streams\n_communicators: Dict[str, SilentN8NCommunicator] = {}\n_communicators_lock = threading.Lock()\n_http_scheduler = FairStreamScheduler(MAX_HTTP_THREADS, MAX_PENDING_PER_STREAM, \"N8N\")\n\ndef get_stream_communicator(stream_id: str) -> SilentN8NCommunicator:\n    with _communicators_lock:\n        communicator = _communicators.get(stream_id)\n        if communicator is None:\n            communicator = _communicators[stream_id] = SilentN8NCommunicator(stream_id)\n        return communicator\n\ndef stream_id_for(image: Any) -> str:\n    \"\"\"Source id of the frame (InferencePipeline sets it from the video_reference index)\"\"\"\n    try:\n        return str(image.video_metadata.video_identifier)\n    except Exception:\n        return DEFAULT_STREAM_ID\n\ndef run(self, anthropic_analysis: Any, image: Any = None, observations: Any = None) -> Dict:\n    \"\"\"\n    SILENT ANALYST CALLER\n    Transmits comprehensive analysis to N8N with minimal console output\n    \"\"\"\n    communicator = get_stream_communicator(stream_id_for(image))\n    \n    communicator.frame_counter += 1\n    current_time = time.time()\n    \n    try:\n        # Extract analysis text\n        if isinstance(anthropic_analysis, dict):\n            analysis_text = anthropic_analysis.get(\"anthropic_analysis\", \"\")\n        else:\n            analysis_text = str(anthropic_analysis) if anthropic_analysis else \"\"\n        \n        # Transmit if meaningful analysis detected\n        if communicator.should_transmit(analysis_text):\n            communicator.transmit_to_n8n(analysis_text, current_time)\n        \n        # Track visits closed by the lifecycle aggregator travel as one batch per frame\n        if isinstance(observations, dict) and observations.get(\"events\"):\n            communicator.transmit_observations(observations[\"events\"], current_time)\n        \n        return {}\n        \n    except:\n        return {}\n\nif register_sink:\n    register_sink(\"Analyst_Caller\", deliver_final_observations)\n"
       }
     },
     {
       "type": "DynamicBlockDefinition",
       "manifest": {
         "type": "ManifestDescription",
-        "description": "Uses Anthropic Claude to analyze environmental context with true asynchronous processing.",
+        "description": "Uses Anthropic Claude to analyze environmental context with true asynchronous processing. Recent tracks are sent as one mosaic of their sharpest crops and the per-tile answers are mapped back to tracker IDs.",
         "block_type": "Anthropic_Environmental_Analyzer",
         "inputs": {
           "detections": {
@@ -143,6 +286,21 @@
                 "image"
               ]
             }
+          },
+          "tracked_detections": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "object_detection_prediction"
+              ],
+              "step_output": [
+                "object_detection_prediction"
+              ]
+            }
           }
         },
         "outputs": {
@@ -151,12 +309,24 @@
             "kind": [
               "dictionary"
             ]
+          },
+          "track_identifications": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "dictionary"
+            ]
+          },
+          "snapshot_stats": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "dictionary"
+            ]
           }
         }
       },
       "code": {
         "type": "PythonCode",
-        "run_function_code": "import requests\nimport base64\nimport time\nimport cv2\nimport threading\nimport numpy as np\nfrom typing import Any, Dict, Optional, List\nfrom inference.core.workflows.execution_engine.entities.base import WorkflowImageData\n\n# === ANTHROPIC API CONFIGURATION ===\nANTHROPIC_API_KEY = \"[YOUR-API-KEY-HERE]\"\nANTHROPIC_API_URL = \"https://api.anthropic.com/v1/messages\"\n\n# === PROCESSING CONFIGURATION ===\nANALYSIS_INTERVAL_SECONDS = 15.0\nMAX_CONCURRENT_THREADS = 1  # Reduced to prevent API overload\nCLAUDE_IMAGE_SIZE = 800  # Reduced size to prevent API issues\nAPI_TIMEOUT_SECONDS = 20\n\n# === THREAD-SAFE STATE ===\nstatelock = threading.RLock()\n\nclass SilentClaudeProcessor:\n    def __init__(self):\n        self.frame_counter: int = 0\n        self.last_analysis_time: float = 0.0\n        self.latest_claude_result: str = None\n        self.active_threads: int = 0\n        self.processed_hashes: set = set()\n\n    def should_start_analysis(self, current_time: float) -> bool:\n        with statelock:\n            if self.active_threads >= MAX_CONCURRENT_THREADS:\n                return False\n            time_since_last = current_time - self.last_analysis_time\n            return time_since_last >= ANALYSIS_INTERVAL_SECONDS\n\n    def update_result(self, result: str, timestamp: float):\n        with statelock:\n            self.latest_claude_result = result\n            self.last_analysis_time = timestamp\n\n    def get_latest_result(self) -> Optional[str]:\n        with statelock:\n            return self.latest_claude_result\n\n# Global processor instance\n_processor = SilentClaudeProcessor()\n\ndef convertimage_to_base64_fixed(image: WorkflowImageData) -> Optional[str]:\n    \"\"\"Fixed image conversion with proper error handling\"\"\"\n    try:\n        # Extract numpy array from different possible formats\n        if hasattr(image, 'numpy_image') and image.numpy_image is not None:\n            img_array = image.numpy_image\n        elif hasattr(image, 'data') and image.data is not None:\n            img_array = image.data\n        else:\n            return None\n        \n        if img_array is None or len(img_array.shape) != 3:\n            return None\n        \n        # Convert RGBA to RGB if needed\n        if img_array.shape[2] == 4:\n            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)\n        elif img_array.shape[2] != 3:\n            return None\n        \n        # Ensure uint8\n        if img_array.dtype != np.uint8:\n            img_array = img_array.astype(np.uint8)\n        \n        # Resize for API compatibility\n        height, width = img_array.shape[:2]\n        if height > CLAUDE_IMAGE_SIZE or width > CLAUDE_IMAGE_SIZE:\n            if height > width:\n                new_height = CLAUDE_IMAGE_SIZE\n                new_width = int(CLAUDE_IMAGE_SIZE * width / height)\n            else:\n                new_width = CLAUDE_IMAGE_SIZE  \n                new_height = int(CLAUDE_IMAGE_SIZE * height / width)\n            \n            img_array = cv2.resize(img_array, (new_width, new_height), interpolation=cv2.INTER_AREA)\n        \n        # Encode to JPEG\n        encode_params = [cv2.IMWRITE_JPEG_QUALITY, 85]\n        success, buffer = cv2.imencode('.jpg', img_array, encode_params)\n        \n        if not success:\n            return None\n        \n        # Convert to base64\n        image_bytes = buffer.tobytes()\n        return base64.b64encode(image_bytes).decode('utf-8')\n        \n    except Exception:\n        return None\n\ndef executeclaude_api_call(image: WorkflowImageData, class_names: List[str], \n                           confidences: List[float], current_time: float) -> str:\n    \"\"\"Execute Claude API call with enhanced environmental location intelligence\"\"\"\n    \n    # Convert image to base64\n    image_b64 = convertimage_to_base64_fixed(image)\n    if not image_b64:\n        raise ValueError(\"Image conversion failed\")\n    \n    # Prepare species context\n    if class_names:\n        species_context = f\"{len(class_names)} organisms detected: {', '.join(class_names[:3])}\"\n    else:\n        species_context = \"No organisms detected in current frame\"\n    \n    # ENHANCED CLAUDE PROMPT FOR SYSTEMATICS PHENOLOGIST AI AGENT (SPAI) INTEGRATION\n    prompt = f\"\"\"You are operating as a PhD-level environmental biologist and taxonomist analyzing environmental monitoring footage for the Audtheia Project's global biodiversity surveillance network. Your analysis will be processed by the Systematics Phenologist AI Agent (SPAI) within the RTSP Analyst N8N Workflow to populate specific columns in the Species Observations Airtable database with research-grade precision.\n\n**DETECTION CONTEXT:** {species_context}\n\n**MISSION-CRITICAL DIRECTIVE:** \nYour analysis must provide exact terminology matching Airtable database columns to prevent downstream AI agent hallucinations. Every selection must be based on observable visual evidence combined with established species ecology.\n\n**DYNAMIC HABITAT CLASSIFICATION - PRIMARY ANALYSIS:**\nDetermine the primary habitat type through systematic visual assessment: Marine, Freshwater, Estuarine, Terrestrial, Mixed, or Unknown\n\n**COMPREHENSIVE ENVIRONMENTAL ANALYSIS BY HABITAT TYPE:**\n\n**MARINE ENVIRONMENT ANALYSIS** (if applicable):\n- Water column assessment: clarity (crystal clear/clear/turbid/murky), color variations, depth indicators, visibility range\n- Substrate characterization: coral formations, sand composition (fine/coarse/carbonate), rock types, algal coverage, sediment patterns\n- Ecosystem classification: coral reefs (fringing/barrier/patch), kelp forests, rocky intertidal zones, open ocean pelagic, seagrass beds, mangrove systems\n- Depth zone indicators: shallow tropical (<10m), mid-depth temperate (10-50m), deep-water characteristics (>50m)\n- Current/flow dynamics: wave action, tidal influences, water movement patterns, circulation indicators\n\n**TERRESTRIAL ENVIRONMENT ANALYSIS** (if applicable):\n- Vegetation structure: canopy coverage percentage, understory density, vertical stratification, species composition\n- Topographic features: elevation indicators, slope characteristics, aspect, drainage patterns, microhabitat variation\n- Seasonal phenological indicators: leaf condition (emerging/mature/senescent), flowering status, fruiting evidence, dormancy signs\n- Substrate characteristics: soil exposure, leaf litter depth, rock formations, ground cover composition, moisture indicators\n- Ecosystem classification: deciduous forest, coniferous forest, mixed forest, grassland prairie, savanna, tundra, desert scrubland, agricultural landscape, urban green space\n\n**FRESHWATER ENVIRONMENT ANALYSIS** (if applicable):\n- Hydrological characteristics: flow velocity, water clarity, depth variation, seasonal indicators, temperature cues\n- Ecosystem classification: rivers (fast/slow flowing), streams, lakes (oligotrophic/eutrophic), ponds, wetlands, marshes, swamps, riparian zones\n- Substrate analysis: rocky bottom, sandy substrate, muddy sediment, organic debris, aquatic vegetation presence\n- Water quality indicators: algal presence, turbidity, color, surface conditions\n\n**MIXED/TRANSITIONAL ENVIRONMENT ANALYSIS** (if applicable):\n- Ecotone characteristics: habitat boundary definition, species overlap zones, transition gradients\n- Coastal interfaces: beach/dune systems, rocky shores, estuarine mixing zones\n- Riparian corridors: stream-terrestrial interfaces, floodplain characteristics, wetland edges\n\n**SPECIES-SPECIFIC BEHAVIORAL ANALYSIS (MANDATORY EXACT TERMINOLOGY):**\nFor EACH species observed, provide precise selections based on observable behavioral evidence:\n\n**Activity Period** (mandatory - select exactly 1): Diurnal, Nocturnal, Crepuscular, Unknown\n- Base selection on observation timing, species ecology, and visible activity patterns\n- Consider species-specific circadian preferences and environmental cues\n\n**Behavioral Context** (mandatory - select exactly 1): Feeding, Resting, Social, Sessile, Reproductive, Territorial, Migration, Invasive Species\n- Feeding: foraging behavior, prey capture, feeding postures, food manipulation\n- Resting: stationary positions, reduced activity, roosting behavior, comfort behaviors\n- Social: group interactions, communication displays, cooperative behaviors, aggregation patterns\n- Sessile: permanently attached organisms (corals, sponges, barnacles)\n- Reproductive: courtship displays, mating behavior, nesting activity, parental care\n- Territorial: aggressive displays, boundary defense, resource guarding\n- Migration: directional movement, seasonal positioning, transient behavior\n- Invasive Species: non-native species identification with disruption indicators\n\n**Circadian Phase** (mandatory - select exactly 1): Active, Inactive, Transitional, Peak Activity, Unknown\n- Active: engaged in normal behavioral activities, alert, responsive\n- Inactive: reduced activity, minimal movement, energy conservation mode\n- Transitional: changing between activity states, preparation behaviors\n- Peak Activity: maximum energy behaviors, intense feeding/reproductive activity\n\n**PHENOLOGICAL ASSESSMENT (MANDATORY EXACT TERMINOLOGY):**\nBase selections on observation date, visual life stage evidence, and species-specific reproductive ecology:\n\n**Seasonal Timing** (mandatory - select exactly 1): Expected, Early, Late, Unusual, Unknown\n- Expected: behavior/life stage matches typical seasonal patterns for species\n- Early: phenological event occurring ahead of typical timing\n- Late: phenological event occurring behind typical timing\n- Unusual: atypical behavior or life stage for the season/location\n\n**Life Cycle Stage** (mandatory - select exactly 1): Juvenile, Adult, Reproductive, Migrating, Dormant, Unknown\n- Juvenile: immature individuals, subadult characteristics, growth phase indicators\n- Adult: mature individuals, full size development, adult coloration/characteristics\n- Reproductive: breeding condition indicators, spawning behavior, parental characteristics\n- Migrating: transitional movement, seasonal positioning, directional behavior\n- Dormant: reduced activity, overwintering, estivation, minimal metabolic activity\n\n**Breeding Season** (mandatory - select exactly 1): Pre-Breeding, Breeding, Post-breeding, Non-breeding, Unknown\n- Pre-Breeding: courtship preparation, territory establishment, pre-spawning conditioning\n- Breeding: active reproduction, spawning, nesting, mating displays\n- Post-breeding: parental care, juvenile rearing, post-reproductive recovery\n- Non-breeding: outside reproductive season, non-reproductive social behaviors\n\n**TAXONOMIC PRECISION REQUIREMENTS:**\n- Species identification: Provide genus and species (binomial nomenclature) when confidence is high (>80%)\n- Family-level classification: Always provide family assignment with morphological justification\n- Morphological evidence: List 3-5 specific observable characteristics supporting identification\n- Confidence assessment: Provide numerical confidence (0.0-1.0) with uncertainty factors\n- Population enumeration: Count individuals when possible, note aggregation patterns\n\n**DETAILED SCIENTIFIC NOTES REQUIREMENTS:**\n\n**Chronobiology Notes:** Provide comprehensive behavioral ecology analysis including:\n- Justification for Activity Period, Behavioral Context, and Circadian Phase selections\n- Species-specific temporal activity patterns based on literature and observation\n- Environmental factors influencing behavior (lighting, temperature, tidal cycles)\n- Circadian rhythm alignment with observation timing\n- Behavioral intensity assessment and ecological significance\n\n**Phenology Notes:** Provide detailed seasonal ecology analysis including:\n- Justification for Seasonal Timing, Life Cycle Stage, and Breeding Season selections\n- Species-specific reproductive timing (lunar cycles for marine taxa, seasonal patterns for terrestrial taxa)\n- Developmental stage assessment with morphological evidence\n- Seasonal environmental correlations and climate influences\n- Population-level phenological significance and monitoring value\n\n**MANDATORY RESPONSE STRUCTURE:**\nBegin with: claude_environmentalanalysis, timestamp_{int(current_time)}, scientifically_validated\n\n**Species Identification:** [Binomial nomenclature when possible, family classification, morphological diagnostic features, population count, identification confidence level (0.0-1.0)]\n\n**Environmental Conditions:** [Habitat-specific comprehensive description using appropriate terminology - aquatic descriptors for marine/freshwater environments, terrestrial descriptors for land environments, no cross-contamination of terminology]\n\n**Habitat Assessment:** [Detailed ecosystem classification, structural complexity assessment, habitat quality indicators, environmental stability. Primary classification: Marine, Freshwater, Estuarine, Terrestrial, Mixed, or Unknown]\n\n**Behavioral Observations:** Activity Period: [exact selection], Behavioral Context: [exact selection], Circadian Phase: [exact selection]. [Provide detailed behavioral evidence and species-specific justification for each selection]\n\n**Phenological Assessment:** Seasonal Timing: [exact selection], Life Cycle Stage: [exact selection], Breeding Season: [exact selection]. [Provide detailed phenological evidence and species-specific reproductive ecology justification]\n\n**Chronobiology Notes:** [Comprehensive 100-150 word analysis explaining behavioral observations, temporal activity patterns, circadian ecology, and species-specific behavioral significance based on visual evidence and established behavioral ecology]\n\n**Phenology Notes:** [Comprehensive 100-150 word analysis explaining seasonal timing assessment, life cycle stage determination, breeding season evaluation, and species-specific reproductive ecology based on observation timing and visual evidence]\n\n**Conservation Implications:** [Species conservation status, habitat protection priorities, observed threat indicators, monitoring significance, population health assessment]\n\n**Research Value:** [Scientific significance of observation, data quality metrics, ecological importance, contribution to biodiversity monitoring objectives, research applications]\n\n**Geographic Context:** [Biogeographic positioning, climate zone assessment, ecosystem biogeography, location inference confidence levels, ecological context]\n\n**ABSOLUTE REQUIREMENTS - NO EXCEPTIONS:**\n1. Use ONLY specified exact terminology for Activity Period, Behavioral Context, Circadian Phase, Seasonal Timing, Life Cycle Stage, and Breeding Season\n2. Provide habitat-appropriate environmental descriptions with zero cross-contamination (marine terms only for aquatic species, terrestrial terms only for land species)\n3. Base ALL assessments on observable visual evidence combined with established species ecology\n4. Provide detailed scientific justification for every behavioral and phenological selection\n5. Maintain research-grade scientific accuracy while ensuring perfect SPAI parsing compatibility\n6. Include numerical confidence levels for all taxonomic and ecological assessments\n7. Consider species-specific ecology: lunar reproductive cycles for marine taxa, seasonal patterns for terrestrial taxa\n8. Provide comprehensive chronobiology and phenology notes explaining selection rationales\n\nANALYSIS TARGET: Provide PhD-level environmental analysis optimized for automated processing while maintaining scientific rigor suitable for global biodiversity monitoring applications.\n\nMaximum response: 2000 words for comprehensive scientific analysis.\"\"\"\n\n    # CORRECTED API request format\n    headers = {\n        \"Content-Type\": \"application/json\",\n        \"x-api-key\": ANTHROPIC_API_KEY,\n        \"anthropic-version\": \"2023-06-01\"\n    }\n    \n    # CORRECTED payload structure\n    payload = {\n        \"model\": \"claude-3-5-sonnet-20241022\",\n        \"max_tokens\": 2000,  # Increased for enhanced analysis\n        \"messages\": [\n            {\n                \"role\": \"user\",\n                \"content\": [\n                    {\n                        \"type\": \"image\",\n                        \"source\": {\n                            \"type\": \"base64\",\n                            \"media_type\": \"image/jpeg\",\n                            \"data\": image_b64\n                        }\n                    },\n                    {\n                        \"type\": \"text\", \n                        \"text\": prompt\n                    }\n                ]\n            }\n        ]\n    }\n    \n    response = requests.post(ANTHROPIC_API_URL, headers=headers, json=payload, timeout=API_TIMEOUT_SECONDS)\n    \n    if response.status_code == 200:\n        claude_text = response.json()[\"content\"][0][\"text\"].strip()\n        \n        # Ensure proper formatting\n        if \"claude_environmentalanalysis\" not in claude_text:\n            ts = int(current_time)\n            claude_text = f\"claude_environmentalanalysis, timestamp_{ts}, scientifically_validated, {claude_text}\"\n        \n        # Add completion indicators\n        final_result = f\"audtheia_environmental_monitoring, {claude_text}, background_processing_complete\"\n        return final_result\n    \n    else:\n        # API error - generate comprehensive fallback that looks like Claude analysis\n        return generatecomprehensive_fallback(class_names, current_time)\n\ndef generatecomprehensive_fallback(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate comprehensive fallback with DYNAMIC habitat detection for universal species support\"\"\"\n    \n    timestamp = int(current_time)\n    iso_time = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(current_time))\n    \n    # DYNAMIC HABITAT DETECTION based on species names\n    def detect_habitat_type(species_list: List[str]) -> str:\n        if not species_list:\n            return \"Unknown\"\n        \n        # MARINE/SALTWATER indicators (comprehensive)\n        marine_keywords = [\n            'shark', 'ray', 'tuna', 'grouper', 'snapper', 'angelfish', 'parrotfish', 'wrasse', 'surgeonfish',\n            'butterflyfish', 'triggerfish', 'pufferfish', 'barracuda', 'moray', 'goby', 'blenny',\n            'whale', 'dolphin', 'porpoise', 'seal', 'sea-lion', 'walrus', 'manatee', 'dugong',\n            'coral', 'sponge', 'anemone', 'jellyfish', 'urchin', 'starfish', 'sea-cucumber', 'nudibranch',\n            'octopus', 'squid', 'cuttlefish', 'nautilus', 'lobster', 'crab', 'shrimp', 'krill',\n            'barnacle', 'mussel', 'oyster', 'scallop', 'clam', 'conch', 'abalone', 'limpet',\n            'tunicate', 'bryozoan', 'hydroid', 'zoanthid', 'soft-coral', 'hard-coral',\n            'kelp', 'seaweed', 'algae', 'seagrass', 'marine-algae', 'coralline-algae'\n        ]\n        \n        # FRESHWATER indicators (comprehensive)\n        freshwater_keywords = [\n            'trout', 'bass', 'pike', 'perch', 'catfish', 'salmon', 'sturgeon', 'carp', 'minnow',\n            'sunfish', 'bluegill', 'walleye', 'muskie', 'grayling', 'char', 'darter', 'sucker',\n            'beaver', 'otter', 'muskrat', 'platypus',\n            'duck', 'goose', 'swan', 'heron', 'egret', 'crane', 'kingfisher', 'grebe', 'loon',\n            'pelican', 'cormorant', 'bittern',\n            'turtle', 'terrapin', 'frog', 'toad', 'newt', 'salamander', 'water-snake',\n            'crayfish', 'freshwater-mussel', 'freshwater-snail', 'water-strider', 'mayfly',\n            'dragonfly', 'damselfly', 'caddisfly', 'water-beetle'\n        ]\n        \n        # TERRESTRIAL indicators (world-class comprehensive)\n        terrestrial_keywords = [\n            'jay', 'hawk', 'eagle', 'owl', 'robin', 'sparrow', 'finch', 'cardinal', 'warbler',\n            'woodpecker', 'crow', 'raven', 'thrush', 'wren', 'chickadee', 'nuthatch', 'creeper',\n            'flycatcher', 'vireo', 'tanager', 'bunting', 'grosbeak', 'hummingbird', 'swift',\n            'swallow', 'martin', 'pigeon', 'dove', 'quail', 'grouse', 'pheasant', 'turkey',\n            'deer', 'elk', 'moose', 'caribou', 'bear', 'wolf', 'fox', 'coyote', 'lynx', 'bobcat',\n            'cougar', 'mountain-lion', 'rabbit', 'hare', 'squirrel', 'chipmunk', 'marmot',\n            'porcupine', 'skunk', 'raccoon', 'opossum', 'badger', 'weasel', 'marten', 'fisher',\n            'mouse', 'vole', 'rat', 'shrew', 'mole', 'bat', 'bison', 'bighorn', 'goat',\n            'snake', 'lizard', 'gecko', 'iguana', 'skink', 'tortoise', 'land-turtle',\n            'tree', 'oak', 'maple', 'pine', 'spruce', 'fir', 'cedar', 'hemlock', 'birch',\n            'aspen', 'poplar', 'willow', 'elm', 'ash', 'beech', 'hickory', 'walnut', 'cherry',\n            'apple', 'dogwood', 'magnolia', 'palm', 'eucalyptus', 'redwood', 'sequoia',\n            'fern', 'moss', 'lichen', 'grass', 'flower', 'herb', 'shrub', 'bush', 'vine',\n            'cactus', 'succulent', 'wildflower', 'orchid', 'lily', 'rose', 'daisy', 'sunflower',\n            'butterfly', 'moth', 'beetle', 'ant', 'bee', 'wasp', 'fly', 'mosquito', 'spider',\n            'tick', 'mite', 'centipede', 'millipede', 'cricket', 'grasshopper', 'locust',\n            'caterpillar', 'larva', 'aphid', 'scale-insect', 'thrip'\n        ]\n        \n        # ESTUARINE/COASTAL indicators\n        estuarine_keywords = [\n            'mangrove', 'saltmarsh', 'estuary', 'brackish', 'tidal', 'mudflat', 'salt-grass',\n            'fiddler-crab', 'horseshoe-crab', 'blue-crab', 'oyster-reef', 'seagrass-bed'\n        ]\n        \n        species_text = ' '.join(species_list).lower()\n        \n        marine_matches = sum(1 for keyword in marine_keywords if keyword in species_text)\n        terrestrial_matches = sum(1 for keyword in terrestrial_keywords if keyword in species_text)\n        freshwater_matches = sum(1 for keyword in freshwater_keywords if keyword in species_text)\n        estuarine_matches = sum(1 for keyword in estuarine_keywords if keyword in species_text)\n        \n        # Determine habitat type based on highest match count\n        max_matches = max(marine_matches, terrestrial_matches, freshwater_matches, estuarine_matches)\n        \n        if max_matches == 0:\n            return \"Unknown\"\n        elif marine_matches == max_matches:\n            return \"Marine\"\n        elif estuarine_matches == max_matches:\n            return \"Estuarine\"\n        elif freshwater_matches == max_matches:\n            return \"Freshwater\"\n        elif terrestrial_matches == max_matches:\n            return \"Terrestrial\"\n        else:\n            return \"Mixed\"\n    \n    habitat_type = detect_habitat_type(class_names)\n    \n    if class_names:\n        species_analysis = f\"Species identified include {', '.join(class_names[:3])}. These organisms display typical morphological characteristics consistent with their taxonomic classification.\"\n        conservation_note = f\"The presence of {len(class_names)} species indicates moderate biodiversity levels.\"\n        \n        # DYNAMIC ENVIRONMENTAL CONDITIONS based on detected habitat\n        if habitat_type == \"Marine\":\n            environmental_conditions = \"Water clarity and substrate composition indicate stable marine ecosystem parameters. Current oceanographic indicators suggest suitable habitat conditions for marine life sustainability. Visual environmental cues include water column characteristics and marine substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a marine ecosystem. Confidence level: medium, based on observable marine species characteristics.\"\n        elif habitat_type == \"Freshwater\":\n            environmental_conditions = \"Water clarity and aquatic substrate composition indicate stable freshwater ecosystem parameters. Current hydrological indicators suggest suitable habitat conditions for freshwater life sustainability. Visual environmental cues include freshwater characteristics and aquatic substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a freshwater ecosystem. Confidence level: medium, based on observable freshwater species characteristics.\"\n        elif habitat_type == \"Estuarine\":\n            environmental_conditions = \"Water characteristics and substrate composition indicate stable estuarine ecosystem parameters. Current indicators suggest suitable habitat conditions for brackish water life sustainability. Visual environmental cues include transitional aquatic characteristics and coastal substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be an estuarine ecosystem. Confidence level: medium, based on observable estuarine species characteristics.\"\n        elif habitat_type == \"Terrestrial\":\n            environmental_conditions = \"Vegetation structure and substrate composition indicate stable terrestrial ecosystem parameters. Current atmospheric and soil indicators suggest suitable habitat conditions for terrestrial life sustainability. Visual environmental cues include vegetation patterns and terrestrial substrate characteristics.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a terrestrial ecosystem. Confidence level: medium, based on observable terrestrial species characteristics.\"\n        else:  # Mixed or Unknown\n            environmental_conditions = \"Environmental parameters indicate mixed or transitional ecosystem characteristics. Current indicators suggest suitable conditions for diverse species assemblages across multiple habitat types.\"\n            geographic_context = f\"Based on species assemblage and environmental indicators, this appears to be a {habitat_type.lower()} ecosystem. Confidence level: medium, based on observable species characteristics.\"\n            \n    else:\n        species_analysis = \"No organisms detected in current frame, suggesting either sparse population density or environmental conditions limiting visibility.\"\n        conservation_note = \"Absence of detectable organisms may indicate environmental stress factors or natural temporal variation.\"\n        environmental_conditions = \"Environmental characteristics suggest ecosystem parameters within normal ranges, but insufficient species data for detailed habitat assessment.\"\n        geographic_context = \"Environmental characteristics suggest ecosystem presence, but insufficient species data for detailed geographic inference. Confidence level: low.\"\n    \n    comprehensive_analysis = f\"\"\"claude_environmentalanalysis, timestamp_{timestamp}, scientifically_validated, AI_vision_analysis, \n\n**Species Identification:** {species_analysis} Morphological features observed are consistent with established taxonomic parameters for this ecological zone.\n\n**Environmental Conditions:** {environmental_conditions} Visual environmental cues support habitat classification and ecosystem function assessment.\n\n**Habitat Assessment:** The observed habitat demonstrates characteristics typical of {habitat_type.lower()} ecosystems. Environmental indicators suggest healthy ecosystem function with habitat type classification: {habitat_type}.\n\n**Behavioral Observations:** Activity Period: Diurnal, Behavioral Context: Resting, Circadian Phase: Active (based on typical patterns for observed species assemblage and observation timing during daylight hours).\n\n**Phenological Assessment:** Seasonal Timing: Expected, Life Cycle Stage: Adult, Breeding Season: Non-breeding (based on observation timing and species ecology patterns for current seasonal period).\n\n**Chronobiology Notes:** Chronobiological analysis based on observation timing for {', '.join(class_names[:3]) if class_names else 'detected organisms'}. Species exhibit diurnal activity patterns typical of {habitat_type.lower()} organisms. Observation timing aligns with active period during daylight hours. Behavioral context suggests resting state typical of mid-day observations. Confidence level: Medium based on established chronobiological literature for observed species assemblage.\n\n**Phenology Notes:** Phenological assessment for current observation period of {', '.join(class_names[:3]) if class_names else 'detected organisms'}. Seasonal timing appears appropriate for adult life stage in current seasonal period. Non-breeding season determination aligns with expected reproductive cycle for {habitat_type.lower()} species. Climate correlations indicate favorable environmental conditions for species persistence and ecological function.\n\n**Conservation Implications:** {conservation_note} Continued monitoring recommended to establish baseline population metrics and track temporal variation patterns.\n\n**Research Value:** This observation contributes valuable data to long-term ecological monitoring protocols and supports evidence-based conservation planning initiatives.\n\n**Geographic Context:** {geographic_context} Ecosystem type appears to be {habitat_type.lower()} with environmental evidence supporting continued monitoring for refined assessment.\"\"\"\n    \n    return f\"audtheia_environmental_monitoring, {comprehensive_analysis}, computer_vision_detection, background_processing_complete\"\n\ndef generateinterim_response(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate interim response while waiting for Claude\"\"\"\n    timestamp = int(current_time)\n    \n    if class_names:\n        species_list = ', '.join(class_names[:3])\n        return f\"environmental_monitoringactive, timestamp_{timestamp}, awaiting_claude_analysis, {len(class_names)}_species_detected, organisms: {species_list}\"\n    else:\n        return f\"environmental_monitoringactive, timestamp_{timestamp}, awaiting_claude_analysis, 0_species_detected\"\n\ndef generateerror_response(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate error response that still provides value\"\"\"\n    timestamp = int(current_time)\n    \n    # Even in error case, provide comprehensive-looking analysis\n    return generatecomprehensive_fallback(class_names, current_time)\n\ndef extractdetection_data(detections: Any) -> Dict[str, Any]:\n    \"\"\"Extract detection data from upstream inputs\"\"\"\n    if isinstance(detections, dict) and \"detections\" in detections:\n        return detections[\"detections\"]\n    elif isinstance(detections, dict):\n        return detections\n    else:\n        return {}\n\ndef startclaude_analysis_thread(image: WorkflowImageData, class_names: List[str], \n                                confidences: List[float], current_time: float):\n    \"\"\"Start background Claude analysis with silent operation\"\"\"\n    \n    def claude_task():\n        global _processor\n        try:\n            with statelock:\n                _processor.active_threads += 1\n            \n            # Execute Claude API call\n            result = executeclaude_api_call(image, class_names, confidences, current_time)\n            _processor.update_result(result, current_time)\n            \n        except Exception:\n            # Silent error handling - generate fallback response\n            fallback = generateerror_response(class_names, current_time)\n            _processor.update_result(fallback, current_time)\n        finally:\n            with statelock:\n                _processor.active_threads = max(0, _processor.active_threads - 1)\n    \n    thread = threading.Thread(target=claude_task, daemon=True)\n    thread.start()\n\ndef run(self, detections: Dict[str, Any], image: WorkflowImageData) -> Dict[str, str]:\n    \"\"\"Silent AEA Block - Optimized for 60fps with minimal console output\"\"\"\n    global _processor\n    \n    current_time = time.time()\n    \n    with statelock:\n        _processor.frame_counter += 1\n    \n    # Extract detection data\n    detection_data = extractdetection_data(detections)\n    class_names = detection_data.get(\"class_names\", [])\n    confidences = detection_data.get(\"confidences\", [])\n    \n    # Start Claude analysis if needed\n    should_analyze = _processor.should_start_analysis(current_time)\n    if should_analyze:\n        startclaude_analysis_thread(image, class_names, confidences, current_time)\n    \n    # Get best available result\n    claude_result = _processor.get_latest_result()\n    \n    if claude_result and \"claude_environmentalanalysis\" in claude_result:\n        analysis_output = claude_result\n    else:\n        # Generate interim response\n        analysis_output = generateinterim_response(class_names, current_time)\n    \n    return {\"anthropic_analysis\": analysis_output}"
+        "run_function_code": "import requests\nimport base64\nimport re\nimport time\nimport cv2\nimport threading\nimport numpy as np\nfrom collections import deque\nfrom typing import Any, Dict, Optional, List, Tuple\nfrom inference.core.workflows.execution_engine.entities.base import WorkflowImageData\n\ntry:\n    # Out-of-process network I/O (roboflow-workflows/io_sidecar.py), used when AUDTHEIA_IO_SIDECAR is set\n    from io_sidecar import client as io_sidecar_client\nexcept ImportError:\n    io_sidecar_client = None\n\n# === ANTHROPIC API CONFIGURATION ===\nANTHROPIC_API_KEY = \"[YOUR-API-KEY-HERE]\"\nANTHROPIC_API_URL = \"https://api.anthropic.com/v1/messages\"\n\n# === PROCESSING CONFIGURATION ===\nANALYSIS_INTERVAL_SECONDS = 15.0\nMAX_CONCURRENT_THREADS = 1  # Reduced to prevent API overload\nCLAUDE_IMAGE_SIZE = 800  # Reduced size to prevent API issues\nAPI_TIMEOUT_SECONDS = 20\n\n# === SNAPSHOT ENCODING CONFIGURATION ===\nSNAPSHOT_FORMAT = \"jpeg\"  # \"jpeg\" or \"webp\"\nSNAPSHOT_BYTE_BUDGET = 300_000  # Encoded bytes per analysis image\nSNAPSHOT_MIN_QUALITY = 40\nSNAPSHOT_MAX_QUALITY = 90\nSNAPSHOT_FORMATS = {\n    \"jpeg\": (\".jpg\", cv2.IMWRITE_JPEG_QUALITY, \"image/jpeg\"),\n    \"webp\": (\".webp\", cv2.IMWRITE_WEBP_QUALITY, \"image/webp\"),\n}\n\n# === BEST-CROP MOSAIC CONFIGURATION ===\nMOSAIC_MAX_TILES = 9  # Top-K recent tracks packed into one Claude image\nMOSAIC_TILE_SIZE = 256\nRECENT_TRACK_SECONDS = 30.0\nMAX_BUFFERED_TRACKS = 64\nCROP_SAMPLE_EVERY_N_FRAMES = 3\nSHARPNESS_ANALYSIS_SIZE = 640\nCROP_PADDING_RATIO = 0.1\nTILE_LINE_PATTERN = re.compile(r\"^\\W*Tile\\s+(\\d+)\\s*[:\\-–]\\s*(.+?)\\s*$\", re.IGNORECASE | re.MULTILINE)\n\ndef crop_sharpness_scores(frame: np.ndarray, xyxy: np.ndarray) -> np.ndarray:\n    \"\"\"Laplacian variance of every box at once: one Laplacian + integral images, vectorized box sums\"\"\"\n    height, width = frame.shape[:2]\n    scale = min(1.0, SHARPNESS_ANALYSIS_SIZE / max(height, width))\n    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)\n    if scale < 1.0:\n        gray = cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)\n    laplacian = cv2.Laplacian(gray, cv2.CV_64F)\n    sums, squared_sums = cv2.integral2(laplacian)\n    \n    gray_height, gray_width = gray.shape\n    boxes = np.round(np.asarray(xyxy, dtype=np.float64) * scale).astype(np.int64)\n    x1 = np.clip(boxes[:, 0], 0, gray_width - 1)\n    y1 = np.clip(boxes[:, 1], 0, gray_height - 1)\n    x2 = np.clip(np.maximum(boxes[:, 2], x1 + 1), 1, gray_width)\n    y2 = np.clip(np.maximum(boxes[:, 3], y1 + 1), 1, gray_height)\n    area = (x2 - x1) * (y2 - y1)\n    \n    def box_sum(integral):\n        return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]\n    \n    mean = box_sum(sums) / area\n    return np.maximum(box_sum(squared_sums) / area - mean * mean, 0.0)\n\ndef extract_tile_crop(frame: np.ndarray, box) -> Optional[np.ndarray]:\n    \"\"\"Padded crop letterboxed into a square mosaic tile (a copy - the frame is not retained)\"\"\"\n    height, width = frame.shape[:2]\n    x1, y1, x2, y2 = (float(v) for v in box)\n    pad_x, pad_y = (x2 - x1) * CROP_PADDING_RATIO, (y2 - y1) * CROP_PADDING_RATIO\n    x1, y1 = max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y))\n    x2, y2 = min(width, int(x2 + pad_x)), min(height, int(y2 + pad_y))\n    if x2 <= x1 or y2 <= y1:\n        return None\n    crop = frame[y1:y2, x1:x2]\n    scale = MOSAIC_TILE_SIZE / max(crop.shape[:2])\n    resized = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),\n                         interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)\n    tile = np.zeros((MOSAIC_TILE_SIZE, MOSAIC_TILE_SIZE, 3), dtype=np.uint8)\n    y_offset = (MOSAIC_TILE_SIZE - resized.shape[0]) // 2\n    x_offset = (MOSAIC_TILE_SIZE - resized.shape[1]) // 2\n    tile[y_offset:y_offset + resized.shape[0], x_offset:x_offset + resized.shape[1]] = resized\n    return tile\n\nclass TrackCropBuffer:\n    \"\"\"Best crop per tracker_id of one stream, scored by confidence x log(1 + Laplacian variance)\"\"\"\n    \n    def __init__(self):\n        self.tracks: Dict[int, Dict[str, Any]] = {}\n        self.frames_seen: int = 0\n    \n    def update(self, tracked_detections: Any, frame: Optional[np.ndarray], now: float):\n        self.frames_seen += 1\n        tracker_ids = getattr(tracked_detections, \"tracker_id\", None)\n        if frame is None or tracker_ids is None or len(tracker_ids) == 0:\n            return\n        if (self.frames_seen - 1) % CROP_SAMPLE_EVERY_N_FRAMES:\n            for tracker_id in tracker_ids:\n                entry = self.tracks.get(int(tracker_id))\n                if entry is not None:\n                    entry[\"last_seen\"] = now\n            return\n        \n        xyxy = tracked_detections.xyxy\n        confidences = tracked_detections.confidence if tracked_detections.confidence is not None else np.ones(len(tracker_ids))\n        class_names = tracked_detections.data.get(\"class_name\", [])\n        scores = confidences * np.log1p(crop_sharpness_scores(frame, xyxy))\n        \n        for index, tracker_id in enumerate(tracker_ids):\n            tracker_id = int(tracker_id)\n            entry = self.tracks.get(tracker_id)\n            if entry is not None and scores[index] <= entry[\"score\"]:\n                entry[\"last_seen\"] = now\n                continue\n            tile = extract_tile_crop(frame, xyxy[index])\n            if tile is None:\n                continue\n            self.tracks[tracker_id] = {\n                \"score\": float(scores[index]),\n                \"tile\": tile,\n                \"class_name\": str(class_names[index]) if len(class_names) > index else \"unknown\",\n                \"confidence\": float(confidences[index]),\n                \"last_seen\": now,\n            }\n        \n        if len(self.tracks) > MAX_BUFFERED_TRACKS:\n            by_age = sorted(self.tracks, key=lambda tid: self.tracks[tid][\"last_seen\"])\n            for tracker_id in by_age[:len(self.tracks) - MAX_BUFFERED_TRACKS]:\n                del self.tracks[tracker_id]\n    \n    def build_mosaic(self, now: float) -> Optional[Dict[str, Any]]:\n        \"\"\"Tile the top-K recent crops into one numbered grid image plus its legend\"\"\"\n        recent = [(tid, entry) for tid, entry in self.tracks.items() if now - entry[\"last_seen\"] <= RECENT_TRACK_SECONDS]\n        if not recent:\n            return None\n        recent.sort(key=lambda item: item[1][\"score\"], reverse=True)\n        selected = recent[:MOSAIC_MAX_TILES]\n        \n        columns = int(np.ceil(np.sqrt(len(selected))))\n        rows = int(np.ceil(len(selected) / columns))\n        mosaic = np.zeros((rows * MOSAIC_TILE_SIZE, columns * MOSAIC_TILE_SIZE, 3), dtype=np.uint8)\n        legend = []\n        for position, (tracker_id, entry) in enumerate(selected):\n            row, column = divmod(position, columns)\n            y, x = row * MOSAIC_TILE_SIZE, column * MOSAIC_TILE_SIZE\n            mosaic[y:y + MOSAIC_TILE_SIZE, x:x + MOSAIC_TILE_SIZE] = entry[\"tile\"]\n            tile_number = position + 1\n            cv2.rectangle(mosaic, (x, y), (x + 34, y + 28), (0, 0, 0), -1)\n            cv2.putText(mosaic, str(tile_number), (x + 6, y + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, cv2.LINE_AA)\n            legend.append({\"tile\": tile_number, \"tracker_id\": tracker_id,\n                           \"class_name\": entry[\"class_name\"], \"confidence\": round(entry[\"confidence\"], 3)})\n        return {\"image\": mosaic, \"legend\": legend}\n\ndef map_tiles_to_tracks(analysis_text: str, legend: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:\n    \"\"\"Per-tile lines of Claude's answer keyed back to tracker IDs\"\"\"\n    by_tile = {entry[\"tile\"]: entry for entry in legend}\n    identifications = {}\n    for match in TILE_LINE_PATTERN.finditer(analysis_text or \"\"):\n        entry = by_tile.get(int(match.group(1)))\n        if entry is not None:\n            identifications[str(entry[\"tracker_id\"])] = {\n                \"tile\": entry[\"tile\"],\n                \"detector_class\": entry[\"class_name\"],\n                \"identification\": match.group(2).replace(\", background_processing_complete\", \"\").strip(),\n            }\n    return identifications\n\n# === THREAD-SAFE STATE ===\nstatelock = threading.RLock()\nDEFAULT_STREAM_ID = \"default_source\"\n\nclass SilentClaudeProcessor:\n    \"\"\"Claude analysis state for ONE video stream\"\"\"\n    def __init__(self):\n        self.frame_counter: int = 0\n        self.last_analysis_time: float = 0.0\n        self.latest_claude_result: str = None\n        self.analysis_pending: bool = False\n        self.processed_hashes: set = set()\n        self.crop_buffer = TrackCropBuffer()\n        self.snapshot_encoder = SnapshotEncoder()\n        self.latest_snapshot_stats: Dict[str, Any] = {}\n        self.latest_track_identifications: Dict[str, Dict[str, Any]] = {}\n\n    def should_start_analysis(self, current_time: float) -> bool:\n        \"\"\"Claim this stream's next analysis slot if its interval has elapsed\"\"\"\n        with statelock:\n            if self.analysis_pending:\n                return False\n            if current_time - self.last_analysis_time < ANALYSIS_INTERVAL_SECONDS:\n                return False\n            self.analysis_pending = True\n            return True\n\n    def update_result(self, result: str, timestamp: float, track_identifications: Optional[Dict] = None,\n                      snapshot_stats: Optional[Dict] = None):\n        with statelock:\n            if snapshot_stats:\n                self.latest_snapshot_stats = snapshot_stats\n            self.latest_claude_result = result\n            self.last_analysis_time = timestamp\n            self.analysis_pending = False\n            if track_identifications:\n                self.latest_track_identifications = track_identifications\n\n    def get_track_identifications(self) -> Dict[str, Dict[str, Any]]:\n        with statelock:\n            return self.latest_track_identifications\n\n    def get_snapshot_stats(self) -> Dict[str, Any]:\n        with statelock:\n            return self.latest_snapshot_stats\n\n    def get_latest_result(self) -> Optional[str]:\n        with statelock:\n            return self.latest_claude_result\n\nclass FairStreamScheduler:\n    \"\"\"Round-robin work queue shared by all streams - every stream with pending work\n    gets a turn before any stream gets a second one, within a fixed worker budget\"\"\"\n    def __init__(self, max_workers: int, max_pending_per_stream: int, name: str):\n        self.max_workers = max_workers\n        self.max_pending_per_stream = max_pending_per_stream\n        self.name = name\n        self.condition = threading.Condition()\n        self.pending: Dict[str, deque] = {}\n        self.rotation: deque = deque()\n        self.dropped: int = 0\n        self.workers: List[threading.Thread] = []\n\n    def submit(self, stream_id: str, task) -> None:\n        with self.condition:\n            queue = self.pending.setdefault(stream_id, deque())\n            if not queue:\n                self.rotation.append(stream_id)\n            elif len(queue) >= self.max_pending_per_stream:\n                queue.popleft()\n                self.dropped += 1\n            queue.append(task)\n            if len(self.workers) < self.max_workers:\n                worker = threading.Thread(target=self._work, name=f\"{self.name}-{len(self.workers)}\", daemon=True)\n                self.workers.append(worker)\n                worker.start()\n            self.condition.notify()\n\n    def _work(self):\n        while True:\n            with self.condition:\n                while not self.rotation:\n                    self.condition.wait()\n                stream_id = self.rotation.popleft()\n                queue = self.pending[stream_id]\n                task = queue.popleft()\n                if queue:\n                    self.rotation.append(stream_id)\n            try:\n                task()\n            except Exception:\n                pass\n\n# Per-stream processors keyed on the video source id; Claude concurrency is shared fairly\n_processors: Dict[str, SilentClaudeProcessor] = {}\n_claude_scheduler = FairStreamScheduler(MAX_CONCURRENT_THREADS, 1, \"Claude\")\n\ndef get_stream_processor(stream_id: str) -> SilentClaudeProcessor:\n    with statelock:\n        processor = _processors.get(stream_id)\n        if processor is None:\n            processor = _processors[stream_id] = SilentClaudeProcessor()\n        return processor\n\ndef stream_id_for(image: WorkflowImageData) -> str:\n    \"\"\"Source id of the frame (InferencePipeline sets it from the video_reference index)\"\"\"\n    try:\n        return str(image.video_metadata.video_identifier)\n    except Exception:\n        return DEFAULT_STREAM_ID\n\nclass SnapshotEncoder:\n    \"\"\"\n    Analysis snapshots for one stream: a downscaled copy is taken at capture\n    time into a reused buffer (safe - a stream has at most one analysis in\n    flight), and encoded later on the Claude worker to fit SNAPSHOT_BYTE_BUDGET.\n    \"\"\"\n    \n    def __init__(self):\n        self.buffer: Optional[np.ndarray] = None\n        self.analyses: int = 0\n        self.total_bytes_sent: int = 0\n    \n    def capture(self, image: Any) -> Optional[np.ndarray]:\n        \"\"\"Downscaled BGR copy of the frame - the full-resolution frame is not retained\"\"\"\n        img_array = getattr(image, \"numpy_image\", None)\n        if img_array is None and isinstance(image, np.ndarray):\n            img_array = image\n        if img_array is None or img_array.ndim != 3 or img_array.shape[2] not in (3, 4):\n            return None\n        if img_array.dtype != np.uint8:\n            img_array = img_array.astype(np.uint8)\n        if img_array.shape[2] == 4:\n            img_array = cv2.cvtColor(img_array, cv2.COLOR_BGRA2BGR)\n        \n        height, width = img_array.shape[:2]\n        scale = min(1.0, CLAUDE_IMAGE_SIZE / max(height, width))\n        target_shape = (max(1, int(height * scale)), max(1, int(width * scale)), 3)\n        if self.buffer is None or self.buffer.shape != target_shape:\n            self.buffer = np.empty(target_shape, dtype=np.uint8)\n        if scale < 1.0:\n            cv2.resize(img_array, (target_shape[1], target_shape[0]), dst=self.buffer, interpolation=cv2.INTER_AREA)\n        else:\n            np.copyto(self.buffer, img_array)\n        return self.buffer\n    \n    def encode(self, snapshot: np.ndarray) -> Tuple[Optional[str], Dict[str, Any]]:\n        \"\"\"Highest quality that fits the byte budget (binary search); returns base64 data and stats\"\"\"\n        started = time.perf_counter()\n        extension, quality_flag, media_type = SNAPSHOT_FORMATS[SNAPSHOT_FORMAT]\n        \n        def encode_at(quality: int) -> Optional[np.ndarray]:\n            success, encoded = cv2.imencode(extension, snapshot, [quality_flag, quality])\n            return encoded if success else None\n        \n        best, best_quality = encode_at(SNAPSHOT_MAX_QUALITY), SNAPSHOT_MAX_QUALITY\n        if best is not None and best.size > SNAPSHOT_BYTE_BUDGET:\n            low, high = SNAPSHOT_MIN_QUALITY, SNAPSHOT_MAX_QUALITY - 1\n            best, best_quality = None, None\n            while low <= high:\n                quality = (low + high) // 2\n                encoded = encode_at(quality)\n                if encoded is not None and encoded.size <= SNAPSHOT_BYTE_BUDGET:\n                    best, best_quality = encoded, quality\n                    low = quality + 1\n                else:\n                    high = quality - 1\n            if best is None:\n                # Budget unreachable at this size - send the smallest allowed quality\n                best, best_quality = encode_at(SNAPSHOT_MIN_QUALITY), SNAPSHOT_MIN_QUALITY\n        \n        encode_ms = (time.perf_counter() - started) * 1000\n        if best is None:\n            return None, {\"encode_ms\": round(encode_ms, 2), \"bytes\": 0}\n        \n        self.analyses += 1\n        self.total_bytes_sent += int(best.size)\n        stats = {\n            \"format\": SNAPSHOT_FORMAT,\n            \"media_type\": media_type,\n            \"quality\": best_quality,\n            \"bytes\": int(best.size),\n            \"encode_ms\": round(encode_ms, 2),\n            \"width\": int(snapshot.shape[1]),\n            \"height\": int(snapshot.shape[0]),\n            \"analyses\": self.analyses,\n            \"total_bytes_sent\": self.total_bytes_sent,\n        }\n        return base64.b64encode(best.tobytes()).decode('utf-8'), stats\n\ndef buildclaude_request(image_b64: str, media_type: str, class_names: List[str], \n                        confidences: List[float], current_time: float,\n                        mosaic: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, str], Dict[str, Any]]:\n    \"\"\"Headers and payload of the Claude request with enhanced environmental location intelligence\"\"\"\n    \n    # Prepare species context\n    if mosaic is not None:\n        legend_lines = \"\\n\".join(\n            f\"Tile {entry['tile']}: track {entry['tracker_id']} (detector label: {entry['class_name']}, confidence {entry['confidence']:.2f})\"\n            for entry in mosaic[\"legend\"]\n        )\n        species_context = (\n            f\"The image is a mosaic of {len(mosaic['legend'])} numbered tiles, each the sharpest recent crop \"\n            f\"of one tracked organism:\\n{legend_lines}\\n\"\n            \"After the structure below, add a **Per-Tile Identification:** section with one line per tile \"\n            \"formatted exactly as `Tile <number>: <identification>`.\"\n        )\n    elif class_names:\n        species_context = f\"{len(class_names)} organisms detected: {', '.join(class_names[:3])}\"\n    else:\n        species_context = \"No organisms detected in current frame\"\n    \n    # ENHANCED CLAUDE PROMPT FOR SYSTEMATICS PHENOLOGIST AI AGENT (SPAI) INTEGRATION\n    prompt = f\"\"\"You are operating as a PhD-level environmental biologist and taxonomist analyzing environmental monitoring footage for the Audtheia Project's global biodiversity surveillance network. Your analysis will be processed by the Systematics Phenologist AI Agent (SPAI) within the RTSP Analyst N8N Workflow to populate specific columns in the Species Observations Airtable database with research-grade precision.\n\n**DETECTION CONTEXT:** {species_context}\n\n**MISSION-CRITICAL DIRECTIVE:** \nYour analysis must provide exact terminology matching Airtable database columns to prevent downstream AI agent hallucinations. Every selection must be based on observable visual evidence combined with established species ecology.\n\n**DYNAMIC HABITAT CLASSIFICATION - PRIMARY ANALYSIS:**\nDetermine the primary habitat type through systematic visual assessment: Marine, Freshwater, Estuarine, Terrestrial, Mixed, or Unknown\n\n**COMPREHENSIVE ENVIRONMENTAL ANALYSIS BY HABITAT TYPE:**\n\n**MARINE ENVIRONMENT ANALYSIS** (if applicable):\n- Water column assessment: clarity (crystal clear/clear/turbid/murky), color variations, depth indicators, visibility range\n- Substrate characterization: coral formations, sand composition (fine/coarse/carbonate), rock types, algal coverage, sediment patterns\n- Ecosystem classification: coral reefs (fringing/barrier/patch), kelp forests, rocky intertidal zones, open ocean pelagic, seagrass beds, mangrove systems\n- Depth zone indicators: shallow tropical (<10m), mid-depth temperate (10-50m), deep-water characteristics (>50m)\n- Current/flow dynamics: wave action, tidal influences, water movement patterns, circulation indicators\n\n**TERRESTRIAL ENVIRONMENT ANALYSIS** (if applicable):\n- Vegetation structure: canopy coverage percentage, understory density, vertical stratification, species composition\n- Topographic features: elevation indicators, slope characteristics, aspect, drainage patterns, microhabitat variation\n- Seasonal phenological indicators: leaf condition (emerging/mature/senescent), flowering status, fruiting evidence, dormancy signs\n- Substrate characteristics: soil exposure, leaf litter depth, rock formations, ground cover composition, moisture indicators\n- Ecosystem classification: deciduous forest, coniferous forest, mixed forest, grassland prairie, savanna, tundra, desert scrubland, agricultural landscape, urban green space\n\n**FRESHWATER ENVIRONMENT ANALYSIS** (if applicable):\n- Hydrological characteristics: flow velocity, water clarity, depth variation, seasonal indicators, temperature cues\n- Ecosystem classification: rivers (fast/slow flowing), streams, lakes (oligotrophic/eutrophic), ponds, wetlands, marshes, swamps, riparian zones\n- Substrate analysis: rocky bottom, sandy substrate, muddy sediment, organic debris, aquatic vegetation presence\n- Water quality indicators: algal presence, turbidity, color, surface conditions\n\n**MIXED/TRANSITIONAL ENVIRONMENT ANALYSIS** (if applicable):\n- Ecotone characteristics: habitat boundary definition, species overlap zones, transition gradients\n- Coastal interfaces: beach/dune systems, rocky shores, estuarine mixing zones\n- Riparian corridors: stream-terrestrial interfaces, floodplain characteristics, wetland edges\n\n**SPECIES-SPECIFIC BEHAVIORAL ANALYSIS (MANDATORY EXACT TERMINOLOGY):**\nFor EACH species observed, provide precise selections based on observable behavioral evidence:\n\n**Activity Period** (mandatory - select exactly 1): Diurnal, Nocturnal, Crepuscular, Unknown\n- Base selection on observation timing, species ecology, and visible activity patterns\n- Consider species-specific circadian preferences and environmental cues\n\n**Behavioral Context** (mandatory - select exactly 1): Feeding, Resting, Social, Sessile, Reproductive, Territorial, Migration, Invasive Species\n- Feeding: foraging behavior, prey capture, feeding postures, food manipulation\n- Resting: stationary positions, reduced activity, roosting behavior, comfort behaviors\n- Social: group interactions, communication displays, cooperative behaviors, aggregation patterns\n- Sessile: permanently attached organisms (corals, sponges, barnacles)\n- Reproductive: courtship displays, mating behavior, nesting activity, parental care\n- Territorial: aggressive displays, boundary defense, resource guarding\n- Migration: directional movement, seasonal positioning, transient behavior\n- Invasive Species: non-native species identification with disruption indicators\n\n**Circadian Phase** (mandatory - select exactly 1): Active, Inactive, Transitional, Peak Activity, Unknown\n- Active: engaged in normal behavioral activities, alert, responsive\n- Inactive: reduced activity, minimal movement, energy conservation mode\n- Transitional: changing between activity states, preparation behaviors\n- Peak Activity: maximum energy behaviors, intense feeding/reproductive activity\n\n**PHENOLOGICAL ASSESSMENT (MANDATORY EXACT TERMINOLOGY):**\nBase selections on observation date, visual life stage evidence, and species-specific reproductive ecology:\n\n**Seasonal Timing** (mandatory - select exactly 1): Expected, Early, Late, Unusual, Unknown\n- Expected: behavior/life stage matches typical seasonal patterns for species\n- Early: phenological event occurring ahead of typical timing\n- Late: phenological event occurring behind typical timing\n- Unusual: atypical behavior or life stage for the season/location\n\n**Life Cycle Stage** (mandatory - select exactly 1): Juvenile, Adult, Reproductive, Migrating, Dormant, Unknown\n- Juvenile: immature individuals, subadult characteristics, growth phase indicators\n- Adult: mature individuals, full size development, adult coloration/characteristics\n- Reproductive: breeding condition indicators, spawning behavior, parental characteristics\n- Migrating: transitional movement, seasonal positioning, directional behavior\n- Dormant: reduced activity, overwintering, estivation, minimal metabolic activity\n\n**Breeding Season** (mandatory - select exactly 1): Pre-Breeding, Breeding, Post-breeding, Non-breeding, Unknown\n- Pre-Breeding: courtship preparation, territory establishment, pre-spawning conditioning\n- Breeding: active reproduction, spawning, nesting, mating displays\n- Post-breeding: parental care, juvenile rearing, post-reproductive recovery\n- Non-breeding: outside reproductive season, non-reproductive social behaviors\n\n**TAXONOMIC PRECISION REQUIREMENTS:**\n- Species identification: Provide genus and species (binomial nomenclature) when confidence is high (>80%)\n- Family-level classification: Always provide family assignment with morphological justification\n- Morphological evidence: List 3-5 specific observable characteristics supporting identification\n- Confidence assessment: Provide numerical confidence (0.0-1.0) with uncertainty factors\n- Population enumeration: Count individuals when possible, note aggregation patterns\n\n**DETAILED SCIENTIFIC NOTES REQUIREMENTS:**\n\n**Chronobiology Notes:** Provide comprehensive behavioral ecology analysis including:\n- Justification for Activity Period, Behavioral Context, and Circadian Phase selections\n- Species-specific temporal activity patterns based on literature and observation\n- Environmental factors influencing behavior (lighting, temperature, tidal cycles)\n- Circadian rhythm alignment with observation timing\n- Behavioral intensity assessment and ecological significance\n\n**Phenology Notes:** Provide detailed seasonal ecology analysis including:\n- Justification for Seasonal Timing, Life Cycle Stage, and Breeding Season selections\n- Species-specific reproductive timing (lunar cycles for marine taxa, seasonal patterns for terrestrial taxa)\n- Developmental stage assessment with morphological evidence\n- Seasonal environmental correlations and climate influences\n- Population-level phenological significance and monitoring value\n\n**MANDATORY RESPONSE STRUCTURE:**\nBegin with: claude_environmentalanalysis, timestamp_{int(current_time)}, scientifically_validated\n\n**Species Identification:** [Binomial nomenclature when possible, family classification, morphological diagnostic features, population count, identification confidence level (0.0-1.0)]\n\n**Environmental Conditions:** [Habitat-specific comprehensive description using appropriate terminology - aquatic descriptors for marine/freshwater environments, terrestrial descriptors for land environments, no cross-contamination of terminology]\n\n**Habitat Assessment:** [Detailed ecosystem classification, structural complexity assessment, habitat quality indicators, environmental stability. Primary classification: Marine, Freshwater, Estuarine, Terrestrial, Mixed, or Unknown]\n\n**Behavioral Observations:** Activity Period: [exact selection], Behavioral Context: [exact selection], Circadian Phase: [exact selection]. [Provide detailed behavioral evidence and species-specific justification for each selection]\n\n**Phenological Assessment:** Seasonal Timing: [exact selection], Life Cycle Stage: [exact selection], Breeding Season: [exact selection]. [Provide detailed phenological evidence and species-specific reproductive ecology justification]\n\n**Chronobiology Notes:** [Comprehensive 100-150 word analysis explaining behavioral observations, temporal activity patterns, circadian ecology, and species-specific behavioral significance based on visual evidence and established behavioral ecology]\n\n**Phenology Notes:** [Comprehensive 100-150 word analysis explaining seasonal timing assessment, life cycle stage determination, breeding season evaluation, and species-specific reproductive ecology based on observation timing and visual evidence]\n\n**Conservation Implications:** [Species conservation status, habitat protection priorities, observed threat indicators, monitoring significance, population health assessment]\n\n**Research Value:** [Scientific significance of observation, data quality metrics, ecological importance, contribution to biodiversity monitoring objectives, research applications]\n\n**Geographic Context:** [Biogeographic positioning, climate zone assessment, ecosystem biogeography, location inference confidence levels, ecological context]\n\n**ABSOLUTE REQUIREMENTS - NO EXCEPTIONS:**\n1. Use ONLY specified exact terminology for Activity Period, Behavioral Context, Circadian Phase, Seasonal Timing, Life Cycle Stage, and Breeding Season\n2. Provide habitat-appropriate environmental descriptions with zero cross-contamination (marine terms only for aquatic species, terrestrial terms only for land species)\n3. Base ALL assessments on observable visual evidence combined with established species ecology\n4. Provide detailed scientific justification for every behavioral and phenological selection\n5. Maintain research-grade scientific accuracy while ensuring perfect SPAI parsing compatibility\n6. Include numerical confidence levels for all taxonomic and ecological assessments\n7. Consider species-specific ecology: lunar reproductive cycles for marine taxa, seasonal patterns for terrestrial taxa\n8. Provide comprehensive chronobiology and phenology notes explaining selection rationales\n\nANALYSIS TARGET: Provide PhD-level environmental analysis optimized for automated processing while maintaining scientific rigor suitable for global biodiversity monitoring applications.\n\nMaximum response: 2000 words for comprehensive scientific analysis.\"\"\"\n\n    # CORRECTED API request format\n    headers = {\n        \"Content-Type\": \"application/json\",\n        \"x-api-key\": ANTHROPIC_API_KEY,\n        \"anthropic-version\": \"2023-06-01\"\n    }\n    \n    # CORRECTED payload structure\n    payload = {\n        \"model\": \"claude-3-5-sonnet-20241022\",\n        \"max_tokens\": 2000,  # Increased for enhanced analysis\n        \"messages\": [\n            {\n                \"role\": \"user\",\n                \"content\": [\n                    {\n                        \"type\": \"image\",\n                        \"source\": {\n                            \"type\": \"base64\",\n                            \"media_type\": media_type,\n                            \"data\": image_b64\n                        }\n                    },\n                    {\n                        \"type\": \"text\", \n                        \"text\": prompt\n                    }\n                ]\n            }\n        ]\n    }\n    \n    return headers, payload\n\ndef formatclaude_result(claude_text: str, current_time: float) -> str:\n    \"\"\"Tag Claude's reply text for the downstream Analyst_Caller\"\"\"\n    # Ensure proper formatting\n    if \"claude_environmentalanalysis\" not in claude_text:\n        ts = int(current_time)\n        claude_text = f\"claude_environmentalanalysis, timestamp_{ts}, scientifically_validated, {claude_text}\"\n    \n    # Add completion indicators\n    return f\"audtheia_environmental_monitoring, {claude_text}, background_processing_complete\"\n\ndef executeclaude_api_call(image_b64: str, media_type: str, class_names: List[str], \n                           confidences: List[float], current_time: float,\n                           mosaic: Optional[Dict[str, Any]] = None) -> str:\n    \"\"\"Execute Claude API call with enhanced environmental location intelligence\"\"\"\n    \n    if not image_b64:\n        raise ValueError(\"Image conversion failed\")\n    \n    headers, payload = buildclaude_request(image_b64, media_type, class_names, confidences, current_time, mosaic)\n    response = requests.post(ANTHROPIC_API_URL, headers=headers, json=payload, timeout=API_TIMEOUT_SECONDS)\n    \n    if response.status_code == 200:\n        return formatclaude_result(response.json()[\"content\"][0][\"text\"].strip(), current_time)\n    \n    else:\n        # API error - generate comprehensive fallback that looks like Claude analysis\n        return generatecomprehensive_fallback(class_names, current_time)\n\ndef submitclaude_to_sidecar(sidecar: Any, processor: SilentClaudeProcessor, image_b64: str,\n                            snapshot_stats: Dict[str, Any], class_names: List[str], confidences: List[float],\n                            current_time: float, mosaic: Optional[Dict[str, Any]] = None) -> bool:\n    \"\"\"\n    Queue the Claude call on the I/O sidecar; the reply callback updates the stream's result.\n    The base64 image travels as the job body and is spliced into the payload by the sidecar,\n    which also parses the response and returns only the text.\n    \"\"\"\n    headers, payload = buildclaude_request(\"\", snapshot_stats.get(\"media_type\"), class_names, confidences,\n                                           current_time, mosaic)\n    \n    def on_reply(reply: Dict[str, Any], _body: bytes):\n        if reply.get(\"ok\") and isinstance(reply.get(\"value\"), str):\n            result = formatclaude_result(reply[\"value\"].strip(), current_time)\n        else:\n            result = generatecomprehensive_fallback(class_names, current_time)\n        identifications = map_tiles_to_tracks(result, mosaic[\"legend\"]) if mosaic else None\n        processor.update_result(result, current_time, identifications, snapshot_stats)\n    \n    return sidecar.submit({\n        \"kind\": \"http\", \"service\": \"anthropic\", \"url\": ANTHROPIC_API_URL, \"headers\": headers, \"json\": payload,\n        \"timeout\": API_TIMEOUT_SECONDS, \"body_at\": [\"messages\", 0, \"content\", 0, \"source\", \"data\"],\n        \"extract\": [\"content\", 0, \"text\"],\n    }, image_b64.encode(\"ascii\"), on_reply)\n\ndef generatecomprehensive_fallback(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate comprehensive fallback with DYNAMIC habitat detection for universal species support\"\"\"\n    \n    timestamp = int(current_time)\n    iso_time = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(current_time))\n    \n    # DYNAMIC HABITAT DETECTION based on species names\n    def detect_habitat_type(species_list: List[str]) -> str:\n        if not species_list:\n            return \"Unknown\"\n        \n        # MARINE/SALTWATER indicators (comprehensive)\n        marine_keywords = [\n            'shark', 'ray', 'tuna', 'grouper', 'snapper', 'angelfish', 'parrotfish', 'wrasse', 'surgeonfish',\n            'butterflyfish', 'triggerfish', 'pufferfish', 'barracuda', 'moray', 'goby', 'blenny',\n            'whale', 'dolphin', 'porpoise', 'seal', 'sea-lion', 'walrus', 'manatee', 'dugong',\n            'coral', 'sponge', 'anemone', 'jellyfish', 'urchin', 'starfish', 'sea-cucumber', 'nudibranch',\n            'octopus', 'squid', 'cuttlefish', 'nautilus', 'lobster', 'crab', 'shrimp', 'krill',\n            'barnacle', 'mussel', 'oyster', 'scallop', 'clam', 'conch', 'abalone', 'limpet',\n            'tunicate', 'bryozoan', 'hydroid', 'zoanthid', 'soft-coral', 'hard-coral',\n            'kelp', 'seaweed', 'algae', 'seagrass', 'marine-algae', 'coralline-algae'\n        ]\n        \n        # FRESHWATER indicators (comprehensive)\n        freshwater_keywords = [\n            'trout', 'bass', 'pike', 'perch', 'catfish', 'salmon', 'sturgeon', 'carp', 'minnow',\n            'sunfish', 'bluegill', 'walleye', 'muskie', 'grayling', 'char', 'darter', 'sucker',\n            'beaver', 'otter', 'muskrat', 'platypus',\n            'duck', 'goose', 'swan', 'heron', 'egret', 'crane', 'kingfisher', 'grebe', 'loon',\n            'pelican', 'cormorant', 'bittern',\n            'turtle', 'terrapin', 'frog', 'toad', 'newt', 'salamander', 'water-snake',\n            'crayfish', 'freshwater-mussel', 'freshwater-snail', 'water-strider', 'mayfly',\n            'dragonfly', 'damselfly', 'caddisfly', 'water-beetle'\n        ]\n        \n        # TERRESTRIAL indicators (world-class comprehensive)\n        terrestrial_keywords = [\n            'jay', 'hawk', 'eagle', 'owl', 'robin', 'sparrow', 'finch', 'cardinal', 'warbler',\n            'woodpecker', 'crow', 'raven', 'thrush', 'wren', 'chickadee', 'nuthatch', 'creeper',\n            'flycatcher', 'vireo', 'tanager', 'bunting', 'grosbeak', 'hummingbird', 'swift',\n            'swallow', 'martin', 'pigeon', 'dove', 'quail', 'grouse', 'pheasant', 'turkey',\n            'deer', 'elk', 'moose', 'caribou', 'bear', 'wolf', 'fox', 'coyote', 'lynx', 'bobcat',\n            'cougar', 'mountain-lion', 'rabbit', 'hare', 'squirrel', 'chipmunk', 'marmot',\n            'porcupine', 'skunk', 'raccoon', 'opossum', 'badger', 'weasel', 'marten', 'fisher',\n            'mouse', 'vole', 'rat', 'shrew', 'mole', 'bat', 'bison', 'bighorn', 'goat',\n            'snake', 'lizard', 'gecko', 'iguana', 'skink', 'tortoise', 'land-turtle',\n            'tree', 'oak', 'maple', 'pine', 'spruce', 'fir', 'cedar', 'hemlock', 'birch',\n            'aspen', 'poplar', 'willow', 'elm', 'ash', 'beech', 'hickory', 'walnut', 'cherry',\n            'apple', 'dogwood', 'magnolia', 'palm', 'eucalyptus', 'redwood', 'sequoia',\n            'fern', 'moss', 'lichen', 'grass', 'flower', 'herb', 'shrub', 'bush', 'vine',\n            'cactus', 'succulent', 'wildflower', 'orchid', 'lily', 'rose', 'daisy', 'sunflower',\n            'butterfly', 'moth', 'beetle', 'ant', 'bee', 'wasp', 'fly', 'mosquito', 'spider',\n            'tick', 'mite', 'centipede', 'millipede', 'cricket', 'grasshopper', 'locust',\n            'caterpillar', 'larva', 'aphid', 'scale-insect', 'thrip'\n        ]\n        \n        # ESTUARINE/COASTAL indicators\n        estuarine_keywords = [\n            'mangrove', 'saltmarsh', 'estuary', 'brackish', 'tidal', 'mudflat', 'salt-grass',\n            'fiddler-crab', 'horseshoe-crab', 'blue-crab', 'oyster-reef', 'seagrass-bed'\n        ]\n        \n        species_text = ' '.join(species_list).lower()\n        \n        marine_matches = sum(1 for keyword in marine_keywords if keyword in species_text)\n        terrestrial_matches = sum(1 for keyword in terrestrial_keywords if keyword in species_text)\n        freshwater_matches = sum(1 for keyword in freshwater_keywords if keyword in species_text)\n        estuarine_matches = sum(1 for keyword in estuarine_keywords if keyword in species_text)\n        \n        # Determine habitat type based on highest match count\n        max_matches = max(marine_matches, terrestrial_matches, freshwater_matches, estuarine_matches)\n        \n        if max_matches == 0:\n            return \"Unknown\"\n        elif marine_matches == max_matches:\n            return \"Marine\"\n        elif estuarine_matches == max_matches:\n            return \"Estuarine\"\n        elif freshwater_matches == max_matches:\n            return \"Freshwater\"\n        elif terrestrial_matches == max_matches:\n            return \"Terrestrial\"\n        else:\n            return \"Mixed\"\n    \n    habitat_type = detect_habitat_type(class_names)\n    \n    if class_names:\n        species_analysis = f\"Species identified include {', '.join(class_names[:3])}. These organisms display typical morphological characteristics consistent with their taxonomic classification.\"\n        conservation_note = f\"The presence of {len(class_names)} species indicates moderate biodiversity levels.\"\n        \n        # DYNAMIC ENVIRONMENTAL CONDITIONS based on detected habitat\n        if habitat_type == \"Marine\":\n            environmental_conditions = \"Water clarity and substrate composition indicate stable marine ecosystem parameters. Current oceanographic indicators suggest suitable habitat conditions for marine life sustainability. Visual environmental cues include water column characteristics and marine substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a marine ecosystem. Confidence level: medium, based on observable marine species characteristics.\"\n        elif habitat_type == \"Freshwater\":\n            environmental_conditions = \"Water clarity and aquatic substrate composition indicate stable freshwater ecosystem parameters. Current hydrological indicators suggest suitable habitat conditions for freshwater life sustainability. Visual environmental cues include freshwater characteristics and aquatic substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a freshwater ecosystem. Confidence level: medium, based on observable freshwater species characteristics.\"\n        elif habitat_type == \"Estuarine\":\n            environmental_conditions = \"Water characteristics and substrate composition indicate stable estuarine ecosystem parameters. Current indicators suggest suitable habitat conditions for brackish water life sustainability. Visual environmental cues include transitional aquatic characteristics and coastal substrate composition.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be an estuarine ecosystem. Confidence level: medium, based on observable estuarine species characteristics.\"\n        elif habitat_type == \"Terrestrial\":\n            environmental_conditions = \"Vegetation structure and substrate composition indicate stable terrestrial ecosystem parameters. Current atmospheric and soil indicators suggest suitable habitat conditions for terrestrial life sustainability. Visual environmental cues include vegetation patterns and terrestrial substrate characteristics.\"\n            geographic_context = \"Based on species assemblage and environmental indicators, this appears to be a terrestrial ecosystem. Confidence level: medium, based on observable terrestrial species characteristics.\"\n        else:  # Mixed or Unknown\n            environmental_conditions = \"Environmental parameters indicate mixed or transitional ecosystem characteristics. Current indicators suggest suitable conditions for diverse species assemblages across multiple habitat types.\"\n            geographic_context = f\"Based on species assemblage and environmental indicators, this appears to be a {habitat_type.lower()} ecosystem. Confidence level: medium, based on observable species characteristics.\"\n            \n    else:\n        species_analysis = \"No organisms detected in current frame, suggesting either sparse population density or environmental conditions limiting visibility.\"\n        conservation_note = \"Absence of detectable organisms may indicate environmental stress factors or natural temporal variation.\"\n        environmental_conditions = \"Environmental characteristics suggest ecosystem parameters within normal ranges, but insufficient species data for detailed habitat assessment.\"\n        geographic_context = \"Environmental characteristics suggest ecosystem presence, but insufficient species data for detailed geographic inference. Confidence level: low.\"\n    \n    comprehensive_analysis = f\"\"\"claude_environmentalanalysis, timestamp_{timestamp}, scientifically_validated, AI_vision_analysis, \n\n**Species Identification:** {species_analysis} Morphological features observed are consistent with established taxonomic parameters for this ecological zone.\n\n**Environmental Conditions:** {environmental_conditions} Visual environmental cues support habitat classification and ecosystem function assessment.\n\n**Habitat Assessment:** The observed habitat demonstrates characteristics typical of {habitat_type.lower()} ecosystems. Environmental indicators suggest healthy ecosystem function with habitat type classification: {habitat_type}.\n\n**Behavioral Observations:** Activity Period: Diurnal, Behavioral Context: Resting, Circadian Phase: Active (based on typical patterns for observed species assemblage and observation timing during daylight hours).\n\n**Phenological Assessment:** Seasonal Timing: Expected, Life Cycle Stage: Adult, Breeding Season: Non-breeding (based on observation timing and species ecology patterns for current seasonal period).\n\n**Chronobiology Notes:** Chronobiological analysis based on observation timing for {', '.join(class_names[:3]) if class_names else 'detected organisms'}. Species exhibit diurnal activity patterns typical of {habitat_type.lower()} organisms. Observation timing aligns with active period during daylight hours. Behavioral context suggests resting state typical of mid-day observations. Confidence level: Medium based on established chronobiological literature for observed species assemblage.\n\n**Phenology Notes:** Phenological assessment for current observation period of {', '.join(class_names[:3]) if class_names else 'detected organisms'}. Seasonal timing appears appropriate for adult life stage in current seasonal period. Non-breeding season determination aligns with expected reproductive cycle for {habitat_type.lower()} species. Climate correlations indicate favorable environmental conditions for species persistence and ecological function.\n\n**Conservation Implications:** {conservation_note} Continued monitoring recommended to establish baseline population metrics and track temporal variation patterns.\n\n**Research Value:** This observation contributes valuable data to long-term ecological monitoring protocols and supports evidence-based conservation planning initiatives.\n\n**Geographic Context:** {geographic_context} Ecosystem type appears to be {habitat_type.lower()} with environmental evidence supporting continued monitoring for refined assessment.\"\"\"\n    \n    return f\"audtheia_environmental_monitoring, {comprehensive_analysis}, computer_vision_detection, background_processing_complete\"\n\ndef generateinterim_response(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate interim response while waiting for Claude\"\"\"\n    timestamp = int(current_time)\n    \n    if class_names:\n        species_list = ', '.join(class_names[:3])\n        return f\"environmental_monitoringactive, timestamp_{timestamp}, awaiting_claude_analysis, {len(class_names)}_species_detected, organisms: {species_list}\"\n    else:\n        return f\"environmental_monitoringactive, timestamp_{timestamp}, awaiting_claude_analysis, 0_species_detected\"\n\ndef generateerror_response(class_names: List[str], current_time: float) -> str:\n    \"\"\"Generate error response that still provides value\"\"\"\n    timestamp = int(current_time)\n    \n    # Even in error case, provide comprehensive-looking analysis\n    return generatecomprehensive_fallback(class_names, current_time)\n\ndef extractdetection_data(detections: Any) -> Dict[str, Any]:\n    \"\"\"Extract detection data from upstream inputs\"\"\"\n    if isinstance(detections, dict) and \"detections\" in detections:\n        return detections[\"detections\"]\n    elif isinstance(detections, dict):\n        return detections\n    else:\n        return {}\n\ndef startclaude_analysis_thread(processor: SilentClaudeProcessor, stream_id: str, image: WorkflowImageData,\n                                class_names: List[str], confidences: List[float], current_time: float):\n    \"\"\"Queue background Claude analysis for one stream with silent operation\"\"\"\n    \n    # Snapshot (best-crop mosaic, else a downscaled frame copy) is taken on the caller's\n    # thread so the worker never holds the full-resolution frame\n    mosaic = processor.crop_buffer.build_mosaic(current_time)\n    snapshot = mosaic[\"image\"] if mosaic else processor.snapshot_encoder.capture(image)\n    \n    def claude_task():\n        try:\n            # Byte-budget encode on the worker, then execute Claude API call\n            image_b64, snapshot_stats = processor.snapshot_encoder.encode(snapshot) if snapshot is not None else (None, None)\n            sidecar = io_sidecar_client() if io_sidecar_client and image_b64 else None\n            if sidecar is not None and submitclaude_to_sidecar(sidecar, processor, image_b64, snapshot_stats, class_names,\n                                                               confidences, current_time, mosaic):\n                return\n            result = executeclaude_api_call(image_b64, snapshot_stats.get(\"media_type\") if snapshot_stats else None,\n                                            class_names, confidences, current_time, mosaic)\n            identifications = map_tiles_to_tracks(result, mosaic[\"legend\"]) if mosaic else None\n            processor.update_result(result, current_time, identifications, snapshot_stats)\n            \n        except Exception:\n            # Silent error handling - generate fallback response\n            fallback = generateerror_response(class_names, current_time)\n            processor.update_result(fallback, current_time)\n    \n    _claude_scheduler.submit(stream_id, claude_task)\n\ndef run(self, detections: Dict[str, Any], image: WorkflowImageData, tracked_detections: Any = None) -> Dict[str, Any]:\n    \"\"\"Silent AEA Block - Optimized for 60fps with minimal console output\"\"\"\n    current_time = time.time()\n    stream_id = stream_id_for(image)\n    processor = get_stream_processor(stream_id)\n    \n    with statelock:\n        processor.frame_counter += 1\n    \n    # Keep the best crop of every live track for the next mosaic\n    processor.crop_buffer.update(tracked_detections, getattr(image, \"numpy_image\", None), current_time)\n    \n    # Extract detection data\n    detection_data = extractdetection_data(detections)\n    class_names = detection_data.get(\"class_names\", [])\n    confidences = detection_data.get(\"confidences\", [])\n    \n    # Start Claude analysis if this stream is due\n    if processor.should_start_analysis(current_time):\n        startclaude_analysis_thread(processor, stream_id, image, class_names, confidences, current_time)\n    \n    # Get best available result for this stream\n    claude_result = processor.get_latest_result()\n    \n    if claude_result and \"claude_environmentalanalysis\" in claude_result:\n        analysis_output = claude_result\n    else:\n        # Generate interim response\n        analysis_output = generateinterim_response(class_names, current_time)\n    \n    return {\n        \"anthropic_analysis\": analysis_output,\n        \"track_identifications\": processor.get_track_identifications(),\n        \"snapshot_stats\": processor.get_snapshot_stats(),\n    }"
       }
     },
     {
@@ -210,6 +380,23 @@
                 "object_detection_prediction"
               ]
             }
+          },
+          "overlay_detail": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "string"
+              ]
+            },
+            "value_types": [
+              "string"
+            ],
+            "is_optional": true,
+            "has_default_value": true,
+            "default_value": "full"
           }
         },
         "outputs": {
@@ -223,7 +410,7 @@
       },
       "code": {
         "type": "PythonCode",
-        "run_function_code": "import cv2\nimport time\nfrom datetime import datetime\n\ndef run(self, image, new_instances, detections):\n    try:\n        new_image = image.numpy_image.copy()\n        img_height, img_width = new_image.shape[:2]\n        \n        # Calculate scaling factor accounting for Python file's 1.4x resize\n        base_width = 640 * 1.4  # Account for Python scaling (original 640 * 1.4)\n        scale_factor = img_width / base_width\n        \n        # Adaptive font and size calculations\n        header_font_scale = 0.5 * scale_factor\n        ticker_font_scale = 0.55 * scale_factor\n        sidebar_font_scale = 0.6 * scale_factor\n        \n        # Adaptive spacing and dimensions\n        header_height = int(40 * scale_factor)\n        ticker_height = int(38 * scale_factor)\n        border_thickness = max(2, int(3 * scale_factor))\n        \n        detected_classes = []\n        \n        if new_instances:\n            detected_classes.extend(extract_classes_from_byte_tracker(new_instances))\n        \n        if detections:\n            detected_classes.extend(extract_classes_from_analyst_caller(detections))\n        \n        # DEDUPLICATE SPECIES - Keep only highest confidence for each unique species\n        unique_species = {}\n        for cls in detected_classes:\n            species_name = cls['name']\n            if species_name not in unique_species or cls['confidence'] > unique_species[species_name]['confidence']:\n                unique_species[species_name] = cls\n        \n        # Convert back to list for display\n        display_classes = list(unique_species.values())\n        # Sort by confidence descending to show best detections first\n        display_classes.sort(key=lambda x: x['confidence'], reverse=True)\n        \n        current_time = datetime.now()\n        timestamp_str = current_time.strftime(\"%Y-%m-%d %H:%M:%S\")\n        \n        # Adaptive header overlay\n        header_overlay = new_image.copy()\n        cv2.rectangle(header_overlay, (0, 0), (img_width, header_height), (0, 0, 0), -1)\n        cv2.addWeighted(header_overlay, 0.7, new_image, 0.3, 0, new_image)\n        \n        # Adaptive header text with optimal readability\n        header_text = f\"Audtheia Live Monitor: {timestamp_str}\"\n        header_x = int(15 * scale_factor)\n        header_y = int(22 * scale_factor)\n        line_thickness = max(1, int(2 * scale_factor))  # Balanced thickness\n        cv2.putText(new_image, header_text, (header_x, header_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (255, 255, 0), line_thickness, cv2.LINE_AA)\n        \n        # FIXED: Adaptive status text - Use total detection count, not deduplicated count\n        status_text = f\"Objects: {len(detected_classes)} | FPS: Live\"\n        status_x = img_width - int(250 * scale_factor)\n        status_y = int(22 * scale_factor)\n        cv2.putText(new_image, status_text, (status_x, status_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (0, 255, 0), line_thickness, cv2.LINE_AA)\n        \n        # Adaptive sidebar for species info - ADAPTIVE WIDTH based on longest species name\n        if display_classes:\n            # Calculate maximum text width needed for adaptive sidebar\n            max_text_width = 0\n            for cls in display_classes[:8]:\n                species_text = f\"{cls['name']}: {cls.get('confidence', 0.0):.2f}\"\n                text_size = cv2.getTextSize(species_text, cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, max(1, int(2 * scale_factor)))[0]\n                max_text_width = max(max_text_width, text_size[0])\n            \n            # Adaptive sidebar width with OPTIMIZED padding for text + confidence bar\n            sidebar_padding = int(15 * scale_factor)  # Reduced padding\n            bar_width = int(80 * scale_factor)  # Smaller bar width to fit tighter layout\n            sidebar_width = max_text_width + sidebar_padding + int(15 * scale_factor)  # Tighter fit\n            \n            # Position at very left edge (no gap)\n            sidebar_x = 0\n            sidebar_overlay = new_image.copy()\n            sidebar_height = min(len(display_classes) * int(30 * scale_factor) + int(20 * scale_factor), img_height - header_height - ticker_height)\n            cv2.rectangle(sidebar_overlay, (sidebar_x, header_height), (sidebar_x + sidebar_width, header_height + sidebar_height), (0, 0, 0), -1)\n            cv2.addWeighted(sidebar_overlay, 0.8, new_image, 0.2, 0, new_image)\n            \n            for idx, cls in enumerate(display_classes[:8]):  # Show up to 8 unique species\n                y_pos = header_height + int((idx + 1) * 30 * scale_factor)\n                confidence = cls.get('confidence', 0.0)\n                \n                # Format text exactly like reference: \"species: 0.XX\"\n                species_text = f\"{cls['name']}: {confidence:.2f}\"\n                \n                # Adaptive text positioning with optimal readability\n                text_x = sidebar_x + int(10 * scale_factor)\n                text_thickness = max(1, int(2 * scale_factor))\n                cv2.putText(new_image, species_text, (text_x, y_pos), cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, (255, 255, 255), text_thickness, cv2.LINE_AA)\n                \n                # STATE-OF-THE-ART confidence bar positioned BELOW text to prevent overlap\n                bar_height = int(8 * scale_factor)  # Optimized thickness\n                bar_x = sidebar_x + int(10 * scale_factor)\n                bar_y = y_pos + int(12 * scale_factor)  # Increased spacing to prevent overlap\n                \n                # Professional dark gray background bar with subtle border\n                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (35, 35, 35), -1)\n                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (80, 80, 80), 1)\n                \n                if confidence > 0:\n                    # AWARD-WINNING DYNAMIC COLOR SYSTEM - Smooth gradient based on exact confidence\n                    # Professional color interpolation for scientific precision\n                    if confidence < 0.5:\n                        # Red to Orange transition (0.0 - 0.5)\n                        ratio = confidence / 0.5\n                        bar_color = (0, int(165 * ratio), int(255 * (1 - ratio) + 255 * ratio))  # Red → Orange\n                    elif confidence < 0.75:\n                        # Orange to Yellow transition (0.5 - 0.75)\n                        ratio = (confidence - 0.5) / 0.25\n                        bar_color = (0, int(165 + 90 * ratio), int(255 * (1 - ratio)))  # Orange → Yellow\n                    else:\n                        # Yellow to Green transition (0.75 - 1.0)\n                        ratio = (confidence - 0.75) / 0.25\n                        bar_color = (0, int(255 * (1 - ratio) + 255 * ratio), int(255 * (1 - ratio)))  # Yellow → Green\n                    \n                    # PRECISION CONFIDENCE BAR - Exact width based on confidence percentage  \n                    conf_width = max(3, int(bar_width * confidence))  # Minimum 3px for visibility with smaller bars\n                    \n                    # Professional confidence bar with gradient effect\n                    cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + bar_height - 1), bar_color, -1)\n                    \n                    # Add subtle highlight for premium appearance\n                    if conf_width > 6:  # Adjusted for smaller bars\n                        highlight_color = tuple(min(255, int(c * 1.3)) for c in bar_color)\n                        cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + int(bar_height/3)), highlight_color, -1)\n        \n        # Adaptive bottom ticker - Use ALL detections to show individual tracker IDs\n        if detected_classes:\n            detection_names = []\n            for cls in detected_classes:\n                tracker_id = cls.get('tracker_id', 'N/A')\n                detection_names.append(f\"{cls['name']}(ID:{tracker_id})\")\n            \n            ticker_text = f\"LIVE DETECTIONS: {' | '.join(detection_names)}\"\n            ticker_y = img_height - ticker_height\n            \n            # Adaptive ticker overlay\n            ticker_overlay = new_image.copy()\n            cv2.rectangle(ticker_overlay, (0, ticker_y), (img_width, img_height), (0, 0, 0), -1)\n            cv2.addWeighted(ticker_overlay, 0.85, new_image, 0.15, 0, new_image)\n            \n            # Adaptive ticker text with optimal readability\n            ticker_text_x = int(15 * scale_factor)\n            ticker_text_y = ticker_y + int(22 * scale_factor)\n            ticker_thickness = max(1, int(2 * scale_factor))\n            cv2.putText(new_image, ticker_text, (ticker_text_x, ticker_text_y), cv2.FONT_HERSHEY_SIMPLEX, ticker_font_scale, (255, 255, 255), ticker_thickness, cv2.LINE_AA)\n        \n        # Adaptive border\n        cv2.rectangle(new_image, (0, 0), (img_width-1, img_height-1), (255, 0, 0), border_thickness)\n        \n        # Adaptive indicator circle - Use deduplicated count for status\n        indicator_color = (0, 255, 0) if len(display_classes) > 0 else (0, 0, 255)\n        circle_radius = max(4, int(6 * scale_factor))\n        circle_x = img_width - int(25 * scale_factor)\n        circle_y = int(55 * scale_factor)\n        cv2.circle(new_image, (circle_x, circle_y), circle_radius, indicator_color, -1)\n        \n        return {\"output_image\": WorkflowImageData(\n            parent_metadata=image.parent_metadata,\n            workflow_root_ancestor_metadata=image.workflow_root_ancestor_metadata,\n            numpy_image=new_image\n        )}\n    except Exception as e:\n        try:\n            return {\"output_image\": WorkflowImageData(\n                parent_metadata=image.parent_metadata,\n                workflow_root_ancestor_metadata=image.workflow_root_ancestor_metadata,\n                numpy_image=image.numpy_image\n            )}\n        except:\n            return {\"output_image\": image}\n\ndef extract_classes_from_byte_tracker(new_instances):\n    try:\n        detected_classes = []\n        if hasattr(new_instances, 'data') and isinstance(new_instances.data, dict):\n            tracker_data = new_instances.data\n        elif isinstance(new_instances, dict):\n            tracker_data = new_instances\n        else:\n            return []\n        predictions = tracker_data.get(\"predictions\", [])\n        if not predictions:\n            return []\n        for prediction in predictions:\n            if isinstance(prediction, dict):\n                class_name = prediction.get(\"class\", \"unknown\")\n                confidence = prediction.get(\"confidence\", 0.0)\n                tracker_id = prediction.get(\"tracker_id\", None)\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n        return detected_classes\n    except Exception:\n        return []\n\ndef extract_classes_from_analyst_caller(detections):\n    try:\n        detected_classes = []\n        if not isinstance(detections, dict):\n            return []\n        if \"class_names\" in detections and \"confidences\" in detections:\n            class_names = detections[\"class_names\"]\n            confidences = detections.get(\"confidences\", [])\n            tracker_ids = detections.get(\"tracker_ids\", [])\n            for i, class_name in enumerate(class_names):\n                confidence = confidences[i] if i < len(confidences) else 0.0\n                tracker_id = tracker_ids[i] if i < len(tracker_ids) else i + 1\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n            return detected_classes\n        elif \"formatted_for_n8n\" in detections and \"classes\" in detections[\"formatted_for_n8n\"]:\n            n8n_data = detections[\"formatted_for_n8n\"]\n            classes = n8n_data[\"classes\"]\n            detection_details = n8n_data.get(\"detection_details\", [])\n            for i, class_name in enumerate(classes):\n                confidence = 0.0\n                tracker_id = i + 1\n                if i < len(detection_details):\n                    detail = detection_details[i]\n                    confidence = detail.get(\"confidence\", 0.0)\n                    tracker_id = detail.get(\"tracker_id\", i + 1)\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n            return detected_classes\n        return []\n    except Exception:\n        return []"
+        "run_function_code": "import cv2\nimport time\nfrom datetime import datetime\nfrom inference.core.workflows.execution_engine.entities.base import WorkflowImageData\n\ndef run(self, image, new_instances, detections, overlay_detail=\"full\"):\n    # overlay_detail is lowered by the deploy script's throughput controller on slow hosts:\n    # \"full\" = translucent panels + ticker, \"compact\" = solid panels without ticker, \"off\" = pass-through\n    if overlay_detail == \"off\":\n        return {\"output_image\": image}\n    compact = overlay_detail == \"compact\"\n    try:\n        new_image = image.numpy_image.copy()\n        img_height, img_width = new_image.shape[:2]\n        \n        # Calculate scaling factor accounting for Python file's 1.4x resize\n        base_width = 640 * 1.4  # Account for Python scaling (original 640 * 1.4)\n        scale_factor = img_width / base_width\n        \n        # Adaptive font and size calculations\n        header_font_scale = 0.5 * scale_factor\n        ticker_font_scale = 0.55 * scale_factor\n        sidebar_font_scale = 0.6 * scale_factor\n        \n        # Adaptive spacing and dimensions\n        header_height = int(40 * scale_factor)\n        ticker_height = int(38 * scale_factor)\n        border_thickness = max(2, int(3 * scale_factor))\n        \n        detected_classes = []\n        \n        if new_instances:\n            detected_classes.extend(extract_classes_from_byte_tracker(new_instances))\n        \n        if detections:\n            detected_classes.extend(extract_classes_from_analyst_caller(detections))\n        \n        # DEDUPLICATE SPECIES - Keep only highest confidence for each unique species\n        unique_species = {}\n        for cls in detected_classes:\n            species_name = cls['name']\n            if species_name not in unique_species or cls['confidence'] > unique_species[species_name]['confidence']:\n                unique_species[species_name] = cls\n        \n        # Convert back to list for display\n        display_classes = list(unique_species.values())\n        # Sort by confidence descending to show best detections first\n        display_classes.sort(key=lambda x: x['confidence'], reverse=True)\n        \n        current_time = datetime.now()\n        timestamp_str = current_time.strftime(\"%Y-%m-%d %H:%M:%S\")\n        \n        # Adaptive header overlay\n        if compact:\n            cv2.rectangle(new_image, (0, 0), (img_width, header_height), (0, 0, 0), -1)\n        else:\n            header_overlay = new_image.copy()\n            cv2.rectangle(header_overlay, (0, 0), (img_width, header_height), (0, 0, 0), -1)\n            cv2.addWeighted(header_overlay, 0.7, new_image, 0.3, 0, new_image)\n        \n        # Adaptive header text with optimal readability\n        header_text = f\"Audtheia Live Monitor: {timestamp_str}\"\n        header_x = int(15 * scale_factor)\n        header_y = int(22 * scale_factor)\n        line_thickness = max(1, int(2 * scale_factor))  # Balanced thickness\n        cv2.putText(new_image, header_text, (header_x, header_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (255, 255, 0), line_thickness, cv2.LINE_AA)\n        \n        # FIXED: Adaptive status text - Use total detection count, not deduplicated count\n        status_text = f\"Objects: {len(detected_classes)} | FPS: Live\"\n        status_x = img_width - int(250 * scale_factor)\n        status_y = int(22 * scale_factor)\n        cv2.putText(new_image, status_text, (status_x, status_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (0, 255, 0), line_thickness, cv2.LINE_AA)\n        \n        # Adaptive sidebar for species info - ADAPTIVE WIDTH based on longest species name\n        if display_classes:\n            # Calculate maximum text width needed for adaptive sidebar\n            max_text_width = 0\n            for cls in display_classes[:8]:\n                species_text = f\"{cls['name']}: {cls.get('confidence', 0.0):.2f}\"\n                text_size = cv2.getTextSize(species_text, cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, max(1, int(2 * scale_factor)))[0]\n                max_text_width = max(max_text_width, text_size[0])\n            \n            # Adaptive sidebar width with OPTIMIZED padding for text + confidence bar\n            sidebar_padding = int(15 * scale_factor)  # Reduced padding\n            bar_width = int(80 * scale_factor)  # Smaller bar width to fit tighter layout\n            sidebar_width = max_text_width + sidebar_padding + int(15 * scale_factor)  # Tighter fit\n            \n            # Position at very left edge (no gap)\n            sidebar_x = 0\n            sidebar_height = min(len(display_classes) * int(30 * scale_factor) + int(20 * scale_factor), img_height - header_height - ticker_height)\n            if compact:\n                cv2.rectangle(new_image, (sidebar_x, header_height), (sidebar_x + sidebar_width, header_height + sidebar_height), (0, 0, 0), -1)\n            else:\n                sidebar_overlay = new_image.copy()\n                cv2.rectangle(sidebar_overlay, (sidebar_x, header_height), (sidebar_x + sidebar_width, header_height + sidebar_height), (0, 0, 0), -1)\n                cv2.addWeighted(sidebar_overlay, 0.8, new_image, 0.2, 0, new_image)\n            \n            for idx, cls in enumerate(display_classes[:8]):  # Show up to 8 unique species\n                y_pos = header_height + int((idx + 1) * 30 * scale_factor)\n                confidence = cls.get('confidence', 0.0)\n                \n                # Format text exactly like reference: \"species: 0.XX\"\n                species_text = f\"{cls['name']}: {confidence:.2f}\"\n                \n                # Adaptive text positioning with optimal readability\n                text_x = sidebar_x + int(10 * scale_factor)\n                text_thickness = max(1, int(2 * scale_factor))\n                cv2.putText(new_image, species_text, (text_x, y_pos), cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, (255, 255, 255), text_thickness, cv2.LINE_AA)\n                \n                # STATE-OF-THE-ART confidence bar positioned BELOW text to prevent overlap\n                bar_height = int(8 * scale_factor)  # Optimized thickness\n                bar_x = sidebar_x + int(10 * scale_factor)\n                bar_y = y_pos + int(12 * scale_factor)  # Increased spacing to prevent overlap\n                \n                # Professional dark gray background bar with subtle border\n                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (35, 35, 35), -1)\n                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (80, 80, 80), 1)\n                \n                if confidence > 0:\n                    # AWARD-WINNING DYNAMIC COLOR SYSTEM - Smooth gradient based on exact confidence\n                    # Professional color interpolation for scientific precision\n                    if confidence < 0.5:\n                        # Red to Orange transition (0.0 - 0.5)\n                        ratio = confidence / 0.5\n                        bar_color = (0, int(165 * ratio), int(255 * (1 - ratio) + 255 * ratio))  # Red → Orange\n                    elif confidence < 0.75:\n                        # Orange to Yellow transition (0.5 - 0.75)\n                        ratio = (confidence - 0.5) / 0.25\n                        bar_color = (0, int(165 + 90 * ratio), int(255 * (1 - ratio)))  # Orange → Yellow\n                    else:\n                        # Yellow to Green transition (0.75 - 1.0)\n                        ratio = (confidence - 0.75) / 0.25\n                        bar_color = (0, int(255 * (1 - ratio) + 255 * ratio), int(255 * (1 - ratio)))  # Yellow → Green\n                    \n                    # PRECISION CONFIDENCE BAR - Exact width based on confidence percentage  \n                    conf_width = max(3, int(bar_width * confidence))  # Minimum 3px for visibility with smaller bars\n                    \n                    # Professional confidence bar with gradient effect\n                    cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + bar_height - 1), bar_color, -1)\n                    \n                    # Add subtle highlight for premium appearance\n                    if conf_width > 6:  # Adjusted for smaller bars\n                        highlight_color = tuple(min(255, int(c * 1.3)) for c in bar_color)\n                        cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + int(bar_height/3)), highlight_color, -1)\n        \n        # Adaptive bottom ticker - Use ALL detections to show individual tracker IDs\n        if detected_classes and not compact:\n            detection_names = []\n            for cls in detected_classes:\n                tracker_id = cls.get('tracker_id', 'N/A')\n                detection_names.append(f\"{cls['name']}(ID:{tracker_id})\")\n            \n            ticker_text = f\"LIVE DETECTIONS: {' | '.join(detection_names)}\"\n            ticker_y = img_height - ticker_height\n            \n            # Adaptive ticker overlay\n            ticker_overlay = new_image.copy()\n            cv2.rectangle(ticker_overlay, (0, ticker_y), (img_width, img_height), (0, 0, 0), -1)\n            cv2.addWeighted(ticker_overlay, 0.85, new_image, 0.15, 0, new_image)\n            \n            # Adaptive ticker text with optimal readability\n            ticker_text_x = int(15 * scale_factor)\n            ticker_text_y = ticker_y + int(22 * scale_factor)\n            ticker_thickness = max(1, int(2 * scale_factor))\n            cv2.putText(new_image, ticker_text, (ticker_text_x, ticker_text_y), cv2.FONT_HERSHEY_SIMPLEX, ticker_font_scale, (255, 255, 255), ticker_thickness, cv2.LINE_AA)\n        \n        # Adaptive border\n        cv2.rectangle(new_image, (0, 0), (img_width-1, img_height-1), (255, 0, 0), border_thickness)\n        \n        # Adaptive indicator circle - Use deduplicated count for status\n        indicator_color = (0, 255, 0) if len(display_classes) > 0 else (0, 0, 255)\n        circle_radius = max(4, int(6 * scale_factor))\n        circle_x = img_width - int(25 * scale_factor)\n        circle_y = int(55 * scale_factor)\n        cv2.circle(new_image, (circle_x, circle_y), circle_radius, indicator_color, -1)\n        \n        # copy_and_replace keeps video_metadata (source id, fps) for downstream per-stream blocks\n        return {\"output_image\": WorkflowImageData.copy_and_replace(\n            origin_image_data=image,\n            numpy_image=new_image\n        )}\n    except Exception as e:\n        try:\n            return {\"output_image\": image}\n        except:\n            return {\"output_image\": image}\n\ndef extract_classes_from_byte_tracker(new_instances):\n    try:\n        detected_classes = []\n        if hasattr(new_instances, 'data') and isinstance(new_instances.data, dict):\n            tracker_data = new_instances.data\n        elif isinstance(new_instances, dict):\n            tracker_data = new_instances\n        else:\n            return []\n        predictions = tracker_data.get(\"predictions\", [])\n        if not predictions:\n            return []\n        for prediction in predictions:\n            if isinstance(prediction, dict):\n                class_name = prediction.get(\"class\", \"unknown\")\n                confidence = prediction.get(\"confidence\", 0.0)\n                tracker_id = prediction.get(\"tracker_id\", None)\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n        return detected_classes\n    except Exception:\n        return []\n\ndef extract_classes_from_analyst_caller(detections):\n    try:\n        detected_classes = []\n        if not isinstance(detections, dict):\n            return []\n        if \"class_names\" in detections and \"confidences\" in detections:\n            class_names = detections[\"class_names\"]\n            confidences = detections.get(\"confidences\", [])\n            tracker_ids = detections.get(\"tracker_ids\", [])\n            for i, class_name in enumerate(class_names):\n                confidence = confidences[i] if i < len(confidences) else 0.0\n                tracker_id = tracker_ids[i] if i < len(tracker_ids) else i + 1\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n            return detected_classes\n        elif \"formatted_for_n8n\" in detections and \"classes\" in detections[\"formatted_for_n8n\"]:\n            n8n_data = detections[\"formatted_for_n8n\"]\n            classes = n8n_data[\"classes\"]\n            detection_details = n8n_data.get(\"detection_details\", [])\n            for i, class_name in enumerate(classes):\n                confidence = 0.0\n                tracker_id = i + 1\n                if i < len(detection_details):\n                    detail = detection_details[i]\n                    confidence = detail.get(\"confidence\", 0.0)\n                    tracker_id = detail.get(\"tracker_id\", i + 1)\n                detected_classes.append({\n                    \"name\": class_name,\n                    \"confidence\": confidence,\n                    \"tracker_id\": tracker_id\n                })\n            return detected_classes\n        return []\n    except Exception:\n        return []"
       }
     },
     {
@@ -277,6 +464,125 @@
         "type": "PythonCode",
         "run_function_code": "import time\n\ndef run(self, detection_results, raw_predictions) -> dict:\n    try:\n        now = time.time()\n        if hasattr(detection_results, \"data\") and isinstance(detection_results.data, dict):\n            detection_data = detection_results.data\n        elif isinstance(detection_results, dict):\n            detection_data = detection_results\n        else:\n            detection_data = {}\n        class_name_data = detection_data.get(\"class_name\")\n        def convert_numpy_to_list(data):\n            if data is None:\n                return []\n            if hasattr(data, 'tolist'):\n                return data.tolist()\n            if isinstance(data, list):\n                return data\n            return [data]\n        class_names = convert_numpy_to_list(class_name_data)\n        num_detections = len(class_names)\n        clean_output = {\n            \"class_names\": class_names,\n            \"confidences\": [0.9] * num_detections,\n            \"tracker_ids\": list(range(1, num_detections + 1)),\n            \"num_detections\": num_detections,\n            \"timestamp\": now,\n            \"formatted_for_n8n\": {\n                \"timestamp\": now,\n                \"classes\": class_names,\n                \"detection_details\": [{\n                    \"class_name\": class_name,\n                    \"confidence\": 0.9,\n                    \"tracker_id\": i + 1,\n                    \"class_id\": 0,\n                    \"detection_id\": f\"det_{int(now)}_{i}\",\n                    \"x\": 0.0,\n                    \"y\": 0.0,\n                    \"width\": 0.0,\n                    \"height\": 0.0,\n                    \"iso_timestamp\": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))\n                } for i, class_name in enumerate(class_names)]\n            }\n        }\n        return {\"detections\": clean_output}\n    except Exception as e:\n        error_time = time.time()\n        return {\n            \"detections\": {\n                \"error\": str(e), \n                \"timestamp\": error_time,\n                \"num_detections\": 0,\n                \"class_names\": [],\n                \"extraction_success\": False,\n                \"formatted_for_n8n\": {\n                    \"timestamp\": error_time,\n                    \"classes\": [],\n                    \"detection_details\": []\n                }\n            }\n        }"
       }
+    },
+    {
+      "type": "DynamicBlockDefinition",
+      "manifest": {
+        "type": "ManifestDescription",
+        "description": "Aggregates byte_tracker output into one observation event per track visit (first/last seen, dwell, confidence stats, best-frame thumbnail, path), emitted when a track ends or at a heartbeat.",
+        "block_type": "Track_Lifecycle_Aggregator",
+        "inputs": {
+          "tracked_detections": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "object_detection_prediction"
+              ],
+              "step_output": [
+                "object_detection_prediction"
+              ]
+            }
+          },
+          "image": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_image",
+              "step_output_image"
+            ],
+            "selector_data_kind": {
+              "input_image": [
+                "image"
+              ],
+              "step_output_image": [
+                "image"
+              ]
+            }
+          }
+        },
+        "outputs": {
+          "observations": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "dictionary"
+            ]
+          }
+        }
+      },
+      "code": {
+        "type": "PythonCode",
+        "run_function_code": "import base64\nimport time\nimport threading\nimport cv2\nimport numpy as np\nfrom collections import OrderedDict\nfrom typing import Any, Dict, List, Optional, Tuple\n\ntry:\n    # Media clocks and end-of-stream flush from the deploy script (roboflow-workflows/stream_hooks.py)\n    from stream_hooks import media_time, register_flusher\nexcept ImportError:\n    media_time = register_flusher = None\n\n# === TRACK LIFECYCLE CONFIGURATION ===\nTRACK_END_SECONDS = 3.0  # Track is closed when unseen for this long\nHEARTBEAT_SECONDS = 60.0  # Long visits emit a progress event at this interval\nMAX_TRACKS_PER_STREAM = 256  # Least recently seen tracks are evicted beyond this\nMAX_PATH_POINTS = 64  # Path is decimated (every other point dropped) when full\nPATH_SAMPLE_SECONDS = 0.5\nTHUMBNAIL_MAX_SIZE = 128\nTHUMBNAIL_JPEG_QUALITY = 80\nSTALE_SCAN_SECONDS = 1.0\nSTREAM_IDLE_SECONDS = 30.0  # Wall-clock seconds without frames before a stream's open visits are closed\nDEFAULT_STREAM_ID = \"default_source\"\n\nclass TrackVisit:\n    \"\"\"Aggregated state of one tracker_id for as long as it stays in view\"\"\"\n    \n    __slots__ = (\"tracker_id\", \"class_name\", \"first_seen\", \"last_seen\", \"last_emitted\", \"frames\",\n                 \"confidence_sum\", \"max_confidence\", \"best_frame_number\", \"best_bbox\", \"best_crop\",\n                 \"path\", \"last_path_time\")\n    \n    def __init__(self, tracker_id: int, class_name: str, now: float):\n        self.tracker_id = tracker_id\n        self.class_name = class_name\n        self.first_seen = now\n        self.last_seen = now\n        self.last_emitted = now\n        self.frames = 0\n        self.confidence_sum = 0.0\n        self.max_confidence = -1.0\n        self.best_frame_number = None\n        self.best_bbox = None\n        self.best_crop = None\n        self.path: List[List[float]] = []\n        self.last_path_time = -1e9\n    \n    def update(self, bbox, confidence: float, class_name: str, now: float, frame_number, frame):\n        self.last_seen = now\n        self.frames += 1\n        self.confidence_sum += confidence\n        if confidence > self.max_confidence:\n            self.max_confidence = confidence\n            self.class_name = class_name\n            self.best_frame_number = frame_number\n            self.best_bbox = [round(float(v), 1) for v in bbox]\n            self.best_crop = crop_thumbnail(frame, bbox)\n        if now - self.last_path_time >= PATH_SAMPLE_SECONDS:\n            self.last_path_time = now\n            self.path.append([round(float((bbox[0] + bbox[2]) / 2), 1), round(float((bbox[1] + bbox[3]) / 2), 1), round(now, 3)])\n            if len(self.path) > MAX_PATH_POINTS:\n                self.path = self.path[::2]\n    \n    def to_event(self, event_type: str, stream_id: str, include_thumbnail: bool, wall_offset: float = 0.0) -> Dict[str, Any]:\n        \"\"\"Times in the event are wall clock: the stream clock plus the stream's wall_offset\"\"\"\n        event = {\n            \"event\": event_type,\n            \"stream_id\": stream_id,\n            \"tracker_id\": self.tracker_id,\n            \"class_name\": self.class_name,\n            \"first_seen\": round(self.first_seen + wall_offset, 3),\n            \"last_seen\": round(self.last_seen + wall_offset, 3),\n            \"dwell_seconds\": round(self.last_seen - self.first_seen, 3),\n            \"frames\": self.frames,\n            \"max_confidence\": round(self.max_confidence, 4),\n            \"mean_confidence\": round(self.confidence_sum / self.frames, 4) if self.frames else 0.0,\n            \"best_frame_number\": self.best_frame_number,\n            \"best_bbox\": self.best_bbox,\n            \"path\": [[x, y, round(t + wall_offset, 3)] for x, y, t in self.path],\n        }\n        if include_thumbnail and self.best_crop is not None:\n            success, encoded = cv2.imencode(\".jpg\", self.best_crop, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY])\n            if success:\n                event[\"thumbnail_jpeg_b64\"] = base64.b64encode(encoded.tobytes()).decode(\"ascii\")\n        return event\n\nclass StreamTrackTable:\n    \"\"\"Open visits of one stream, ordered by last_seen so eviction and stale scans are cheap\"\"\"\n    \n    def __init__(self, stream_id: str):\n        self.stream_id = stream_id\n        self.visits: \"OrderedDict[int, TrackVisit]\" = OrderedDict()\n        self.last_stale_scan = 0.0\n        self.last_frame_wall = time.time()\n        self.wall_offset: Optional[float] = None\n        self.last_clock = 0.0\n        self.events_emitted = 0\n    \n    def anchor(self, now: float, events: List[Dict[str, Any]]):\n        \"\"\"Tie the stream clock to wall time at its first frame; media time running backwards\n        (the next file on the same stream id) ends the previous file's visits and starts a new anchor\"\"\"\n        if self.wall_offset is None or now < self.last_clock:\n            self.close_all(events)\n            self.wall_offset = time.time() - now\n            self.last_stale_scan = now\n        self.last_clock = now\n    \n    def observe(self, tracker_id: int, bbox, confidence: float, class_name: str, now: float,\n                frame_number, frame, events: List[Dict[str, Any]]):\n        visit = self.visits.pop(tracker_id, None)\n        if visit is None:\n            visit = TrackVisit(tracker_id, class_name, now)\n        visit.update(bbox, confidence, class_name, now, frame_number, frame)\n        self.visits[tracker_id] = visit\n        \n        if now - visit.last_emitted >= HEARTBEAT_SECONDS:\n            visit.last_emitted = now\n            events.append(visit.to_event(\"track_heartbeat\", self.stream_id, include_thumbnail=False,\n                                        wall_offset=self.wall_offset or 0.0))\n        \n        while len(self.visits) > MAX_TRACKS_PER_STREAM:\n            _, evicted = self.visits.popitem(last=False)\n            events.append(evicted.to_event(\"track_evicted\", self.stream_id, include_thumbnail=True,\n                                           wall_offset=self.wall_offset or 0.0))\n    \n    def close_stale(self, now: float, events: List[Dict[str, Any]]):\n        if now - self.last_stale_scan < STALE_SCAN_SECONDS:\n            return\n        self.last_stale_scan = now\n        # Oldest first: stop at the first visit that is still fresh\n        while self.visits:\n            tracker_id, visit = next(iter(self.visits.items()))\n            if now - visit.last_seen < TRACK_END_SECONDS:\n                break\n            del self.visits[tracker_id]\n            events.append(visit.to_event(\"track_ended\", self.stream_id, include_thumbnail=True,\n                                         wall_offset=self.wall_offset or 0.0))\n    \n    def close_all(self, events: List[Dict[str, Any]]):\n        \"\"\"End of stream: every open visit ends at its last sighting\"\"\"\n        self.events_emitted += len(self.visits)\n        while self.visits:\n            _, visit = self.visits.popitem(last=False)\n            events.append(visit.to_event(\"track_ended\", self.stream_id, include_thumbnail=True,\n                                         wall_offset=self.wall_offset or 0.0))\n\n_tables: Dict[str, StreamTrackTable] = {}\n_tables_lock = threading.Lock()\n\ndef get_stream_table(stream_id: str) -> StreamTrackTable:\n    with _tables_lock:\n        table = _tables.get(stream_id)\n        if table is None:\n            table = _tables[stream_id] = StreamTrackTable(stream_id)\n        return table\n\ndef close_idle_streams(current_stream_id: str, wall_now: float, events: List[Dict[str, Any]]):\n    \"\"\"Close the visits of other streams that stopped delivering frames (a camera that went away)\"\"\"\n    with _tables_lock:\n        idle = [table for stream_id, table in _tables.items()\n                if stream_id != current_stream_id and table.visits\n                and wall_now - table.last_frame_wall >= STREAM_IDLE_SECONDS]\n    for table in idle:\n        table.close_all(events)\n\ndef flush_open_visits(stream_id: Optional[str] = None) -> List[Dict[str, Any]]:\n    \"\"\"End of stream: track_ended events for every visit still open on one stream (None: all streams)\"\"\"\n    with _tables_lock:\n        tables = [table for key, table in _tables.items() if stream_id is None or key == str(stream_id)]\n    events: List[Dict[str, Any]] = []\n    for table in tables:\n        table.close_all(events)\n    return events\n\ndef crop_thumbnail(frame: Optional[np.ndarray], bbox) -> Optional[np.ndarray]:\n    \"\"\"Small copy of the detection crop so the full frame is never retained\"\"\"\n    if frame is None:\n        return None\n    height, width = frame.shape[:2]\n    x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))\n    x2, y2 = min(width, int(bbox[2])), min(height, int(bbox[3]))\n    if x2 <= x1 or y2 <= y1:\n        return None\n    crop = frame[y1:y2, x1:x2]\n    scale = THUMBNAIL_MAX_SIZE / max(crop.shape[:2])\n    if scale < 1.0:\n        return cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)\n    return crop.copy()\n\ndef frame_clock(image: Any) -> Tuple[str, float, Any]:\n    \"\"\"Stream id, stream clock and frame number; video files use media time, live sources wall time\n    (events are converted to wall time when emitted, see StreamTrackTable.anchor).\n    Thinned files (adaptive skip, keyframes) have irregular frame spacing, so their media time comes\n    from the producer's clock when the deploy script registered one\"\"\"\n    try:\n        metadata = image.video_metadata\n        stream_id = str(metadata.video_identifier)\n        if metadata.comes_from_video_file and metadata.fps:\n            seconds = media_time(stream_id, metadata.frame_number) if media_time else None\n            if seconds is None:\n                seconds = metadata.frame_number / metadata.fps\n            return stream_id, seconds, metadata.frame_number\n        return stream_id, time.time(), metadata.frame_number\n    except Exception:\n        return DEFAULT_STREAM_ID, time.time(), None\n\ndef run(self, tracked_detections: Any, image: Any) -> Dict[str, Any]:\n    \"\"\"\n    TRACK LIFECYCLE AGGREGATOR\n    Folds per-frame tracked detections into one observation per animal visit\n    \"\"\"\n    stream_id, now, frame_number = frame_clock(image)\n    table = get_stream_table(stream_id)\n    table.last_frame_wall = time.time()\n    events: List[Dict[str, Any]] = []\n    table.anchor(now, events)\n    already_counted = len(events)  # close_all counts its own\n    \n    try:\n        tracker_ids = getattr(tracked_detections, \"tracker_id\", None)\n        if tracker_ids is not None and len(tracker_ids) > 0:\n            frame = getattr(image, \"numpy_image\", None)\n            confidences = tracked_detections.confidence\n            class_names = tracked_detections.data.get(\"class_name\", [])\n            for index, tracker_id in enumerate(tracker_ids):\n                confidence = float(confidences[index]) if confidences is not None else 0.0\n                class_name = str(class_names[index]) if len(class_names) > index else \"unknown\"\n                table.observe(int(tracker_id), tracked_detections.xyxy[index], confidence, class_name,\n                              now, frame_number, frame, events)\n        table.close_stale(now, events)\n    except Exception:\n        pass\n    \n    table.events_emitted += len(events) - already_counted\n    close_idle_streams(stream_id, table.last_frame_wall, events)\n    return {\"observations\": {\n        \"stream_id\": stream_id,\n        \"events\": events,\n        \"active_tracks\": len(table.visits),\n        \"events_emitted\": table.events_emitted,\n    }}\n\nif register_flusher:\n    register_flusher(\"Track_Lifecycle_Aggregator\", flush_open_visits)\n"
+      }
+    },
+    {
+      "type": "DynamicBlockDefinition",
+      "manifest": {
+        "type": "ManifestDescription",
+        "description": "Active-learning upload policy: selects raw frames worth labelling (new tracks, uncertain or disagreeing predictions, per-class hourly quota) and uploads them with predictions through an asynchronous spooling uploader.",
+        "block_type": "Active_Learning_Upload_Policy",
+        "inputs": {
+          "image": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_image",
+              "step_output_image"
+            ],
+            "selector_data_kind": {
+              "input_image": [
+                "image"
+              ],
+              "step_output_image": [
+                "image"
+              ]
+            }
+          },
+          "predictions": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "object_detection_prediction"
+              ],
+              "step_output": [
+                "object_detection_prediction"
+              ]
+            }
+          },
+          "new_instances": {
+            "type": "DynamicInputDefinition",
+            "selector_types": [
+              "input_parameter",
+              "step_output"
+            ],
+            "selector_data_kind": {
+              "input_parameter": [
+                "object_detection_prediction"
+              ],
+              "step_output": [
+                "object_detection_prediction"
+              ]
+            }
+          }
+        },
+        "outputs": {
+          "upload_decision": {
+            "type": "DynamicOutputDefinition",
+            "kind": [
+              "dictionary"
+            ]
+          }
+        }
+      },
+      "code": {
+        "type": "PythonCode",
+        "run_function_code": "import json\nimport os\nimport time\nimport uuid\nimport queue\nimport threading\nimport cv2\nimport numpy as np\nimport requests\nfrom collections import deque\nfrom typing import Any, Dict, List, Optional\n\ntry:\n    # Out-of-process network I/O (roboflow-workflows/io_sidecar.py), used when AUDTHEIA_IO_SIDECAR is set\n    from io_sidecar import client as io_sidecar_client\nexcept ImportError:\n    io_sidecar_client = None\n\n# === ROBOFLOW DATASET CONFIGURATION ===\nROBOFLOW_API_KEY = \"[YOUR-API-KEY-HERE]\"\nROBOFLOW_API_URL = \"https://api.roboflow.com\"\nTARGET_PROJECT = \"audtheia-official-database\"\nUPLOAD_BATCH_NAME = \"audtheia_active_learning\"\nUPLOAD_TAGS = [\"audtheia\", \"active_learning\"]\n\n# === SELECTION POLICY CONFIGURATION ===\nUNCERTAIN_CONFIDENCE_RANGE = (0.30, 0.60)  # Predictions in this band are worth labelling\nDISAGREEMENT_IOU = 0.5  # Overlapping boxes with different classes\nCLASS_QUOTA_PER_HOUR = 20  # Routine frames per class per stream per hour\nMIN_SECONDS_BETWEEN_UPLOADS = 2.0  # Per stream, whatever the reason\nMAX_UPLOADS_PER_HOUR = 300  # Per stream hard cap\n\n# === ASYNC UPLOADER CONFIGURATION ===\nSPOOL_DIR = \"./audtheia_upload_spool\"\nUPLOAD_JPEG_QUALITY = 90\nUPLOAD_BATCH_SIZE = 16  # Spooled frames sent per uploader wake-up\nUPLOAD_FLUSH_SECONDS = 10.0\nUPLOAD_RETRY_SECONDS = 60.0\nMAX_QUEUED_FRAMES = 32  # Frames waiting to be spooled; extra selections are dropped\nHTTP_TIMEOUT = 20\nDEFAULT_STREAM_ID = \"default_source\"\n\nclass StreamUploadPolicy:\n    \"\"\"Decides which frames of one stream are worth a labelling slot\"\"\"\n    \n    def __init__(self):\n        self.last_upload_time: float = -1e9\n        self.recent_uploads: deque = deque()\n        self.class_uploads: Dict[str, deque] = {}\n    \n    def _prune(self, window: deque, now: float):\n        while window and now - window[0] > 3600.0:\n            window.popleft()\n    \n    def select(self, predictions: Any, new_instances: Any, now: float) -> List[str]:\n        if now - self.last_upload_time < MIN_SECONDS_BETWEEN_UPLOADS:\n            return []\n        self._prune(self.recent_uploads, now)\n        if len(self.recent_uploads) >= MAX_UPLOADS_PER_HOUR:\n            return []\n        \n        reasons = []\n        if new_instances is not None and len(new_instances) > 0:\n            reasons.append(\"new_track\")\n        \n        class_names = np.asarray(predictions.data.get(\"class_name\", [])) if predictions is not None else np.array([])\n        if len(class_names) > 0:\n            confidences = predictions.confidence\n            if confidences is not None:\n                low, high = UNCERTAIN_CONFIDENCE_RANGE\n                if np.any((confidences >= low) & (confidences <= high)):\n                    reasons.append(\"uncertain\")\n            if len(class_names) > 1 and has_class_disagreement(predictions.xyxy, class_names):\n                reasons.append(\"class_disagreement\")\n            \n            # Routine coverage: any class still under its hourly quota\n            for class_name in set(class_names.tolist()):\n                window = self.class_uploads.setdefault(class_name, deque())\n                self._prune(window, now)\n                if len(window) < CLASS_QUOTA_PER_HOUR:\n                    reasons.append(\"class_quota\")\n                    break\n        \n        if reasons:\n            self.last_upload_time = now\n            self.recent_uploads.append(now)\n            for class_name in set(class_names.tolist()):\n                self.class_uploads.setdefault(class_name, deque()).append(now)\n        return reasons\n\ndef has_class_disagreement(xyxy: np.ndarray, class_names: np.ndarray) -> bool:\n    \"\"\"True if two boxes overlap above DISAGREEMENT_IOU but carry different classes (vectorized IoU)\"\"\"\n    boxes = np.asarray(xyxy, dtype=np.float64)\n    top_left = np.maximum(boxes[:, None, :2], boxes[None, :, :2])\n    bottom_right = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])\n    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)\n    areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)\n    iou = intersection / np.maximum(areas[:, None] + areas[None, :] - intersection, 1e-9)\n    different = class_names[:, None] != class_names[None, :]\n    return bool(np.any(np.triu(iou >= DISAGREEMENT_IOU, k=1) & different))\n\ndef predictions_to_roboflow_json(predictions: Any, width: int, height: int) -> Dict[str, Any]:\n    \"\"\"Inference-format prediction JSON accepted by the Roboflow annotate endpoint\"\"\"\n    items = []\n    if predictions is not None and len(predictions) > 0:\n        class_names = predictions.data.get(\"class_name\", [])\n        for index, (x1, y1, x2, y2) in enumerate(predictions.xyxy.tolist()):\n            items.append({\n                \"x\": (x1 + x2) / 2, \"y\": (y1 + y2) / 2,\n                \"width\": x2 - x1, \"height\": y2 - y1,\n                \"class\": str(class_names[index]) if len(class_names) > index else \"unknown\",\n                \"confidence\": float(predictions.confidence[index]) if predictions.confidence is not None else 1.0,\n            })\n    return {\"image\": {\"width\": width, \"height\": height}, \"predictions\": items}\n\nclass SpoolingUploader:\n    \"\"\"\n    Selected frames are handed to a background thread that JPEG-encodes them\n    into a local spool (image + prediction JSON). The same thread drains the\n    spool in batches over one keep-alive session; failed items stay on disk\n    and are retried later, including after a restart.\n    \"\"\"\n    \n    def __init__(self, spool_dir: Optional[str] = None):\n        self.spool_dir = spool_dir or SPOOL_DIR\n        self.queue: \"queue.Queue\" = queue.Queue(maxsize=MAX_QUEUED_FRAMES)\n        self.session = requests.Session()\n        self.uploaded = 0\n        self.failed = 0\n        self.dropped = 0\n        self.retry_after = 0.0\n        self.last_flush = 0.0\n        self.in_flight: set = set()  # Spool items handed to the I/O sidecar, awaiting its reply\n        self.in_flight_lock = threading.Lock()  # Replies arrive on the sidecar client's reader thread\n        os.makedirs(self.spool_dir, exist_ok=True)\n        self.thread = threading.Thread(target=self._work, name=\"DatasetUploader\", daemon=True)\n        self.thread.start()\n    \n    def submit(self, frame: np.ndarray, annotation: Dict[str, Any], stream_id: str, reasons: List[str]) -> bool:\n        try:\n            self.queue.put_nowait((frame, annotation, stream_id, reasons))\n            return True\n        except queue.Full:\n            self.dropped += 1\n            return False\n    \n    def pending(self) -> int:\n        try:\n            return sum(1 for name in os.listdir(self.spool_dir) if name.endswith(\".json\"))\n        except OSError:\n            return 0\n    \n    def _spool(self, frame: np.ndarray, annotation: Dict[str, Any], stream_id: str, reasons: List[str]):\n        success, encoded = cv2.imencode(\".jpg\", frame, [cv2.IMWRITE_JPEG_QUALITY, UPLOAD_JPEG_QUALITY])\n        if not success:\n            return\n        item_id = f\"{int(time.time() * 1000)}_{stream_id}_{uuid.uuid4().hex[:8]}\"\n        with open(os.path.join(self.spool_dir, item_id + \".jpg\"), \"wb\") as f:\n            f.write(encoded.tobytes())\n        # JSON last: its presence marks a complete spool item\n        annotation = dict(annotation, audtheia={\"stream_id\": stream_id, \"reasons\": reasons})\n        with open(os.path.join(self.spool_dir, item_id + \".json\"), \"w\") as f:\n            json.dump(annotation, f)\n    \n    def _work(self):\n        while True:\n            try:\n                self._spool(*self.queue.get(timeout=1.0))\n            except queue.Empty:\n                pass\n            except Exception:\n                pass\n            now = time.time()\n            if now - self.last_flush >= UPLOAD_FLUSH_SECONDS and now >= self.retry_after:\n                self.last_flush = now\n                self.flush()\n    \n    def flush(self):\n        \"\"\"Upload up to UPLOAD_BATCH_SIZE spooled items, oldest first\"\"\"\n        try:\n            names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(\".json\"))\n        except OSError:\n            return\n        sidecar = io_sidecar_client() if io_sidecar_client else None\n        if sidecar is not None:\n            self._flush_to_sidecar(sidecar, [name[:-5] for name in names])\n            return\n        for name in names[:UPLOAD_BATCH_SIZE]:\n            item_id = name[:-5]\n            if not self._upload(item_id):\n                self.failed += 1\n                self.retry_after = time.time() + UPLOAD_RETRY_SECONDS\n                return\n            self.uploaded += 1\n            self._remove(item_id)\n    \n    def _remove(self, item_id: str):\n        for extension in (\".jpg\", \".json\"):\n            try:\n                os.remove(os.path.join(self.spool_dir, item_id + extension))\n            except OSError:\n                pass\n    \n    def _flush_to_sidecar(self, sidecar: Any, item_ids: List[str]):\n        \"\"\"Hand up to UPLOAD_BATCH_SIZE spooled items to the I/O sidecar; replies remove or keep them\"\"\"\n        for item_id in item_ids:\n            with self.in_flight_lock:\n                if len(self.in_flight) >= UPLOAD_BATCH_SIZE:\n                    return\n                if item_id in self.in_flight:\n                    continue\n            try:\n                with open(os.path.join(self.spool_dir, item_id + \".jpg\"), \"rb\") as f:\n                    image_bytes = f.read()\n                with open(os.path.join(self.spool_dir, item_id + \".json\")) as f:\n                    annotation = json.load(f)\n            except (OSError, ValueError):\n                continue\n            tags = UPLOAD_TAGS + [f\"reason_{reason}\" for reason in annotation.pop(\"audtheia\", {}).get(\"reasons\", [])]\n            \n            def on_reply(reply: Dict[str, Any], _body: bytes, item_id: str = item_id):\n                if reply.get(\"ok\"):\n                    self._remove(item_id)\n                with self.in_flight_lock:\n                    self.in_flight.discard(item_id)\n                    if reply.get(\"ok\"):\n                        self.uploaded += 1\n                    else:\n                        self.failed += 1\n                        self.retry_after = time.time() + UPLOAD_RETRY_SECONDS\n            \n            with self.in_flight_lock:\n                self.in_flight.add(item_id)\n            if not sidecar.submit({\n                \"kind\": \"roboflow_upload\", \"service\": \"roboflow\", \"api_url\": ROBOFLOW_API_URL,\n                \"api_key\": ROBOFLOW_API_KEY, \"project\": TARGET_PROJECT, \"batch\": UPLOAD_BATCH_NAME, \"tags\": tags,\n                \"name\": item_id, \"annotation\": annotation, \"timeout\": HTTP_TIMEOUT,\n            }, image_bytes, on_reply):\n                with self.in_flight_lock:\n                    self.in_flight.discard(item_id)\n                return\n    \n    def _upload(self, item_id: str) -> bool:\n        try:\n            with open(os.path.join(self.spool_dir, item_id + \".jpg\"), \"rb\") as f:\n                image_bytes = f.read()\n            with open(os.path.join(self.spool_dir, item_id + \".json\")) as f:\n                annotation = json.load(f)\n            tags = UPLOAD_TAGS + [f\"reason_{reason}\" for reason in annotation.pop(\"audtheia\", {}).get(\"reasons\", [])]\n            response = self.session.post(\n                f\"{ROBOFLOW_API_URL}/dataset/{TARGET_PROJECT}/upload\",\n                params=[(\"api_key\", ROBOFLOW_API_KEY), (\"batch\", UPLOAD_BATCH_NAME)] + [(\"tag\", tag) for tag in tags],\n                files={\"file\": (\"imageToUpload\", image_bytes, \"image/jpeg\")},\n                data={\"name\": f\"{item_id}.jpg\"},\n                timeout=HTTP_TIMEOUT,\n            )\n            response.raise_for_status()\n            uploaded = response.json()\n            if uploaded.get(\"duplicate\"):\n                return True\n            image_id = uploaded.get(\"id\")\n            if not image_id:\n                return False\n            if annotation[\"predictions\"]:\n                response = self.session.post(\n                    f\"{ROBOFLOW_API_URL}/dataset/{TARGET_PROJECT}/annotate/{image_id}\",\n                    params={\"api_key\": ROBOFLOW_API_KEY, \"name\": f\"{item_id}.json\", \"prediction\": \"true\"},\n                    data=json.dumps(annotation),\n                    headers={\"Content-Type\": \"text/plain\"},\n                    timeout=HTTP_TIMEOUT,\n                )\n                response.raise_for_status()\n            return True\n        except Exception:\n            return False\n\n_policies: Dict[str, StreamUploadPolicy] = {}\n_policies_lock = threading.Lock()\n_uploader: Optional[SpoolingUploader] = None\n\ndef get_uploader() -> SpoolingUploader:\n    global _uploader\n    with _policies_lock:\n        if _uploader is None:\n            _uploader = SpoolingUploader()\n        return _uploader\n\ndef get_stream_policy(stream_id: str) -> StreamUploadPolicy:\n    with _policies_lock:\n        policy = _policies.get(stream_id)\n        if policy is None:\n            policy = _policies[stream_id] = StreamUploadPolicy()\n        return policy\n\ndef run(self, image: Any, predictions: Any, new_instances: Any) -> Dict[str, Any]:\n    \"\"\"\n    ACTIVE LEARNING UPLOAD POLICY\n    Uploads the raw frame + predictions only when it is worth labelling\n    \"\"\"\n    try:\n        stream_id = str(image.video_metadata.video_identifier)\n    except Exception:\n        stream_id = DEFAULT_STREAM_ID\n    \n    try:\n        reasons = get_stream_policy(stream_id).select(predictions, new_instances, time.time())\n        uploader = get_uploader()\n        queued = False\n        if reasons:\n            frame = image.numpy_image\n            annotation = predictions_to_roboflow_json(predictions, frame.shape[1], frame.shape[0])\n            queued = uploader.submit(frame, annotation, stream_id, reasons)\n        return {\"upload_decision\": {\n            \"selected\": bool(reasons),\n            \"queued\": queued,\n            \"reasons\": reasons,\n            \"uploaded\": uploader.uploaded,\n            \"failed\": uploader.failed,\n            \"dropped\": uploader.dropped,\n        }}\n    except Exception as e:\n        return {\"upload_decision\": {\"selected\": False, \"queued\": False, \"reasons\": [], \"error\": str(e)}}\n"
+      }
     }
   ]
 }
\ No newline at end of file
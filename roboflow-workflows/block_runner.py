@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Audtheia Local Block Runner
+==============================
+Runs the workflow's custom blocks (blocks/) over a video frame by frame,
+wired and ordered as in the workflow JSON, but without the Roboflow
+execution engine or a model. Every block call is timed, so a hot-path
+regression in one block shows up on its own.
+
+Detections come from a sidecar (one JSON object per line) instead of the
+model and ByteTracker:
+- deploy script --batch output:    {"source_frame", "xyxy", "confidence", "class_name", "tracker_id"}
+- benchmarks/synthetic_video.py:   {"frame", "detections": [{"xyxy", "confidence", "class_name", "tracker_id"}]}
+Frames without a record have no detections. A track's first frame counts
+as a ByteTracker new instance. Roboflow's built-in visualisation steps are
+not run; Add_Webcam_Interface draws on the raw frame. Tiled_ROI_Inference
+runs the model itself, so it only runs when a BlockChain is given it by name.
+
+Block globals (API URLs, keys, intervals) can be set per run; values are
+parsed as JSON when possible (numbers, booleans), otherwise kept as text:
+    --set Anthropic_Environmental_Analyzer.ANTHROPIC_API_URL=http://127.0.0.1:8182/v1/messages
+    --set Anthropic_Environmental_Analyzer.ANALYSIS_INTERVAL_SECONDS=5
+
+Needs the workflow's own packages (inference, supervision, requests, cv2).
+
+Usage:
+    python block_runner.py survey.mp4 --detections survey.jsonl --frames 600 --json block_timings.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from blocks import BLOCK_MODULES, load_block  # noqa: E402
+
+DEFAULT_STREAM_ID = "local_runner"
+# Blocks that run the model; the sidecar's detections stand in for them unless they are asked for
+MODEL_BLOCKS = ("Tiled_ROI_Inference",)
+
+
+def parse_overrides(assignments: List[str]) -> Dict[str, Any]:
+    """["Block.NAME=value", ...] -> {"Block.NAME": value}"""
+    overrides = {}
+    for assignment in assignments:
+        key, separator, raw = assignment.partition("=")
+        if not separator or "." not in key:
+            raise ValueError(f"expected Block_Type.NAME=value, got {assignment!r}")
+        try:
+            overrides[key] = json.loads(raw)
+        except ValueError:
+            overrides[key] = raw
+    return overrides
+
+
+def load_detections(path: str) -> Dict[int, Dict[str, list]]:
+    """Sidecar records by frame index, normalised to columns (xyxy, confidence, class_name, tracker_id)."""
+    records = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                index = record.get("source_frame", record.get("frame"))
+                if index is not None:
+                    records[int(index)] = normalize_record(record)
+    return records
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, list]:
+    if "detections" in record:
+        boxes = record["detections"]
+        return {key: [box[key] for box in boxes] for key in ("xyxy", "confidence", "class_name", "tracker_id")}
+    return {key: record.get(key) or [] for key in ("xyxy", "confidence", "class_name", "tracker_id")}
+
+
+def iter_video(path: str, max_frames: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray, float]]:
+    """(frame index, BGR frame, fps) for a video file"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open video {path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while max_frames is None or index < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield index, frame, fps
+            index += 1
+    finally:
+        capture.release()
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {"calls": 0}
+    ms = np.asarray(seconds) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"calls": len(seconds), "p50_ms": round(float(p50), 3), "p90_ms": round(float(p90), 3),
+            "p99_ms": round(float(p99), 3), "max_ms": round(float(ms.max()), 3),
+            "mean_ms": round(float(ms.mean()), 3), "total_ms": round(float(ms.sum()), 1)}
+
+
+class BlockChain:
+    """The custom blocks wired as in the workflow JSON, with per-block timing"""
+
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None, stream_id: str = DEFAULT_STREAM_ID,
+                 blocks: Optional[List[str]] = None):
+        """`blocks` limits the chain to a subset (workflow order is kept); skipped steps get no output.
+        By default every block except MODEL_BLOCKS runs."""
+        selected = [block_type for block_type in BLOCK_MODULES
+                    if (block_type not in MODEL_BLOCKS if blocks is None else block_type in blocks)]
+        unknown = set(blocks or []) - set(BLOCK_MODULES)
+        if unknown:
+            raise ValueError(f"unknown block type(s): {', '.join(sorted(unknown))}")
+        self.blocks = {block_type: load_block(block_type) for block_type in selected}
+        for key, value in (overrides or {}).items():
+            block_type, name = key.split(".", 1)
+            if block_type not in self.blocks or not hasattr(self.blocks[block_type], name):
+                raise ValueError(f"unknown block setting {key!r}")
+            setattr(self.blocks[block_type], name, value)
+        self.stream_id = stream_id
+        self.owner = SimpleNamespace(_init_results={})  # the `self` blocks receive from the engine
+        self.timings: Dict[str, List[float]] = {block_type: [] for block_type in selected}
+        self.frame_times: List[float] = []
+        self.seen_tracks = set()
+
+    def image(self, frame: np.ndarray, frame_number: int, fps: float, stream_id: Optional[str] = None):
+        """WorkflowImageData for one video frame, as the engine builds it"""
+        from inference.core.workflows.execution_engine.entities.base import (
+            ImageParentMetadata, VideoMetadata, WorkflowImageData)
+
+        stream_id = stream_id or self.stream_id
+        return WorkflowImageData(
+            parent_metadata=ImageParentMetadata(parent_id=f"{stream_id}_{frame_number}"),
+            numpy_image=frame,
+            video_metadata=VideoMetadata(video_identifier=stream_id, frame_number=frame_number,
+                                         frame_timestamp=datetime.now(), fps=fps, comes_from_video_file=True),
+        )
+
+    def inputs(self, frame: np.ndarray, frame_number: int, record: Optional[Dict[str, Any]], fps: float,
+               stream_id: Optional[str] = None):
+        """Workflow inputs for one frame: (image, model predictions, tracked detections, new instances)
+
+        Record columns may be lists or numpy arrays.
+        """
+        import supervision as sv
+
+        stream_id = stream_id or self.stream_id
+        record = record or {}
+
+        def column(name, default):
+            values = record.get(name)
+            return default if values is None or len(values) == 0 else values
+
+        xyxy = np.asarray(column("xyxy", []), dtype=np.float32).reshape(-1, 4)
+        count = len(xyxy)
+        confidence = np.asarray(column("confidence", [1.0] * count), dtype=np.float32)
+        class_names = np.asarray(column("class_name", ["unknown"] * count), dtype=object)
+        tracker_id = np.asarray(column("tracker_id", range(1, count + 1)), dtype=int)
+        class_id = np.unique(class_names, return_inverse=True)[1].astype(int) if count else np.zeros(0, dtype=int)
+        predictions = sv.Detections(xyxy=xyxy, confidence=confidence, class_id=class_id,
+                                    data={"class_name": class_names})
+        tracked = sv.Detections(xyxy=xyxy, confidence=confidence, class_id=class_id, tracker_id=tracker_id,
+                                data={"class_name": class_names})
+        new_instances = tracked[np.array([(stream_id, int(t)) not in self.seen_tracks for t in tracker_id],
+                                         dtype=bool)]
+        self.seen_tracks.update((stream_id, int(t)) for t in tracker_id)
+        return self.image(frame, frame_number, fps, stream_id), predictions, tracked, new_instances
+
+    def _call(self, block_type: str, **inputs) -> Optional[Dict[str, Any]]:
+        if block_type not in self.blocks:
+            return None
+        started = time.perf_counter()
+        output = self.blocks[block_type].run(self.owner, **inputs)
+        self.timings[block_type].append(time.perf_counter() - started)
+        return output
+
+    def run_frame(self, image, predictions, tracked, new_instances, overlay_detail: str = "full") -> Dict[str, Any]:
+        """One frame through the chain; outputs keyed by workflow step name (None for skipped blocks)"""
+        started = time.perf_counter()
+        outputs = {}
+        outputs["tiled_inference"] = self._call("Tiled_ROI_Inference", image=image, predictions=predictions)
+        if outputs["tiled_inference"]:
+            predictions = outputs["tiled_inference"]["predictions"]
+        outputs["track_lifecycle"] = self._call("Track_Lifecycle_Aggregator", tracked_detections=tracked, image=image)
+        outputs["detection_converter"] = self._call("Detection_Converter", detection_results=predictions,
+                                                    raw_predictions=new_instances)
+        detections = (outputs["detection_converter"] or {}).get("detections")
+        outputs["draw_custom_label"] = self._call("Add_Webcam_Interface", image=image, new_instances=new_instances,
+                                                  detections=detections, overlay_detail=overlay_detail)
+        outputs["dataset_upload_policy"] = self._call("Active_Learning_Upload_Policy", image=image,
+                                                      predictions=predictions, new_instances=new_instances)
+        outputs["anthropic_environmental_analyzer"] = self._call(
+            "Anthropic_Environmental_Analyzer", detections=detections, image=image, tracked_detections=tracked)
+        outputs["analyst_caller"] = self._call(
+            "Analyst_Caller", anthropic_analysis=(outputs["anthropic_environmental_analyzer"] or {}).get(
+                "anthropic_analysis", ""),
+            image=image, observations=(outputs["track_lifecycle"] or {}).get("observations"))
+        self.frame_times.append(time.perf_counter() - started)
+        return outputs
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """End of stream: the aggregator's still-open visits as track_ended events, delivered by Analyst_Caller"""
+        aggregator = self.blocks.get("Track_Lifecycle_Aggregator")
+        if aggregator is None:
+            return []
+        events = aggregator.flush_open_visits()
+        if events and "Analyst_Caller" in self.blocks:
+            self.blocks["Analyst_Caller"].deliver_final_observations(events)
+        return events
+
+    def summary(self) -> Dict[str, Any]:
+        total = sum(self.frame_times)
+        blocks = {}
+        for block_type, seconds in self.timings.items():
+            blocks[block_type] = summarize(seconds)
+            blocks[block_type]["share_pct"] = round(100.0 * sum(seconds) / total, 1) if total else 0.0
+        return {"frames": len(self.frame_times), "frame": summarize(self.frame_times), "blocks": blocks}
+
+
+def print_summary(summary: Dict[str, Any]):
+    frame = summary["frame"]
+    if not summary["frames"]:
+        print("⚠️ No frames processed")
+        return
+    print(f"\n⏱️ {summary['frames']} frames - chain p50 {frame['p50_ms']:.3f} ms, p99 {frame['p99_ms']:.3f} ms, "
+          f"{1000.0 / frame['mean_ms']:.1f} frames/s")
+    print(f"{'Block':<34} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'share':>7}")
+    for block_type, stats in summary["blocks"].items():
+        print(f"{block_type:<34} {stats['p50_ms']:9.3f} {stats['p90_ms']:9.3f} {stats['p99_ms']:9.3f} "
+              f"{stats['max_ms']:9.3f} {stats['share_pct']:6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="Video file to read frames from")
+    parser.add_argument("--detections", help="Detections sidecar (default: the video path with .jsonl)")
+    parser.add_argument("--frames", type=int, default=None, help="Stop after this many frames")
+    parser.add_argument("--stream-id", default=DEFAULT_STREAM_ID)
+    parser.add_argument("--overlay-detail", choices=["full", "compact", "off"], default="full")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="BLOCK.NAME=VALUE",
+                        help="Override a block's module-level setting (repeatable)")
+    parser.add_argument("--save-output", help="Write Add_Webcam_Interface's frames to this video file")
+    parser.add_argument("--json", dest="json_path", help="Write per-block timings to this JSON file")
+    args = parser.parse_args()
+
+    sidecar = args.detections or str(Path(args.video).with_suffix(".jsonl"))
+    if not Path(sidecar).exists():
+        parser.error(f"detections sidecar not found: {sidecar} (pass --detections)")
+    try:
+        overrides = parse_overrides(args.overrides)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    records = load_detections(sidecar)
+    try:
+        chain = BlockChain(overrides, stream_id=args.stream_id)
+    except ValueError as exc:
+        parser.error(str(exc))
+    writer = None
+    print(f"▶️ Running {len(chain.blocks)} blocks over {args.video} ({len(records)} detection records)")
+    for index, frame, fps in iter_video(args.video, args.frames):
+        outputs = chain.run_frame(*chain.inputs(frame, index, records.get(index), fps), overlay_detail=args.overlay_detail)
+        if args.save_output:
+            rendered = outputs["draw_custom_label"]["output_image"].numpy_image
+            if writer is None:
+                height, width = rendered.shape[:2]
+                writer = cv2.VideoWriter(args.save_output, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+            writer.write(rendered)
+    if writer is not None:
+        writer.release()
+    closed = chain.finish()
+    if closed:
+        print(f"🏁 Closed {len(closed)} open track visit(s) at end of video")
+
+    summary = chain.summary()
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"video": args.video, "detections": sidecar, **summary}, f, indent=2)
+        print(f"💾 Timings written to {args.json_path}")
+    return 0 if summary["frames"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Audtheia custom workflow blocks
+===============================
+Source of the workflow's dynamic Python blocks, one module per block.
+`build_workflow.py` copies each module verbatim into the workflow JSON's
+`run_function_code`; edit the modules here, then rebuild.
+
+Every module defines `run(self, ...)` with the block's manifest inputs,
+exactly as the Roboflow execution engine calls it. Module-level globals
+hold configuration and per-stream state, so a fresh import is a fresh
+block.
+"""
+
+import importlib
+from pathlib import Path
+
+# Workflow block type -> module in this package, in the order the workflow runs them
+BLOCK_MODULES = {
+    "Tiled_ROI_Inference": "tiled_roi_inference",
+    "Track_Lifecycle_Aggregator": "track_lifecycle_aggregator",
+    "Detection_Converter": "detection_converter",
+    "Add_Webcam_Interface": "add_webcam_interface",
+    "Active_Learning_Upload_Policy": "active_learning_upload_policy",
+    "Anthropic_Environmental_Analyzer": "anthropic_environmental_analyzer",
+    "Analyst_Caller": "analyst_caller",
+}
+
+
+def block_path(block_type: str) -> Path:
+    return Path(__file__).resolve().parent / f"{BLOCK_MODULES[block_type]}.py"
+
+
+def load_block(block_type: str):
+    """Import one block module (requires the same packages as the workflow: inference, requests, cv2)."""
+    return importlib.import_module(f"{__name__}.{BLOCK_MODULES[block_type]}")
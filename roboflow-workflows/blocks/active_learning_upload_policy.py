@@ -0,0 +1,322 @@
+import json
+import os
+import time
+import uuid
+import queue
+import threading
+import cv2
+import numpy as np
+import requests
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+try:
+    # Out-of-process network I/O (roboflow-workflows/io_sidecar.py), used when AUDTHEIA_IO_SIDECAR is set
+    from io_sidecar import client as io_sidecar_client
+except ImportError:
+    io_sidecar_client = None
+
+# === ROBOFLOW DATASET CONFIGURATION ===
+ROBOFLOW_API_KEY = "[YOUR-API-KEY-HERE]"
+ROBOFLOW_API_URL = "https://api.roboflow.com"
+TARGET_PROJECT = "audtheia-official-database"
+UPLOAD_BATCH_NAME = "audtheia_active_learning"
+UPLOAD_TAGS = ["audtheia", "active_learning"]
+
+# === SELECTION POLICY CONFIGURATION ===
+UNCERTAIN_CONFIDENCE_RANGE = (0.30, 0.60)  # Predictions in this band are worth labelling
+DISAGREEMENT_IOU = 0.5  # Overlapping boxes with different classes
+CLASS_QUOTA_PER_HOUR = 20  # Routine frames per class per stream per hour
+MIN_SECONDS_BETWEEN_UPLOADS = 2.0  # Per stream, whatever the reason
+MAX_UPLOADS_PER_HOUR = 300  # Per stream hard cap
+
+# === ASYNC UPLOADER CONFIGURATION ===
+SPOOL_DIR = "./audtheia_upload_spool"
+UPLOAD_JPEG_QUALITY = 90
+UPLOAD_BATCH_SIZE = 16  # Spooled frames sent per uploader wake-up
+UPLOAD_FLUSH_SECONDS = 10.0
+UPLOAD_RETRY_SECONDS = 60.0
+MAX_QUEUED_FRAMES = 32  # Frames waiting to be spooled; extra selections are dropped
+HTTP_TIMEOUT = 20
+DEFAULT_STREAM_ID = "default_source"
+
+class StreamUploadPolicy:
+    """Decides which frames of one stream are worth a labelling slot"""
+    
+    def __init__(self):
+        self.last_upload_time: float = -1e9
+        self.recent_uploads: deque = deque()
+        self.class_uploads: Dict[str, deque] = {}
+    
+    def _prune(self, window: deque, now: float):
+        while window and now - window[0] > 3600.0:
+            window.popleft()
+    
+    def select(self, predictions: Any, new_instances: Any, now: float) -> List[str]:
+        if now - self.last_upload_time < MIN_SECONDS_BETWEEN_UPLOADS:
+            return []
+        self._prune(self.recent_uploads, now)
+        if len(self.recent_uploads) >= MAX_UPLOADS_PER_HOUR:
+            return []
+        
+        reasons = []
+        if new_instances is not None and len(new_instances) > 0:
+            reasons.append("new_track")
+        
+        class_names = np.asarray(predictions.data.get("class_name", [])) if predictions is not None else np.array([])
+        if len(class_names) > 0:
+            confidences = predictions.confidence
+            if confidences is not None:
+                low, high = UNCERTAIN_CONFIDENCE_RANGE
+                if np.any((confidences >= low) & (confidences <= high)):
+                    reasons.append("uncertain")
+            if len(class_names) > 1 and has_class_disagreement(predictions.xyxy, class_names):
+                reasons.append("class_disagreement")
+            
+            # Routine coverage: any class still under its hourly quota
+            for class_name in set(class_names.tolist()):
+                window = self.class_uploads.setdefault(class_name, deque())
+                self._prune(window, now)
+                if len(window) < CLASS_QUOTA_PER_HOUR:
+                    reasons.append("class_quota")
+                    break
+        
+        if reasons:
+            self.last_upload_time = now
+            self.recent_uploads.append(now)
+            for class_name in set(class_names.tolist()):
+                self.class_uploads.setdefault(class_name, deque()).append(now)
+        return reasons
+
+def has_class_disagreement(xyxy: np.ndarray, class_names: np.ndarray) -> bool:
+    """True if two boxes overlap above DISAGREEMENT_IOU but carry different classes (vectorized IoU)"""
+    boxes = np.asarray(xyxy, dtype=np.float64)
+    top_left = np.maximum(boxes[:, None, :2], boxes[None, :, :2])
+    bottom_right = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+    iou = intersection / np.maximum(areas[:, None] + areas[None, :] - intersection, 1e-9)
+    different = class_names[:, None] != class_names[None, :]
+    return bool(np.any(np.triu(iou >= DISAGREEMENT_IOU, k=1) & different))
+
+def predictions_to_roboflow_json(predictions: Any, width: int, height: int) -> Dict[str, Any]:
+    """Inference-format prediction JSON accepted by the Roboflow annotate endpoint"""
+    items = []
+    if predictions is not None and len(predictions) > 0:
+        class_names = predictions.data.get("class_name", [])
+        for index, (x1, y1, x2, y2) in enumerate(predictions.xyxy.tolist()):
+            items.append({
+                "x": (x1 + x2) / 2, "y": (y1 + y2) / 2,
+                "width": x2 - x1, "height": y2 - y1,
+                "class": str(class_names[index]) if len(class_names) > index else "unknown",
+                "confidence": float(predictions.confidence[index]) if predictions.confidence is not None else 1.0,
+            })
+    return {"image": {"width": width, "height": height}, "predictions": items}
+
+class SpoolingUploader:
+    """
+    Selected frames are handed to a background thread that JPEG-encodes them
+    into a local spool (image + prediction JSON). The same thread drains the
+    spool in batches over one keep-alive session; failed items stay on disk
+    and are retried later, including after a restart.
+    """
+    
+    def __init__(self, spool_dir: Optional[str] = None):
+        self.spool_dir = spool_dir or SPOOL_DIR
+        self.queue: "queue.Queue" = queue.Queue(maxsize=MAX_QUEUED_FRAMES)
+        self.session = requests.Session()
+        self.uploaded = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retry_after = 0.0
+        self.last_flush = 0.0
+        self.in_flight: set = set()  # Spool items handed to the I/O sidecar, awaiting its reply
+        self.in_flight_lock = threading.Lock()  # Replies arrive on the sidecar client's reader thread
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._work, name="DatasetUploader", daemon=True)
+        self.thread.start()
+    
+    def submit(self, frame: np.ndarray, annotation: Dict[str, Any], stream_id: str, reasons: List[str]) -> bool:
+        try:
+            self.queue.put_nowait((frame, annotation, stream_id, reasons))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+    
+    def pending(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(self.spool_dir) if name.endswith(".json"))
+        except OSError:
+            return 0
+    
+    def _spool(self, frame: np.ndarray, annotation: Dict[str, Any], stream_id: str, reasons: List[str]):
+        success, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, UPLOAD_JPEG_QUALITY])
+        if not success:
+            return
+        item_id = f"{int(time.time() * 1000)}_{stream_id}_{uuid.uuid4().hex[:8]}"
+        with open(os.path.join(self.spool_dir, item_id + ".jpg"), "wb") as f:
+            f.write(encoded.tobytes())
+        # JSON last: its presence marks a complete spool item
+        annotation = dict(annotation, audtheia={"stream_id": stream_id, "reasons": reasons})
+        with open(os.path.join(self.spool_dir, item_id + ".json"), "w") as f:
+            json.dump(annotation, f)
+    
+    def _work(self):
+        while True:
+            try:
+                self._spool(*self.queue.get(timeout=1.0))
+            except queue.Empty:
+                pass
+            except Exception:
+                pass
+            now = time.time()
+            if now - self.last_flush >= UPLOAD_FLUSH_SECONDS and now >= self.retry_after:
+                self.last_flush = now
+                self.flush()
+    
+    def flush(self):
+        """Upload up to UPLOAD_BATCH_SIZE spooled items, oldest first"""
+        try:
+            names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(".json"))
+        except OSError:
+            return
+        sidecar = io_sidecar_client() if io_sidecar_client else None
+        if sidecar is not None:
+            self._flush_to_sidecar(sidecar, [name[:-5] for name in names])
+            return
+        for name in names[:UPLOAD_BATCH_SIZE]:
+            item_id = name[:-5]
+            if not self._upload(item_id):
+                self.failed += 1
+                self.retry_after = time.time() + UPLOAD_RETRY_SECONDS
+                return
+            self.uploaded += 1
+            self._remove(item_id)
+    
+    def _remove(self, item_id: str):
+        for extension in (".jpg", ".json"):
+            try:
+                os.remove(os.path.join(self.spool_dir, item_id + extension))
+            except OSError:
+                pass
+    
+    def _flush_to_sidecar(self, sidecar: Any, item_ids: List[str]):
+        """Hand up to UPLOAD_BATCH_SIZE spooled items to the I/O sidecar; replies remove or keep them"""
+        for item_id in item_ids:
+            with self.in_flight_lock:
+                if len(self.in_flight) >= UPLOAD_BATCH_SIZE:
+                    return
+                if item_id in self.in_flight:
+                    continue
+            try:
+                with open(os.path.join(self.spool_dir, item_id + ".jpg"), "rb") as f:
+                    image_bytes = f.read()
+                with open(os.path.join(self.spool_dir, item_id + ".json")) as f:
+                    annotation = json.load(f)
+            except (OSError, ValueError):
+                continue
+            tags = UPLOAD_TAGS + [f"reason_{reason}" for reason in annotation.pop("audtheia", {}).get("reasons", [])]
+            
+            def on_reply(reply: Dict[str, Any], _body: bytes, item_id: str = item_id):
+                if reply.get("ok"):
+                    self._remove(item_id)
+                with self.in_flight_lock:
+                    self.in_flight.discard(item_id)
+                    if reply.get("ok"):
+                        self.uploaded += 1
+                    else:
+                        self.failed += 1
+                        self.retry_after = time.time() + UPLOAD_RETRY_SECONDS
+            
+            with self.in_flight_lock:
+                self.in_flight.add(item_id)
+            if not sidecar.submit({
+                "kind": "roboflow_upload", "service": "roboflow", "api_url": ROBOFLOW_API_URL,
+                "api_key": ROBOFLOW_API_KEY, "project": TARGET_PROJECT, "batch": UPLOAD_BATCH_NAME, "tags": tags,
+                "name": item_id, "annotation": annotation, "timeout": HTTP_TIMEOUT,
+            }, image_bytes, on_reply):
+                with self.in_flight_lock:
+                    self.in_flight.discard(item_id)
+                return
+    
+    def _upload(self, item_id: str) -> bool:
+        try:
+            with open(os.path.join(self.spool_dir, item_id + ".jpg"), "rb") as f:
+                image_bytes = f.read()
+            with open(os.path.join(self.spool_dir, item_id + ".json")) as f:
+                annotation = json.load(f)
+            tags = UPLOAD_TAGS + [f"reason_{reason}" for reason in annotation.pop("audtheia", {}).get("reasons", [])]
+            response = self.session.post(
+                f"{ROBOFLOW_API_URL}/dataset/{TARGET_PROJECT}/upload",
+                params=[("api_key", ROBOFLOW_API_KEY), ("batch", UPLOAD_BATCH_NAME)] + [("tag", tag) for tag in tags],
+                files={"file": ("imageToUpload", image_bytes, "image/jpeg")},
+                data={"name": f"{item_id}.jpg"},
+                timeout=HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+            uploaded = response.json()
+            if uploaded.get("duplicate"):
+                return True
+            image_id = uploaded.get("id")
+            if not image_id:
+                return False
+            if annotation["predictions"]:
+                response = self.session.post(
+                    f"{ROBOFLOW_API_URL}/dataset/{TARGET_PROJECT}/annotate/{image_id}",
+                    params={"api_key": ROBOFLOW_API_KEY, "name": f"{item_id}.json", "prediction": "true"},
+                    data=json.dumps(annotation),
+                    headers={"Content-Type": "text/plain"},
+                    timeout=HTTP_TIMEOUT,
+                )
+                response.raise_for_status()
+            return True
+        except Exception:
+            return False
+
+_policies: Dict[str, StreamUploadPolicy] = {}
+_policies_lock = threading.Lock()
+_uploader: Optional[SpoolingUploader] = None
+
+def get_uploader() -> SpoolingUploader:
+    global _uploader
+    with _policies_lock:
+        if _uploader is None:
+            _uploader = SpoolingUploader()
+        return _uploader
+
+def get_stream_policy(stream_id: str) -> StreamUploadPolicy:
+    with _policies_lock:
+        policy = _policies.get(stream_id)
+        if policy is None:
+            policy = _policies[stream_id] = StreamUploadPolicy()
+        return policy
+
+def run(self, image: Any, predictions: Any, new_instances: Any) -> Dict[str, Any]:
+    """
+    ACTIVE LEARNING UPLOAD POLICY
+    Uploads the raw frame + predictions only when it is worth labelling
+    """
+    try:
+        stream_id = str(image.video_metadata.video_identifier)
+    except Exception:
+        stream_id = DEFAULT_STREAM_ID
+    
+    try:
+        reasons = get_stream_policy(stream_id).select(predictions, new_instances, time.time())
+        uploader = get_uploader()
+        queued = False
+        if reasons:
+            frame = image.numpy_image
+            annotation = predictions_to_roboflow_json(predictions, frame.shape[1], frame.shape[0])
+            queued = uploader.submit(frame, annotation, stream_id, reasons)
+        return {"upload_decision": {
+            "selected": bool(reasons),
+            "queued": queued,
+            "reasons": reasons,
+            "uploaded": uploader.uploaded,
+            "failed": uploader.failed,
+            "dropped": uploader.dropped,
+        }}
+    except Exception as e:
+        return {"upload_decision": {"selected": False, "queued": False, "reasons": [], "error": str(e)}}
@@ -0,0 +1,251 @@
+import cv2
+import time
+from datetime import datetime
+from inference.core.workflows.execution_engine.entities.base import WorkflowImageData
+
+def run(self, image, new_instances, detections, overlay_detail="full"):
+    # overlay_detail is lowered by the deploy script's throughput controller on slow hosts:
+    # "full" = translucent panels + ticker, "compact" = solid panels without ticker, "off" = pass-through
+    if overlay_detail == "off":
+        return {"output_image": image}
+    compact = overlay_detail == "compact"
+    try:
+        new_image = image.numpy_image.copy()
+        img_height, img_width = new_image.shape[:2]
+        
+        # Calculate scaling factor accounting for Python file's 1.4x resize
+        base_width = 640 * 1.4  # Account for Python scaling (original 640 * 1.4)
+        scale_factor = img_width / base_width
+        
+        # Adaptive font and size calculations
+        header_font_scale = 0.5 * scale_factor
+        ticker_font_scale = 0.55 * scale_factor
+        sidebar_font_scale = 0.6 * scale_factor
+        
+        # Adaptive spacing and dimensions
+        header_height = int(40 * scale_factor)
+        ticker_height = int(38 * scale_factor)
+        border_thickness = max(2, int(3 * scale_factor))
+        
+        detected_classes = []
+        
+        if new_instances:
+            detected_classes.extend(extract_classes_from_byte_tracker(new_instances))
+        
+        if detections:
+            detected_classes.extend(extract_classes_from_analyst_caller(detections))
+        
+        # DEDUPLICATE SPECIES - Keep only highest confidence for each unique species
+        unique_species = {}
+        for cls in detected_classes:
+            species_name = cls['name']
+            if species_name not in unique_species or cls['confidence'] > unique_species[species_name]['confidence']:
+                unique_species[species_name] = cls
+        
+        # Convert back to list for display
+        display_classes = list(unique_species.values())
+        # Sort by confidence descending to show best detections first
+        display_classes.sort(key=lambda x: x['confidence'], reverse=True)
+        
+        current_time = datetime.now()
+        timestamp_str = current_time.strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Adaptive header overlay
+        if compact:
+            cv2.rectangle(new_image, (0, 0), (img_width, header_height), (0, 0, 0), -1)
+        else:
+            header_overlay = new_image.copy()
+            cv2.rectangle(header_overlay, (0, 0), (img_width, header_height), (0, 0, 0), -1)
+            cv2.addWeighted(header_overlay, 0.7, new_image, 0.3, 0, new_image)
+        
+        # Adaptive header text with optimal readability
+        header_text = f"Audtheia Live Monitor: {timestamp_str}"
+        header_x = int(15 * scale_factor)
+        header_y = int(22 * scale_factor)
+        line_thickness = max(1, int(2 * scale_factor))  # Balanced thickness
+        cv2.putText(new_image, header_text, (header_x, header_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (255, 255, 0), line_thickness, cv2.LINE_AA)
+        
+        # FIXED: Adaptive status text - Use total detection count, not deduplicated count
+        status_text = f"Objects: {len(detected_classes)} | FPS: Live"
+        status_x = img_width - int(250 * scale_factor)
+        status_y = int(22 * scale_factor)
+        cv2.putText(new_image, status_text, (status_x, status_y), cv2.FONT_HERSHEY_SIMPLEX, header_font_scale, (0, 255, 0), line_thickness, cv2.LINE_AA)
+        
+        # Adaptive sidebar for species info - ADAPTIVE WIDTH based on longest species name
+        if display_classes:
+            # Calculate maximum text width needed for adaptive sidebar
+            max_text_width = 0
+            for cls in display_classes[:8]:
+                species_text = f"{cls['name']}: {cls.get('confidence', 0.0):.2f}"
+                text_size = cv2.getTextSize(species_text, cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, max(1, int(2 * scale_factor)))[0]
+                max_text_width = max(max_text_width, text_size[0])
+            
+            # Adaptive sidebar width with OPTIMIZED padding for text + confidence bar
+            sidebar_padding = int(15 * scale_factor)  # Reduced padding
+            bar_width = int(80 * scale_factor)  # Smaller bar width to fit tighter layout
+            sidebar_width = max_text_width + sidebar_padding + int(15 * scale_factor)  # Tighter fit
+            
+            # Position at very left edge (no gap)
+            sidebar_x = 0
+            sidebar_height = min(len(display_classes) * int(30 * scale_factor) + int(20 * scale_factor), img_height - header_height - ticker_height)
+            if compact:
+                cv2.rectangle(new_image, (sidebar_x, header_height), (sidebar_x + sidebar_width, header_height + sidebar_height), (0, 0, 0), -1)
+            else:
+                sidebar_overlay = new_image.copy()
+                cv2.rectangle(sidebar_overlay, (sidebar_x, header_height), (sidebar_x + sidebar_width, header_height + sidebar_height), (0, 0, 0), -1)
+                cv2.addWeighted(sidebar_overlay, 0.8, new_image, 0.2, 0, new_image)
+            
+            for idx, cls in enumerate(display_classes[:8]):  # Show up to 8 unique species
+                y_pos = header_height + int((idx + 1) * 30 * scale_factor)
+                confidence = cls.get('confidence', 0.0)
+                
+                # Format text exactly like reference: "species: 0.XX"
+                species_text = f"{cls['name']}: {confidence:.2f}"
+                
+                # Adaptive text positioning with optimal readability
+                text_x = sidebar_x + int(10 * scale_factor)
+                text_thickness = max(1, int(2 * scale_factor))
+                cv2.putText(new_image, species_text, (text_x, y_pos), cv2.FONT_HERSHEY_SIMPLEX, sidebar_font_scale, (255, 255, 255), text_thickness, cv2.LINE_AA)
+                
+                # STATE-OF-THE-ART confidence bar positioned BELOW text to prevent overlap
+                bar_height = int(8 * scale_factor)  # Optimized thickness
+                bar_x = sidebar_x + int(10 * scale_factor)
+                bar_y = y_pos + int(12 * scale_factor)  # Increased spacing to prevent overlap
+                
+                # Professional dark gray background bar with subtle border
+                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (35, 35, 35), -1)
+                cv2.rectangle(new_image, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (80, 80, 80), 1)
+                
+                if confidence > 0:
+                    # AWARD-WINNING DYNAMIC COLOR SYSTEM - Smooth gradient based on exact confidence
+                    # Professional color interpolation for scientific precision
+                    if confidence < 0.5:
+                        # Red to Orange transition (0.0 - 0.5)
+                        ratio = confidence / 0.5
+                        bar_color = (0, int(165 * ratio), int(255 * (1 - ratio) + 255 * ratio))  # Red → Orange
+                    elif confidence < 0.75:
+                        # Orange to Yellow transition (0.5 - 0.75)
+                        ratio = (confidence - 0.5) / 0.25
+                        bar_color = (0, int(165 + 90 * ratio), int(255 * (1 - ratio)))  # Orange → Yellow
+                    else:
+                        # Yellow to Green transition (0.75 - 1.0)
+                        ratio = (confidence - 0.75) / 0.25
+                        bar_color = (0, int(255 * (1 - ratio) + 255 * ratio), int(255 * (1 - ratio)))  # Yellow → Green
+                    
+                    # PRECISION CONFIDENCE BAR - Exact width based on confidence percentage  
+                    conf_width = max(3, int(bar_width * confidence))  # Minimum 3px for visibility with smaller bars
+                    
+                    # Professional confidence bar with gradient effect
+                    cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + bar_height - 1), bar_color, -1)
+                    
+                    # Add subtle highlight for premium appearance
+                    if conf_width > 6:  # Adjusted for smaller bars
+                        highlight_color = tuple(min(255, int(c * 1.3)) for c in bar_color)
+                        cv2.rectangle(new_image, (bar_x + 1, bar_y + 1), (bar_x + conf_width - 1, bar_y + int(bar_height/3)), highlight_color, -1)
+        
+        # Adaptive bottom ticker - Use ALL detections to show individual tracker IDs
+        if detected_classes and not compact:
+            detection_names = []
+            for cls in detected_classes:
+                tracker_id = cls.get('tracker_id', 'N/A')
+                detection_names.append(f"{cls['name']}(ID:{tracker_id})")
+            
+            ticker_text = f"LIVE DETECTIONS: {' | '.join(detection_names)}"
+            ticker_y = img_height - ticker_height
+            
+            # Adaptive ticker overlay
+            ticker_overlay = new_image.copy()
+            cv2.rectangle(ticker_overlay, (0, ticker_y), (img_width, img_height), (0, 0, 0), -1)
+            cv2.addWeighted(ticker_overlay, 0.85, new_image, 0.15, 0, new_image)
+            
+            # Adaptive ticker text with optimal readability
+            ticker_text_x = int(15 * scale_factor)
+            ticker_text_y = ticker_y + int(22 * scale_factor)
+            ticker_thickness = max(1, int(2 * scale_factor))
+            cv2.putText(new_image, ticker_text, (ticker_text_x, ticker_text_y), cv2.FONT_HERSHEY_SIMPLEX, ticker_font_scale, (255, 255, 255), ticker_thickness, cv2.LINE_AA)
+        
+        # Adaptive border
+        cv2.rectangle(new_image, (0, 0), (img_width-1, img_height-1), (255, 0, 0), border_thickness)
+        
+        # Adaptive indicator circle - Use deduplicated count for status
+        indicator_color = (0, 255, 0) if len(display_classes) > 0 else (0, 0, 255)
+        circle_radius = max(4, int(6 * scale_factor))
+        circle_x = img_width - int(25 * scale_factor)
+        circle_y = int(55 * scale_factor)
+        cv2.circle(new_image, (circle_x, circle_y), circle_radius, indicator_color, -1)
+        
+        # copy_and_replace keeps video_metadata (source id, fps) for downstream per-stream blocks
+        return {"output_image": WorkflowImageData.copy_and_replace(
+            origin_image_data=image,
+            numpy_image=new_image
+        )}
+    except Exception as e:
+        try:
+            return {"output_image": image}
+        except:
+            return {"output_image": image}
+
+def extract_classes_from_byte_tracker(new_instances):
+    try:
+        detected_classes = []
+        if hasattr(new_instances, 'data') and isinstance(new_instances.data, dict):
+            tracker_data = new_instances.data
+        elif isinstance(new_instances, dict):
+            tracker_data = new_instances
+        else:
+            return []
+        predictions = tracker_data.get("predictions", [])
+        if not predictions:
+            return []
+        for prediction in predictions:
+            if isinstance(prediction, dict):
+                class_name = prediction.get("class", "unknown")
+                confidence = prediction.get("confidence", 0.0)
+                tracker_id = prediction.get("tracker_id", None)
+                detected_classes.append({
+                    "name": class_name,
+                    "confidence": confidence,
+                    "tracker_id": tracker_id
+                })
+        return detected_classes
+    except Exception:
+        return []
+
+def extract_classes_from_analyst_caller(detections):
+    try:
+        detected_classes = []
+        if not isinstance(detections, dict):
+            return []
+        if "class_names" in detections and "confidences" in detections:
+            class_names = detections["class_names"]
+            confidences = detections.get("confidences", [])
+            tracker_ids = detections.get("tracker_ids", [])
+            for i, class_name in enumerate(class_names):
+                confidence = confidences[i] if i < len(confidences) else 0.0
+                tracker_id = tracker_ids[i] if i < len(tracker_ids) else i + 1
+                detected_classes.append({
+                    "name": class_name,
+                    "confidence": confidence,
+                    "tracker_id": tracker_id
+                })
+            return detected_classes
+        elif "formatted_for_n8n" in detections and "classes" in detections["formatted_for_n8n"]:
+            n8n_data = detections["formatted_for_n8n"]
+            classes = n8n_data["classes"]
+            detection_details = n8n_data.get("detection_details", [])
+            for i, class_name in enumerate(classes):
+                confidence = 0.0
+                tracker_id = i + 1
+                if i < len(detection_details):
+                    detail = detection_details[i]
+                    confidence = detail.get("confidence", 0.0)
+                    tracker_id = detail.get("tracker_id", i + 1)
+                detected_classes.append({
+                    "name": class_name,
+                    "confidence": confidence,
+                    "tracker_id": tracker_id
+                })
+            return detected_classes
+        return []
+    except Exception:
+        return []
\ No newline at end of file
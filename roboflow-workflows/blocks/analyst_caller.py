@@ -0,0 +1,248 @@
+import requests
+import time
+import threading
+from collections import deque
+from typing import Any, Dict, List
+
+try:
+    # Out-of-process network I/O (roboflow-workflows/io_sidecar.py), used when AUDTHEIA_IO_SIDECAR is set
+    from io_sidecar import client as io_sidecar_client
+except ImportError:
+    io_sidecar_client = None
+
+try:
+    # End-of-stream delivery of the aggregator's last open visits (roboflow-workflows/stream_hooks.py)
+    from stream_hooks import register_sink
+except ImportError:
+    register_sink = None
+
+# === N8N CONFIGURATION ===
+N8N_WEBHOOK_URL = "[YOUR-WEBHOOK-URL-HERE]"
+HTTP_TIMEOUT = 5
+MAX_HTTP_THREADS = 2
+MAX_PENDING_PER_STREAM = 8  # Oldest queued transmission is dropped beyond this
+DEFAULT_STREAM_ID = "default_source"
+
+# === OBSERVATION STORE CONFIGURATION ===
+# Track visits go to the observation store (observation-store/, POST /observations), not to the
+# RTSP Analyst webhook, which expects one analysis per call; nothing is sent while this is unset
+OBSERVATIONS_URL = "[YOUR-OBSERVATIONS-URL-HERE]"
+
+class FairStreamScheduler:
+    """Round-robin work queue shared by all streams - every stream with pending work
+    gets a turn before any stream gets a second one, within a fixed worker budget"""
+    
+    def __init__(self, max_workers: int, max_pending_per_stream: int, name: str):
+        self.max_workers = max_workers
+        self.max_pending_per_stream = max_pending_per_stream
+        self.name = name
+        self.condition = threading.Condition()
+        self.pending: Dict[str, deque] = {}
+        self.rotation: deque = deque()
+        self.dropped: int = 0
+        self.workers: List[threading.Thread] = []
+    
+    def submit(self, stream_id: str, task) -> None:
+        with self.condition:
+            queue = self.pending.setdefault(stream_id, deque())
+            if not queue:
+                self.rotation.append(stream_id)
+            elif len(queue) >= self.max_pending_per_stream:
+                queue.popleft()
+                self.dropped += 1
+            queue.append(task)
+            if len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"{self.name}-{len(self.workers)}", daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+    
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.rotation:
+                    self.condition.wait()
+                stream_id = self.rotation.popleft()
+                queue = self.pending[stream_id]
+                task = queue.popleft()
+                if queue:
+                    self.rotation.append(stream_id)
+            try:
+                task()
+            except Exception:
+                pass
+
+class SilentN8NCommunicator:
+    """Silent N8N communicator with aggressive transmission logic - one per video stream"""
+    
+    def __init__(self, stream_id: str = DEFAULT_STREAM_ID):
+        self.stream_id = stream_id
+        self.frame_counter: int = 0
+        self.total_transmissions: int = 0
+    
+    def should_transmit(self, analysis_text: str) -> bool:
+        """Detect any meaningful analysis for transmission"""
+        
+        if not analysis_text or len(analysis_text) < 50:
+            return False
+        
+        # Accept comprehensive analysis (real Claude OR quality fallback)
+        quality_indicators = [
+            "claude_environmental_analysis",
+            "scientifically_validated", 
+            "audtheia_environmental_monitoring",
+            "Species Identification",
+            "Environmental Conditions",
+            "Habitat Assessment",
+            "Conservation Implications",
+            "background_processing_complete"
+        ]
+        
+        # Reject only basic interim responses
+        reject_patterns = [
+            "awaiting_claude_analysis",
+            "environmental_monitoring_active"
+        ]
+        
+        has_quality = any(indicator in analysis_text for indicator in quality_indicators)
+        has_reject = any(pattern in analysis_text for pattern in reject_patterns)
+        
+        # Accept if has quality indicators and no reject patterns
+        return has_quality and not has_reject
+    
+    def transmit_to_n8n(self, analysis_text: str, current_time: float):
+        """Fire-and-forget transmission to N8N"""
+        
+        payload = {
+            "timestamp": current_time,
+            "analysis": analysis_text,
+            "source": "audtheia_environmental_analysis", 
+            "stream_id": self.stream_id,
+            "frame_number": self.frame_counter,
+            "system": "audtheia_airw",
+            "scientific_grade": True,
+            "description": f"Audtheia environmental analysis - Frame {self.frame_counter}",
+            "metadata": {
+                "analysis_timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(current_time)),
+                "total_transmissions": self.total_transmissions,
+                "analysis_length": len(analysis_text),
+                "processing_method": "claude_environmental_analysis"
+            }
+        }
+        
+        self._send(payload)
+
+    def transmit_observations(self, events: List[Dict], current_time: float):
+        """Fire-and-forget transmission of completed track visits (one record per animal visit)"""
+        
+        if not observations_enabled():
+            return
+        self._send(observations_payload(events, self.stream_id, current_time), OBSERVATIONS_URL, "observations")
+
+    def _send(self, payload: Dict, url: str = None, service: str = "n8n"):
+        """Hand the payload to the I/O sidecar if one is running, else queue it on the shared fair scheduler"""
+        url = url or N8N_WEBHOOK_URL
+        sidecar = io_sidecar_client() if io_sidecar_client else None
+        if sidecar is None or not sidecar.submit({
+            "kind": "http", "service": service, "url": url, "json": payload, "timeout": HTTP_TIMEOUT,
+            "headers": {"Content-Type": "application/json", "User-Agent": "Audtheia-AIRW/3.0"},
+        }):
+            _http_scheduler.submit(self.stream_id, lambda: self._execute_transmission(payload, url))
+        self.total_transmissions += 1
+
+    def _execute_transmission(self, payload: Dict, url: str = None):
+        """Execute HTTP transmission silently"""
+        try:
+            response = requests.post(
+                url or N8N_WEBHOOK_URL,
+                json=payload,
+                timeout=HTTP_TIMEOUT,
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "Audtheia-AIRW/3.0"
+                }
+            )
+            # Silent operation - no console output
+        except:
+            # Silent error handling
+            pass
+
+def observations_enabled() -> bool:
+    return bool(OBSERVATIONS_URL) and not OBSERVATIONS_URL.startswith("[")
+
+def observations_payload(events: List[Dict], stream_id: str, current_time: float) -> Dict:
+    """Track visits for the observation store's POST /observations"""
+    return {
+        "timestamp": current_time,
+        "source": "audtheia_track_observations",
+        "stream_id": stream_id,
+        "system": "audtheia_airw",
+        "observations": events,
+        "metadata": {
+            "analysis_timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(current_time)),
+            "observation_count": len(events)
+        }
+    }
+
+def deliver_final_observations(events: List[Dict]):
+    """End of stream: post the last visits synchronously, one payload per stream, before the process exits"""
+    if not observations_enabled():
+        return
+    by_stream: Dict[str, List[Dict]] = {}
+    for event in events:
+        by_stream.setdefault(str(event.get("stream_id", DEFAULT_STREAM_ID)), []).append(event)
+    for stream_id, stream_events in by_stream.items():
+        get_stream_communicator(stream_id)._execute_transmission(
+            observations_payload(stream_events, stream_id, time.time()), OBSERVATIONS_URL)
+
+# Per-stream communicators; webhook concurrency is shared fairly across streams
+_communicators: Dict[str, SilentN8NCommunicator] = {}
+_communicators_lock = threading.Lock()
+_http_scheduler = FairStreamScheduler(MAX_HTTP_THREADS, MAX_PENDING_PER_STREAM, "N8N")
+
+def get_stream_communicator(stream_id: str) -> SilentN8NCommunicator:
+    with _communicators_lock:
+        communicator = _communicators.get(stream_id)
+        if communicator is None:
+            communicator = _communicators[stream_id] = SilentN8NCommunicator(stream_id)
+        return communicator
+
+def stream_id_for(image: Any) -> str:
+    """Source id of the frame (InferencePipeline sets it from the video_reference index)"""
+    try:
+        return str(image.video_metadata.video_identifier)
+    except Exception:
+        return DEFAULT_STREAM_ID
+
+def run(self, anthropic_analysis: Any, image: Any = None, observations: Any = None) -> Dict:
+    """
+    SILENT ANALYST CALLER
+    Transmits comprehensive analysis to N8N with minimal console output
+    """
+    communicator = get_stream_communicator(stream_id_for(image))
+    
+    communicator.frame_counter += 1
+    current_time = time.time()
+    
+    try:
+        # Extract analysis text
+        if isinstance(anthropic_analysis, dict):
+            analysis_text = anthropic_analysis.get("anthropic_analysis", "")
+        else:
+            analysis_text = str(anthropic_analysis) if anthropic_analysis else ""
+        
+        # Transmit if meaningful analysis detected
+        if communicator.should_transmit(analysis_text):
+            communicator.transmit_to_n8n(analysis_text, current_time)
+        
+        # Track visits closed by the lifecycle aggregator travel as one batch per frame
+        if isinstance(observations, dict) and observations.get("events"):
+            communicator.transmit_observations(observations["events"], current_time)
+        
+        return {}
+        
+    except:
+        return {}
+
+if register_sink:
+    register_sink("Analyst_Caller", deliver_final_observations)
@@ -0,0 +1,62 @@
+import time
+
+def run(self, detection_results, raw_predictions) -> dict:
+    try:
+        now = time.time()
+        if hasattr(detection_results, "data") and isinstance(detection_results.data, dict):
+            detection_data = detection_results.data
+        elif isinstance(detection_results, dict):
+            detection_data = detection_results
+        else:
+            detection_data = {}
+        class_name_data = detection_data.get("class_name")
+        def convert_numpy_to_list(data):
+            if data is None:
+                return []
+            if hasattr(data, 'tolist'):
+                return data.tolist()
+            if isinstance(data, list):
+                return data
+            return [data]
+        class_names = convert_numpy_to_list(class_name_data)
+        num_detections = len(class_names)
+        clean_output = {
+            "class_names": class_names,
+            "confidences": [0.9] * num_detections,
+            "tracker_ids": list(range(1, num_detections + 1)),
+            "num_detections": num_detections,
+            "timestamp": now,
+            "formatted_for_n8n": {
+                "timestamp": now,
+                "classes": class_names,
+                "detection_details": [{
+                    "class_name": class_name,
+                    "confidence": 0.9,
+                    "tracker_id": i + 1,
+                    "class_id": 0,
+                    "detection_id": f"det_{int(now)}_{i}",
+                    "x": 0.0,
+                    "y": 0.0,
+                    "width": 0.0,
+                    "height": 0.0,
+                    "iso_timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+                } for i, class_name in enumerate(class_names)]
+            }
+        }
+        return {"detections": clean_output}
+    except Exception as e:
+        error_time = time.time()
+        return {
+            "detections": {
+                "error": str(e), 
+                "timestamp": error_time,
+                "num_detections": 0,
+                "class_names": [],
+                "extraction_success": False,
+                "formatted_for_n8n": {
+                    "timestamp": error_time,
+                    "classes": [],
+                    "detection_details": []
+                }
+            }
+        }
\ No newline at end of file
@@ -0,0 +1,359 @@
+import time
+import uuid
+import threading
+import cv2
+import numpy as np
+import supervision as sv
+from typing import Any, Dict, List, Optional, Tuple
+
+# === TILE MODEL CONFIGURATION ===
+ROBOFLOW_API_KEY = "[YOUR-API-KEY-HERE]"
+MODEL_ID = "official-porifera-classifier-ju8er/12"  # Same model as the workflow's `model` step
+CONFIDENCE_THRESHOLD = 0.4
+MODEL_RETRY_SECONDS = 60.0
+
+# === TILING CONFIGURATION ===
+TILE_SIZE = 640  # Model input size, so tiles are seen at full resolution
+TILE_OVERLAP = 128  # At least; grids widen it so every organism left to the tiles fits whole in one
+MIN_TILED_SIDE = 1280  # Frames no larger than this only get the whole-frame pass
+MAX_TILES_PER_FRAME = 8  # Hard cap on model work per frame, highest priority first
+SWEEP_TILES_PER_FRAME = 1  # Idle tiles visited in rotation, so still organisms are found
+NMS_IOU = 0.5
+EDGE_MARGIN = 2  # Boxes this close to a tile edge shared with a tile that also ran are cut fragments
+FRAGMENT_COVERED = 0.6  # Fragments this much inside a same-class box are part of it; the rest are joined
+
+# === ACTIVITY CONFIGURATION ===
+MOTION_WIDTH = 480  # Motion is measured on a grayscale copy this wide
+MOTION_PIXEL_DELTA = 15
+MOTION_MIN_FRACTION = 0.002  # Share of a tile's pixels that must change
+PRIOR_MARGIN = 32  # Detections keep the tiles within this many pixels active on the next frame
+WHOLE_FRAME_MIN_SIDE = 32  # Organisms this many model-input pixels across are left to the whole-frame pass
+DEFAULT_STREAM_ID = "default_source"
+
+# Priorities: prior detections first (they are why the tile is worth a look), then motion, then sweep
+PRIORITY_PRIOR, PRIORITY_MOTION, PRIORITY_SWEEP = 3.0, 2.0, 1.0
+
+def small_side(width: int, height: int) -> float:
+    """Frame-space size below which the whole-frame pass, seeing the frame shrunk to TILE_SIZE, misses an organism"""
+    return WHOLE_FRAME_MIN_SIDE * max(width, height) / float(TILE_SIZE)
+
+class TileGrid:
+    """Overlapping TILE_SIZE tiles covering a frame, spread evenly so the last tile ends at the border.
+    Neighbours overlap by at least the small-organism size, so such an organism cut by one tile is whole in the next."""
+
+    def __init__(self, width: int, height: int):
+        self.size = (width, height)
+        self.overlap = min(max(TILE_OVERLAP, int(np.ceil(small_side(width, height))) + 2 * EDGE_MARGIN), TILE_SIZE // 2)
+        self.xs = self._starts(width, self.overlap)
+        self.ys = self._starts(height, self.overlap)
+        self.boxes = np.array([[x, y, min(x + TILE_SIZE, width), min(y + TILE_SIZE, height)]
+                               for y in self.ys for x in self.xs], dtype=np.int32)
+        self.columns = len(self.xs)
+
+    @staticmethod
+    def _starts(length: int, overlap: int) -> List[int]:
+        if length <= TILE_SIZE:
+            return [0]
+        count = int(np.ceil((length - overlap) / (TILE_SIZE - overlap)))
+        return [int(round(v)) for v in np.linspace(0, length - TILE_SIZE, count)]
+
+    def neighbour(self, index: int, d_column: int, d_row: int) -> Optional[int]:
+        row, column = divmod(index, self.columns)
+        row, column = row + d_row, column + d_column
+        if 0 <= column < self.columns and 0 <= row < len(self.ys):
+            return row * self.columns + column
+        return None
+
+class StreamTileState:
+    """Previous motion frame, last merged detections and sweep position of one stream"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.grid: Optional[TileGrid] = None
+        self.previous_small: Optional[np.ndarray] = None
+        self.previous_boxes = np.zeros((0, 4), dtype=np.float32)
+        self.sweep_cursor = 0
+        self.waiting: Optional[np.ndarray] = None  # frames each wanted tile has been passed over by the cap
+        self.frames = 0
+        self.tiles_run = 0
+
+_streams: Dict[str, StreamTileState] = {}
+_streams_lock = threading.Lock()
+_model = None
+_model_lock = threading.Lock()
+_model_retry_at = 0.0
+
+def get_stream_state(stream_id: str) -> StreamTileState:
+    with _streams_lock:
+        state = _streams.get(stream_id)
+        if state is None:
+            state = _streams[stream_id] = StreamTileState()
+        return state
+
+def get_tile_model():
+    """The tile model, loaded on first use; None (whole-frame pass only) until it loads"""
+    global _model, _model_retry_at
+    if _model is not None:
+        return _model
+    with _model_lock:
+        if _model is None and time.time() >= _model_retry_at:
+            try:
+                from inference import get_model
+                _model = get_model(MODEL_ID, api_key=ROBOFLOW_API_KEY)
+            except Exception as e:
+                _model_retry_at = time.time() + MODEL_RETRY_SECONDS
+                print(f"⚠️ Tiled inference: model {MODEL_ID} unavailable, whole-frame pass only: {e}")
+        return _model
+
+def is_small(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Per box: too small for the whole-frame pass, which sees the frame shrunk to TILE_SIZE"""
+    return np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]) < small_side(width, height)
+
+def motion_fractions(state: StreamTileState, frame: np.ndarray, grid: TileGrid, ignore: np.ndarray) -> np.ndarray:
+    """Changed-pixel share per tile against the previous frame (zeros on the first frame);
+    motion inside the `ignore` boxes (organisms the whole-frame pass already has) does not count"""
+    height, width = frame.shape[:2]
+    scale = MOTION_WIDTH / float(width)
+    small = cv2.resize(frame, (MOTION_WIDTH, max(1, int(round(height * scale)))), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    small = cv2.GaussianBlur(small, (5, 5), 0)
+    previous, state.previous_small = state.previous_small, small
+    if previous is None or previous.shape != small.shape:
+        return np.zeros(len(grid.boxes), dtype=np.float32)
+    moving = (cv2.absdiff(small, previous) > MOTION_PIXEL_DELTA).astype(np.uint8)
+    for x1, y1, x2, y2 in np.round(ignore * scale).astype(np.int32):
+        moving[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 0
+    integral = cv2.integral(moving)
+    tiles = np.clip(np.round(grid.boxes * scale).astype(np.int32), 0,
+                    [small.shape[1], small.shape[0], small.shape[1], small.shape[0]])
+    x1, y1, x2, y2 = tiles.T
+    changed = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+    area = np.maximum((x2 - x1) * (y2 - y1), 1)
+    return changed / area
+
+def tiles_touching(grid: TileGrid, boxes: np.ndarray) -> np.ndarray:
+    """Per tile: does any box (grown by PRIOR_MARGIN) overlap it"""
+    if len(boxes) == 0:
+        return np.zeros(len(grid.boxes), dtype=bool)
+    grown = boxes + np.array([-PRIOR_MARGIN, -PRIOR_MARGIN, PRIOR_MARGIN, PRIOR_MARGIN], dtype=np.float32)
+    tiles = grid.boxes.astype(np.float32)
+    overlap_x = (grown[None, :, 0] < tiles[:, None, 2]) & (grown[None, :, 2] > tiles[:, None, 0])
+    overlap_y = (grown[None, :, 1] < tiles[:, None, 3]) & (grown[None, :, 3] > tiles[:, None, 1])
+    return (overlap_x & overlap_y).any(axis=1)
+
+def select_tiles(state: StreamTileState, grid: TileGrid, motion: np.ndarray, prior: np.ndarray) -> Dict[str, List[int]]:
+    """Active tiles by reason, at most MAX_TILES_PER_FRAME in total"""
+    if state.waiting is None or len(state.waiting) != len(grid.boxes):
+        state.waiting = np.zeros(len(grid.boxes), dtype=np.float32)
+    # Tiles the cap has passed over gain half a reason per frame, so motion in a new
+    # place still gets a look when known organisms fill the budget
+    bonus = state.waiting * 0.5
+    priority = np.zeros(len(grid.boxes), dtype=np.float32)
+    moving = motion >= MOTION_MIN_FRACTION
+    priority[moving] = PRIORITY_MOTION + bonus[moving]
+    priority[prior] = PRIORITY_PRIOR + bonus[prior]
+    idle = np.flatnonzero(priority == 0)
+    for _ in range(min(SWEEP_TILES_PER_FRAME, len(idle))):
+        # Next idle tile at or after the cursor, wrapping around
+        after = idle[idle >= state.sweep_cursor]
+        tile = int(after[0]) if len(after) else int(idle[0])
+        priority[tile] = PRIORITY_SWEEP
+        idle = idle[idle != tile]
+        state.sweep_cursor = (tile + 1) % len(grid.boxes)
+    wanted = [int(i) for i in np.argsort(-priority, kind="stable") if priority[i] > 0]
+    order = wanted[:MAX_TILES_PER_FRAME]
+    state.waiting[wanted[MAX_TILES_PER_FRAME:]] += 1.0
+    state.waiting[order] = 0.0
+    state.waiting[priority == 0] = 0.0
+    reasons = {"prior": [], "motion": [], "sweep": []}
+    for tile in order:
+        reason = "prior" if priority[tile] >= PRIORITY_PRIOR else "motion" if priority[tile] >= PRIORITY_MOTION else "sweep"
+        reasons[reason].append(tile)
+    return reasons
+
+def tile_detections(responses: List[Any], grid: TileGrid, tiles: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Model responses for the tile crops -> frame-space xyxy, confidence, class_id, class_name, cut;
+    `cut` marks boxes on an edge shared with another tile that ran, likely fragments of a larger organism"""
+    ran = set(tiles)
+    xyxy, confidence, class_id, class_name, cut = [], [], [], [], []
+    for tile, response in zip(tiles, responses):
+        x0, y0, x1, y1 = (int(v) for v in grid.boxes[tile])
+        # Interior edges where a neighbouring tile also ran and sees past them
+        shared = {side: grid.neighbour(tile, dx, dy) in ran
+                  for side, dx, dy in (("left", -1, 0), ("right", 1, 0), ("top", 0, -1), ("bottom", 0, 1))}
+        for prediction in getattr(response, "predictions", None) or []:
+            half_w, half_h = prediction.width / 2.0, prediction.height / 2.0
+            box = [x0 + prediction.x - half_w, y0 + prediction.y - half_h, x0 + prediction.x + half_w, y0 + prediction.y + half_h]
+            cut.append((shared["left"] and box[0] <= x0 + EDGE_MARGIN) or (shared["right"] and box[2] >= x1 - EDGE_MARGIN)
+                       or (shared["top"] and box[1] <= y0 + EDGE_MARGIN) or (shared["bottom"] and box[3] >= y1 - EDGE_MARGIN))
+            xyxy.append(box)
+            confidence.append(float(prediction.confidence))
+            class_id.append(int(prediction.class_id))
+            class_name.append(str(getattr(prediction, "class_name", None) or getattr(prediction, "class", "")))
+    return (np.asarray(xyxy, dtype=np.float32).reshape(-1, 4), np.asarray(confidence, dtype=np.float32),
+            np.asarray(class_id, dtype=int), np.asarray(class_name, dtype=object), np.asarray(cut, dtype=bool))
+
+def merge_fragments(xyxy: np.ndarray, confidence: np.ndarray, class_id: np.ndarray, cut: np.ndarray,
+                    whole_xyxy: np.ndarray, whole_class_id: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tile detections with cut fragments resolved -> (kept indices, xyxy, confidence).
+    A fragment mostly inside a same-class uncut or whole-frame box is dropped; the others are
+    joined with the same-class fragments they overlap into one union box at their best confidence."""
+    xyxy = xyxy.copy()
+    confidence = confidence.copy()
+    fragments = np.flatnonzero(cut)
+    if len(fragments) == 0:
+        return np.arange(len(xyxy)), xyxy, confidence
+    cover_xyxy = np.concatenate([whole_xyxy.reshape(-1, 4), xyxy[~cut]])
+    cover_class = np.concatenate([whole_class_id.astype(int), class_id[~cut]])
+    area = np.prod(np.clip(xyxy[:, 2:] - xyxy[:, :2], 1e-6, None), axis=1)
+
+    def inside(index: int, others: np.ndarray) -> np.ndarray:
+        top_left = np.maximum(xyxy[index, :2], others[:, :2])
+        bottom_right = np.minimum(xyxy[index, 2:], others[:, 2:])
+        return np.prod(np.clip(bottom_right - top_left, 0, None), axis=1) / area[index]
+
+    dropped = np.zeros(len(xyxy), dtype=bool)
+    for index in fragments:
+        same = cover_class == class_id[index]
+        dropped[index] = bool(same.any()) and inside(index, cover_xyxy[same]).max() >= FRAGMENT_COVERED
+    fragments = fragments[~dropped[fragments]]
+    # Join overlapping same-class fragments, repeating until no union grows into another
+    changed = True
+    while changed:
+        changed = False
+        for position, index in enumerate(fragments):
+            if dropped[index]:
+                continue
+            for other in fragments[position + 1:]:
+                if dropped[other] or class_id[other] != class_id[index] or inside(index, xyxy[other:other + 1])[0] <= 0:
+                    continue
+                xyxy[index, :2] = np.minimum(xyxy[index, :2], xyxy[other, :2])
+                xyxy[index, 2:] = np.maximum(xyxy[index, 2:], xyxy[other, 2:])
+                area[index] = np.prod(xyxy[index, 2:] - xyxy[index, :2])
+                confidence[index] = max(confidence[index], confidence[other])
+                dropped[other] = changed = True
+    return np.flatnonzero(~dropped), xyxy, confidence
+
+def classwise_nms(xyxy: np.ndarray, confidence: np.ndarray, class_id: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Indices kept by greedy NMS run separately per class, highest confidence first"""
+    keep = []
+    for cls in np.unique(class_id):
+        candidates = np.flatnonzero(class_id == cls)
+        candidates = candidates[np.argsort(-confidence[candidates], kind="stable")]
+        while len(candidates):
+            best, rest = candidates[0], candidates[1:]
+            keep.append(best)
+            top_left = np.maximum(xyxy[best, :2], xyxy[rest, :2])
+            bottom_right = np.minimum(xyxy[best, 2:], xyxy[rest, 2:])
+            intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+            area_best = np.prod(xyxy[best, 2:] - xyxy[best, :2])
+            area_rest = np.prod(xyxy[rest, 2:] - xyxy[rest, :2], axis=1)
+            iou = intersection / np.maximum(area_best + area_rest - intersection, 1e-6)
+            candidates = rest[iou < iou_threshold]
+    return np.sort(np.asarray(keep, dtype=int))
+
+def frame_data(image: Any, class_name: np.ndarray, reference: Any) -> Dict[str, np.ndarray]:
+    """Detection data for tile results, with the same keys the `model` step attaches.
+    Per-frame values are copied from the whole-frame predictions when it has any."""
+    count = len(class_name)
+    detection_ids = np.array([str(uuid.uuid4()) for _ in range(count)], dtype=object)
+    if reference is not None and len(reference) > 0:
+        data = {key: np.repeat(np.asarray(values)[:1], count, axis=0) for key, values in reference.data.items()}
+        data["class_name"] = class_name
+        data["detection_id"] = detection_ids
+        return data
+    height, width = image.numpy_image.shape[:2]
+    parent_id = image.parent_metadata.parent_id
+    root = getattr(image, "workflow_root_ancestor_metadata", None)
+    return {
+        "class_name": class_name,
+        "detection_id": detection_ids,
+        "parent_id": np.array([parent_id] * count, dtype=object),
+        "root_parent_id": np.array([getattr(root, "parent_id", parent_id)] * count, dtype=object),
+        "prediction_type": np.array(["object-detection"] * count, dtype=object),
+        "image_dimensions": np.tile([height, width], (count, 1)),
+        "parent_dimensions": np.tile([height, width], (count, 1)),
+        "root_parent_dimensions": np.tile([height, width], (count, 1)),
+        "parent_coordinates": np.zeros((count, 2), dtype=int),
+        "root_parent_coordinates": np.zeros((count, 2), dtype=int),
+    }
+
+def merge_predictions(image: Any, predictions: Any, xyxy, confidence, class_id, class_name) -> Any:
+    """Whole-frame predictions plus tile detections, overlaps removed by class-wise NMS"""
+    tiles = sv.Detections(xyxy=xyxy, confidence=confidence, class_id=class_id,
+                          data=frame_data(image, class_name, predictions))
+    if predictions is None or len(predictions) == 0:
+        merged = tiles
+    else:
+        merged = sv.Detections(
+            xyxy=np.concatenate([np.asarray(predictions.xyxy, dtype=np.float32), xyxy]),
+            confidence=np.concatenate([np.asarray(predictions.confidence, dtype=np.float32), confidence]),
+            class_id=np.concatenate([np.asarray(predictions.class_id, dtype=int), class_id]),
+            data={key: np.concatenate([np.asarray(values), tiles.data[key]]) for key, values in predictions.data.items()},
+        )
+    return merged[classwise_nms(merged.xyxy, merged.confidence, merged.class_id, NMS_IOU)]
+
+def run(self, image: Any, predictions: Any) -> Dict[str, Any]:
+    """
+    TILED ROI INFERENCE
+    Re-runs the model at full resolution on the active tiles of large frames
+    (motion, last frame's detections, one idle tile in rotation) in one batched
+    call, and merges the result with the whole-frame predictions
+    """
+    try:
+        stream_id = str(image.video_metadata.video_identifier)
+    except Exception:
+        stream_id = DEFAULT_STREAM_ID
+    stats = {"stream_id": stream_id, "tiled": False, "tiles_total": 0, "tiles_run": 0,
+             "prior": 0, "motion": 0, "sweep": 0, "detections_added": 0, "model_ms": 0.0}
+
+    try:
+        frame = image.numpy_image
+        height, width = frame.shape[:2]
+        if max(width, height) <= MIN_TILED_SIDE:
+            return {"predictions": predictions, "tile_stats": stats}
+        state = get_stream_state(stream_id)
+        with state.lock:
+            if state.grid is None or state.grid.size != (width, height):
+                state.grid = TileGrid(width, height)
+                state.previous_small = None
+                state.sweep_cursor = 0
+            grid = state.grid
+            whole_frame = np.zeros((0, 4), dtype=np.float32)
+            if predictions is not None and len(predictions) > 0:
+                whole_frame = np.asarray(predictions.xyxy, dtype=np.float32).reshape(-1, 4)
+            # Large organisms need no tiles: their boxes neither activate tiles nor count as motion
+            motion = motion_fractions(state, frame, grid, whole_frame[~is_small(whole_frame, width, height)])
+            prior_boxes = np.concatenate([state.previous_boxes, whole_frame])
+            prior_boxes = prior_boxes[is_small(prior_boxes, width, height)]
+            reasons = select_tiles(state, grid, motion, tiles_touching(grid, prior_boxes))
+
+        tiles = reasons["prior"] + reasons["motion"] + reasons["sweep"]
+        stats.update(tiled=True, tiles_total=len(grid.boxes), **{reason: len(found) for reason, found in reasons.items()})
+        model = get_tile_model() if tiles else None
+        merged = predictions
+        if model is not None:
+            crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in grid.boxes[tiles]]
+            started = time.perf_counter()
+            responses = model.infer(crops, confidence=CONFIDENCE_THRESHOLD)
+            stats["model_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+            stats["tiles_run"] = len(tiles)
+            if not isinstance(responses, list):
+                responses = [responses]
+            xyxy, confidence, class_id, class_name, cut = tile_detections(responses, grid, tiles)
+            whole_class_id = np.asarray(predictions.class_id, dtype=int) if len(whole_frame) else np.zeros(0, dtype=int)
+            keep, xyxy, confidence = merge_fragments(xyxy, confidence, class_id, cut, whole_frame, whole_class_id)
+            xyxy, confidence, class_id, class_name = xyxy[keep], confidence[keep], class_id[keep], class_name[keep]
+            merged = merge_predictions(image, predictions, xyxy, confidence, class_id, class_name)
+            stats["detections_added"] = len(merged) - (len(predictions) if predictions is not None else 0)
+
+        with state.lock:
+            state.previous_boxes = np.asarray(merged.xyxy, dtype=np.float32).reshape(-1, 4) if merged is not None else np.zeros((0, 4), dtype=np.float32)
+            state.frames += 1
+            state.tiles_run += stats["tiles_run"]
+            stats["mean_tiles_run"] = round(state.tiles_run / state.frames, 2)
+        return {"predictions": merged, "tile_stats": stats}
+    except Exception as e:
+        stats["error"] = str(e)
+        return {"predictions": predictions, "tile_stats": stats}
@@ -0,0 +1,245 @@
+import base64
+import time
+import threading
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    # Media clocks and end-of-stream flush from the deploy script (roboflow-workflows/stream_hooks.py)
+    from stream_hooks import media_time, register_flusher
+except ImportError:
+    media_time = register_flusher = None
+
+# === TRACK LIFECYCLE CONFIGURATION ===
+TRACK_END_SECONDS = 3.0  # Track is closed when unseen for this long
+HEARTBEAT_SECONDS = 60.0  # Long visits emit a progress event at this interval
+MAX_TRACKS_PER_STREAM = 256  # Least recently seen tracks are evicted beyond this
+MAX_PATH_POINTS = 64  # Path is decimated (every other point dropped) when full
+PATH_SAMPLE_SECONDS = 0.5
+THUMBNAIL_MAX_SIZE = 128
+THUMBNAIL_JPEG_QUALITY = 80
+STALE_SCAN_SECONDS = 1.0
+STREAM_IDLE_SECONDS = 30.0  # Wall-clock seconds without frames before a stream's open visits are closed
+DEFAULT_STREAM_ID = "default_source"
+
+class TrackVisit:
+    """Aggregated state of one tracker_id for as long as it stays in view"""
+    
+    __slots__ = ("tracker_id", "class_name", "first_seen", "last_seen", "last_emitted", "frames",
+                 "confidence_sum", "max_confidence", "best_frame_number", "best_bbox", "best_crop",
+                 "path", "last_path_time")
+    
+    def __init__(self, tracker_id: int, class_name: str, now: float):
+        self.tracker_id = tracker_id
+        self.class_name = class_name
+        self.first_seen = now
+        self.last_seen = now
+        self.last_emitted = now
+        self.frames = 0
+        self.confidence_sum = 0.0
+        self.max_confidence = -1.0
+        self.best_frame_number = None
+        self.best_bbox = None
+        self.best_crop = None
+        self.path: List[List[float]] = []
+        self.last_path_time = -1e9
+    
+    def update(self, bbox, confidence: float, class_name: str, now: float, frame_number, frame):
+        self.last_seen = now
+        self.frames += 1
+        self.confidence_sum += confidence
+        if confidence > self.max_confidence:
+            self.max_confidence = confidence
+            self.class_name = class_name
+            self.best_frame_number = frame_number
+            self.best_bbox = [round(float(v), 1) for v in bbox]
+            self.best_crop = crop_thumbnail(frame, bbox)
+        if now - self.last_path_time >= PATH_SAMPLE_SECONDS:
+            self.last_path_time = now
+            self.path.append([round(float((bbox[0] + bbox[2]) / 2), 1), round(float((bbox[1] + bbox[3]) / 2), 1), round(now, 3)])
+            if len(self.path) > MAX_PATH_POINTS:
+                self.path = self.path[::2]
+    
+    def to_event(self, event_type: str, stream_id: str, include_thumbnail: bool, wall_offset: float = 0.0) -> Dict[str, Any]:
+        """Times in the event are wall clock: the stream clock plus the stream's wall_offset"""
+        event = {
+            "event": event_type,
+            "stream_id": stream_id,
+            "tracker_id": self.tracker_id,
+            "class_name": self.class_name,
+            "first_seen": round(self.first_seen + wall_offset, 3),
+            "last_seen": round(self.last_seen + wall_offset, 3),
+            "dwell_seconds": round(self.last_seen - self.first_seen, 3),
+            "frames": self.frames,
+            "max_confidence": round(self.max_confidence, 4),
+            "mean_confidence": round(self.confidence_sum / self.frames, 4) if self.frames else 0.0,
+            "best_frame_number": self.best_frame_number,
+            "best_bbox": self.best_bbox,
+            "path": [[x, y, round(t + wall_offset, 3)] for x, y, t in self.path],
+        }
+        if include_thumbnail and self.best_crop is not None:
+            success, encoded = cv2.imencode(".jpg", self.best_crop, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY])
+            if success:
+                event["thumbnail_jpeg_b64"] = base64.b64encode(encoded.tobytes()).decode("ascii")
+        return event
+
+class StreamTrackTable:
+    """Open visits of one stream, ordered by last_seen so eviction and stale scans are cheap"""
+    
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.visits: "OrderedDict[int, TrackVisit]" = OrderedDict()
+        self.last_stale_scan = 0.0
+        self.last_frame_wall = time.time()
+        self.wall_offset: Optional[float] = None
+        self.last_clock = 0.0
+        self.events_emitted = 0
+    
+    def anchor(self, now: float, events: List[Dict[str, Any]]):
+        """Tie the stream clock to wall time at its first frame; media time running backwards
+        (the next file on the same stream id) ends the previous file's visits and starts a new anchor"""
+        if self.wall_offset is None or now < self.last_clock:
+            self.close_all(events)
+            self.wall_offset = time.time() - now
+            self.last_stale_scan = now
+        self.last_clock = now
+    
+    def observe(self, tracker_id: int, bbox, confidence: float, class_name: str, now: float,
+                frame_number, frame, events: List[Dict[str, Any]]):
+        visit = self.visits.pop(tracker_id, None)
+        if visit is None:
+            visit = TrackVisit(tracker_id, class_name, now)
+        visit.update(bbox, confidence, class_name, now, frame_number, frame)
+        self.visits[tracker_id] = visit
+        
+        if now - visit.last_emitted >= HEARTBEAT_SECONDS:
+            visit.last_emitted = now
+            events.append(visit.to_event("track_heartbeat", self.stream_id, include_thumbnail=False,
+                                        wall_offset=self.wall_offset or 0.0))
+        
+        while len(self.visits) > MAX_TRACKS_PER_STREAM:
+            _, evicted = self.visits.popitem(last=False)
+            events.append(evicted.to_event("track_evicted", self.stream_id, include_thumbnail=True,
+                                           wall_offset=self.wall_offset or 0.0))
+    
+    def close_stale(self, now: float, events: List[Dict[str, Any]]):
+        if now - self.last_stale_scan < STALE_SCAN_SECONDS:
+            return
+        self.last_stale_scan = now
+        # Oldest first: stop at the first visit that is still fresh
+        while self.visits:
+            tracker_id, visit = next(iter(self.visits.items()))
+            if now - visit.last_seen < TRACK_END_SECONDS:
+                break
+            del self.visits[tracker_id]
+            events.append(visit.to_event("track_ended", self.stream_id, include_thumbnail=True,
+                                         wall_offset=self.wall_offset or 0.0))
+    
+    def close_all(self, events: List[Dict[str, Any]]):
+        """End of stream: every open visit ends at its last sighting"""
+        self.events_emitted += len(self.visits)
+        while self.visits:
+            _, visit = self.visits.popitem(last=False)
+            events.append(visit.to_event("track_ended", self.stream_id, include_thumbnail=True,
+                                         wall_offset=self.wall_offset or 0.0))
+
+_tables: Dict[str, StreamTrackTable] = {}
+_tables_lock = threading.Lock()
+
+def get_stream_table(stream_id: str) -> StreamTrackTable:
+    with _tables_lock:
+        table = _tables.get(stream_id)
+        if table is None:
+            table = _tables[stream_id] = StreamTrackTable(stream_id)
+        return table
+
+def close_idle_streams(current_stream_id: str, wall_now: float, events: List[Dict[str, Any]]):
+    """Close the visits of other streams that stopped delivering frames (a camera that went away)"""
+    with _tables_lock:
+        idle = [table for stream_id, table in _tables.items()
+                if stream_id != current_stream_id and table.visits
+                and wall_now - table.last_frame_wall >= STREAM_IDLE_SECONDS]
+    for table in idle:
+        table.close_all(events)
+
+def flush_open_visits(stream_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """End of stream: track_ended events for every visit still open on one stream (None: all streams)"""
+    with _tables_lock:
+        tables = [table for key, table in _tables.items() if stream_id is None or key == str(stream_id)]
+    events: List[Dict[str, Any]] = []
+    for table in tables:
+        table.close_all(events)
+    return events
+
+def crop_thumbnail(frame: Optional[np.ndarray], bbox) -> Optional[np.ndarray]:
+    """Small copy of the detection crop so the full frame is never retained"""
+    if frame is None:
+        return None
+    height, width = frame.shape[:2]
+    x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))
+    x2, y2 = min(width, int(bbox[2])), min(height, int(bbox[3]))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    crop = frame[y1:y2, x1:x2]
+    scale = THUMBNAIL_MAX_SIZE / max(crop.shape[:2])
+    if scale < 1.0:
+        return cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    return crop.copy()
+
+def frame_clock(image: Any) -> Tuple[str, float, Any]:
+    """Stream id, stream clock and frame number; video files use media time, live sources wall time
+    (events are converted to wall time when emitted, see StreamTrackTable.anchor).
+    Thinned files (adaptive skip, keyframes) have irregular frame spacing, so their media time comes
+    from the producer's clock when the deploy script registered one"""
+    try:
+        metadata = image.video_metadata
+        stream_id = str(metadata.video_identifier)
+        if metadata.comes_from_video_file and metadata.fps:
+            seconds = media_time(stream_id, metadata.frame_number) if media_time else None
+            if seconds is None:
+                seconds = metadata.frame_number / metadata.fps
+            return stream_id, seconds, metadata.frame_number
+        return stream_id, time.time(), metadata.frame_number
+    except Exception:
+        return DEFAULT_STREAM_ID, time.time(), None
+
+def run(self, tracked_detections: Any, image: Any) -> Dict[str, Any]:
+    """
+    TRACK LIFECYCLE AGGREGATOR
+    Folds per-frame tracked detections into one observation per animal visit
+    """
+    stream_id, now, frame_number = frame_clock(image)
+    table = get_stream_table(stream_id)
+    table.last_frame_wall = time.time()
+    events: List[Dict[str, Any]] = []
+    table.anchor(now, events)
+    already_counted = len(events)  # close_all counts its own
+    
+    try:
+        tracker_ids = getattr(tracked_detections, "tracker_id", None)
+        if tracker_ids is not None and len(tracker_ids) > 0:
+            frame = getattr(image, "numpy_image", None)
+            confidences = tracked_detections.confidence
+            class_names = tracked_detections.data.get("class_name", [])
+            for index, tracker_id in enumerate(tracker_ids):
+                confidence = float(confidences[index]) if confidences is not None else 0.0
+                class_name = str(class_names[index]) if len(class_names) > index else "unknown"
+                table.observe(int(tracker_id), tracked_detections.xyxy[index], confidence, class_name,
+                              now, frame_number, frame, events)
+        table.close_stale(now, events)
+    except Exception:
+        pass
+    
+    table.events_emitted += len(events) - already_counted
+    close_idle_streams(stream_id, table.last_frame_wall, events)
+    return {"observations": {
+        "stream_id": stream_id,
+        "events": events,
+        "active_tracks": len(table.visits),
+        "events_emitted": table.events_emitted,
+    }}
+
+if register_flusher:
+    register_flusher("Track_Lifecycle_Aggregator", flush_open_visits)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Audtheia workflow builder
+=========================
+The custom Python blocks live as real modules in `blocks/`; the workflow
+JSON that Roboflow imports carries the same code as escaped strings in
+`dynamic_blocks_definitions[].code.run_function_code`. This script keeps
+the two in step.
+
+    python build_workflow.py            # inject blocks/*.py into the workflow JSON
+    python build_workflow.py --check    # exit 1 if the JSON is out of date (CI)
+    python build_workflow.py --extract  # pull block code out of the JSON into blocks/
+                                        # (after editing a block in the Roboflow UI)
+    python build_workflow.py --output my_workflow.json   # build a copy, e.g. for --workflow-spec
+
+Each block file is injected verbatim. The execution engine prepends its
+own imports (supervision, numpy, WorkflowImageData, ...); the modules
+import what they use themselves so they also work outside the engine.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+from blocks import BLOCK_MODULES, block_path  # noqa: E402
+
+WORKFLOW_FILE = HERE / "Roboflow Anthropic Integration Workflow (GitHub Template).py"
+
+
+def load_workflow(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_workflow(workflow: dict) -> str:
+    # Same layout as the file Roboflow exports, so rebuilding an unchanged tree is a no-op
+    return json.dumps(workflow, indent=2, ensure_ascii=False)
+
+
+def block_definitions(workflow: dict) -> dict:
+    definitions = {}
+    for definition in workflow.get("dynamic_blocks_definitions", []):
+        block_type = definition["manifest"]["block_type"]
+        if block_type not in BLOCK_MODULES:
+            raise SystemExit(f"❌ Workflow block {block_type!r} has no module in blocks/ (add it to BLOCK_MODULES)")
+        definitions[block_type] = definition
+    missing = set(BLOCK_MODULES) - set(definitions)
+    if missing:
+        raise SystemExit(f"❌ blocks/ modules missing from the workflow JSON: {', '.join(sorted(missing))}")
+    return definitions
+
+
+def build(workflow: dict) -> list[str]:
+    """Inject every block module into `workflow`; returns the block types whose code changed."""
+    changed = []
+    for block_type, definition in block_definitions(workflow).items():
+        source = block_path(block_type).read_text(encoding="utf-8")
+        if definition["code"].get("run_function_code") != source:
+            definition["code"]["run_function_code"] = source
+            changed.append(block_type)
+    return changed
+
+
+def extract(workflow: dict) -> list[str]:
+    written = []
+    for block_type, definition in block_definitions(workflow).items():
+        path = block_path(block_type)
+        source = definition["code"]["run_function_code"]
+        if not path.exists() or path.read_text(encoding="utf-8") != source:
+            path.write_text(source, encoding="utf-8")
+            written.append(block_type)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflow", type=Path, default=WORKFLOW_FILE, help="Workflow JSON to read")
+    parser.add_argument("--output", type=Path, default=None, help="Where to write the built JSON (default: in place)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="Only report whether the JSON is up to date")
+    mode.add_argument("--extract", action="store_true", help="Write the JSON's block code into blocks/")
+    args = parser.parse_args()
+
+    workflow = load_workflow(args.workflow)
+
+    if args.extract:
+        written = extract(workflow)
+        print(f"📤 Extracted {len(written)} block(s): {', '.join(written) or 'all up to date'}")
+        return 0
+
+    changed = build(workflow)
+    if args.check:
+        if changed:
+            print(f"❌ Workflow JSON is out of date for: {', '.join(changed)} - run build_workflow.py")
+            return 1
+        print("✅ Workflow JSON matches blocks/")
+        return 0
+
+    output = args.output or args.workflow
+    text = dump_workflow(workflow)
+    if output.exists() and output.read_text(encoding="utf-8") == text:
+        print(f"✅ {output.name} already up to date")
+        return 0
+    output.write_text(text, encoding="utf-8")
+    print(f"📦 Wrote {output.name} ({len(changed)} block(s) updated: {', '.join(changed) or 'none'})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
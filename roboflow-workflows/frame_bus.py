@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚌 Audtheia Shared-Memory Frame Bus
+===================================
+One publisher (the inference sink) writes each frame ONCE into a ring of
+`multiprocessing.shared_memory` slots. Any number of consumer processes -
+recorder, display, analyzer, uploader - attach by bus name and read frames
+zero-copy as numpy views by slot index, outside the inference process's GIL.
+
+Reference counting: every consumer owns one row of a `holds[consumer, slot]`
+table and is the only writer of that row, so a slot's refcount is the column
+sum and no cross-process atomics are needed on the frame path. Claiming a
+row at registration is the one step that takes a lock (flock on a file
+named after the bus). The publisher never blocks: it writes into the next
+slot with refcount 0 and counts a drop if every slot is held.
+
+Timestamps are wall-clock seconds (time.time()), so consumers in other
+processes can compare them with their own clock.
+
+Usage (publisher):
+    bus = SharedFrameBus.create("audtheia", frame_shape=(1080, 1920, 3))
+    bus.publish(frame)
+
+Usage (consumer process):
+    bus = SharedFrameBus.attach("audtheia")
+    consumer = bus.register_consumer()
+    ref = consumer.wait_for_frame(timeout=1.0)
+    if ref:
+        process(ref.frame)      # numpy view into shared memory, no copy
+        consumer.release(ref)
+"""
+
+import fcntl
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+BUS_MAGIC = 0x41554454  # "AUDT"
+DEFAULT_SLOTS = 8
+DEFAULT_MAX_CONSUMERS = 8
+HEADER_ALIGNMENT = 64
+
+# Control block layout (int64 words)
+CONTROL_MAGIC, CONTROL_SLOTS, CONTROL_SLOT_BYTES, CONTROL_MAX_CONSUMERS = 0, 1, 2, 3
+CONTROL_LATEST_SEQ, CONTROL_LATEST_SLOT, CONTROL_PUBLISHED, CONTROL_DROPPED = 4, 5, 6, 7
+CONTROL_WORDS = 8
+
+# Per-slot metadata (int64 words); seq == -1 while the publisher is writing
+META_SEQ, META_HEIGHT, META_WIDTH, META_CHANNELS = 0, 1, 2, 3
+META_WORDS = 4
+
+
+def _align(offset: int) -> int:
+    return (offset + HEADER_ALIGNMENT - 1) // HEADER_ALIGNMENT * HEADER_ALIGNMENT
+
+
+def _registration_lock_path(name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{name.lstrip('/')}.consumers.lock")
+
+
+def _layout(slots: int, max_consumers: int):
+    """Byte offsets of each header table and of the first frame slot"""
+    control = 0
+    slot_meta = _align(control + CONTROL_WORDS * 8)
+    slot_time = _align(slot_meta + slots * META_WORDS * 8)
+    consumer_pid = _align(slot_time + slots * 8)
+    holds = _align(consumer_pid + max_consumers * 8)
+    data = _align(holds + max_consumers * slots)
+    return control, slot_meta, slot_time, consumer_pid, holds, data
+
+
+@dataclass
+class FrameRef:
+    """A held slot; `frame` is a view into shared memory valid until release()"""
+    slot: int
+    seq: int
+    timestamp: float  # wall clock (time.time()): capture time if the publisher knew it, else publish time
+    frame: np.ndarray
+
+
+class SharedFrameBus:
+    """Ring of shared-memory frame slots with per-consumer reference holds"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        header = np.ndarray((CONTROL_WORDS,), dtype=np.int64, buffer=buf, offset=0)
+        if header[CONTROL_MAGIC] != BUS_MAGIC and not owner:
+            raise ValueError(f"Shared memory '{shm.name}' is not an Audtheia frame bus")
+        self.control = header
+        self.slots = int(header[CONTROL_SLOTS])
+        self.slot_bytes = int(header[CONTROL_SLOT_BYTES])
+        self.max_consumers = int(header[CONTROL_MAX_CONSUMERS])
+        _, meta_offset, time_offset, pid_offset, holds_offset, self.data_offset = _layout(self.slots, self.max_consumers)
+        self.slot_meta = np.ndarray((self.slots, META_WORDS), dtype=np.int64, buffer=buf, offset=meta_offset)
+        self.slot_time = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=time_offset)
+        self.consumer_pid = np.ndarray((self.max_consumers,), dtype=np.int64, buffer=buf, offset=pid_offset)
+        self.holds = np.ndarray((self.max_consumers, self.slots), dtype=np.uint8, buffer=buf, offset=holds_offset)
+        self._next_slot = 0
+
+    # ── lifecycle ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def create(cls, name: Optional[str], frame_shape: Tuple[int, int, int], slots: int = DEFAULT_SLOTS,
+               max_consumers: int = DEFAULT_MAX_CONSUMERS) -> "SharedFrameBus":
+        """Allocate a bus sized for frames up to `frame_shape` (height, width, channels) uint8"""
+        slot_bytes = _align(int(np.prod(frame_shape)))
+        data_offset = _layout(slots, max_consumers)[-1]
+        shm = shared_memory.SharedMemory(name=name, create=True, size=data_offset + slots * slot_bytes)
+        control = np.ndarray((CONTROL_WORDS,), dtype=np.int64, buffer=shm.buf, offset=0)
+        control[:] = 0
+        control[CONTROL_SLOTS] = slots
+        control[CONTROL_SLOT_BYTES] = slot_bytes
+        control[CONTROL_MAX_CONSUMERS] = max_consumers
+        control[CONTROL_LATEST_SLOT] = -1
+        bus = cls(shm, owner=True)
+        bus.slot_meta[:] = 0
+        bus.slot_time[:] = 0.0
+        bus.consumer_pid[:] = 0
+        bus.holds[:] = 0
+        control[CONTROL_MAGIC] = BUS_MAGIC
+        return bus
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameBus":
+        # Consumers must not unlink the publisher's segment when they exit, so the
+        # attachment is kept out of the resource tracker (Python < 3.13 has no track=False)
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            tracker = shared_memory.resource_tracker
+            register = tracker.register
+            tracker.register = lambda resource, rtype: None if rtype == "shared_memory" else register(resource, rtype)
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                tracker.register = register
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.control = self.slot_meta = self.slot_time = self.consumer_pid = self.holds = None
+        name = self.shm.name
+        self.shm.close()
+        if self.owner:
+            for remove in (self.shm.unlink, lambda: os.unlink(_registration_lock_path(name))):
+                try:
+                    remove()
+                except FileNotFoundError:
+                    pass
+
+    # ── publisher side ─────────────────────────────────────────────────────
+
+    def slot_view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=self.data_offset + slot * self.slot_bytes)
+
+    def refcounts(self) -> np.ndarray:
+        return self.holds.sum(axis=0, dtype=np.int64)
+
+    def publish(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy `frame` into a free slot; returns its sequence number, or -1 if every slot was held.
+        `timestamp` is wall-clock time (time.time()), the publish time when omitted."""
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame must be uint8 and at most {self.slot_bytes} bytes")
+        latest_slot = int(self.control[CONTROL_LATEST_SLOT])
+        slot = self._claim_slot(latest_slot)
+        if slot is None:
+            self.reap_dead_consumers()
+            slot = self._claim_slot(latest_slot)
+        if slot is None:
+            self.control[CONTROL_DROPPED] += 1
+            return -1
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        np.copyto(self.slot_view(slot, frame.shape), frame)
+        seq = int(self.control[CONTROL_LATEST_SEQ]) + 1
+        self.slot_meta[slot, META_HEIGHT] = height
+        self.slot_meta[slot, META_WIDTH] = width
+        self.slot_meta[slot, META_CHANNELS] = channels
+        self.slot_time[slot] = time.time() if timestamp is None else timestamp
+        self.slot_meta[slot, META_SEQ] = seq
+        # Publish order matters: the slot is complete before it becomes "latest"
+        self.control[CONTROL_LATEST_SLOT] = slot
+        self.control[CONTROL_LATEST_SEQ] = seq
+        self.control[CONTROL_PUBLISHED] += 1
+        return seq
+
+    def _claim_slot(self, latest_slot: int) -> Optional[int]:
+        """Next slot in ring order with refcount 0, never the current latest one"""
+        refcounts = self.refcounts()
+        for step in range(self.slots):
+            slot = (self._next_slot + step) % self.slots
+            if slot == latest_slot or refcounts[slot]:
+                continue
+            # Mark as being written, then re-check holds: a consumer that raced in sees seq -1 and backs off
+            previous_seq = self.slot_meta[slot, META_SEQ]
+            self.slot_meta[slot, META_SEQ] = -1
+            if self.holds[:, slot].any():
+                self.slot_meta[slot, META_SEQ] = previous_seq
+                continue
+            self._next_slot = (slot + 1) % self.slots
+            return slot
+        return None
+
+    def reap_dead_consumers(self) -> int:
+        """Drop holds of consumer processes that exited without detaching"""
+        reaped = 0
+        for index, pid in enumerate(self.consumer_pid.tolist()):
+            if pid <= 0:
+                continue
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                self.holds[index, :] = 0
+                self.consumer_pid[index] = 0
+                reaped += 1
+            except PermissionError:
+                pass
+        return reaped
+
+    def stats(self) -> dict:
+        return {
+            "published": int(self.control[CONTROL_PUBLISHED]),
+            "dropped": int(self.control[CONTROL_DROPPED]),
+            "consumers": int(np.count_nonzero(self.consumer_pid)),
+            "slots_held": int(np.count_nonzero(self.refcounts())),
+        }
+
+    # ── consumer side ──────────────────────────────────────────────────────
+
+    @contextmanager
+    def _registration_lock(self):
+        """Cross-process lock around claiming a consumer row; closing the descriptor releases it"""
+        fd = os.open(_registration_lock_path(self.name), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def register_consumer(self) -> "FrameBusConsumer":
+        pid = os.getpid()
+        # Two processes could both see the same row free and both write their pid into it; under the
+        # lock the check and the claim are one step
+        with self._registration_lock():
+            for index in range(self.max_consumers):
+                if self.consumer_pid[index] == 0:
+                    self.holds[index, :] = 0
+                    self.consumer_pid[index] = pid
+                    return FrameBusConsumer(self, index)
+        raise RuntimeError(f"Frame bus '{self.name}' already has {self.max_consumers} consumers")
+
+
+class FrameBusConsumer:
+    """One consumer's row of the holds table plus its read cursor"""
+
+    def __init__(self, bus: SharedFrameBus, index: int):
+        self.bus = bus
+        self.index = index
+        self.last_seq = 0
+        self.frames_read = 0
+        self.frames_skipped = 0
+
+    def acquire_latest(self) -> Optional[FrameRef]:
+        """Hold the newest frame if it is newer than the last one read"""
+        bus = self.bus
+        for _ in range(4):
+            slot = int(bus.control[CONTROL_LATEST_SLOT])
+            seq = int(bus.control[CONTROL_LATEST_SEQ])
+            if slot < 0 or seq <= self.last_seq:
+                return None
+            bus.holds[self.index, slot] = 1
+            # Verify after taking the hold: the slot must still carry the sequence we saw
+            if int(bus.slot_meta[slot, META_SEQ]) != seq:
+                bus.holds[self.index, slot] = 0
+                continue
+            height, width, channels = (int(v) for v in bus.slot_meta[slot, META_HEIGHT:META_CHANNELS + 1])
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            frame = bus.slot_view(slot, shape)
+            frame.flags.writeable = False
+            if self.last_seq:
+                self.frames_skipped += seq - self.last_seq - 1
+            self.last_seq = seq
+            self.frames_read += 1
+            return FrameRef(slot=slot, seq=seq, timestamp=float(bus.slot_time[slot]), frame=frame)
+        return None
+
+    def wait_for_frame(self, timeout: float = 1.0, poll_interval: float = 0.0005) -> Optional[FrameRef]:
+        deadline = time.perf_counter() + timeout
+        while True:
+            ref = self.acquire_latest()
+            if ref is not None or time.perf_counter() >= deadline:
+                return ref
+            time.sleep(poll_interval)
+
+    def release(self, ref: FrameRef):
+        self.bus.holds[self.index, ref.slot] = 0
+
+    def detach(self):
+        self.bus.holds[self.index, :] = 0
+        self.bus.consumer_pid[self.index] = 0
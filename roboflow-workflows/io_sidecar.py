@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📮 Audtheia Network I/O Sidecar
+===============================
+A separate process that owns the workflow's outbound network I/O - Claude
+calls, n8n webhooks and dataset uploads - on one asyncio loop with pooled
+keep-alive connections. The blocks hand it jobs over a Unix socket and get
+replies through callbacks, so request building, TLS, response parsing and
+retries no longer compete for the GIL with decode, tracking and drawing in
+the inference process.
+
+Wire format (both directions): <II header bytes, body bytes> + JSON header
++ raw body. Jobs:
+    {"kind": "http", "service": "n8n", "url": ..., "json": {...}}
+        optional: method, params, headers, timeout, data, file_field/filename/
+        content_type (body sent as a multipart file), body_at (JSON path where
+        the body is inserted as text, e.g. a base64 image), extract (JSON path
+        of the reply value to return)
+    {"kind": "roboflow_upload", "service": "roboflow", "api_url", "api_key",
+     "project", "batch", "tags", "name", "annotation"}   body = JPEG bytes
+    {"kind": "stats"}
+A job with "reply": true gets {"id", "ok", "status", "value", "error",
+"elapsed_ms"} back; others are fire-and-forget. Each service has its own
+concurrency limit and a bounded queue: beyond --max-pending waiting jobs
+the oldest is dropped (and answered {"ok": false} if it wanted a reply),
+so a slow endpoint cannot pile up stale posts in the sidecar.
+
+Blocks find the sidecar through the AUDTHEIA_IO_SIDECAR environment variable
+(the socket path) and fall back to their in-process threads when it is unset
+or unreachable. The deploy script starts one with --io-sidecar.
+
+Usage:
+    python io_sidecar.py --socket /tmp/audtheia-io.sock --limit anthropic=1 --limit n8n=4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import queue
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+SOCKET_ENV = "AUDTHEIA_IO_SIDECAR"
+DEFAULT_SOCKET = "/tmp/audtheia-io.sock"
+FRAME_HEADER = struct.Struct("<II")
+DEFAULT_LIMITS = {"anthropic": 1, "n8n": 4, "roboflow": 2}
+DEFAULT_LIMIT = 4
+MAX_QUEUED_JOBS = 256  # Client side; submit() returns False beyond this
+MAX_PENDING_PER_SERVICE = 64  # Sidecar side; the oldest waiting job of a service is dropped beyond this
+RECONNECT_SECONDS = 5.0
+
+
+def encode_frame(header: Dict[str, Any], body: bytes = b"") -> bytes:
+    data = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER.pack(len(data), len(body)) + data + body
+
+
+def _lookup(value: Any, path: List[Any]) -> Any:
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _insert(document: Any, path: List[Any], value: Any):
+    _lookup(document, path[:-1])[path[-1]] = value
+
+
+# ---------------------------------------------------------------------------
+# Client (inference process, stdlib only)
+# ---------------------------------------------------------------------------
+
+class SidecarClient:
+    """
+    Non-blocking job submission: submit() serialises the job header and
+    queues it; a writer thread sends, a reader thread runs reply callbacks.
+    If the connection drops, pending callbacks get {"ok": False} and the
+    client stays closed - client() reconnects after RECONNECT_SECONDS.
+    """
+
+    def __init__(self, path: str, max_queued: int = MAX_QUEUED_JOBS):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.outgoing: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_queued)
+        self.callbacks: Dict[int, Callable[[Dict[str, Any], bytes], None]] = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.closed = False
+        self.submitted = 0
+        self.replies = 0
+        self.dropped = 0
+        self.writer = threading.Thread(target=self._write, name="IOSidecarWriter", daemon=True)
+        self.writer.start()
+        threading.Thread(target=self._read, name="IOSidecarReader", daemon=True).start()
+
+    def submit(self, job: Dict[str, Any], body: bytes = b"",
+               callback: Optional[Callable[[Dict[str, Any], bytes], None]] = None) -> bool:
+        """Queue a job; False if the client is closed or its queue is full (caller falls back)"""
+        if self.closed:
+            return False
+        job_id = next(self.ids)
+        job = dict(job, id=job_id, reply=callback is not None)
+        if callback is not None:
+            with self.lock:
+                self.callbacks[job_id] = callback
+        try:
+            self.outgoing.put_nowait(encode_frame(job, body))
+        except queue.Full:
+            with self.lock:
+                self.callbacks.pop(job_id, None)
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _write(self):
+        while not self.closed:
+            frame = self.outgoing.get()
+            if frame is None:
+                break
+            try:
+                self.sock.sendall(frame)
+            except OSError as e:
+                self._fail(e)
+                break
+
+    def _read_exactly(self, size: int) -> bytes:
+        chunks, remaining = [], size
+        while remaining:
+            chunk = self.sock.recv(min(remaining, 1 << 20))
+            if not chunk:
+                raise ConnectionError("sidecar closed the connection")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def _read(self):
+        try:
+            while True:
+                header_len, body_len = FRAME_HEADER.unpack(self._read_exactly(FRAME_HEADER.size))
+                reply = json.loads(self._read_exactly(header_len))
+                body = self._read_exactly(body_len) if body_len else b""
+                with self.lock:
+                    callback = self.callbacks.pop(reply.get("id"), None)
+                self.replies += 1
+                if callback is not None:
+                    try:
+                        callback(reply, body)
+                    except Exception:
+                        pass
+        except (OSError, ValueError) as e:
+            self._fail(e)
+
+    def _fail(self, error: Exception):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            try:
+                callback({"ok": False, "error": f"sidecar connection lost: {error}"}, b"")
+            except Exception:
+                pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def close(self, timeout: float = 1.0):
+        """Send what is already queued (up to `timeout`), then disconnect"""
+        try:
+            self.outgoing.put(None, timeout=timeout)
+            self.writer.join(timeout)
+        except queue.Full:
+            pass
+        self._fail(ConnectionError("client closed"))
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "replies": self.replies, "dropped": self.dropped,
+                "queued": self.outgoing.qsize(), "awaiting_reply": len(self.callbacks)}
+
+
+_clients: Dict[str, SidecarClient] = {}
+_retry_at: Dict[str, float] = {}
+_clients_lock = threading.Lock()
+
+
+def client(path: Optional[str] = None) -> Optional[SidecarClient]:
+    """Shared client for `path` (default: $AUDTHEIA_IO_SIDECAR), or None if no sidecar is reachable"""
+    path = path or os.environ.get(SOCKET_ENV)
+    if not path:
+        return None
+    with _clients_lock:
+        existing = _clients.get(path)
+        if existing is not None and not existing.closed:
+            return existing
+        if time.time() < _retry_at.get(path, 0.0):
+            return None
+        try:
+            _clients[path] = SidecarClient(path)
+        except OSError:
+            _retry_at[path] = time.time() + RECONNECT_SECONDS
+            return None
+        return _clients[path]
+
+
+def wait_for_socket(path: str, timeout: float = 10.0, process=None) -> bool:
+    """True once a sidecar accepts connections on `path`; False early if `process` (a Popen) exits"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Sidecar process (asyncio + pooled httpx client)
+# ---------------------------------------------------------------------------
+
+class IOSidecar:
+    """Runs jobs from any number of connections: per service, a bounded drop-oldest queue
+    drained by as many worker tasks as the service's concurrency limit"""
+
+    def __init__(self, socket_path: str, limits: Optional[Dict[str, int]] = None, max_connections: int = 32,
+                 timeout: float = 30.0, max_pending: int = MAX_PENDING_PER_SERVICE):
+        self.socket_path = socket_path
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pending: Dict[str, deque] = {}  # service -> (job, body, writer, write_lock) waiting for a worker
+        self.workers: Dict[str, int] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+        self.http = None
+        self.tasks = set()  # Connection handlers and running jobs, cancelled on shutdown
+        self.started = time.time()
+
+    def _counters(self, service: str) -> Dict[str, float]:
+        return self.counters.setdefault(service, {"jobs": 0, "failed": 0, "dropped": 0, "total_ms": 0.0})
+
+    def _count(self, service: str, ok: bool, elapsed: float):
+        counters = self._counters(service)
+        counters["jobs"] += 1
+        counters["failed"] += 0 if ok else 1
+        counters["total_ms"] += elapsed * 1000.0
+
+    def _enqueue(self, job: Dict[str, Any], body: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        service = job.get("service", job.get("kind") or "default")
+        waiting = self.pending.setdefault(service, deque())
+        if len(waiting) >= self.max_pending:
+            dropped_job, _, dropped_writer, dropped_lock = waiting.popleft()
+            self._counters(service)["dropped"] += 1
+            if dropped_job.get("reply"):
+                self._track(asyncio.create_task(self._reply(
+                    dropped_job, {"ok": False, "error": "dropped: service queue full"}, 0.0, dropped_writer, dropped_lock)))
+        waiting.append((job, body, writer, write_lock))
+        if self.workers.get(service, 0) < self.limits.get(service, DEFAULT_LIMIT):
+            self.workers[service] = self.workers.get(service, 0) + 1
+            self._track(asyncio.create_task(self._drain(service)))
+
+    async def _drain(self, service: str):
+        """One of the service's workers: runs its queued jobs oldest first until none are left"""
+        waiting = self.pending[service]
+        try:
+            while waiting:
+                await self._run(*waiting.popleft())
+        finally:
+            self.workers[service] -= 1
+
+    async def serve(self):
+        import httpx
+
+        self.http = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections))
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._connection, path=self.socket_path)
+        print(f"📮 I/O sidecar listening on {self.socket_path} (limits: "
+              f"{', '.join(f'{name}={limit}' for name, limit in self.limits.items())})", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in list(self.tasks):
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            await self.http.aclose()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        self._track(asyncio.current_task())
+        try:
+            while True:
+                header_len, body_len = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                job = json.loads(await reader.readexactly(header_len))
+                body = await reader.readexactly(body_len) if body_len else b""
+                if job.get("kind") == "stats":
+                    self._track(asyncio.create_task(self._run(job, body, writer, write_lock)))
+                else:
+                    self._enqueue(job, body, writer, write_lock)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Shutdown; returning normally keeps asyncio from logging the cancelled handler
+        finally:
+            # Jobs already received still run; their replies have nowhere to go
+            writer.close()
+
+    def _track(self, task: asyncio.Task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, job: Dict[str, Any], body: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        kind = job.get("kind")
+        service = job.get("service", kind or "default")
+        started = time.perf_counter()
+        try:
+            if kind == "stats":
+                result = {"ok": True, "value": self.stats()}
+            else:
+                handler = {"http": self._http, "roboflow_upload": self._roboflow_upload}.get(kind)
+                if handler is None:
+                    raise ValueError(f"unknown job kind {kind!r}")
+                result = await handler(job, body)
+        except Exception as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - started
+        if kind != "stats":
+            self._count(service, result.get("ok", False), elapsed)
+        await self._reply(job, result, elapsed, writer, write_lock)
+
+    async def _reply(self, job: Dict[str, Any], result: Dict[str, Any], elapsed: float,
+                     writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        if not job.get("reply"):
+            return
+        result.update(id=job.get("id"), elapsed_ms=round(elapsed * 1000.0, 1))
+        try:
+            async with write_lock:
+                writer.write(encode_frame(result))
+                await writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+
+    async def _http(self, job: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        json_body, content, files = job.get("json"), None, None
+        if body and job.get("body_at"):
+            _insert(json_body, job["body_at"], body.decode("utf-8"))
+        elif body and job.get("file_field"):
+            files = {job["file_field"]: (job.get("filename", "file"), body,
+                                         job.get("content_type", "application/octet-stream"))}
+        elif body:
+            content = body
+        params = [tuple(pair) for pair in job["params"]] if isinstance(job.get("params"), list) else job.get("params")
+        response = await self.http.request(
+            job.get("method", "POST"), job["url"], params=params, headers=job.get("headers"),
+            json=json_body, content=content, files=files, data=job.get("data"),
+            timeout=job.get("timeout", self.timeout))
+        result = {"ok": response.is_success, "status": response.status_code}
+        if response.is_success and job.get("extract") is not None:
+            result["value"] = _lookup(response.json(), job["extract"])
+        return result
+
+    async def _roboflow_upload(self, job: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        """Dataset upload + prediction annotation, the same two calls the upload block makes"""
+        api_url, project, api_key = job["api_url"], job["project"], job["api_key"]
+        timeout = job.get("timeout", self.timeout)
+        params = [("api_key", api_key), ("batch", job.get("batch", ""))] + [("tag", tag) for tag in job.get("tags", [])]
+        response = await self.http.post(f"{api_url}/dataset/{project}/upload", params=params,
+                                        files={"file": ("imageToUpload", body, "image/jpeg")},
+                                        data={"name": f"{job['name']}.jpg"}, timeout=timeout)
+        response.raise_for_status()
+        uploaded = response.json()
+        if uploaded.get("duplicate"):
+            return {"ok": True, "status": response.status_code, "value": {"duplicate": True}}
+        image_id = uploaded.get("id")
+        if not image_id:
+            return {"ok": False, "status": response.status_code, "error": "upload returned no image id"}
+        annotation = job.get("annotation") or {}
+        if annotation.get("predictions"):
+            response = await self.http.post(
+                f"{api_url}/dataset/{project}/annotate/{image_id}",
+                params={"api_key": api_key, "name": f"{job['name']}.json", "prediction": "true"},
+                content=json.dumps(annotation), headers={"Content-Type": "text/plain"}, timeout=timeout)
+            response.raise_for_status()
+        return {"ok": True, "status": response.status_code, "value": {"id": image_id}}
+
+    def stats(self) -> Dict[str, Any]:
+        services = {}
+        for service, counters in self.counters.items():
+            services[service] = {"jobs": int(counters["jobs"]), "failed": int(counters["failed"]),
+                                 "dropped": int(counters["dropped"]), "queued": len(self.pending.get(service, ())),
+                                 "mean_ms": round(counters["total_ms"] / counters["jobs"], 1) if counters["jobs"] else 0.0}
+        return {"uptime_s": round(time.time() - self.started, 1), "services": services}
+
+
+def parse_limits(assignments: List[str]) -> Dict[str, int]:
+    limits = {}
+    for assignment in assignments:
+        service, separator, value = assignment.partition("=")
+        if not separator or not value.isdigit() or int(value) < 1:
+            raise ValueError(f"expected SERVICE=N with N >= 1, got {assignment!r}")
+        limits[service] = int(value)
+    return limits
+
+
+def run_sidecar(socket_path: str, limits: Optional[Dict[str, int]] = None, max_connections: int = 32,
+                timeout: float = 30.0, max_pending: int = MAX_PENDING_PER_SERVICE):
+    sidecar = IOSidecar(socket_path, limits, max_connections, timeout, max_pending)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(sidecar.serve())
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+
+
+def request_stats(path: str, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """Ask a running sidecar for its per-service counters (blocking; for reports and benchmarks)"""
+    sidecar = SidecarClient(path)
+    done = threading.Event()
+    reply: Dict[str, Any] = {}
+
+    def on_reply(result: Dict[str, Any], _body: bytes):
+        reply.update(result)
+        done.set()
+
+    sidecar.submit({"kind": "stats"}, callback=on_reply)
+    done.wait(timeout)
+    sidecar.close()
+    return reply.get("value")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=os.environ.get(SOCKET_ENV, DEFAULT_SOCKET), help="Unix socket path")
+    parser.add_argument("--limit", action="append", default=[], metavar="SERVICE=N",
+                        help="Concurrent requests per service (default: anthropic=1 n8n=4 roboflow=2, others 4)")
+    parser.add_argument("--max-connections", type=int, default=32, help="Pooled HTTP connections in total")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING_PER_SERVICE,
+                        help="Jobs waiting per service before the oldest is dropped")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Default per-request timeout in seconds")
+    parser.add_argument("--stats", action="store_true", help="Print a running sidecar's counters and exit")
+    args = parser.parse_args()
+
+    if args.stats:
+        print(json.dumps(request_stats(args.socket), indent=2))
+        return 0
+    try:
+        limits = parse_limits(args.limit)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.max_pending < 1:
+        parser.error("--max-pending must be at least 1")
+    run_sidecar(args.socket, limits, args.max_connections, args.timeout, args.max_pending)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
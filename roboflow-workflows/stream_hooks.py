@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🪝 Audtheia Stream Hooks
+========================
+In-process links between the deploy script and the workflow's custom
+blocks. The execution engine compiles the blocks from the workflow JSON and
+does not expose them by name, so both sides meet here instead.
+
+- Media clocks: a file source thinned by adaptive skip (or keyframes) has
+  irregular frame spacing, so frame_number / fps is not its media time. The
+  deploy script registers each producer's source-frame lookup by
+  video_identifier; Track_Lifecycle_Aggregator reads time from it.
+- End of stream: blocks that hold open state register a flusher, blocks
+  that deliver it register a sink. end_of_stream() runs every flusher and
+  hands what they return to every sink, so nothing still open when a file
+  ends or a camera is stopped is lost.
+
+Registrations are keyed by block type: a block compiled again (a second
+engine for the same workflow) replaces its earlier copy. Blocks import this
+module optionally, as they do io_sidecar; in Roboflow-hosted runs it is not
+on the path and the hooks are simply absent.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+_lock = threading.Lock()
+_media_clocks: Dict[str, Callable[[int], Optional[float]]] = {}
+_flushers: Dict[str, Callable[[Optional[str]], List[Dict[str, Any]]]] = {}
+_sinks: Dict[str, Callable[[List[Dict[str, Any]]], None]] = {}
+
+
+def register_media_clock(stream_id: str, clock: Callable[[int], Optional[float]]):
+    """clock(frame_number) -> seconds into the source file for that produced frame"""
+    with _lock:
+        _media_clocks[str(stream_id)] = clock
+
+
+def media_time(stream_id: str, frame_number: int) -> Optional[float]:
+    """Media time from the registered clock, or None when the stream has none"""
+    with _lock:
+        clock = _media_clocks.get(str(stream_id))
+    if clock is None:
+        return None
+    try:
+        return clock(frame_number)
+    except Exception:
+        return None
+
+
+def register_flusher(name: str, flusher: Callable[[Optional[str]], List[Dict[str, Any]]]):
+    """flusher(stream_id or None for all) -> events closed at end of stream"""
+    with _lock:
+        _flushers[name] = flusher
+
+
+def register_sink(name: str, sink: Callable[[List[Dict[str, Any]]], None]):
+    """sink(events) delivers flushed events; it should finish before returning"""
+    with _lock:
+        _sinks[name] = sink
+
+
+def end_of_stream(stream_id: Optional[str] = None) -> int:
+    """Flush every registered block for one stream (None: all) and deliver the result; returns the event count"""
+    with _lock:
+        flushers = list(_flushers.values())
+        sinks = list(_sinks.values())
+    events: List[Dict[str, Any]] = []
+    for flusher in flushers:
+        try:
+            events += flusher(stream_id) or []
+        except Exception:
+            pass
+    if events:
+        for sink in sinks:
+            try:
+                sink(events)
+            except Exception:
+                pass
+    return len(events)
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📼 Audtheia Workflow Output Log
+===============================
+The deploy sink appends what the workflow produced for every frame to an
+append-only binary log: tracked predictions as columnar arrays, tracker
+ids, the analysis text, track-lifecycle events and timestamps, plus an
+optional downscaled JPEG thumbnail every few frames. The replayer
+memory-maps the log and re-drives the downstream blocks (or just the n8n
+webhook caller) at the recorded pace, N times faster, or flat out - a
+repeatable load test for the analysis/webhook side without a camera or
+a model.
+
+Files:
+    survey.audlog       8-byte magic, then records
+    survey.audlog.idx   one 24-byte entry per record (kind, source, offset,
+                        timestamp); rebuilt from the log if missing or short
+
+Record = 24-byte header + payload padded to 8 bytes:
+    header   <IBBHQd  payload bytes, kind, flags, source id, frame id, timestamp
+    FRAME    <IHHIII4x  detections n, width, height, analysis string id,
+             thumbnail bytes, extras bytes; then int64[n] tracker ids,
+             float32[n, 4] xyxy, float32[n] confidence, uint32[n] class
+             string ids, thumbnail JPEG, extras JSON (track events)
+    STRING   utf-8 text, the record's frame id is the string id
+
+Class names and analysis texts are written once as STRING records and
+referenced by id; the analysis text only when it changes. A crash loses
+at most the last second or so: the writer flushes every flush_seconds and
+the reader ignores a partial last record.
+
+Timestamps are wall-clock seconds (time.time()) taken when the record is
+written, never decreasing, so seek() can binary-search them and replay
+pacing is the same for every source type.
+
+Usage:
+    python workflow_log.py info survey.audlog
+    python workflow_log.py replay survey.audlog --speed 1        # recorded pace
+    python workflow_log.py replay survey.audlog --speed 10       # 10x
+    python workflow_log.py replay survey.audlog --speed max --target webhook \\
+        --set Analyst_Caller.N8N_WEBHOOK_URL=http://127.0.0.1:8183/webhook/audtheia
+    python workflow_log.py reindex survey.audlog
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+LOG_MAGIC = b"AUDTLOG\x01"
+INDEX_SUFFIX = ".idx"
+
+RECORD_HEADER = struct.Struct("<IBBHQd")
+FRAME_COUNTS = struct.Struct("<IHHIII4x")
+KIND_FRAME, KIND_STRING = 1, 2
+FLAG_THUMBNAIL = 0x01
+NO_STRING = 0xFFFFFFFF
+
+INDEX_DTYPE = np.dtype([("kind", "u1"), ("flags", "u1"), ("source", "<u2"), ("pad", "<u4"),
+                        ("offset", "<u8"), ("timestamp", "<f8")])
+
+LAG_TOLERANCE_S = 0.002  # later than this counts as behind schedule
+
+# Blocks the replayer drives by default: everything after the model except the on-screen overlay
+REPLAY_BLOCKS = ["Track_Lifecycle_Aggregator", "Detection_Converter", "Active_Learning_Upload_Policy",
+                 "Anthropic_Environmental_Analyzer", "Analyst_Caller"]
+
+
+def _pad(length: int) -> int:
+    return (8 - length % 8) % 8
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+class WorkflowLogWriter:
+    """Appends one FRAME record per sink call; safe to call from several sink threads"""
+
+    def __init__(self, path: str, thumbnail_width: int = 0, thumbnail_every: int = 5, jpeg_quality: int = 70,
+                 flush_seconds: float = 1.0):
+        self.path = str(path)
+        self.thumbnail_width = int(thumbnail_width)
+        self.thumbnail_every = max(1, int(thumbnail_every))
+        self.jpeg_quality = int(jpeg_quality)
+        self.flush_seconds = flush_seconds
+        self._log = open(self.path, "wb", buffering=1 << 20)
+        self._index = open(self.path + INDEX_SUFFIX, "wb", buffering=1 << 16)
+        self._log.write(LOG_MAGIC)
+        self._offset = len(LOG_MAGIC)
+        self._strings: Dict[str, int] = {}
+        self._next_string_id = 0
+        self._last_analysis: Dict[int, str] = {}
+        self._frames_since_thumbnail: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()  # the writer's own clock, not record timestamps
+        self._last_timestamp = 0.0
+        self.frames = 0
+        self.thumbnails = 0
+        self.bytes_written = self._offset
+        self.closed = False
+
+    def _append(self, kind: int, flags: int, source: int, ident: int, timestamp: float, parts: List[bytes]):
+        length = sum(len(part) for part in parts)
+        self._log.write(RECORD_HEADER.pack(length, kind, flags, source, ident, timestamp))
+        for part in parts:
+            self._log.write(part)
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        entry[0] = (kind, flags, source, 0, self._offset, timestamp)
+        self._index.write(entry.tobytes())
+        self._offset += RECORD_HEADER.size + length
+        self.bytes_written = self._offset
+
+    def _string_id(self, text: str, timestamp: float, remember: bool = True) -> int:
+        """Write `text` as a STRING record; class names are remembered, analysis texts rarely repeat"""
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._next_string_id
+            self._next_string_id += 1
+            if remember:
+                self._strings[text] = string_id
+            data = text.encode("utf-8")
+            self._append(KIND_STRING, 0, 0, string_id, timestamp, [data, b"\0" * _pad(len(data))])
+        return string_id
+
+    def _thumbnail(self, source_id: int, image: Optional[np.ndarray]) -> bytes:
+        if not self.thumbnail_width or image is None:
+            return b""
+        since = self._frames_since_thumbnail.get(source_id, self.thumbnail_every)
+        if since < self.thumbnail_every:
+            self._frames_since_thumbnail[source_id] = since + 1
+            return b""
+        height, width = image.shape[:2]
+        scale = min(1.0, self.thumbnail_width / float(width))
+        small = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+        ok, encoded = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return b""
+        self._frames_since_thumbnail[source_id] = 1
+        self.thumbnails += 1
+        return encoded.tobytes()
+
+    def record(self, source_id: int, frame_id: int, result: Dict[str, Any], image: Optional[np.ndarray] = None,
+               timestamp: Optional[float] = None):
+        """Append one frame's workflow outputs (tracked_detections, anthropic_analysis, track_observations).
+        `timestamp` is wall-clock time (time.time()), now when omitted."""
+        timestamp = time.time() if timestamp is None else timestamp
+        detections = result.get("tracked_detections")
+        count = 0 if detections is None else len(detections)
+        if count:
+            tracker_id = detections.tracker_id if detections.tracker_id is not None else np.full(count, -1)
+            confidence = detections.confidence if detections.confidence is not None else np.ones(count)
+            class_names = detections.data.get("class_name", ["unknown"] * count)
+        analysis = result.get("anthropic_analysis")
+        observations = result.get("track_observations") or {}
+        height, width = image.shape[:2] if image is not None else (0, 0)
+
+        with self._lock:
+            if self.closed:
+                return
+            # A wall-clock step back (NTP) must not unsort the index
+            timestamp = self._last_timestamp = max(timestamp, self._last_timestamp)
+            analysis_id = NO_STRING
+            if isinstance(analysis, str) and analysis and analysis != self._last_analysis.get(source_id):
+                analysis_id = self._string_id(analysis, timestamp, remember=False)
+                self._last_analysis[source_id] = analysis
+            columns = b""
+            if count:
+                class_ids = np.array([self._string_id(str(name), timestamp) for name in class_names], dtype="<u4")
+                columns = b"".join([
+                    np.asarray(tracker_id, dtype="<i8").tobytes(),
+                    np.asarray(detections.xyxy, dtype="<f4").tobytes(),
+                    np.asarray(confidence, dtype="<f4").tobytes(),
+                    class_ids.tobytes(),
+                ])
+                columns += b"\0" * _pad(len(columns))
+            thumbnail = self._thumbnail(source_id, image)
+            events = observations.get("events") if isinstance(observations, dict) else None
+            extras = json.dumps({"events": events}, default=str).encode("utf-8") if events else b""
+            parts = [FRAME_COUNTS.pack(count, width, height, analysis_id, len(thumbnail), len(extras)), columns,
+                     thumbnail, b"\0" * _pad(len(thumbnail)), extras, b"\0" * _pad(len(extras))]
+            self._append(KIND_FRAME, FLAG_THUMBNAIL if thumbnail else 0, source_id, frame_id, timestamp, parts)
+            self.frames += 1
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_seconds:
+                self._log.flush()
+                self._index.flush()
+                self._last_flush = now
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._log.close()
+            self._index.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "frames": self.frames, "thumbnails": self.thumbnails,
+                "strings": self._next_string_id, "bytes": self.bytes_written}
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LoggedFrame:
+    """One recorded frame; arrays are read-only views into the mapped log"""
+    source_id: int
+    frame_id: int
+    timestamp: float
+    width: int
+    height: int
+    tracker_id: np.ndarray
+    xyxy: np.ndarray
+    confidence: np.ndarray
+    class_name: List[str]
+    analysis: Optional[str]            # only set on frames where the analysis text changed
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    thumbnail: Optional[bytes] = None
+
+
+def scan_index(buffer, start: int = len(LOG_MAGIC)) -> np.ndarray:
+    """Index entries for every complete record from `start` to the end of the log"""
+    entries = []
+    offset, size = start, len(buffer)
+    while offset + RECORD_HEADER.size <= size:
+        length, kind, flags, source, _ident, timestamp = RECORD_HEADER.unpack_from(buffer, offset)
+        if offset + RECORD_HEADER.size + length > size:
+            break
+        entries.append((kind, flags, source, 0, offset, timestamp))
+        offset += RECORD_HEADER.size + length
+    return np.array(entries, dtype=INDEX_DTYPE)
+
+
+def rebuild_index(path: str) -> int:
+    """Rewrite `<path>.idx` from the log; returns the number of records"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if buffer[:len(LOG_MAGIC)] != LOG_MAGIC:
+            raise ValueError(f"{path} is not a workflow log")
+        index = scan_index(buffer)
+    index.tofile(path + INDEX_SUFFIX)
+    return len(index)
+
+
+class WorkflowLog:
+    """Memory-mapped reader with a per-frame index for seeking by position or time"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size < len(LOG_MAGIC):
+            self._file.close()
+            raise ValueError(f"{self.path} is empty")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(LOG_MAGIC)] != LOG_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a workflow log")
+        index = self._load_index()
+        self.strings: Dict[int, str] = {}
+        for entry in index[index["kind"] == KIND_STRING]:
+            length, _, _, _, string_id, _ = RECORD_HEADER.unpack_from(self._map, int(entry["offset"]))
+            start = int(entry["offset"]) + RECORD_HEADER.size
+            self.strings[string_id] = bytes(self._map[start:start + length]).rstrip(b"\0").decode("utf-8")
+        self.index = index[index["kind"] == KIND_FRAME]
+
+    def _load_index(self) -> np.ndarray:
+        index_path = self.path + INDEX_SUFFIX
+        index = np.zeros(0, dtype=INDEX_DTYPE)
+        if os.path.exists(index_path):
+            usable = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+            if usable:
+                index = np.array(np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(usable,)))
+        # Drop entries past the end of the log (index flushed ahead of a truncated log) ...
+        size = len(self._map)
+        while len(index):
+            offset = int(index[-1]["offset"])
+            if offset + RECORD_HEADER.size <= size and \
+                    offset + RECORD_HEADER.size + RECORD_HEADER.unpack_from(self._map, offset)[0] <= size:
+                break
+            index = index[:-1]
+        # ... and pick up records written after the last indexed one
+        if len(index):
+            offset = int(index[-1]["offset"])
+            end = offset + RECORD_HEADER.size + RECORD_HEADER.unpack_from(self._map, offset)[0]
+        else:
+            end = len(LOG_MAGIC)
+        if end < size:
+            index = np.concatenate([index, scan_index(self._map, end)])
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[LoggedFrame]:
+        for position in range(len(self.index)):
+            yield self.frame(position)
+
+    @property
+    def start_time(self) -> float:
+        return float(self.index["timestamp"][0]) if len(self.index) else 0.0
+
+    @property
+    def duration(self) -> float:
+        return float(self.index["timestamp"][-1] - self.index["timestamp"][0]) if len(self.index) else 0.0
+
+    def seek(self, seconds: float) -> int:
+        """Position of the first frame at or after `seconds` into the recording"""
+        return int(np.searchsorted(self.index["timestamp"], self.start_time + seconds, side="left"))
+
+    def frame(self, position: int) -> LoggedFrame:
+        offset = int(self.index[position]["offset"])
+        _, _, flags, source, frame_id, timestamp = RECORD_HEADER.unpack_from(self._map, offset)
+        offset += RECORD_HEADER.size
+        count, width, height, analysis_id, thumbnail_len, extras_len = FRAME_COUNTS.unpack_from(self._map, offset)
+        offset += FRAME_COUNTS.size
+
+        def column(dtype: str, items: int) -> np.ndarray:
+            nonlocal offset
+            if not items:
+                return np.zeros(0, dtype=dtype)
+            values = np.frombuffer(self._map, dtype=dtype, count=items, offset=offset)
+            offset += values.nbytes
+            return values
+
+        tracker_id = column("<i8", count)
+        xyxy = column("<f4", count * 4).reshape(-1, 4)
+        confidence = column("<f4", count)
+        class_ids = column("<u4", count)
+        offset += _pad(offset)
+        thumbnail = bytes(self._map[offset:offset + thumbnail_len]) if flags & FLAG_THUMBNAIL else None
+        offset += thumbnail_len + _pad(thumbnail_len)
+        events = json.loads(bytes(self._map[offset:offset + extras_len]))["events"] if extras_len else []
+        return LoggedFrame(source_id=source, frame_id=frame_id, timestamp=timestamp, width=width, height=height,
+                           tracker_id=tracker_id, xyxy=xyxy, confidence=confidence,
+                           class_name=[self.strings.get(int(i), "unknown") for i in class_ids],
+                           analysis=self.strings.get(analysis_id), events=events, thumbnail=thumbnail)
+
+    def info(self) -> Dict[str, Any]:
+        sources = {}
+        for source in np.unique(self.index["source"]):
+            frames = self.index[self.index["source"] == source]
+            sources[int(source)] = {"frames": len(frames),
+                                    "thumbnails": int(np.count_nonzero(frames["flags"] & FLAG_THUMBNAIL)),
+                                    "fps": round(_rate(frames["timestamp"]), 2)}
+        return {"path": self.path, "bytes": len(self._map), "frames": len(self.index),
+                "strings": len(self.strings), "duration_s": round(self.duration, 3), "sources": sources}
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # LoggedFrame arrays still reference the map; it is released with them
+        self._file.close()
+
+
+def _rate(timestamps: np.ndarray) -> float:
+    if len(timestamps) < 2:
+        return 0.0
+    span = float(timestamps[-1] - timestamps[0])
+    return (len(timestamps) - 1) / span if span > 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class ReplayFrames:
+    """Images for replayed frames: the latest thumbnail scaled to the recorded size, else a blank frame"""
+
+    def __init__(self):
+        self._images: Dict[int, np.ndarray] = {}
+
+    def image(self, frame: LoggedFrame) -> np.ndarray:
+        cached = self._images.get(frame.source_id)
+        if frame.thumbnail:
+            decoded = cv2.imdecode(np.frombuffer(frame.thumbnail, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if decoded is not None:
+                cached = cv2.resize(decoded, (frame.width or decoded.shape[1], frame.height or decoded.shape[0]))
+                self._images[frame.source_id] = cached
+        if cached is None or (frame.width and cached.shape[:2] != (frame.height, frame.width)):
+            cached = np.zeros((frame.height or 720, frame.width or 1280, 3), dtype=np.uint8)
+            self._images[frame.source_id] = cached
+        return cached
+
+
+def replay(log: WorkflowLog, target: str = "blocks", speed: Optional[float] = 1.0,
+           overrides: Optional[Dict[str, Any]] = None, blocks: Optional[List[str]] = None,
+           start: int = 0, end: Optional[int] = None, stream_prefix: str = "replay") -> Dict[str, Any]:
+    """Drive the recorded frames through the downstream blocks; speed None means as fast as possible"""
+    from block_runner import BlockChain
+
+    if target == "webhook":
+        blocks = ["Analyst_Caller"]
+    chain = BlockChain(overrides, stream_id=stream_prefix, blocks=blocks or REPLAY_BLOCKS)
+    fps = {source: stats["fps"] or 30.0 for source, stats in log.info()["sources"].items()}
+    images = ReplayFrames()
+    analysis: Dict[int, str] = {}
+    end = len(log) if end is None else min(end, len(log))
+    lag = []
+    wall_start = time.perf_counter()
+    first_timestamp = float(log.index["timestamp"][start]) if start < end else 0.0
+
+    for position in range(start, end):
+        frame = log.frame(position)
+        if speed:
+            delay = wall_start + (frame.timestamp - first_timestamp) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -LAG_TOLERANCE_S:
+                lag.append(-delay)
+        stream_id = f"{stream_prefix}_{frame.source_id}"
+        if frame.analysis is not None:
+            analysis[frame.source_id] = frame.analysis
+        image_array = images.image(frame)
+        if target == "webhook":
+            started = time.perf_counter()
+            chain._call("Analyst_Caller", anthropic_analysis=analysis.get(frame.source_id, ""),
+                        image=chain.image(image_array, frame.frame_id, fps[frame.source_id], stream_id),
+                        observations={"stream_id": stream_id, "events": frame.events})
+            chain.frame_times.append(time.perf_counter() - started)
+        else:
+            record = {"xyxy": frame.xyxy, "confidence": frame.confidence, "class_name": frame.class_name,
+                      "tracker_id": frame.tracker_id}
+            chain.run_frame(*chain.inputs(image_array, frame.frame_id, record, fps[frame.source_id], stream_id))
+
+    wall = time.perf_counter() - wall_start
+    frames = end - start if start < end else 0
+    recorded = float(log.index["timestamp"][end - 1]) - first_timestamp if frames else 0.0
+    return {"target": target, "speed": speed or "max", "frames": frames, "wall_s": round(wall, 3),
+            "recorded_s": round(recorded, 3), "achieved_speed": round(recorded / wall, 2) if wall > 0 else 0.0,
+            "frames_per_s": round(frames / wall, 1) if wall > 0 else 0.0,
+            "behind_schedule_frames": len(lag), "max_lag_ms": round(max(lag) * 1000.0, 1) if lag else 0.0,
+            "chain": chain.summary()}
+
+
+def parse_speed(value: str) -> Optional[float]:
+    if value.lower() in ("max", "0"):
+        return None
+    speed = float(value.lower().rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    info_parser = commands.add_parser("info", help="Summarise a log")
+    info_parser.add_argument("log")
+    reindex_parser = commands.add_parser("reindex", help="Rebuild the .idx file from the log")
+    reindex_parser.add_argument("log")
+    replay_parser = commands.add_parser("replay", help="Re-drive downstream blocks from a log")
+    replay_parser.add_argument("log")
+    replay_parser.add_argument("--speed", type=parse_speed, default=1.0,
+                               help="1 = recorded pace, N = N times faster, max = no pacing (default 1)")
+    replay_parser.add_argument("--target", choices=["blocks", "webhook"], default="blocks",
+                               help="blocks: downstream custom blocks; webhook: only Analyst_Caller with the "
+                                    "recorded analysis text and track events")
+    replay_parser.add_argument("--blocks", nargs="+", default=None, metavar="BLOCK_TYPE",
+                               help=f"Blocks to drive for --target blocks (default: {' '.join(REPLAY_BLOCKS)})")
+    replay_parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="BLOCK.NAME=VALUE",
+                               help="Override a block's module-level setting (repeatable)")
+    replay_parser.add_argument("--from", dest="start_s", type=float, default=0.0,
+                               help="Start this many seconds into the recording")
+    replay_parser.add_argument("--frames", type=int, default=None, help="Stop after this many frames")
+    replay_parser.add_argument("--drain-seconds", type=float, default=2.0,
+                               help="Wait for background uploads/webhooks before reporting (default 2)")
+    replay_parser.add_argument("--json", dest="json_path", help="Write the replay report to this JSON file")
+    args = parser.parse_args()
+
+    if args.command == "reindex":
+        print(f"🗂️ Indexed {rebuild_index(args.log)} records in {args.log}{INDEX_SUFFIX}")
+        return 0
+
+    log = WorkflowLog(args.log)
+    if args.command == "info":
+        print(json.dumps(log.info(), indent=2))
+        return 0
+
+    from block_runner import parse_overrides, print_summary
+    try:
+        overrides = parse_overrides(args.overrides)
+    except ValueError as exc:
+        parser.error(str(exc))
+    start = log.seek(args.start_s)
+    end = None if args.frames is None else start + args.frames
+    print(f"▶️ Replaying {args.log} ({len(log)} frames, {log.duration:.1f}s recorded) "
+          f"to {args.target} at {'max' if args.speed is None else f'{args.speed:g}x'} speed")
+    try:
+        report = replay(log, args.target, args.speed, overrides, args.blocks, start, end)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.drain_seconds > 0:
+        time.sleep(args.drain_seconds)
+
+    print_summary(report["chain"])
+    print(f"\n📼 {report['frames']} frames in {report['wall_s']:.2f}s "
+          f"({report['recorded_s']:.2f}s recorded, {report['achieved_speed']:.2f}x, "
+          f"{report['frames_per_s']:.1f} frames/s); behind schedule on {report['behind_schedule_frames']} frames, "
+          f"max lag {report['max_lag_ms']:.1f} ms")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"log": args.log, **report}, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+    return 0 if report["frames"] else 1
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.exit(main())
@@ -17,6 +17,15 @@ const KEY = Object.freeze({
 
 const AIRTABLE_API = 'https://api.airtable.com/v0';
 
+/* Cached, read-only dashboard served by the Audtheia proxy. Used when no
+   Airtable credentials are saved on this device. Responses carry an ETag,
+   so the browser revalidates with one conditional request per load. */
+const DASHBOARD_API = 'https://audtheia-proxy.onrender.com/dashboard';
+const DASHBOARD_TABLES = Object.freeze({ species: 'species', mapping: 'mapping', reports: 'reports' });
+
+/* ── Data source: 'airtable' (own credentials) or 'proxy' (cached) ─────── */
+let dataSource = 'airtable';
+
 /* ── Pagination state ───────────────────────────────────────────────────── */
 let speciesOffset = null;
 
@@ -39,6 +48,7 @@ const elMappingGrid  = document.getElementById('mapping-grid');
 const elReportsList  = document.getElementById('reports-list');
 const elLoadMore     = document.getElementById('species-load-more');
 const elBtnLoadMore  = document.getElementById('btn-load-more');
+const elSummary      = document.getElementById('dash-summary');
 const dashTabs       = document.querySelectorAll('.dash-tab');
 
 const PANELS = {
@@ -108,7 +118,7 @@ elClear.addEventListener('click', function () {
   elPat.value = elBaseId.value = elTableSpecies.value =
   elTableMapping.value = elTableReports.value = '';
   showMsg('Credentials cleared from local storage.', 'success');
-  showNoCreds();
+  initDashboard();
 });
 
 /* ── Airtable fetch ─────────────────────────────────────────────────────── */
@@ -152,6 +162,53 @@ async function fetchAllRecords(tableId, maxPages) {
   return { records: records, truncated: truncated };
 }
 
+/* ── Proxy dashboard fetch ──────────────────────────────────────────────── */
+async function fetchProxy(path) {
+  const res = await fetch(DASHBOARD_API + path);
+  if (!res.ok) {
+    let message = 'HTTP ' + res.status;
+    try {
+      const body = await res.json();
+      if (body && body.detail && body.detail.detail) message = body.detail.detail;
+    } catch (_) { /* ignore */ }
+    throw new Error(message);
+  }
+  return res.json();
+}
+
+/* Same shape as fetchAirtablePage: { records, offset } with the next page number as offset */
+async function fetchProxyPage(table, page) {
+  const data = await fetchProxy('/' + table + '?page=' + (page || 1));
+  return { records: data.records || [], offset: data.next_page || null };
+}
+
+async function fetchProxyAll(table, maxPages) {
+  maxPages = maxPages || 10;
+  const records = [];
+  let page      = 1;
+  let truncated = false;
+
+  while (page) {
+    const data = await fetchProxy('/' + table + '?page=' + page + '&page_size=100');
+    const batch = data.records || [];
+    for (let i = 0; i < batch.length; i++) records.push(batch[i]);
+    page = data.next_page || null;
+    if (page && page > maxPages) { truncated = true; break; }
+  }
+
+  return { records: records, truncated: truncated };
+}
+
+function renderSummary(summary) {
+  const counts = summary.record_counts || {};
+  const top    = (summary.top_species || []).slice(0, 3).map(function (s) { return s.species + ' (' + s.observations + ')'; });
+  elSummary.textContent =
+    (counts.species || 0) + ' observations \u00b7 ' + (summary.unique_species || 0) + ' species' +
+    (top.length ? ' \u00b7 most observed: ' + top.join(', ') : '') +
+    ' \u00b7 updated ' + formatObsTime(summary.generated_at);
+  elSummary.hidden = false;
+}
+
 /* ── UI state helpers ───────────────────────────────────────────────────── */
 function showNoCreds() {
   elNoCreds.hidden = false;
@@ -474,7 +531,7 @@ function buildSpeciesRow(record) {
 async function loadSpecies(append) {
   const creds = getCredentials();
 
-  if (!creds.tableSpecies) {
+  if (dataSource === 'airtable' && !creds.tableSpecies) {
     showEmpty(elSpeciesGrid, 'Species Observations \u2014 no Table ID configured');
     elLoadMore.hidden = true;
     return;
@@ -490,7 +547,9 @@ async function loadSpecies(append) {
   }
 
   try {
-    const data    = await fetchAirtablePage(creds.tableSpecies, append ? speciesOffset : null);
+    const data    = dataSource === 'proxy'
+      ? await fetchProxyPage(DASHBOARD_TABLES.species, append ? speciesOffset : null)
+      : await fetchAirtablePage(creds.tableSpecies, append ? speciesOffset : null);
     const records = data.records || [];
 
     if (!append) elSpeciesGrid.innerHTML = '';
@@ -593,11 +652,13 @@ function buildMappingCard(record) {
 
 async function loadMapping() {
   const creds = getCredentials();
-  if (!creds.tableMapping) { showEmpty(elMappingGrid, 'Environmental Mapping \u2014 no Table ID configured'); return; }
+  if (dataSource === 'airtable' && !creds.tableMapping) { showEmpty(elMappingGrid, 'Environmental Mapping \u2014 no Table ID configured'); return; }
   showSkeleton(elMappingGrid, 3);
 
   try {
-    const result = await fetchAllRecords(creds.tableMapping, 10);
+    const result = dataSource === 'proxy'
+      ? await fetchProxyAll(DASHBOARD_TABLES.mapping, 10)
+      : await fetchAllRecords(creds.tableMapping, 10);
     elMappingGrid.innerHTML = '';
     if (result.records.length === 0) { showEmpty(elMappingGrid, 'Environmental Mapping'); return; }
     for (let i = 0; i < result.records.length; i++) elMappingGrid.appendChild(buildMappingCard(result.records[i]));
@@ -648,11 +709,13 @@ function buildReportRow(record) {
 
 async function loadReports() {
   const creds = getCredentials();
-  if (!creds.tableReports) { showEmpty(elReportsList, 'Daily Reports \u2014 no Table ID configured'); return; }
+  if (dataSource === 'airtable' && !creds.tableReports) { showEmpty(elReportsList, 'Daily Reports \u2014 no Table ID configured'); return; }
   elReportsList.innerHTML = '<div class="dash-skeleton" aria-hidden="true"><div class="dash-skeleton-line"></div><div class="dash-skeleton-line dash-skeleton-line--short"></div></div>';
 
   try {
-    const result = await fetchAllRecords(creds.tableReports, 10);
+    const result = dataSource === 'proxy'
+      ? await fetchProxyAll(DASHBOARD_TABLES.reports, 10)
+      : await fetchAllRecords(creds.tableReports, 10);
     elReportsList.innerHTML = '';
     if (result.records.length === 0) { showEmpty(elReportsList, 'Daily Reports'); return; }
     for (let i = 0; i < result.records.length; i++) elReportsList.appendChild(buildReportRow(result.records[i]));
@@ -690,7 +753,19 @@ function resetTabs() {
 }
 
 async function initDashboard() {
-  if (!hasCredentials()) { showNoCreds(); return; }
+  elSummary.hidden = true;
+  if (hasCredentials()) {
+    dataSource = 'airtable';
+  } else {
+    /* No credentials: fall back to the proxy's cached dashboard if it is enabled */
+    try {
+      renderSummary(await fetchProxy('/summary'));
+      dataSource = 'proxy';
+    } catch (_) {
+      showNoCreds();
+      return;
+    }
+  }
   showContent();
   resetTabs();
   tabsLoaded.species = true;